@@ -7,7 +7,7 @@ from django.utils.safestring import mark_safe
 from .models import (
     User, Shop, Category, Product, ProductInfo,
     Parameter, ProductParameter, Contact,
-    Order, OrderItem, ConfirmEmailToken
+    Order, OrderItem, ConfirmEmailToken, ShopImportState, PriceHistory, ParameterFacet, CatalogItem
 )
 
 class CustomUserCreationForm(UserCreationForm):
@@ -85,4 +85,8 @@ admin.site.register(Contact)
 admin.site.register(Order)
 admin.site.register(OrderItem)
 admin.site.register(ConfirmEmailToken)
+admin.site.register(ShopImportState)
+admin.site.register(PriceHistory)
+admin.site.register(ParameterFacet)
+admin.site.register(CatalogItem)
 admin.site.register(User)
\ No newline at end of file
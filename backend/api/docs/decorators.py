@@ -168,7 +168,8 @@ def partner_endpoint(operation, summary=None, description=None, **kwargs):
     Специализированный декоратор для partner endpoints.
 
     Args:
-        operation: Тип операции ('update_price', 'get_state', 'update_state', 'get_orders')
+        operation: Тип операции ('update_price', 'batch_update', 'upload_price', 'rollback_catalog',
+            'get_state', 'update_state', 'get_orders')
         summary: Краткое описание
         description: Подробное описание
         **kwargs: Дополнительные параметры
@@ -180,6 +181,9 @@ def partner_endpoint(operation, summary=None, description=None, **kwargs):
     if not summary:
         operation_summaries = {
             'update_price': 'Обновить прайс-лист партнера',
+            'batch_update': 'Пакетно обновить прайс-листы партнеров',
+            'upload_price': 'Загрузить файл прайс-листа партнера',
+            'rollback_catalog': 'Откатить каталог партнера к предыдущей версии',
             'get_state': 'Получить статус партнера',
             'update_state': 'Обновить статус партнера',
             'get_orders': 'Получить заказы партнера'
@@ -164,6 +164,19 @@ PARTNER_EXAMPLES = {
             "state": "on"  # или "off"
         },
         request_only=True
+    ),
+
+    'batch_update_request': OpenApiExample(
+        name="Пакетное обновление прайсов",
+        description="Пример запроса на обновление прайс-листов нескольких магазинов",
+        value={
+            "shops": [
+                {"shop_id": 1, "url": "https://example.com/shop1.yaml"},
+                {"shop_id": 2}
+            ],
+            "concurrency": 4
+        },
+        request_only=True
     )
 }
 
@@ -283,7 +296,8 @@ def get_examples_for_operation(operation_type, resource_type=None):
         },
         'partner': {
             'update_price': [PARTNER_EXAMPLES['price_update_request']],
-            'update_state': [PARTNER_EXAMPLES['state_update_request']]
+            'update_state': [PARTNER_EXAMPLES['state_update_request']],
+            'batch_update': [PARTNER_EXAMPLES['batch_update_request']]
         }
     }
 
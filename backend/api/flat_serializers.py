@@ -0,0 +1,263 @@
+from rest_framework import serializers
+from backend.models import Product, ProductInfo, Contact, OrderItem
+from backend.services.catalog import CatalogReadModel
+
+# Поля DRF для значений, формат которых должен совпадать с ModelSerializer
+_datetime_field = serializers.DateTimeField()
+_total_cost_field = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+def image_url(name, request=None):
+    """
+    Ссылка на изображение товара, как у ImageField сериализатора; без изображения - None.
+    """
+    if not name:
+        return None
+    url = Product._meta.get_field('image').storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+class CatalogItemFlatSerializer:
+    """
+    Быстрая сериализация витрины каталога из строк values().
+
+    Без параметров fields и expand формирует тот же JSON, что и ProductInfoSerializer,
+    но без создания объектов моделей и обхода полей сериализатора.
+
+    Параметры запроса:
+    - fields - поля ответа через запятую (например, fields=id,price,product);
+    - expand - развернутые вложенные объекты: product, product.category, shop,
+      product_parameters.
+    Если задан fields или expand, неразвернутые product, shop и категория товара
+    возвращаются как id, а product_parameters - только при явном запросе.
+    Из витрины читаются только столбцы выбранных полей.
+    """
+
+    field_names = ('id', 'model', 'external_id', 'product', 'shop', 'quantity', 'price', 'price_rrc',
+                   'product_parameters')
+    expandable = ('product', 'product.category', 'shop', 'product_parameters')
+    # Поля ответа, которые берутся из столбцов витрины без преобразования
+    scalar_columns = {
+        'id': 'pk', 'model': 'model', 'external_id': 'external_id',
+        'quantity': 'quantity', 'price': 'price', 'price_rrc': 'price_rrc',
+    }
+
+    def __init__(self, fields=None, expand=None):
+        """
+        Args:
+            fields: Поля ответа; без fields и expand - полный ответ.
+            expand: Развернутые вложенные объекты.
+        """
+        if fields is None and expand is None:
+            self.expand = set(self.expandable)
+            self.fields = self.field_names
+            return
+        self.expand = set(expand or ())
+        if 'product.category' in self.expand:
+            self.expand.add('product')
+        selected = set(fields or [name for name in self.field_names if name != 'product_parameters'])
+        if 'product_parameters' in self.expand:
+            selected.add('product_parameters')
+        self.fields = tuple(name for name in self.field_names if name in selected)
+
+    @staticmethod
+    def split(query_params, name):
+        return [value.strip() for item in query_params.getlist(name) for value in item.split(',') if value.strip()]
+
+    @classmethod
+    def parse(cls, query_params):
+        """
+        Разбор параметров fields и expand запроса.
+
+        Returns:
+            tuple: (CatalogItemFlatSerializer, текст ошибки или None).
+        """
+        if 'fields' not in query_params and 'expand' not in query_params:
+            return cls(), None
+        fields, expand = cls.split(query_params, 'fields'), cls.split(query_params, 'expand')
+        unknown = [name for name in fields if name not in cls.field_names]
+        if unknown:
+            return None, f"Неизвестные поля: {', '.join(unknown)}. Доступны: {', '.join(cls.field_names)}"
+        unknown = [name for name in expand if name not in cls.expandable]
+        if unknown:
+            return None, f"Недопустимое значение expand: {', '.join(unknown)}. Доступны: {', '.join(cls.expandable)}"
+        return cls(fields or None, expand), None
+
+    def columns(self):
+        """
+        Столбцы витрины для выбранных полей; первичный ключ нужен всегда (курсорная пагинация).
+        """
+        columns = ['pk']
+        for name in self.fields:
+            if name in self.scalar_columns:
+                columns.append(self.scalar_columns[name])
+            elif name == 'product':
+                columns.append('product_id')
+                if 'product' in self.expand:
+                    columns += ['product_name', 'product_image', 'category_id']
+                    if 'product.category' in self.expand:
+                        columns.append('category_name')
+            elif name == 'shop':
+                columns.append('shop_id')
+                if 'shop' in self.expand:
+                    columns += ['shop_name', 'shop_url', 'shop_state']
+            elif name == 'product_parameters':
+                columns.append('parameters')
+        return list(dict.fromkeys(columns))
+
+    def values(self, queryset, *columns):
+        """
+        Строки витрины со столбцами выбранных полей, ключей сортировки и дополнительными columns.
+        """
+        ordering = [name.lstrip('-') for name in queryset.query.order_by if isinstance(name, str)]
+        return queryset.values(*dict.fromkeys(self.columns() + ordering + list(columns)))
+
+    def product(self, row, request=None):
+        if 'product' not in self.expand:
+            return row['product_id']
+        category = row['category_id']
+        if category is not None and 'product.category' in self.expand:
+            category = {'id': row['category_id'], 'name': row['category_name']}
+        return {
+            'id': row['product_id'],
+            'name': row['product_name'],
+            'category': category,
+            'image': image_url(row['product_image'], request),
+        }
+
+    def shop(self, row):
+        if 'shop' not in self.expand:
+            return row['shop_id']
+        return {'id': row['shop_id'], 'name': row['shop_name'], 'url': row['shop_url'], 'state': row['shop_state']}
+
+    def to_representation(self, row, request=None):
+        data = {}
+        for name in self.fields:
+            if name in self.scalar_columns:
+                data[name] = row[self.scalar_columns[name]]
+            elif name == 'product':
+                data[name] = self.product(row, request)
+            elif name == 'shop':
+                data[name] = self.shop(row)
+            else:
+                data[name] = row['parameters']
+        return data
+
+    def many(self, rows, request=None):
+        return [self.to_representation(row, request) for row in rows]
+
+
+class ProductInfoFlatSerializer:
+    """
+    Быстрая сериализация товаров магазинов (ProductInfo) двумя запросами:
+    строки товаров со связанными моделями и их параметры.
+
+    Формирует тот же JSON, что и ProductInfoSerializer; в отличие от витрины
+    каталога, возвращает и товары выключенных магазинов и прежних версий каталога,
+    на которые ссылаются заказы.
+    """
+
+    @staticmethod
+    def load(product_info_ids, request=None):
+        """
+        Returns:
+            dict: "product_info_id -> данные товара".
+        """
+        product_info_ids = set(product_info_ids)
+        if not product_info_ids:
+            return {}
+        parameters = CatalogReadModel.parameters(product_info_ids)
+        rows = ProductInfo.objects.filter(id__in=product_info_ids).values(*CatalogReadModel.product_info_fields)
+        result = {}
+        for row in rows:
+            category = None
+            if row['product__category_id'] is not None:
+                category = {'id': row['product__category_id'], 'name': row['product__category__name']}
+            result[row['id']] = {
+                'id': row['id'],
+                'model': row['model'],
+                'external_id': row['external_id'],
+                'product': {
+                    'id': row['product_id'],
+                    'name': row['product__name'],
+                    'category': category,
+                    'image': image_url(row['product__image'], request),
+                },
+                'shop': {'id': row['shop_id'], 'name': row['shop__name'], 'url': row['shop__url'],
+                         'state': row['shop__state']},
+                'quantity': row['quantity'],
+                'price': row['price'],
+                'price_rrc': row['price_rrc'],
+                'product_parameters': parameters.get(row['id'], []),
+            }
+        return result
+
+
+class OrderFlatSerializer:
+    """
+    Быстрая сериализация заказов и корзины.
+
+    Формирует тот же JSON, что и OrderSerializer, фиксированным числом запросов
+    (заказы, контакты, позиции, товары, параметры) независимо от количества
+    заказов и позиций; стоимость заказа считается по уже загруженным ценам.
+    """
+
+    contact_fields = ('id', 'city', 'street', 'house', 'structure', 'building', 'apartment', 'phone')
+
+    @classmethod
+    def many(cls, orders, request=None):
+        """
+        Args:
+            orders: QuerySet заказов с нужными фильтрами и сортировкой.
+
+        Returns:
+            list: Данные заказов в порядке QuerySet.
+        """
+        rows = list(orders.values('id', 'dt', 'state', 'contact_id'))
+        if not rows:
+            return []
+        order_ids = [row['id'] for row in rows]
+
+        contact_ids = {row['contact_id'] for row in rows if row['contact_id'] is not None}
+        contacts = {
+            contact['id']: contact
+            for contact in Contact.objects.filter(id__in=contact_ids).values(*cls.contact_fields)
+        } if contact_ids else {}
+
+        items = {}
+        item_rows = list(OrderItem.objects.filter(order_id__in=order_ids).order_by('id').values(
+            'id', 'order_id', 'product_info_id', 'quantity'
+        ))
+        product_infos = ProductInfoFlatSerializer.load(
+            [item['product_info_id'] for item in item_rows], request
+        )
+        for item in item_rows:
+            items.setdefault(item['order_id'], []).append(item)
+
+        result = []
+        for row in rows:
+            ordered_items = [
+                {
+                    'id': item['id'],
+                    'product_info': product_infos[item['product_info_id']],
+                    'quantity': item['quantity'],
+                }
+                for item in items.get(row['id'], [])
+            ]
+            total_cost = sum(item['quantity'] * item['product_info']['price'] for item in ordered_items)
+            result.append({
+                'id': row['id'],
+                'dt': _datetime_field.to_representation(row['dt']),
+                'state': row['state'],
+                'contact': contacts.get(row['contact_id']),
+                'ordered_items': ordered_items,
+                'total_cost': _total_cost_field.to_representation(total_cost),
+            })
+        return result
+
+    @classmethod
+    def one(cls, order, request=None):
+        """
+        Данные одного заказа.
+        """
+        return cls.many(type(order).objects.filter(pk=order.pk), request)[0]
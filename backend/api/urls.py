@@ -3,8 +3,13 @@ from django.urls import path
 from backend.api.views.basket_views import BasketView
 from backend.api.views.celery_views import TaskStatusView
 from backend.api.views.order_views import OrderView, OrderDetailView
-from backend.api.views.partner_views import PartnerUpdateView, PartnerStateView, PartnerOrdersView
-from backend.api.views.product_views import ProductView, ProductDetailView, ProductImageUploadView
+from backend.api.views.partner_views import (
+    PartnerUpdateView, PartnerBatchUpdateView, PartnerUploadView, PartnerCatalogRollbackView,
+    PartnerStateView, PartnerOrdersView
+)
+from backend.api.views.product_views import (
+    ProductView, ProductDetailView, ProductPriceHistoryView, ProductImageUploadView
+)
 from backend.api.views.user_views import (
     UserRegisterView, ConfirmEmailView, UserLoginView, UserDetailsView,
     PasswordResetRequestView, PasswordResetConfirmView, ContactViewSet,
@@ -43,6 +48,7 @@ urlpatterns = [
     path('categories', CategoryView.as_view(), name='categories'),
     path('products', ProductView.as_view(), name='products'),
     path('products/<int:pk>', ProductDetailView.as_view(), name='product-detail'),
+    path('products/<int:pk>/price-history', ProductPriceHistoryView.as_view(), name='product-price-history'),
     path('products/<int:product_id>/image', ProductImageUploadView.as_view(), name='product-image'),
 
     # URL для корзины и заказов
@@ -52,6 +58,9 @@ urlpatterns = [
 
     # URL для партнеров (магазинов)
     path('partner/update', PartnerUpdateView.as_view(), name='partner-update'),
+    path('partner/update/batch', PartnerBatchUpdateView.as_view(), name='partner-update-batch'),
+    path('partner/update/upload', PartnerUploadView.as_view(), name='partner-update-upload'),
+    path('partner/catalog/rollback', PartnerCatalogRollbackView.as_view(), name='partner-catalog-rollback'),
     path('partner/state', PartnerStateView.as_view(), name='partner-state'),
     path('partner/orders', PartnerOrdersView.as_view(), name='partner-orders'),
 
@@ -10,6 +10,7 @@ from backend.api.docs import get_success_response, get_error_response
 from backend.models import Order, OrderItem, ProductInfo
 from backend.api.serializers import OrderSerializer, OrderItemSerializer, BasketAddSerializer, BasketUpdateSerializer, \
     BasketDeleteSerializer, BasketItemsDeleteSerializer
+from backend.api.flat_serializers import OrderFlatSerializer
 
 # Импорты для drf-spectacular
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample, OpenApiResponse, inline_serializer
@@ -82,10 +83,6 @@ class BasketView(APIView):
         basket = Order.objects.filter(
             user=request.user,
             state='basket'
-        ).prefetch_related(
-            'ordered_items__product_info__product',
-            'ordered_items__product_info__shop',
-            'ordered_items__product_info__product_parameters__parameter'
         ).first()
 
         if not basket:
@@ -94,8 +91,7 @@ class BasketView(APIView):
                 status=status.HTTP_200_OK
             )
 
-        serializer = OrderSerializer(basket)
-        return Response(serializer.data)
+        return Response(OrderFlatSerializer.one(basket))
 
     @extend_schema(
         tags=['Orders'],
@@ -144,7 +140,7 @@ class BasketView(APIView):
 
                 # Проверяем наличие товара
                 try:
-                    product_info = ProductInfo.objects.select_related('shop').get(id=product_info_id)
+                    product_info = ProductInfo.objects.live().select_related('shop').get(id=product_info_id)
                     if not product_info.shop.state:
                         error_messages.append(f"Магазин {product_info.shop.name} не принимает заказы")
                         continue
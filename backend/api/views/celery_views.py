@@ -30,6 +30,13 @@ class TaskStatusView(APIView):
                 'status': 'started',
                 'message': 'Задача выполняется'
             }
+        elif task.state == 'PROGRESS':
+            # Ход выполнения, опубликованный задачей через update_state
+            response = {
+                'status': 'progress',
+                'message': 'Задача выполняется',
+                'progress': task.info
+            }
         elif task.state == 'SUCCESS':
             response = {
                 'status': 'success',
@@ -2,10 +2,11 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from django.db import transaction
-from django.db.models import F, Sum, Prefetch
+from django.db.models import F
 
 from backend.models import Order, OrderItem, Contact
 from backend.api.serializers import OrderSerializer, OrderItemSerializer, OrderCreateSerializer
+from backend.api.flat_serializers import OrderFlatSerializer
 from backend.tasks import send_order_confirmation_email
 
 # Импорты для системы документации
@@ -33,21 +34,18 @@ class OrderView(APIView):
         responses={200: OrderSerializer(many=True)}
     )
     def get(self, request):
-        """Получение списка заказов пользователя."""
+        """
+        Получение списка заказов пользователя.
+
+        Ответ формируется OrderFlatSerializer фиксированным числом запросов.
+        """
         orders = Order.objects.filter(
             user=request.user,
         ).exclude(
             state='basket'
-        ).prefetch_related(
-            'ordered_items__product_info__product',
-            'ordered_items__product_info__shop',
-            'contact'
-        ).annotate(
-            total_sum=Sum(F('ordered_items__quantity') * F('ordered_items__product_info__price'))
         ).order_by('-dt')
 
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data)
+        return Response(OrderFlatSerializer.many(orders))
 
     @crud_endpoint(
         operation='create',
@@ -109,6 +107,16 @@ class OrderView(APIView):
                 'error': 'Магазины не принимают заказы'
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        # Проверяем, что товары не сняты с продажи новой версией каталога магазина
+        outdated_items = basket.ordered_items.exclude(
+            product_info__catalog_version=F('product_info__shop__catalog_version')
+        )
+        if outdated_items.exists():
+            return Response({
+                'status': False,
+                'error': 'Каталог магазина обновлен, часть товаров корзины больше не продается'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
         # Проверяем достаточность количества товаров
         for item in basket.ordered_items.all():
             if item.product_info.quantity < item.quantity:
@@ -128,7 +136,7 @@ class OrderView(APIView):
                 product_info = order_item.product_info
                 if product_info.quantity >= order_item.quantity:
                     product_info.quantity -= order_item.quantity
-                    product_info.save()
+                    product_info.save(update_fields=['quantity'])
                 else:
                     # Если товара недостаточно, откатываем транзакцию
                     raise ValueError(f"Недостаточное количество товара {product_info.product.name}")
@@ -163,19 +171,14 @@ class OrderDetailView(APIView):
     def get(self, request, pk):
         """Получение детальной информации о заказе."""
         try:
-            order = Order.objects.prefetch_related(
-                'ordered_items__product_info__product',
-                'ordered_items__product_info__shop',
-                'contact'
-            ).get(id=pk, user=request.user)
+            order = Order.objects.get(id=pk, user=request.user)
         except Order.DoesNotExist:
             return Response({
                 'status': False,
                 'error': 'Заказ не найден'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        serializer = OrderSerializer(order)
-        return Response(serializer.data)
+        return Response(OrderFlatSerializer.one(order))
 
     @crud_endpoint(
         operation='update',
@@ -222,7 +225,7 @@ class OrderDetailView(APIView):
                 product_info = item.product_info
                 # Увеличиваем количество товара в магазине
                 product_info.quantity += item.quantity
-                product_info.save()
+                product_info.save(update_fields=['quantity'])
 
             # Меняем статус заказа на 'canceled'
             order.state = 'canceled'
@@ -2,11 +2,16 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
+from rest_framework.parsers import MultiPartParser
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
 
 from backend.api.serializers import OrderSerializer, OrderItemSerializer, ContactSerializer, ShopStateUpdateSerializer
 from backend.models import Shop, Order
 from backend.services.import_service import ImportService
-from backend.tasks import import_shop_data_task
+from backend.services.fetch import PriceListDownload, FetchError, PriceListFetcher
+from backend.services.import_orchestration import ImportLock, ImportOrchestrator
+from backend.tasks import import_shop_data_task, import_shop_file_task
 
 # Импорты системы документации
 from backend.api.docs import (
@@ -62,6 +67,16 @@ class PartnerUpdateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Если импорт магазина уже выполняется, возвращаем ID выполняющейся задачи
+        running_task_id = ImportLock.holder(request.user.id)
+        if running_task_id:
+            return Response({
+                "status": True,
+                "message": "Импорт данных магазина уже выполняется. Результат будет доступен позже.",
+                "task_id": running_task_id,
+                "coalesced": True
+            })
+
         # Запуск асинхронной задачи для импорта данных
         task = import_shop_data_task.delay(url, request.user.id)
 
@@ -72,6 +87,207 @@ class PartnerUpdateView(APIView):
         })
 
 
+class PartnerUploadView(APIView):
+    """
+    Представление для загрузки файла прайс-листа партнера.
+
+    Загруженный файл не читается в память: обработчик TemporaryFileUploadHandler
+    записывает его на диск по фрагментам, после чего файл копируется
+    (с распаковкой gzip) в каталог IMPORT_UPLOAD_DIR и импортируется задачей Celery.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Обработчики загрузки нужно заменить до первого обращения к телу запроса
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+    @partner_endpoint(
+        operation='upload_price',
+        summary="Загрузить файл прайс-листа партнера",
+        description="Принимает файл прайс-листа (YAML, JSON, JSON Lines или CSV, в том числе сжатый gzip) "
+                    "в поле file формата multipart/form-data и запускает его импорт",
+        request={
+            'multipart/form-data': {
+                'type': 'object',
+                'properties': {'file': {'type': 'string', 'format': 'binary'}}
+            }
+        },
+        responses={
+            200: get_success_response("Импорт прайс-листа запущен"),
+            400: get_error_response("Файл не передан или некорректен"),
+            403: get_error_response("Пользователь не является партнером"),
+            409: get_error_response("Импорт магазина уже выполняется")
+        }
+    )
+    def post(self, request):
+        """
+        Загрузка файла прайс-листа и запуск импорта.
+
+        Ожидает multipart/form-data с полем 'file'.
+        """
+        if request.user.type != 'shop':
+            return Response(
+                {"status": False, "error": "Только пользователи с типом 'магазин' могут обновлять прайс-листы"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        uploaded_file = request.FILES.get('file')
+        if uploaded_file is None:
+            return Response(
+                {"status": False, "error": "Необходимо передать файл прайс-листа в поле file"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if uploaded_file.size > settings.IMPORT_MAX_SIZE:
+            return Response(
+                {"status": False, "error": PriceListFetcher.size_error()},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Загруженный файл другого содержания не объединяется с выполняющимся импортом
+        running_task_id = ImportLock.holder(request.user.id)
+        if running_task_id:
+            return Response({
+                "status": False,
+                "error": "Импорт данных магазина уже выполняется. Повторите загрузку после его завершения.",
+                "task_id": running_task_id
+            }, status=status.HTTP_409_CONFLICT)
+
+        try:
+            download = PriceListDownload.from_upload(uploaded_file)
+        except FetchError as e:
+            return Response({"status": False, "error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        task = import_shop_file_task.delay(download.as_dict(), request.user.id)
+
+        return Response({
+            "status": True,
+            "message": "Файл загружен, импорт данных запущен асинхронно. Результат будет доступен позже.",
+            "task_id": task.id
+        })
+
+
+class PartnerBatchUpdateView(APIView):
+    """
+    Представление для пакетного обновления прайс-листов нескольких магазинов.
+    Доступно только администраторам.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @partner_endpoint(
+        operation='batch_update',
+        summary="Пакетно обновить прайс-листы партнеров",
+        description="Запускает параллельный импорт прайс-листов нескольких магазинов. "
+                    "Повторные импорты одного магазина объединяются, результат - общий отчет задачи.",
+        responses={
+            200: get_success_response("Пакетный импорт запущен"),
+            400: get_error_response("Не указан список магазинов"),
+            403: get_error_response("Пользователь не является администратором")
+        }
+    )
+    def post(self, request):
+        """
+        Запуск пакетного импорта прайс-листов.
+
+        Ожидаемый формат данных:
+        {
+            "shops": [
+                {"shop_id": 1, "url": "https://example.com/shop1.yaml"},
+                {"shop_id": 2}  // используется сохраненный URL магазина
+            ],
+            "concurrency": 4  // необязательно, по умолчанию IMPORT_BATCH_CONCURRENCY
+        }
+        """
+        if not request.user.is_staff:
+            return Response(
+                {"status": False, "error": "Пакетный импорт доступен только администраторам"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        shops = request.data.get('shops')
+        if not shops or not isinstance(shops, list):
+            return Response(
+                {"status": False, "error": "Необходимо указать список магазинов"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        concurrency = request.data.get('concurrency')
+        if concurrency is not None and (not isinstance(concurrency, int) or concurrency < 1):
+            return Response(
+                {"status": False, "error": "Параметр concurrency должен быть положительным числом"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        items, errors = ImportOrchestrator.prepare_items(shops)
+        if not items:
+            return Response(
+                {"status": False, "error": "Нет магазинов для импорта", "errors": errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = ImportOrchestrator.start_batch(items, concurrency=concurrency)
+
+        return Response({
+            "status": True,
+            "message": f"Пакетный импорт запущен для магазинов: {len(items)}. Результат будет доступен позже.",
+            "task_id": result.id,
+            "errors": errors
+        })
+
+
+class PartnerCatalogRollbackView(APIView):
+    """
+    Представление для отката каталога магазина к предыдущей версии.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @partner_endpoint(
+        operation='rollback_catalog',
+        summary="Откатить каталог партнера к предыдущей версии",
+        description="Делает текущей предыдущую опубликованную версию каталога магазина. "
+                    "Повторный откат возвращает отмененную версию",
+        responses={
+            200: get_success_response("Каталог возвращен к предыдущей версии"),
+            400: get_error_response("Нет предыдущей версии каталога"),
+            403: get_error_response("Пользователь не является партнером"),
+            404: get_error_response("Магазин не найден"),
+            409: get_error_response("Импорт магазина уже выполняется")
+        }
+    )
+    def post(self, request):
+        """
+        Откат каталога магазина пользователя.
+        """
+        if request.user.type != 'shop':
+            return Response(
+                {"status": False, "error": "Только пользователи с типом 'магазин' имеют доступ"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        shop = Shop.objects.filter(user=request.user).first()
+        if shop is None:
+            return Response(
+                {"status": False, "error": "Магазин не найден"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        # Во время импорта версия каталога не переключается: импорт сам опубликует свою версию
+        with ImportLock(request.user.id) as lock:
+            if not lock.acquired:
+                return Response({
+                    "status": False,
+                    "error": "Импорт данных магазина уже выполняется. Повторите откат после его завершения.",
+                    "task_id": ImportLock.holder(request.user.id)
+                }, status=status.HTTP_409_CONFLICT)
+
+            result = ImportService.rollback_catalog(shop)
+
+        if not result['status']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+
 class PartnerStateView(APIView):
     """
     Представление для работы с состоянием партнера (магазина).
@@ -2,10 +2,22 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q
-from backend.models import ProductInfo, Product
+from rest_framework.pagination import PageNumberPagination, CursorPagination, Cursor
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import remove_query_param
+import json
+from datetime import datetime
+from django.conf import settings
+from django.db.models import Q, Case, When, Value, IntegerField
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from backend.models import ProductInfo, Product, CatalogItem
+from backend.services.price_history import PriceHistoryService
+from backend.services.search import ProductSearchIndex
+from backend.services.facets import ParameterFilters, FacetService
+from backend.services.response_cache import CatalogResponseCache
 from backend.api.serializers import ProductSerializer, ProductInfoSerializer
+from backend.api.flat_serializers import CatalogItemFlatSerializer
 
 
 
@@ -17,6 +29,26 @@ from backend.api.docs import (
 from drf_spectacular.utils import OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
+# Параметры выбора полей ответа товара (CatalogItemFlatSerializer)
+FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        name='fields',
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        description='Поля ответа через запятую, например fields=id,price,product',
+        required=False
+    ),
+    OpenApiParameter(
+        name='expand',
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        description='Развернутые вложенные объекты: product, product.category, shop, product_parameters. '
+                    'При заданных fields или expand остальные объекты возвращаются как id',
+        required=False
+    ),
+]
+
+
 class ProductPagination(PageNumberPagination):
     """
     Класс пагинации для продуктов.
@@ -26,18 +58,159 @@ class ProductPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class ProductCursorPagination(CursorPagination):
+    """
+    Курсорная (keyset) пагинация товаров.
+
+    Курсор хранит значения всех ключей сортировки граничной строки страницы,
+    включая уникальный первичный ключ, и страница выбирается составным условием
+    (key > v) OR (key = v AND pk > id) вместо OFFSET, поэтому обход не зависит
+    от числа товаров с одинаковым значением ключа. Общее количество товаров
+    (COUNT) считается, только если клиент передал count=true. Курсоры
+    next/previous непрозрачны и сохраняют сортировку.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = 'id'
+    count_query_param = 'count'
+
+    def get_ordering(self, request, queryset, view):
+        return view.get_ordering(request)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true'):
+            self.count = queryset.count()
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        # Предыдущая страница читается в обратном порядке от первой строки текущей
+        reverse = self.cursor is not None and self.cursor.reverse
+        ordering = [self.reversed_key(key) for key in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(self.after(ordering, self.cursor.position))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.page = rows[:self.page_size]
+        has_more = len(rows) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    @staticmethod
+    def reversed_key(key):
+        return key[1:] if key.startswith('-') else f'-{key}'
+
+    @staticmethod
+    def after(ordering, position):
+        """
+        Условие строк, следующих за position в порядке ordering.
+
+        Для ключей (k1, k2, ...) это k1 > v1 OR (k1 = v1 AND k2 > v2) OR ...;
+        для ключей по убыванию сравнение обратное.
+        """
+        condition, equal = Q(), {}
+        for key, value in zip(ordering, position):
+            name = key.lstrip('-')
+            lookup = 'lt' if key.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None:
+            return None
+        try:
+            position = json.loads(cursor.position)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(position, list) or len(position) != len(self.ordering)
+                or not all(isinstance(value, (int, str)) for value in position)):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=position)
+
+    def encode_position(self, row, reverse):
+        position = json.dumps([row[key.lstrip('-')] for key in self.ordering])
+        return self.encode_cursor(Cursor(offset=0, reverse=reverse, position=position))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Предыдущих строк не осталось - следующая страница первая
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_position(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_position(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        response = {'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data}
+        if self.count is not None:
+            response = {'count': self.count, **response}
+        return Response(response)
+
+
 class ProductView(APIView):
     """
     Представление для получения списка товаров с возможностью фильтрации.
+
+    Товары читаются из витрины каталога (CatalogItem) одним запросом без JOIN,
+    а ответы кэшируются с версиями каталога магазинов (CatalogResponseCache).
+
+    По умолчанию используется постраничная пагинация (page, page_size). При
+    параметре cursor или pagination=cursor включается курсорная пагинация без
+    подсчета общего количества, скорость которой не зависит от глубины страницы.
     """
     permission_classes = [AllowAny]
     pagination_class = ProductPagination
+    cursor_pagination_class = ProductCursorPagination
+    # Поддерживаемые ключи сортировки (параметр ordering); последний ключ - уникальный
+    # первичный ключ витрины (id ProductInfo). Каждой сортировке соответствуют индексы
+    # витрины для всего каталога, магазина и категории (см. CatalogItem.Meta.indexes)
+    ordering_fields = {
+        'id': ('pk',),
+        '-id': ('-pk',),
+        'price': ('price', 'pk'),
+        '-price': ('-price', '-pk'),
+        'name': ('product_name', 'pk'),
+        '-quantity': ('-quantity', '-pk'),
+    }
+    # Фильтры по цене (включительно)
+    price_filters = {
+        'min_price': 'price__gte',
+        'max_price': 'price__lte',
+    }
+
+    def get_ordering(self, request):
+        return self.ordering_fields[request.query_params.get('ordering', 'id')]
+
+    @staticmethod
+    def is_cursor(request):
+        return 'cursor' in request.query_params or request.query_params.get('pagination') == 'cursor'
+
+    def get_paginator(self, request):
+        if self.is_cursor(request):
+            return self.cursor_pagination_class()
+        return self.pagination_class()
 
     @crud_endpoint(
         operation='list',
         resource='products',
         summary="Получить список товаров",
-        description="Возвращает список товаров с возможностью фильтрации по магазину и категории",
+        description="Возвращает список товаров с возможностью фильтрации по магазину и категории. "
+                    "При поиске товары упорядочены по релевантности",
         requires_auth=False,
         parameters=[
             OpenApiParameter(
@@ -53,7 +226,90 @@ class ProductView(APIView):
                 location=OpenApiParameter.QUERY,
                 description='ID категории для фильтрации',
                 required=False
-            )
+            ),
+            OpenApiParameter(
+                name='search',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Поиск по названию и модели товара: подстрока, слова в любом порядке, '
+                            'затем нечеткое совпадение с опечатками',
+                required=False
+            ),
+            OpenApiParameter(
+                name='param[<название>]',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Значение параметра товара, например param[Цвет]=черный; '
+                            'повтор объединяет значения через ИЛИ',
+                required=False
+            ),
+            OpenApiParameter(
+                name='param_min[<название>]',
+                type=OpenApiTypes.NUMBER,
+                location=OpenApiParameter.QUERY,
+                description='Нижняя граница числового параметра (есть также param_max[<название>])',
+                required=False
+            ),
+            OpenApiParameter(
+                name='min_price',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Минимальная цена (включительно)',
+                required=False
+            ),
+            OpenApiParameter(
+                name='max_price',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Максимальная цена (включительно)',
+                required=False
+            ),
+            OpenApiParameter(
+                name='in_stock',
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description='Только товары в наличии',
+                required=False
+            ),
+            OpenApiParameter(
+                name='facets',
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description='Добавить в ответ значения параметров с количеством найденных товаров',
+                required=False
+            ),
+            OpenApiParameter(
+                name='ordering',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Сортировка: id, -id, price, -price, name, -quantity. '
+                            'Без параметра при поиске товары упорядочены по релевантности; '
+                            'при поиске с курсорной пагинацией параметр обязателен',
+                required=False
+            ),
+            OpenApiParameter(
+                name='pagination',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='cursor - курсорная пагинация (ответ содержит next/previous без count); '
+                            'при поиске требует ordering',
+                required=False
+            ),
+            OpenApiParameter(
+                name='cursor',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Курсор страницы из ссылок next/previous',
+                required=False
+            ),
+            OpenApiParameter(
+                name='count',
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description='Вернуть общее количество товаров при курсорной пагинации',
+                required=False
+            ),
+            *FIELDS_PARAMETERS
         ],
         responses={200: ProductInfoSerializer(many=True)}
     )
@@ -64,39 +320,108 @@ class ProductView(APIView):
         Доступные фильтры:
         - shop_id - ID магазина
         - category_id - ID категории
-        - search - поисковый запрос (ищет по названию товара)
+        - search - поисковый запрос (ищет по названию и модели товара через поисковый индекс,
+          результаты упорядочены по релевантности)
+        - min_price, max_price - диапазон цены
+        - in_stock - только товары в наличии
+        - param[<название>], param_min[<название>], param_max[<название>] - параметры товара
+        - facets - значения параметров с количеством товаров для текущей выборки
+        - ordering - сортировка (см. ordering_fields)
+        - fields, expand - выбор полей ответа и развернутых вложенных объектов
+          (см. CatalogItemFlatSerializer)
         """
-        query_params = request.query_params
+        response_cache = CatalogResponseCache(request)
+        cached = response_cache.get()
+        if cached is not None:
+            return cached
 
-        # Базовый QuerySet - включает фильтрацию по статусу магазина (только активные)
-        queryset = ProductInfo.objects.filter(
-            shop__state=True
-        ).select_related(
-            'product', 'shop'
-        ).prefetch_related(
-            'product_parameters__parameter'
-        ).order_by('id')
+        query_params = request.query_params
+        if query_params.get('ordering', 'id') not in self.ordering_fields:
+            return Response(
+                {"status": False, "error": f"Недопустимая сортировка. Доступны: {', '.join(self.ordering_fields)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if query_params.get('search') and 'ordering' not in query_params and self.is_cursor(request):
+            # Порядок по релевантности не является ключом курсора
+            return Response(
+                {"status": False, "error": "Курсорная пагинация результатов поиска требует параметр ordering"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        parameter_filters, filter_error = ParameterFilters.parse(query_params)
+        if filter_error:
+            return Response({"status": False, "error": filter_error}, status=status.HTTP_400_BAD_REQUEST)
+        serializer, fields_error = CatalogItemFlatSerializer.parse(query_params)
+        if fields_error:
+            return Response({"status": False, "error": fields_error}, status=status.HTTP_400_BAD_REQUEST)
+        price_filters = {}
+        for name, lookup in self.price_filters.items():
+            if query_params.get(name):
+                try:
+                    price_filters[lookup] = int(query_params.get(name))
+                except ValueError:
+                    return Response(
+                        {"status": False, "error": f"Параметр {name} должен быть целым числом"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+        # Базовый QuerySet - витрина содержит только текущую версию каталога,
+        # фильтруется по статусу магазина (только активные)
+        queryset = CatalogItem.objects.filter(
+            shop_state=True
+        ).order_by(*self.get_ordering(request))
 
         # Применение фильтров
         if query_params.get('shop_id'):
             queryset = queryset.filter(shop_id=query_params.get('shop_id'))
 
         if query_params.get('category_id'):
-            queryset = queryset.filter(product__category_id=query_params.get('category_id'))
+            queryset = queryset.filter(category_id=query_params.get('category_id'))
 
-        if query_params.get('search'):
-            search_term = query_params.get('search')
-            queryset = queryset.filter(
-                Q(product__name__icontains=search_term) |
-                Q(model__icontains=search_term)
-            )
+        if price_filters:
+            queryset = queryset.filter(**price_filters)
+
+        in_stock = query_params.get('in_stock', '').lower() in ('1', 'true')
+        if in_stock:
+            queryset = queryset.filter(quantity__gt=0)
 
-        # Применение пагинации
-        paginator = self.pagination_class()
-        paginated_queryset = paginator.paginate_queryset(queryset, request)
+        if parameter_filters:
+            queryset = parameter_filters.apply(queryset)
 
-        serializer = ProductInfoSerializer(paginated_queryset, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        if query_params.get('search'):
+            search_term = query_params.get('search')
+            # Поиск выполняется внутри уже отфильтрованной выборки, чтобы ограничение
+            # SEARCH_MAX_RESULTS и выбор ступени поиска учитывали фильтры
+            product_ids = ProductSearchIndex.search(search_term, scope=queryset)
+            if product_ids is None:
+                # Индекс недоступен или запрос короче трех символов
+                queryset = queryset.filter(
+                    Q(product_name__icontains=search_term) |
+                    Q(model__icontains=search_term)
+                )
+            else:
+                relevance = Case(
+                    *[When(product_id=product_id, then=Value(position))
+                      for position, product_id in enumerate(product_ids)],
+                    output_field=IntegerField()
+                )
+                queryset = queryset.filter(product_id__in=product_ids)
+                if 'ordering' not in query_params:
+                    queryset = queryset.order_by(relevance, 'pk')
+
+        # Применение пагинации; курсорная пагинация сортирует по ключу ordering
+        paginator = self.get_paginator(request)
+        rows = paginator.paginate_queryset(serializer.values(queryset), request, view=self)
+
+        response = paginator.get_paginated_response(serializer.many(rows))
+        if query_params.get('facets', '').lower() in ('1', 'true'):
+            if query_params.get('search') or parameter_filters or price_filters or in_stock:
+                response.data['facets'] = FacetService.for_queryset(queryset)
+            else:
+                # Весь каталог, магазин или категория - из предрасчитанной таблицы
+                response.data['facets'] = FacetService.precomputed(
+                    shop_id=query_params.get('shop_id'), category_id=query_params.get('category_id')
+                )
+        return response_cache.store(response, shop_id=query_params.get('shop_id') or None)
 
 
 class ProductDetailView(APIView):
@@ -111,6 +436,7 @@ class ProductDetailView(APIView):
         summary="Получить детальную информацию о конкретном товаре",
         description="Возвращает детальную информацию о конкретном товаре",
         requires_auth=False,
+        parameters=FIELDS_PARAMETERS,
         responses={200: ProductInfoSerializer(many=False)}
     )
     def get(self, request, pk):
@@ -118,13 +444,24 @@ class ProductDetailView(APIView):
         Получение подробной информации о конкретном товаре.
 
         Товары из неактивных магазинов не будут доступны.
+        Товар читается из витрины каталога (CatalogItem) одним запросом,
+        ответ кэшируется с версией каталога магазина.
         """
+        response_cache = CatalogResponseCache(request)
+        cached = response_cache.get()
+        if cached is not None:
+            return cached
+
+        serializer, fields_error = CatalogItemFlatSerializer.parse(request.query_params)
+        if fields_error:
+            return Response({"status": False, "error": fields_error}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             # Также добавляем фильтрацию по статусу магазина
-            product_info = ProductInfo.objects.filter(
+            product_info = serializer.values(CatalogItem.objects.filter(
                 pk=pk,
-                shop__state=True  # Только из активных магазинов
-            ).first()
+                shop_state=True  # Только из активных магазинов
+            ), 'shop_id').first()
 
             if not product_info:
                 return Response(
@@ -132,8 +469,8 @@ class ProductDetailView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            serializer = ProductInfoSerializer(product_info)
-            return Response(serializer.data)
+            return response_cache.store(Response(serializer.to_representation(product_info)),
+                                        shop_id=product_info['shop_id'])
         except Exception as e:
             return Response(
                 {"status": False, "error": "Товар не найден"},
@@ -141,6 +478,111 @@ class ProductDetailView(APIView):
             )
 
 
+class ProductPriceHistoryView(APIView):
+    """
+    Представление для получения истории цен и остатков товара.
+    """
+    permission_classes = [AllowAny]
+
+    @staticmethod
+    def parse_moment(value):
+        """
+        Дата или дата и время из параметра запроса; None, если значение некорректно.
+        """
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                return None
+            moment = datetime.combine(day, datetime.min.time())
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    @crud_endpoint(
+        operation='retrieve',
+        resource='products',
+        summary="Получить историю цен товара",
+        description="Возвращает ряд цен и остатков товара магазина. Если изменений за период больше, "
+                    "чем points, ряд прореживается: период делится на равные интервалы, и для каждого "
+                    "возвращаются последние значения и диапазон цены",
+        requires_auth=False,
+        parameters=[
+            OpenApiParameter(
+                name='date_from',
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                description='Начало периода (ISO 8601); по умолчанию - с первого изменения',
+                required=False
+            ),
+            OpenApiParameter(
+                name='date_to',
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                description='Конец периода (ISO 8601); по умолчанию - текущее время',
+                required=False
+            ),
+            OpenApiParameter(
+                name='points',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Максимальное число точек ряда',
+                required=False
+            )
+        ],
+        responses={
+            200: get_success_response("История цен товара", with_data=True),
+            400: get_error_response("Некорректные параметры периода"),
+            404: get_error_response("Товар не найден")
+        }
+    )
+    def get(self, request, pk):
+        """
+        Получение истории цен товара магазина.
+        """
+        product_info = ProductInfo.objects.live().filter(pk=pk, shop__state=True).first()
+        if product_info is None:
+            return Response(
+                {"status": False, "error": "Товар не найден или магазин не активен"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        bounds = {}
+        for name in ('date_from', 'date_to'):
+            value = request.query_params.get(name)
+            if value:
+                bounds[name] = self.parse_moment(value)
+                if bounds[name] is None:
+                    return Response(
+                        {"status": False, "error": f"Некорректная дата в параметре {name}"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+        if bounds.get('date_from') and bounds.get('date_to') and bounds['date_from'] > bounds['date_to']:
+            return Response(
+                {"status": False, "error": "Начало периода позже его конца"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            points = int(request.query_params.get('points', settings.PRICE_HISTORY_POINTS))
+        except ValueError:
+            points = 0
+        if not 1 <= points <= settings.PRICE_HISTORY_MAX_POINTS:
+            return Response(
+                {"status": False, "error": f"Параметр points должен быть от 1 до {settings.PRICE_HISTORY_MAX_POINTS}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        series = PriceHistoryService.series(product_info, points=points, **bounds)
+        return Response({
+            "status": True,
+            "product_info_id": product_info.id,
+            "shop_id": product_info.shop_id,
+            "external_id": product_info.external_id,
+            **series,
+        })
+
+
 class ProductImageUploadView(APIView):
     """
     Представление для загрузки изображения товара.
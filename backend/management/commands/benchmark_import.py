@@ -0,0 +1,162 @@
+import os
+import json
+import tempfile
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from backend.services.benchmark import PriceListGenerator, LocalPriceListServer, ImportBenchmark
+from backend.services.parsers import SNIFF_SIZE, detect_format
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark price list import: wall time, queries, peak RSS and rows/sec'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'files',
+            nargs='*',
+            help='Price list files; if omitted, synthetic price lists are generated for --goods',
+        )
+        parser.add_argument(
+            '--goods',
+            type=int,
+            nargs='+',
+            default=[1000, 10000],
+            help='Sizes of generated price lists',
+        )
+        parser.add_argument('--params', type=int, default=4, help='Parameters per generated good')
+        parser.add_argument(
+            '--formats',
+            nargs='+',
+            choices=PriceListGenerator.formats,
+            default=['yaml'],
+            help='Formats of generated price lists',
+        )
+        parser.add_argument(
+            '--parse-only',
+            action='store_true',
+            help='Only measure parse throughput, without writing to the database',
+        )
+        parser.add_argument('--runs', type=int, default=3, help='Runs per price list')
+        parser.add_argument(
+            '--mode',
+            choices=('cold', 'warm'),
+            default='cold',
+            help='cold: delete shop goods before each run; warm: re-import into existing data',
+        )
+        parser.add_argument(
+            '--user',
+            type=str,
+            default='benchmark@example.com',
+            help='Email of the shop user that owns imported data',
+        )
+        parser.add_argument('--output', type=str, default='benchmark_results.json', help='JSON results file')
+        parser.add_argument('--compare', type=str, help='Previous JSON results file to compare with')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be positive')
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as file:
+                    baseline = json.load(file)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read {options['compare']}: {e}")
+
+        with tempfile.TemporaryDirectory(prefix='import_benchmark_') as directory:
+            files = self._prepare_files(options, directory)
+
+            parse_results = []
+            for name, label in files:
+                price_format = self._detect_format(os.path.join(directory, name))
+                result = ImportBenchmark.parse(os.path.join(directory, name), price_format)
+                result['file'] = label
+                parse_results.append(result)
+                self.stdout.write(
+                    f"Parsing {label} ({price_format}): {result['parse_time']:.2f} s, "
+                    f"{result['goods_per_sec']:.0f} goods/sec, {result['mb_per_sec']:.1f} MB/s"
+                )
+
+            results = []
+            if not options['parse_only']:
+                results = self._benchmark_import(options, directory, files)
+
+        report = {
+            'environment': ImportBenchmark.environment(),
+            'mode': options['mode'],
+            'parse': parse_results,
+            'results': results,
+        }
+        if baseline is not None:
+            report['comparison'] = ImportBenchmark.compare(results, baseline)
+            for item in report['comparison']:
+                self.stdout.write(
+                    f"{item['file']}: wall time {item['wall_time_change']:+.1%}, "
+                    f"queries {item['queries_change']:+d}, rows/sec {item['rows_per_sec_change']:+.1f}"
+                )
+
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Results saved to {options['output']}"))
+
+    def _benchmark_import(self, options, directory, files):
+        user, _ = User.objects.get_or_create(
+            email=options['user'],
+            defaults={'type': 'shop', 'is_active': True}
+        )
+        benchmark = ImportBenchmark(user, mode=options['mode'])
+
+        results = []
+        with LocalPriceListServer(directory) as server:
+            for name, label in files:
+                self.stdout.write(f'Benchmarking {label}...')
+                runs = [benchmark.run(server.url(name)) for _ in range(options['runs'])]
+                summary = ImportBenchmark.summarize(label, runs)
+                summary['format'] = self._detect_format(os.path.join(directory, name))
+                results.append(summary)
+                self._write_summary(summary)
+        return results
+
+    def _prepare_files(self, options, directory):
+        """
+        Копирует переданные файлы или генерирует прайс-листы в каталог сервера.
+
+        Returns:
+            list: Пары (имя файла в каталоге, имя для отчета).
+        """
+        files = []
+        if options['files']:
+            for index, path in enumerate(options['files']):
+                if not os.path.exists(path):
+                    raise CommandError(f'File not found: {path}')
+                name = f'{index}_{os.path.basename(path)}'
+                os.symlink(os.path.abspath(path), os.path.join(directory, name))
+                files.append((name, path))
+            return files
+
+        for goods in options['goods']:
+            generator = PriceListGenerator(goods=goods, parameters=options['params'])
+            for price_format in options['formats']:
+                name = f'generated_{goods}.{price_format}'
+                generator.write(os.path.join(directory, name), price_format)
+                files.append((name, name))
+        return files
+
+    @staticmethod
+    def _detect_format(path):
+        with open(path, 'rb') as file:
+            return detect_format(filename=path, head=file.read(SNIFF_SIZE))
+
+    def _write_summary(self, summary):
+        style = self.style.SUCCESS if summary['status'] else self.style.ERROR
+        self.stdout.write(style(
+            f"  {summary['goods']} goods: {summary['wall_time']:.2f} s, {summary['queries']} queries, "
+            f"peak RSS {summary['peak_rss_kb'] / 1024:.0f} MB, {summary['rows_per_sec']:.0f} rows/sec, "
+            f"{summary['goods_per_sec']:.0f} goods/sec"
+        ))
+        if not summary['status']:
+            errors = {run['error'] for run in summary['details'] if run['error']}
+            self.stdout.write(self.style.ERROR(f"  Errors: {'; '.join(errors)}"))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from backend.services.benchmark import PriceListGenerator
+from backend.services.parsers import detect_format
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic price list in the fixtures/shop1.yaml shape (YAML, JSON, JSON Lines or CSV)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', type=str, help='Path to the generated YAML file')
+        parser.add_argument('--goods', type=int, default=1000, help='Number of goods')
+        parser.add_argument('--categories', type=int, default=10, help='Number of categories')
+        parser.add_argument('--params', type=int, default=4, help='Parameters per good (at most 8)')
+        parser.add_argument('--shop', type=str, default='Benchmark Shop', help='Shop name')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+        parser.add_argument(
+            '--format',
+            choices=PriceListGenerator.formats,
+            help='Output format; detected from the file extension by default',
+        )
+
+    def handle(self, *args, **options):
+        if options['goods'] < 0 or options['categories'] < 1 or options['params'] < 0:
+            raise CommandError('--goods and --params must be non-negative, --categories must be positive')
+
+        generator = PriceListGenerator(
+            goods=options['goods'],
+            categories=options['categories'],
+            parameters=options['params'],
+            shop=options['shop'],
+            seed=options['seed'],
+        )
+        price_format = options['format'] or detect_format(filename=options['output'])
+        size = generator.write(options['output'], price_format)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {options['output']} ({price_format}): {options['goods']} goods, {size / 1024 / 1024:.1f} MB"
+        ))
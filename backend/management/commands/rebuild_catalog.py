@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from backend.services.catalog import CatalogReadModel
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the denormalized catalog read model (CatalogItem) from the live catalog versions'
+
+    def handle(self, *args, **options):
+        count = CatalogReadModel.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Catalog rebuilt: {count} items'))
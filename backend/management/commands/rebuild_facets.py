@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from backend.models import Shop
+from backend.services.facets import FacetService
+
+
+class Command(BaseCommand):
+    help = 'Recomputes precomputed parameter facet counts for all shops'
+
+    def handle(self, *args, **options):
+        total = 0
+        for shop in Shop.objects.order_by('id'):
+            total += FacetService.refresh(shop)
+        self.stdout.write(self.style.SUCCESS(f'Facets rebuilt: {total} rows'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from backend.services.search import ProductSearchIndex
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the product search index (SQLite FTS5 or PostgreSQL tsvector/pg_trgm)'
+
+    def handle(self, *args, **options):
+        if ProductSearchIndex.backend() is None:
+            self.stdout.write(self.style.WARNING('Search index is disabled or not supported by this database'))
+            return
+        count = ProductSearchIndex.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Search index rebuilt: {count} products'))
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-17 04:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0003_product_image_user_avatar'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShopImportState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(blank=True, max_length=64, verbose_name='Хэш содержимого прайс-листа')),
+                ('last_import_at', models.DateTimeField(blank=True, null=True, verbose_name='Время последнего импорта')),
+                ('shop', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='import_state', to='backend.shop', verbose_name='Магазин')),
+            ],
+            options={
+                'verbose_name': 'Состояние импорта',
+                'verbose_name_plural': 'Состояния импорта прайс-листов',
+            },
+        ),
+    ]
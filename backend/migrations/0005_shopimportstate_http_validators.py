@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-17 04:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0004_shopimportstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shopimportstate',
+            name='etag',
+            field=models.CharField(blank=True, max_length=255, verbose_name='ETag'),
+        ),
+        migrations.AddField(
+            model_name='shopimportstate',
+            name='last_modified',
+            field=models.CharField(blank=True, max_length=64, verbose_name='Last-Modified'),
+        ),
+        migrations.AddField(
+            model_name='shopimportstate',
+            name='source_url',
+            field=models.URLField(blank=True, max_length=500, verbose_name='Адрес прайс-листа'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-17 04:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0005_shopimportstate_http_validators'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shopimportstate',
+            name='checkpoint_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Время контрольной точки'),
+        ),
+        migrations.AddField(
+            model_name='shopimportstate',
+            name='checkpoint_hash',
+            field=models.CharField(blank=True, max_length=64, verbose_name='Хэш прерванного импорта'),
+        ),
+        migrations.AddField(
+            model_name='shopimportstate',
+            name='checkpoint_offset',
+            field=models.PositiveIntegerField(default=0, verbose_name='Обработано товаров'),
+        ),
+    ]
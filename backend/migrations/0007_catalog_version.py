@@ -0,0 +1,40 @@
+# Generated by Django 5.1.7 on 2026-10-17 04:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0006_shopimportstate_checkpoint'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='productinfo',
+            name='unique_product_info',
+        ),
+        migrations.AddField(
+            model_name='productinfo',
+            name='catalog_version',
+            field=models.PositiveIntegerField(default=0, verbose_name='Версия каталога'),
+        ),
+        migrations.AddField(
+            model_name='shop',
+            name='catalog_version',
+            field=models.PositiveIntegerField(default=0, verbose_name='Текущая версия каталога'),
+        ),
+        migrations.AddField(
+            model_name='shop',
+            name='previous_catalog_version',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Предыдущая версия каталога'),
+        ),
+        migrations.AddIndex(
+            model_name='productinfo',
+            index=models.Index(fields=['shop', 'catalog_version'], name='product_info_shop_version'),
+        ),
+        migrations.AddConstraint(
+            model_name='productinfo',
+            constraint=models.UniqueConstraint(fields=('product', 'shop', 'external_id', 'catalog_version'), name='unique_product_info'),
+        ),
+    ]
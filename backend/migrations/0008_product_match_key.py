@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-17 04:48
+
+from django.db import migrations, models
+
+from backend.services.matching import normalize_match_key
+
+
+def fill_match_keys(apps, schema_editor):
+    """
+    Заполнение ключа сопоставления существующих товаров по названию.
+    """
+    Product = apps.get_model('backend', 'Product')
+    batch = []
+    for product in Product.objects.only('id', 'name').order_by('id').iterator(chunk_size=2000):
+        product.match_key = normalize_match_key(product.name)
+        batch.append(product)
+        if len(batch) >= 2000:
+            Product.objects.bulk_update(batch, ['match_key'])
+            batch = []
+    Product.objects.bulk_update(batch, ['match_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0007_catalog_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='match_key',
+            field=models.CharField(blank=True, db_index=True, max_length=100, verbose_name='Ключ сопоставления'),
+        ),
+        migrations.RunPython(fill_match_keys, migrations.RunPython.noop),
+    ]
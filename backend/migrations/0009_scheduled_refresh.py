@@ -0,0 +1,43 @@
+# Generated by Django 5.1.7 on 2026-10-17 04:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0008_product_match_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shop',
+            name='refresh_interval',
+            field=models.PositiveIntegerField(blank=True, help_text='Пусто - значение IMPORT_REFRESH_INTERVAL, 0 - автообновление отключено', null=True, verbose_name='Период автообновления прайс-листа, секунды'),
+        ),
+        migrations.AddField(
+            model_name='shopimportstate',
+            name='last_refresh_error',
+            field=models.TextField(blank=True, verbose_name='Последняя ошибка автообновления'),
+        ),
+        migrations.AddField(
+            model_name='shopimportstate',
+            name='next_refresh_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Время следующего автообновления'),
+        ),
+        migrations.AddField(
+            model_name='shopimportstate',
+            name='refresh_failures',
+            field=models.PositiveIntegerField(default=0, verbose_name='Ошибок автообновления подряд'),
+        ),
+        migrations.AddField(
+            model_name='shopimportstate',
+            name='refresh_started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Время запуска автообновления'),
+        ),
+        migrations.AddField(
+            model_name='shopimportstate',
+            name='refresh_unchanged',
+            field=models.PositiveIntegerField(default=0, verbose_name='Неизменившихся прайс-листов подряд'),
+        ),
+    ]
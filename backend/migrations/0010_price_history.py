@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-17 04:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0009_scheduled_refresh'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('external_id', models.PositiveIntegerField(verbose_name='Внешний ИД')),
+                ('price', models.PositiveIntegerField(verbose_name='Цена')),
+                ('price_rrc', models.PositiveIntegerField(verbose_name='Рекомендуемая розничная цена')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Количество')),
+                ('recorded_at', models.DateTimeField(verbose_name='Время изменения')),
+                ('shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='backend.shop', verbose_name='Магазин')),
+            ],
+            options={
+                'verbose_name': 'Изменение цены',
+                'verbose_name_plural': 'История цен',
+                'indexes': [models.Index(fields=['shop', 'external_id', 'recorded_at'], name='price_history_item')],
+            },
+        ),
+    ]
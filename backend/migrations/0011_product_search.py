@@ -0,0 +1,78 @@
+from django.db import migrations
+from django.db.models import F
+
+from backend.services.matching import normalize_text
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Создание поискового индекса товаров для SQLite (FTS5) и PostgreSQL (tsvector, pg_trgm).
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE backend_product_search USING fts5(document, tokenize='trigram')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            "CREATE TABLE backend_product_search ("
+            "product_id bigint PRIMARY KEY, document text NOT NULL, search_vector tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX backend_product_search_vector ON backend_product_search USING gin (search_vector)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX backend_product_search_trgm ON backend_product_search "
+            "USING gin (document gin_trgm_ops)"
+        )
+    else:
+        return
+    fill_search_index(apps, schema_editor)
+
+
+def fill_search_index(apps, schema_editor):
+    """
+    Заполнение индекса товарами текущих версий каталогов магазинов (по историческим моделям).
+    """
+    Product = apps.get_model('backend', 'Product')
+    ProductInfo = apps.get_model('backend', 'ProductInfo')
+    live = ProductInfo.objects.filter(catalog_version=F('shop__catalog_version'))
+    product_ids = sorted(set(live.values_list('product_id', flat=True)))
+
+    for start in range(0, len(product_ids), 2000):
+        batch = product_ids[start:start + 2000]
+        models = {}
+        for product_id, model in live.filter(product_id__in=batch).exclude(model='').values_list(
+            'product_id', 'model'
+        ).distinct():
+            models.setdefault(product_id, set()).add(model)
+        rows = [
+            (product_id, normalize_text(' '.join([name] + sorted(models.get(product_id, ())))))
+            for product_id, name in Product.objects.filter(id__in=batch).values_list('id', 'name')
+        ]
+        with schema_editor.connection.cursor() as cursor:
+            if schema_editor.connection.vendor == 'sqlite':
+                cursor.executemany("INSERT INTO backend_product_search (rowid, document) VALUES (%s, %s)", rows)
+            else:
+                cursor.executemany(
+                    "INSERT INTO backend_product_search (product_id, document, search_vector) "
+                    "VALUES (%s, %s, to_tsvector('simple', %s))",
+                    [(product_id, document, document) for product_id, document in rows]
+                )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute("DROP TABLE IF EXISTS backend_product_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0010_price_history'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
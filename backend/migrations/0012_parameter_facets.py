@@ -0,0 +1,101 @@
+# Generated by Django 5.1.7 on 2026-10-17 05:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F
+
+from backend.services.facets import numeric_value
+
+
+def fill_numeric_values(apps, schema_editor):
+    """
+    Заполнение числовых значений существующих параметров товаров.
+    """
+    ProductParameter = apps.get_model('backend', 'ProductParameter')
+    batch = []
+    for product_parameter in ProductParameter.objects.only('id', 'value').order_by('id').iterator(chunk_size=2000):
+        product_parameter.value_numeric = numeric_value(product_parameter.value)
+        if product_parameter.value_numeric is not None:
+            batch.append(product_parameter)
+        if len(batch) >= 2000:
+            ProductParameter.objects.bulk_update(batch, ['value_numeric'])
+            batch = []
+    ProductParameter.objects.bulk_update(batch, ['value_numeric'])
+
+
+def fill_facets(apps, schema_editor):
+    """
+    Расчет фасетов текущих версий каталогов магазинов.
+    """
+    ProductParameter = apps.get_model('backend', 'ProductParameter')
+    ParameterFacet = apps.get_model('backend', 'ParameterFacet')
+    rows = ProductParameter.objects.filter(
+        product_info__catalog_version=F('product_info__shop__catalog_version')
+    ).values('product_info__shop_id', 'product_info__product__category_id', 'parameter_id', 'value').annotate(
+        count=Count('id')
+    )
+    ParameterFacet.objects.bulk_create([
+        ParameterFacet(shop_id=row['product_info__shop_id'], category_id=row['product_info__product__category_id'],
+                       parameter_id=row['parameter_id'], value=row['value'], count=row['count'])
+        for row in rows
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0011_product_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParameterFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.CharField(max_length=100, verbose_name='Значение')),
+                ('count', models.PositiveIntegerField(verbose_name='Количество товаров')),
+            ],
+            options={
+                'verbose_name': 'Значение фильтра',
+                'verbose_name_plural': 'Значения фильтров',
+            },
+        ),
+        migrations.AddField(
+            model_name='productparameter',
+            name='value_numeric',
+            field=models.FloatField(blank=True, null=True, verbose_name='Числовое значение'),
+        ),
+        migrations.AddIndex(
+            model_name='productparameter',
+            index=models.Index(fields=['parameter', 'value'], name='product_parameter_value'),
+        ),
+        migrations.AddIndex(
+            model_name='productparameter',
+            index=models.Index(fields=['parameter', 'value_numeric'], name='product_parameter_numeric'),
+        ),
+        migrations.AddField(
+            model_name='parameterfacet',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='parameter_facets', to='backend.category', verbose_name='Категория'),
+        ),
+        migrations.AddField(
+            model_name='parameterfacet',
+            name='parameter',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='facets', to='backend.parameter', verbose_name='Параметр'),
+        ),
+        migrations.AddField(
+            model_name='parameterfacet',
+            name='shop',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='parameter_facets', to='backend.shop', verbose_name='Магазин'),
+        ),
+        migrations.AddIndex(
+            model_name='parameterfacet',
+            index=models.Index(fields=['category', 'parameter'], name='parameter_facet_category'),
+        ),
+        migrations.AddIndex(
+            model_name='parameterfacet',
+            index=models.Index(fields=['shop', 'category'], name='parameter_facet_shop'),
+        ),
+        migrations.RunPython(fill_numeric_values, migrations.RunPython.noop),
+        migrations.RunPython(fill_facets, migrations.RunPython.noop),
+    ]
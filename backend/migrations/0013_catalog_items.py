@@ -0,0 +1,79 @@
+# Generated by Django 5.1.7 on 2026-10-17 05:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_catalog_items(apps, schema_editor):
+    """
+    Заполнение витрины товарами текущих версий каталогов магазинов.
+    """
+    ProductInfo = apps.get_model('backend', 'ProductInfo')
+    ProductParameter = apps.get_model('backend', 'ProductParameter')
+    CatalogItem = apps.get_model('backend', 'CatalogItem')
+    product_info_ids = list(ProductInfo.objects.filter(
+        catalog_version=F('shop__catalog_version')
+    ).order_by('id').values_list('id', flat=True))
+
+    for start in range(0, len(product_info_ids), 2000):
+        batch = product_info_ids[start:start + 2000]
+        parameters = {}
+        for product_info_id, parameter_id, name, value in ProductParameter.objects.filter(
+            product_info_id__in=batch
+        ).order_by('id').values_list('product_info_id', 'parameter_id', 'parameter__name', 'value'):
+            parameters.setdefault(product_info_id, []).append(
+                {'parameter': {'id': parameter_id, 'name': name}, 'value': value}
+            )
+        CatalogItem.objects.bulk_create([
+            CatalogItem(
+                product_info_id=row['id'], product_id=row['product_id'], product_name=row['product__name'],
+                product_image=row['product__image'] or '', category_id=row['product__category_id'],
+                category_name=row['product__category__name'] or '', shop_id=row['shop_id'],
+                shop_name=row['shop__name'], shop_url=row['shop__url'], shop_state=row['shop__state'],
+                model=row['model'], external_id=row['external_id'], quantity=row['quantity'],
+                price=row['price'], price_rrc=row['price_rrc'], parameters=parameters.get(row['id'], []),
+            )
+            for row in ProductInfo.objects.filter(id__in=batch).values(
+                'id', 'model', 'external_id', 'quantity', 'price', 'price_rrc',
+                'product_id', 'product__name', 'product__image', 'product__category_id', 'product__category__name',
+                'shop_id', 'shop__name', 'shop__url', 'shop__state',
+            )
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0012_parameter_facets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogItem',
+            fields=[
+                ('product_info', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='catalog_item', serialize=False, to='backend.productinfo', verbose_name='Информация о продукте')),
+                ('product_name', models.CharField(max_length=80, verbose_name='Название')),
+                ('product_image', models.CharField(blank=True, max_length=100, verbose_name='Изображение товара')),
+                ('category_name', models.CharField(blank=True, max_length=40, verbose_name='Название категории')),
+                ('shop_name', models.CharField(max_length=50, verbose_name='Название магазина')),
+                ('shop_url', models.URLField(blank=True, null=True, verbose_name='Ссылка магазина')),
+                ('shop_state', models.BooleanField(verbose_name='Статус магазина')),
+                ('model', models.CharField(blank=True, max_length=80, verbose_name='Модель')),
+                ('external_id', models.PositiveIntegerField(verbose_name='Внешний ИД')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Количество')),
+                ('price', models.PositiveIntegerField(verbose_name='Цена')),
+                ('price_rrc', models.PositiveIntegerField(verbose_name='Рекомендуемая розничная цена')),
+                ('parameters', models.JSONField(default=list, verbose_name='Параметры')),
+                ('category', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='catalog_items', to='backend.category', verbose_name='Категория')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='catalog_items', to='backend.product', verbose_name='Продукт')),
+                ('shop', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='catalog_items', to='backend.shop', verbose_name='Магазин')),
+            ],
+            options={
+                'verbose_name': 'Товар витрины',
+                'verbose_name_plural': 'Витрина каталога',
+                'indexes': [models.Index(fields=['shop_state', 'product_info'], name='catalog_item_state'), models.Index(fields=['shop', 'product_info'], name='catalog_item_shop'), models.Index(fields=['category', 'product_info'], name='catalog_item_category')],
+            },
+        ),
+        migrations.RunPython(fill_catalog_items, migrations.RunPython.noop),
+    ]
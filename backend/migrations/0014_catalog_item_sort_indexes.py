@@ -0,0 +1,49 @@
+# Generated by Django 5.1.7 on 2026-10-17 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0013_catalog_items'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='catalogitem',
+            index=models.Index(condition=models.Q(('shop_state', True)), fields=['price', 'product_info'], name='catalog_item_state_price'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogitem',
+            index=models.Index(fields=['shop', 'price', 'product_info'], name='catalog_item_shop_price'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogitem',
+            index=models.Index(fields=['category', 'price', 'product_info'], name='catalog_item_category_price'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogitem',
+            index=models.Index(condition=models.Q(('shop_state', True)), fields=['product_name', 'product_info'], name='catalog_item_state_name'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogitem',
+            index=models.Index(fields=['shop', 'product_name', 'product_info'], name='catalog_item_shop_name'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogitem',
+            index=models.Index(fields=['category', 'product_name', 'product_info'], name='catalog_item_category_name'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogitem',
+            index=models.Index(condition=models.Q(('shop_state', True)), fields=['quantity', 'product_info'], name='catalog_item_state_quantity'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogitem',
+            index=models.Index(fields=['shop', 'quantity', 'product_info'], name='catalog_item_shop_quantity'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogitem',
+            index=models.Index(fields=['category', 'quantity', 'product_info'], name='catalog_item_category_quantity'),
+        ),
+    ]
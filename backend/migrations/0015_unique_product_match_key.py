@@ -0,0 +1,121 @@
+from django.db import migrations, models
+from django.db.models import Count, F, Min
+
+from backend.services.matching import normalize_text
+
+
+def merge_duplicate_products(apps, schema_editor):
+    """
+    Объединение товаров с одинаковым ключом сопоставления (по историческим моделям).
+
+    Остается товар с наименьшим id: к нему переносятся предложения магазинов
+    и строки витрины. Если у оставшегося товара уже есть предложение с тем же
+    магазином, внешним ИД и версией каталога, позиции заказов переносятся на него,
+    а повторное предложение удаляется. Поисковый индекс объединенных товаров
+    пересчитывается.
+    """
+    Product = apps.get_model('backend', 'Product')
+    ProductInfo = apps.get_model('backend', 'ProductInfo')
+    OrderItem = apps.get_model('backend', 'OrderItem')
+    CatalogItem = apps.get_model('backend', 'CatalogItem')
+
+    groups = (
+        Product.objects.exclude(match_key='').values('match_key')
+        .annotate(count=Count('id'), keeper=Min('id')).filter(count__gt=1)
+        .values_list('match_key', 'keeper')
+    )
+    merged, removed = [], []
+    for match_key, keeper_id in list(groups):
+        keeper = Product.objects.select_related('category').get(pk=keeper_id)
+        duplicate_ids = list(
+            Product.objects.filter(match_key=match_key).exclude(pk=keeper_id).values_list('id', flat=True)
+        )
+        existing = {
+            (shop_id, external_id, version): pk
+            for pk, shop_id, external_id, version in ProductInfo.objects.filter(product_id=keeper_id).values_list(
+                'id', 'shop_id', 'external_id', 'catalog_version'
+            )
+        }
+        for product_info in ProductInfo.objects.filter(product_id__in=duplicate_ids).order_by('id'):
+            key = (product_info.shop_id, product_info.external_id, product_info.catalog_version)
+            if key not in existing:
+                product_info.product_id = keeper_id
+                product_info.save(update_fields=['product'])
+                existing[key] = product_info.id
+                continue
+            target_id = existing[key]
+            for item in OrderItem.objects.filter(product_info_id=product_info.id):
+                target = OrderItem.objects.filter(order_id=item.order_id, product_info_id=target_id).first()
+                if target is None:
+                    item.product_info_id = target_id
+                    item.save(update_fields=['product_info'])
+                else:
+                    target.quantity += item.quantity
+                    target.save(update_fields=['quantity'])
+                    item.delete()
+            product_info.delete()
+
+        CatalogItem.objects.filter(product_id__in=duplicate_ids).update(
+            product_id=keeper_id, product_name=keeper.name, product_image=keeper.image.name or '',
+            category_id=keeper.category_id, category_name=keeper.category.name if keeper.category else '',
+        )
+        Product.objects.filter(id__in=duplicate_ids).delete()
+        merged.append(keeper_id)
+        removed += duplicate_ids
+
+    if merged:
+        refresh_search_index(apps, schema_editor, merged, removed)
+
+
+def refresh_search_index(apps, schema_editor, product_ids, removed_ids):
+    """
+    Пересчет документов поискового индекса оставшихся товаров и удаление объединенных.
+    """
+    connection = schema_editor.connection
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        return
+    Product = apps.get_model('backend', 'Product')
+    ProductInfo = apps.get_model('backend', 'ProductInfo')
+    live = ProductInfo.objects.filter(catalog_version=F('shop__catalog_version'), product_id__in=product_ids)
+
+    models_by_product = {}
+    for product_id, model in live.exclude(model='').values_list('product_id', 'model').distinct():
+        models_by_product.setdefault(product_id, set()).add(model)
+    rows = [
+        (product_id, normalize_text(' '.join([name] + sorted(models_by_product.get(product_id, ())))))
+        for product_id, name in Product.objects.filter(
+            id__in=set(live.values_list('product_id', flat=True))
+        ).values_list('id', 'name')
+    ]
+
+    column = 'rowid' if connection.vendor == 'sqlite' else 'product_id'
+    stale = list(product_ids) + list(removed_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(stale), 500):
+            batch = stale[start:start + 500]
+            cursor.execute(
+                f"DELETE FROM backend_product_search WHERE {column} IN ({', '.join(['%s'] * len(batch))})", batch
+            )
+        if connection.vendor == 'sqlite':
+            cursor.executemany("INSERT INTO backend_product_search (rowid, document) VALUES (%s, %s)", rows)
+        else:
+            cursor.executemany(
+                "INSERT INTO backend_product_search (product_id, document, search_vector) "
+                "VALUES (%s, %s, to_tsvector('simple', %s))",
+                [(product_id, document, document) for product_id, document in rows]
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0014_catalog_item_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_products, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(condition=models.Q(('match_key', ''), _negated=True), fields=('match_key',), name='unique_product_match_key'),
+        ),
+    ]
@@ -10,6 +10,12 @@ from imagekit.models import ProcessedImageField
 from imagekit.processors import ResizeToFill
 import os
 
+from .services.matching import MATCH_KEY_LENGTH, normalize_match_key
+from .services.search import ProductSearchIndex
+from .services.facets import numeric_value
+from .services.catalog import CatalogReadModel
+from .services.response_cache import CatalogResponseCache
+
 STATE_CHOICES = (
     ('basket', 'Статус корзины'),
     ('new', 'Новый'),
@@ -171,6 +177,13 @@ class Shop(models.Model):
                                 blank=True, null=True,
                                 on_delete=models.CASCADE)
     state = models.BooleanField(verbose_name='статус получения заказов', default=True)
+    catalog_version = models.PositiveIntegerField(verbose_name='Текущая версия каталога', default=0)
+    previous_catalog_version = models.PositiveIntegerField(verbose_name='Предыдущая версия каталога',
+                                                           null=True, blank=True)
+    refresh_interval = models.PositiveIntegerField(
+        verbose_name='Период автообновления прайс-листа, секунды', null=True, blank=True,
+        help_text='Пусто - значение IMPORT_REFRESH_INTERVAL, 0 - автообновление отключено'
+    )
 
     # filename
 
@@ -182,6 +195,59 @@ class Shop(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if not adding:
+            CatalogReadModel.update_shop(self)
+
+    def delete(self, *args, **kwargs):
+        shop_id = self.id
+        product_ids = set(self.product_infos.values_list('product_id', flat=True))
+        result = super().delete(*args, **kwargs)
+        ProductSearchIndex.sync(product_ids)
+        # Строки витрины удалены каскадно - ответы магазина и всего каталога устарели
+        CatalogResponseCache.invalidate([shop_id])
+        return result
+
+
+class ShopImportState(models.Model):
+    """
+    Состояние импорта прайс-листа магазина.
+
+    Хранит сведения о последнем успешном импорте, по которым повторный импорт
+    того же файла может быть пропущен: хэш содержимого и HTTP-валидаторы
+    (ETag/Last-Modified) для условного запроса к источнику, а также контрольную
+    точку незавершенного импорта, с которой он продолжается после сбоя.
+
+    Поля refresh_* хранят расписание планового обновления прайс-листа
+    (см. RefreshScheduler): время следующего запуска и число ошибок или
+    неизменившихся прайс-листов подряд, по которым увеличивается интервал.
+    """
+    shop = models.OneToOneField(Shop, verbose_name='Магазин', related_name='import_state',
+                                on_delete=models.CASCADE)
+    content_hash = models.CharField(verbose_name='Хэш содержимого прайс-листа', max_length=64, blank=True)
+    source_url = models.URLField(verbose_name='Адрес прайс-листа', max_length=500, blank=True)
+    etag = models.CharField(verbose_name='ETag', max_length=255, blank=True)
+    last_modified = models.CharField(verbose_name='Last-Modified', max_length=64, blank=True)
+    checkpoint_hash = models.CharField(verbose_name='Хэш прерванного импорта', max_length=64, blank=True)
+    checkpoint_offset = models.PositiveIntegerField(verbose_name='Обработано товаров', default=0)
+    checkpoint_at = models.DateTimeField(verbose_name='Время контрольной точки', null=True, blank=True)
+    last_import_at = models.DateTimeField(verbose_name='Время последнего импорта', null=True, blank=True)
+    next_refresh_at = models.DateTimeField(verbose_name='Время следующего автообновления', null=True, blank=True,
+                                           db_index=True)
+    refresh_started_at = models.DateTimeField(verbose_name='Время запуска автообновления', null=True, blank=True)
+    refresh_failures = models.PositiveIntegerField(verbose_name='Ошибок автообновления подряд', default=0)
+    refresh_unchanged = models.PositiveIntegerField(verbose_name='Неизменившихся прайс-листов подряд', default=0)
+    last_refresh_error = models.TextField(verbose_name='Последняя ошибка автообновления', blank=True)
+
+    class Meta:
+        verbose_name = 'Состояние импорта'
+        verbose_name_plural = "Состояния импорта прайс-листов"
+
+    def __str__(self):
+        return f"Импорт {self.shop.name}"
+
 
 class Category(models.Model):
     """
@@ -201,6 +267,19 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if not adding:
+            CatalogReadModel.update_categories([self])
+
+    def delete(self, *args, **kwargs):
+        product_ids = set(self.products.values_list('id', flat=True))
+        result = super().delete(*args, **kwargs)
+        ProductSearchIndex.remove(product_ids)
+        CatalogResponseCache.invalidate()
+        return result
+
 
 class Product(models.Model):
     """
@@ -209,8 +288,18 @@ class Product(models.Model):
     Содержит общую информацию о товаре, которая не зависит от конкретного магазина.
     Каждый товар относится к определенной категории. Фактические предложения товаров
     в магазинах представлены моделью ProductInfo.
+
+    При импорте товары прайс-листов сопоставляются с Product по уникальному
+    ключу match_key (нормализованное название или модель), поэтому почти одинаковые
+    названия из разных магазинов относятся к одному товару, а параллельные импорты
+    не создают дублей.
+
+    Название и модели товара хранятся в поисковом индексе (ProductSearchIndex),
+    который обновляется при сохранении и удалении Product и ProductInfo.
     """
     name = models.CharField(max_length=80, verbose_name='Название')
+    match_key = models.CharField(max_length=MATCH_KEY_LENGTH, verbose_name='Ключ сопоставления',
+                                 db_index=True, blank=True)
     category = models.ForeignKey(Category, verbose_name='Категория', related_name='products', blank=True, null=True,
                                  on_delete=models.CASCADE)
     image = ProcessedImageField(
@@ -228,14 +317,46 @@ class Product(models.Model):
         verbose_name = 'Продукт'
         verbose_name_plural = "Список продуктов"
         ordering = ('-name',)
+        constraints = [
+            # Пустой ключ бывает у названий из одних знаков препинания; такие товары не сопоставляются
+            models.UniqueConstraint(fields=['match_key'], condition=~models.Q(match_key=''),
+                                    name='unique_product_match_key'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if not self.match_key:
+            self.match_key = normalize_match_key(self.name)
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        ProductSearchIndex.sync([self.id])
+        if not adding:
+            CatalogReadModel.update_product(self)
+
+    def delete(self, *args, **kwargs):
+        product_id = self.id
+        result = super().delete(*args, **kwargs)
+        ProductSearchIndex.remove([product_id])
+        CatalogResponseCache.invalidate()
+        return result
+
+
+class ProductInfoQuerySet(models.QuerySet):
+    def live(self):
+        """
+        Строки текущей (опубликованной) версии каталога магазина.
+        """
+        return self.filter(catalog_version=models.F('shop__catalog_version'))
+
 
 class ProductInfo(models.Model):
     """
     Модель, хранящая информацию о конкретном товаре в конкретном магазине.
+
+    Каталог магазина версионируется: импорт в режиме replace записывает товары
+    в новую версию, а покупателям показывается версия Shop.catalog_version.
     """
     model = models.CharField(max_length=80, verbose_name='Модель', blank=True)
     external_id = models.PositiveIntegerField(verbose_name='Внешний ИД', db_index=True)
@@ -246,17 +367,96 @@ class ProductInfo(models.Model):
     quantity = models.PositiveIntegerField(verbose_name='Количество')
     price = models.PositiveIntegerField(verbose_name='Цена')
     price_rrc = models.PositiveIntegerField(verbose_name='Рекомендуемая розничная цена')
+    catalog_version = models.PositiveIntegerField(verbose_name='Версия каталога', default=0)
+
+    objects = ProductInfoQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Информация о продукте'
         verbose_name_plural = "Информационный список о продуктах"
         constraints = [
-            models.UniqueConstraint(fields=['product', 'shop', 'external_id'], name='unique_product_info'),
+            models.UniqueConstraint(fields=['product', 'shop', 'external_id', 'catalog_version'],
+                                    name='unique_product_info'),
+        ]
+        indexes = [
+            models.Index(fields=['shop', 'catalog_version'], name='product_info_shop_version'),
         ]
 
     def __str__(self):
         return f"{self.product.name} ({self.shop.name})"
 
+    # Поля, от которых зависит документ поискового индекса товара
+    search_fields = frozenset(('product_id', 'shop_id', 'model', 'catalog_version'))
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def changed_fields(self, update_fields=None):
+        """
+        Поля (attname), измененные после загрузки из БД, с учетом update_fields;
+        None, если исходные значения неизвестны (новый объект или отложенные поля).
+        """
+        saved = None
+        if update_fields is not None:
+            saved = {self._meta.get_field(name).attname for name in update_fields}
+        loaded = getattr(self, '_loaded_values', None)
+        if self._state.adding or loaded is None or models.DEFERRED in loaded.values():
+            return saved
+        changed = {name for name, value in loaded.items() if getattr(self, name) != value}
+        return changed if saved is None else changed & saved
+
+    def save(self, *args, **kwargs):
+        changed = self.changed_fields(kwargs.get('update_fields'))
+        previous_product_id = getattr(self, '_loaded_values', {}).get('product_id')
+        super().save(*args, **kwargs)
+        self._loaded_values = {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields}
+
+        # Документ поиска зависит от названия и моделей товара, а списание остатков
+        # при заказе обновляет в витрине только количество
+        if changed is None or changed & self.search_fields:
+            ProductSearchIndex.sync({self.product_id, previous_product_id} - {None})
+        if changed is None or changed - {'quantity'}:
+            CatalogReadModel.sync([self.id])
+        elif changed:
+            CatalogReadModel.update_quantity(self)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        ProductSearchIndex.sync([self.product_id])
+        CatalogResponseCache.invalidate([self.shop_id])
+        return result
+
+
+class PriceHistory(models.Model):
+    """
+    История цен и остатков товаров магазина.
+
+    Записи только добавляются импортом и только для товаров, у которых
+    изменились цена, рекомендуемая цена или количество. Товар определяется
+    парой "магазин + внешний ИД", которая сохраняется между версиями каталога
+    (строки ProductInfo в режиме replace пересоздаются).
+    """
+    shop = models.ForeignKey(Shop, verbose_name='Магазин', related_name='price_history',
+                             on_delete=models.CASCADE)
+    external_id = models.PositiveIntegerField(verbose_name='Внешний ИД')
+    price = models.PositiveIntegerField(verbose_name='Цена')
+    price_rrc = models.PositiveIntegerField(verbose_name='Рекомендуемая розничная цена')
+    quantity = models.PositiveIntegerField(verbose_name='Количество')
+    recorded_at = models.DateTimeField(verbose_name='Время изменения')
+
+    class Meta:
+        verbose_name = 'Изменение цены'
+        verbose_name_plural = 'История цен'
+        indexes = [
+            models.Index(fields=['shop', 'external_id', 'recorded_at'], name='price_history_item'),
+        ]
+
+    def __str__(self):
+        return f"{self.shop_id}/{self.external_id}: {self.price} ({self.recorded_at})"
+
 
 class Parameter(models.Model):
     """
@@ -285,6 +485,8 @@ class ProductParameter(models.Model):
     Хранит конкретные значения параметров для конкретных товаров в конкретных магазинах.
     Позволяет реализовать гибкую систему характеристик товаров, где набор параметров
     может различаться для разных товаров.
+
+    Числовое значение (value_numeric) хранится отдельно для фильтров по диапазону.
     """
     product_info = models.ForeignKey(ProductInfo, verbose_name='Информация о продукте',
                                      related_name='product_parameters', blank=True,
@@ -292,6 +494,7 @@ class ProductParameter(models.Model):
     parameter = models.ForeignKey(Parameter, verbose_name='Параметр', related_name='product_parameters', blank=True,
                                   on_delete=models.CASCADE)
     value = models.CharField(verbose_name='Значение', max_length=100)
+    value_numeric = models.FloatField(verbose_name='Числовое значение', null=True, blank=True)
 
     class Meta:
         verbose_name = 'Параметр'
@@ -299,6 +502,107 @@ class ProductParameter(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['product_info', 'parameter'], name='unique_product_parameter'),
         ]
+        indexes = [
+            models.Index(fields=['parameter', 'value'], name='product_parameter_value'),
+            models.Index(fields=['parameter', 'value_numeric'], name='product_parameter_numeric'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.value_numeric = numeric_value(self.value)
+        super().save(*args, **kwargs)
+        CatalogReadModel.sync([self.product_info_id])
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        CatalogReadModel.sync([self.product_info_id])
+        return result
+
+
+class ParameterFacet(models.Model):
+    """
+    Предрасчитанное количество товаров с каждым значением параметра
+    по магазину и категории (фасеты фильтров каталога).
+
+    Строки текущей версии каталога магазина пересчитываются после импорта
+    прайс-листа и отката каталога (см. FacetService.refresh).
+    """
+    shop = models.ForeignKey(Shop, verbose_name='Магазин', related_name='parameter_facets',
+                             on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, verbose_name='Категория', related_name='parameter_facets',
+                                 null=True, blank=True, on_delete=models.CASCADE)
+    parameter = models.ForeignKey(Parameter, verbose_name='Параметр', related_name='facets',
+                                  on_delete=models.CASCADE)
+    value = models.CharField(verbose_name='Значение', max_length=100)
+    count = models.PositiveIntegerField(verbose_name='Количество товаров')
+
+    class Meta:
+        verbose_name = 'Значение фильтра'
+        verbose_name_plural = 'Значения фильтров'
+        indexes = [
+            models.Index(fields=['category', 'parameter'], name='parameter_facet_category'),
+            models.Index(fields=['shop', 'category'], name='parameter_facet_shop'),
+        ]
+
+
+class CatalogItem(models.Model):
+    """
+    Витрина каталога: одна строка на товар магазина текущей версии каталога.
+
+    Содержит все данные ответа списка и карточки товара (название и изображение
+    товара, категорию, магазин и его статус, цены, остаток и параметры в JSON),
+    поэтому ProductView и ProductDetailView читают ее одним запросом без JOIN
+    и предзагрузки параметров. Строки пересчитываются импортом и откатом
+    каталога, а также при сохранении моделей через ORM (см. CatalogReadModel).
+    Первичный ключ совпадает с id ProductInfo.
+    """
+    product_info = models.OneToOneField(ProductInfo, verbose_name='Информация о продукте', primary_key=True,
+                                        related_name='catalog_item', on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, verbose_name='Продукт', related_name='catalog_items',
+                                on_delete=models.CASCADE)
+    product_name = models.CharField(max_length=80, verbose_name='Название')
+    product_image = models.CharField(max_length=100, verbose_name='Изображение товара', blank=True)
+    category = models.ForeignKey(Category, verbose_name='Категория', related_name='catalog_items',
+                                 null=True, blank=True, db_index=False, on_delete=models.CASCADE)
+    category_name = models.CharField(max_length=40, verbose_name='Название категории', blank=True)
+    shop = models.ForeignKey(Shop, verbose_name='Магазин', related_name='catalog_items', db_index=False,
+                             on_delete=models.CASCADE)
+    shop_name = models.CharField(max_length=50, verbose_name='Название магазина')
+    shop_url = models.URLField(verbose_name='Ссылка магазина', null=True, blank=True)
+    shop_state = models.BooleanField(verbose_name='Статус магазина')
+    model = models.CharField(max_length=80, verbose_name='Модель', blank=True)
+    external_id = models.PositiveIntegerField(verbose_name='Внешний ИД')
+    quantity = models.PositiveIntegerField(verbose_name='Количество')
+    price = models.PositiveIntegerField(verbose_name='Цена')
+    price_rrc = models.PositiveIntegerField(verbose_name='Рекомендуемая розничная цена')
+    parameters = models.JSONField(verbose_name='Параметры', default=list)
+
+    class Meta:
+        verbose_name = 'Товар витрины'
+        verbose_name_plural = 'Витрина каталога'
+        indexes = [
+            models.Index(fields=['shop_state', 'product_info'], name='catalog_item_state'),
+            models.Index(fields=['shop', 'product_info'], name='catalog_item_shop'),
+            models.Index(fields=['category', 'product_info'], name='catalog_item_category'),
+            # Сортировки каталога (ProductView.ordering_fields) для всего каталога, магазина и категории;
+            # первичный ключ в конце индекса - дополнительный ключ сортировки. Индексы всего каталога
+            # частичные: условие shop_state=True Django передает в SQL без сравнения ("WHERE shop_state"),
+            # и SQLite не использует для него первый столбец составного индекса
+            models.Index(fields=['price', 'product_info'], condition=models.Q(shop_state=True),
+                         name='catalog_item_state_price'),
+            models.Index(fields=['shop', 'price', 'product_info'], name='catalog_item_shop_price'),
+            models.Index(fields=['category', 'price', 'product_info'], name='catalog_item_category_price'),
+            models.Index(fields=['product_name', 'product_info'], condition=models.Q(shop_state=True),
+                         name='catalog_item_state_name'),
+            models.Index(fields=['shop', 'product_name', 'product_info'], name='catalog_item_shop_name'),
+            models.Index(fields=['category', 'product_name', 'product_info'], name='catalog_item_category_name'),
+            models.Index(fields=['quantity', 'product_info'], condition=models.Q(shop_state=True),
+                         name='catalog_item_state_quantity'),
+            models.Index(fields=['shop', 'quantity', 'product_info'], name='catalog_item_shop_quantity'),
+            models.Index(fields=['category', 'quantity', 'product_info'], name='catalog_item_category_quantity'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_name} ({self.shop_name})"
 
 
 class Contact(models.Model):
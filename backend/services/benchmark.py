@@ -0,0 +1,328 @@
+import os
+import csv
+import json
+import random
+import resource
+import sys
+import threading
+import time
+import platform
+import django
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from .bulk_import import QueryCounter
+from .parsers import CSV_COLUMNS, get_reader
+
+CATEGORY_NAMES = (
+    'Смартфоны', 'Аксессуары', 'Flash-накопители', 'Телевизоры', 'Ноутбуки', 'Планшеты',
+    'Наушники', 'Мониторы', 'Фотоаппараты', 'Умные часы', 'Колонки', 'Роутеры',
+)
+BRANDS = ('Apple', 'Samsung', 'Xiaomi', 'Huawei', 'Sony', 'LG', 'Lenovo', 'Asus', 'Philips', 'Kingston')
+COLORS = ('черный', 'белый', 'серебристый', 'золотистый', 'красный', 'синий', 'зеленый')
+PARAMETERS = (
+    ('Диагональ (дюйм)', lambda rnd: rnd.choice((5.5, 6.1, 6.5, 13.3, 15.6, 32, 43, 55))),
+    ('Разрешение (пикс)', lambda rnd: rnd.choice(('1920x1080', '2688x1242', '3840x2160', '1792x828'))),
+    ('Встроенная память (Гб)', lambda rnd: rnd.choice((32, 64, 128, 256, 512))),
+    ('Цвет', lambda rnd: rnd.choice(COLORS)),
+    ('Вес (г)', lambda rnd: rnd.randint(50, 5000)),
+    ('Гарантия (мес)', lambda rnd: rnd.choice((6, 12, 24, 36))),
+    ('Материал корпуса', lambda rnd: rnd.choice(('пластик', 'металл', 'стекло'))),
+    ('Емкость аккумулятора (мАч)', lambda rnd: rnd.randint(1000, 6000)),
+)
+
+
+def yaml_string(value):
+    """
+    Строка в двойных кавычках YAML (совместима с JSON).
+    """
+    return json.dumps(value, ensure_ascii=False)
+
+
+class PriceListGenerator:
+    """
+    Генератор синтетических прайс-листов в формате fixtures/shop1.yaml.
+
+    Помимо YAML, тот же прайс-лист записывается в форматах JSON, JSON Lines и CSV.
+    Файл записывается построчно, без построения документа в памяти,
+    поэтому можно генерировать прайс-листы на миллионы товаров.
+    Результат воспроизводим при одинаковом seed.
+    """
+
+    formats = ('yaml', 'json', 'jsonl', 'csv')
+
+    def __init__(self, goods=1000, categories=10, parameters=4, shop='Benchmark Shop', seed=0):
+        self.goods = goods
+        self.categories = categories
+        self.parameters = min(parameters, len(PARAMETERS))
+        self.shop = shop
+        self.seed = seed
+
+    def iter_categories(self):
+        for category_id in range(1, self.categories + 1):
+            name = CATEGORY_NAMES[(category_id - 1) % len(CATEGORY_NAMES)]
+            if category_id > len(CATEGORY_NAMES):
+                name = f"{name} {category_id}"
+            yield {'id': category_id, 'name': name}
+
+    def iter_goods(self):
+        rnd = random.Random(self.seed)
+        for index in range(self.goods):
+            brand = rnd.choice(BRANDS)
+            price = rnd.randint(5, 2000) * 100
+            yield {
+                'id': 1000000 + index,
+                'category': rnd.randint(1, self.categories),
+                'model': f"{brand.lower()}/model-{index // 3}",
+                'name': f'Товар {brand} {index // 3} ({rnd.choice(COLORS)})',
+                'price': price,
+                'price_rrc': price + rnd.randint(0, 50) * 100,
+                'quantity': rnd.randint(0, 50),
+                'parameters': {name: value(rnd) for name, value in PARAMETERS[:self.parameters]},
+            }
+
+    def iter_lines(self):
+        """
+        Строки YAML-прайс-листа.
+        """
+        yield f"shop: {yaml_string(self.shop)}"
+        yield "categories:"
+        for category in self.iter_categories():
+            yield f"  - id: {category['id']}"
+            yield f"    name: {yaml_string(category['name'])}"
+
+        yield "goods:" if self.goods else "goods: []"
+        for item in self.iter_goods():
+            yield f"  - id: {item['id']}"
+            yield f"    category: {item['category']}"
+            yield f"    model: {item['model']}"
+            yield f"    name: {yaml_string(item['name'])}"
+            yield f"    price: {item['price']}"
+            yield f"    price_rrc: {item['price_rrc']}"
+            yield f"    quantity: {item['quantity']}"
+            if not item['parameters']:
+                yield "    parameters: {}"
+                continue
+            yield "    parameters:"
+            for name, value in item['parameters'].items():
+                yield f"      {yaml_string(name)}: {value}"
+
+    def iter_json_lines(self):
+        """
+        Строки прайс-листа JSON Lines: заголовок и по одному товару в строке.
+        """
+        yield json.dumps({'shop': self.shop, 'categories': list(self.iter_categories())}, ensure_ascii=False)
+        for item in self.iter_goods():
+            yield json.dumps(item, ensure_ascii=False)
+
+    def iter_json(self):
+        """
+        Фрагменты JSON-документа; товары записываются по одному.
+        """
+        header = json.dumps({'shop': self.shop, 'categories': list(self.iter_categories())}, ensure_ascii=False)
+        yield header[:-1] + ', "goods": ['
+        for index, item in enumerate(self.iter_goods()):
+            yield ('' if index == 0 else ',') + json.dumps(item, ensure_ascii=False)
+        yield ']}'
+
+    def write_csv(self, file):
+        categories = {category['id']: category['name'] for category in self.iter_categories()}
+        writer = csv.writer(file)
+        writer.writerow(CSV_COLUMNS + tuple(name for name, _ in PARAMETERS[:self.parameters]))
+        for item in self.iter_goods():
+            writer.writerow([
+                self.shop, item['category'], categories[item['category']], item['id'], item['model'],
+                item['name'], item['price'], item['price_rrc'], item['quantity'], *item['parameters'].values()
+            ])
+
+    def write(self, path, price_format='yaml'):
+        """
+        Запись прайс-листа в файл.
+
+        Returns:
+            int: Размер файла в байтах.
+        """
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            if price_format == 'csv':
+                self.write_csv(file)
+            elif price_format == 'json':
+                file.writelines(self.iter_json())
+            else:
+                lines = self.iter_json_lines() if price_format == 'jsonl' else self.iter_lines()
+                for line in lines:
+                    file.write(line)
+                    file.write('\n')
+        return os.path.getsize(path)
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalPriceListServer:
+    """
+    HTTP-сервер для раздачи прайс-листов из каталога при замерах импорта.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.server = None
+
+    def url(self, filename):
+        return f"http://127.0.0.1:{self.server.server_port}/{filename}"
+
+    def __enter__(self):
+        handler = partial(QuietHandler, directory=self.directory)
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def peak_rss_kb():
+    """
+    Пиковый объем резидентной памяти процесса, КБ (ru_maxrss в macOS измеряется в байтах).
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+class ImportBenchmark:
+    """
+    Замер импорта прайс-листов через ImportService.import_shop_data.
+
+    Для каждого запуска фиксируются время, число SQL-запросов, пиковый RSS процесса
+    и скорость записи строк. Режимы:
+    - cold: товары магазина удаляются перед каждым запуском;
+    - warm: данные сохраняются, сбрасывается только состояние импорта, поэтому
+      замеряется повторный импорт неизменившегося прайс-листа.
+    """
+
+    def __init__(self, user, mode='cold'):
+        self.user = user
+        self.mode = mode
+
+    def reset(self):
+        from ..models import ShopImportState, ProductInfo
+
+        ShopImportState.objects.filter(shop__user=self.user).delete()
+        if self.mode == 'cold':
+            ProductInfo.objects.filter(shop__user=self.user).delete()
+
+    def run(self, url):
+        """
+        Один замер импорта прайс-листа по адресу url.
+        """
+        from .import_service import ImportService
+
+        self.reset()
+        rss_before = peak_rss_kb()
+        started = time.perf_counter()
+        with QueryCounter() as query_counter:
+            result = ImportService.import_shop_data(url, self.user.id)
+        wall_time = time.perf_counter() - started
+
+        stats = result.get('stats', {})
+        rows = stats.get('products', 0) + stats.get('parameters', 0)
+        return {
+            'status': result.get('status', False),
+            'error': result.get('error'),
+            'wall_time': round(wall_time, 3),
+            'queries': query_counter.count,
+            'peak_rss_kb': peak_rss_kb(),
+            'peak_rss_growth_kb': peak_rss_kb() - rss_before,
+            'goods': stats.get('goods', 0),
+            'rows': rows,
+            'rows_per_sec': round(rows / wall_time, 1) if wall_time else 0.0,
+            'goods_per_sec': round(stats.get('goods', 0) / wall_time, 1) if wall_time else 0.0,
+            'stats': stats,
+        }
+
+    @staticmethod
+    def parse(path, price_format):
+        """
+        Замер разбора прайс-листа без записи в БД.
+        """
+        started = time.perf_counter()
+        goods = 0
+        with open(path, 'rb') as stream:
+            reader = get_reader(price_format, stream, chunk_size=settings.IMPORT_CHUNK_SIZE)
+            reader.read_header()
+            for chunk in reader.iter_chunks():
+                goods += len(chunk)
+        parse_time = time.perf_counter() - started
+
+        size = os.path.getsize(path)
+        return {
+            'format': price_format,
+            'size_bytes': size,
+            'goods': goods,
+            'parse_time': round(parse_time, 3),
+            'goods_per_sec': round(goods / parse_time, 1) if parse_time else 0.0,
+            'mb_per_sec': round(size / 1024 / 1024 / parse_time, 2) if parse_time else 0.0,
+        }
+
+    @staticmethod
+    def summarize(filename, runs):
+        """
+        Сводка по запускам одного файла: медианы времени и скорости, максимум памяти.
+        """
+        wall_times = sorted(run['wall_time'] for run in runs)
+        speeds = sorted(run['rows_per_sec'] for run in runs)
+        return {
+            'file': filename,
+            'runs': len(runs),
+            'status': all(run['status'] for run in runs),
+            'wall_time': wall_times[len(wall_times) // 2],
+            'wall_time_min': wall_times[0],
+            'queries': runs[-1]['queries'],
+            'peak_rss_kb': max(run['peak_rss_kb'] for run in runs),
+            'goods': runs[-1]['goods'],
+            'rows': runs[-1]['rows'],
+            'rows_per_sec': speeds[len(speeds) // 2],
+            'goods_per_sec': sorted(run['goods_per_sec'] for run in runs)[len(runs) // 2],
+            'details': runs,
+        }
+
+    @staticmethod
+    def environment():
+        """
+        Сведения об окружении для сравнения результатов разных запусков.
+        """
+        return {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'import_mode': settings.IMPORT_MODE,
+            'batch_size': settings.IMPORT_BATCH_SIZE,
+            'chunk_size': settings.IMPORT_CHUNK_SIZE,
+            'stream_threshold': settings.IMPORT_STREAM_THRESHOLD,
+            'created_at': timezone.now().isoformat(),
+        }
+
+    @staticmethod
+    def compare(results, baseline):
+        """
+        Относительное изменение времени и числа запросов по сравнению с прошлым запуском.
+
+        Замеры сопоставляются по имени файла.
+        """
+        previous = {item['file']: item for item in baseline.get('results', [])}
+        comparison = []
+        for item in results:
+            old = previous.get(item['file'])
+            if old is None:
+                continue
+            comparison.append({
+                'file': item['file'],
+                'wall_time_change': round(item['wall_time'] / old['wall_time'] - 1, 3) if old['wall_time'] else None,
+                'queries_change': item['queries'] - old['queries'],
+                'rows_per_sec_change': round(item['rows_per_sec'] - old['rows_per_sec'], 1),
+            })
+        return comparison
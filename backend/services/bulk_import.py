@@ -0,0 +1,770 @@
+import time
+import logging
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+from .matching import product_match_key
+from .price_history import PriceHistoryRecorder
+from .search import ProductSearchIndex
+from .facets import FacetService, numeric_value
+from .catalog import CatalogReadModel
+from .response_cache import CatalogResponseCache
+from ..models import ShopImportState, Shop, Category, Product, ProductInfo, Parameter, ProductParameter
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """
+    Контекстный менеджер для подсчета SQL-запросов, выполненных через соединение с БД.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.connection = connections[using]
+        self.count = 0
+        self._wrapper = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._wrapper = self.connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._wrapper.__exit__(exc_type, exc_value, traceback)
+
+
+class ImportStats:
+    """
+    Статистика импорта прайс-листа: количество записанных строк, SQL-запросов и скорость.
+    """
+
+    def __init__(self):
+        self.goods = 0
+        self.products = 0
+        self.parameters = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.parameters_deleted = 0
+        self.resumed = 0
+        self.history = 0
+        self.categories_created = 0
+        self.categories_renamed = 0
+        self.categories_linked = 0
+        self.queries = 0
+        self.elapsed = 0.0
+        self._started = time.perf_counter()
+
+    def finish(self):
+        """
+        Фиксирует время окончания импорта.
+        """
+        self.elapsed = time.perf_counter() - self._started
+
+    @classmethod
+    def combine(cls, results):
+        """
+        Суммарная статистика по результатам as_dict() нескольких импортов (разделов прайс-листа).
+
+        Время выполнения не суммируется: его задает вызывающий код.
+        """
+        stats = cls()
+        counters = [name for name, value in vars(stats).items() if isinstance(value, int) and not name.startswith('_')]
+        for result in results:
+            for name in counters:
+                setattr(stats, name, getattr(stats, name) + result.get(name, 0))
+        return stats
+
+    @property
+    def rows(self):
+        return self.products + self.parameters
+
+    @property
+    def rows_per_sec(self):
+        if not self.elapsed:
+            return 0.0
+        return self.rows / self.elapsed
+
+    def as_dict(self):
+        return {
+            'goods': self.goods,
+            'products': self.products,
+            'parameters': self.parameters,
+            'created': self.created,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'deleted': self.deleted,
+            'parameters_deleted': self.parameters_deleted,
+            'resumed': self.resumed,
+            'history': self.history,
+            'categories_created': self.categories_created,
+            'categories_renamed': self.categories_renamed,
+            'categories_linked': self.categories_linked,
+            'queries': self.queries,
+            'elapsed': round(self.elapsed, 3),
+            'rows_per_sec': round(self.rows_per_sec, 1),
+        }
+
+
+class ImportProgress:
+    """
+    Публикация хода импорта: фаза, обработано/всего товаров, записано параметров,
+    прошедшее время, скорость и оценка оставшегося времени.
+
+    Функция callback получает словарь с этими полями. Чтобы не нагружать хранилище
+    результатов Celery, промежуточный ход публикуется не чаще IMPORT_PROGRESS_INTERVAL секунд.
+    """
+
+    def __init__(self, callback, interval=None):
+        self.callback = callback
+        self.interval = settings.IMPORT_PROGRESS_INTERVAL if interval is None else interval
+        self.phase = None
+        self.goods_total = None
+        self.goods_processed = 0
+        self.parameters = 0
+        self._started = time.perf_counter()
+        self._published_at = None
+
+    def set_phase(self, phase, goods_total=None):
+        """
+        Переход к новой фазе импорта; публикуется сразу.
+        """
+        self.phase = phase
+        if goods_total is not None:
+            self.goods_total = goods_total
+        self.publish(force=True)
+
+    def update(self, stats):
+        """
+        Обновление по статистике ImportStats после записи пакета товаров.
+        """
+        self.goods_processed = stats.goods + stats.resumed
+        self.parameters = stats.parameters
+        self.publish()
+
+    def as_dict(self):
+        elapsed = time.perf_counter() - self._started
+        goods_per_sec = self.goods_processed / elapsed if elapsed else 0.0
+        eta = None
+        if self.goods_total is not None and goods_per_sec:
+            eta = round(max(self.goods_total - self.goods_processed, 0) / goods_per_sec, 1)
+
+        return {
+            'phase': self.phase,
+            'goods_processed': self.goods_processed,
+            'goods_total': self.goods_total,
+            'parameters': self.parameters,
+            'elapsed': round(elapsed, 3),
+            'goods_per_sec': round(goods_per_sec, 1),
+            'eta': eta,
+        }
+
+    def publish(self, force=False):
+        now = time.perf_counter()
+        if not force and self._published_at is not None and now - self._published_at < self.interval:
+            return
+        self._published_at = now
+        self.callback(self.as_dict())
+
+
+class ImportCheckpoint:
+    """
+    Контрольная точка импорта: сколько товаров прайс-листа с данным хэшем уже записано.
+
+    Хранится в ShopImportState. Если хэш файла отличается от сохраненного,
+    импорт начинается с начала.
+    """
+
+    def __init__(self, shop, content_hash):
+        self.shop = shop
+        self.content_hash = content_hash
+        state, _ = ShopImportState.objects.get_or_create(shop=shop)
+        self.offset = state.checkpoint_offset if state.checkpoint_hash == content_hash else 0
+
+    def save(self, offset):
+        """
+        Сохранение позиции; вызывается в транзакции пакета товаров.
+        """
+        ShopImportState.objects.filter(shop=self.shop).update(
+            checkpoint_hash=self.content_hash,
+            checkpoint_offset=offset,
+            checkpoint_at=timezone.now(),
+        )
+
+    def clear(self):
+        """
+        Сброс контрольной точки после публикации версии каталога.
+        """
+        ShopImportState.objects.filter(shop=self.shop).update(
+            checkpoint_hash='', checkpoint_offset=0, checkpoint_at=None
+        )
+
+
+class BulkCategoryImporter:
+    """
+    Пакетный импорт категорий прайс-листа и их привязки к магазину.
+
+    Существующие категории загружаются одним запросом по id, новые создаются
+    через bulk_create, переименованные обновляются через bulk_update. Связи
+    категория-магазин вставляются одним bulk_create в промежуточную таблицу
+    с пропуском уже существующих.
+    """
+
+    def __init__(self, shop, batch_size=None, stats=None):
+        self.shop = shop
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.stats = stats if stats is not None else ImportStats()
+
+    def import_categories(self, categories):
+        """
+        Импорт списка категорий в одной транзакции.
+
+        Args:
+            categories (list): Категории в формате прайс-листа ({"id", "name"}).
+
+        Returns:
+            int: Количество категорий прайс-листа (без повторов).
+        """
+        names = {int(category['id']): category['name'] for category in categories}
+        if not names:
+            return 0
+
+        with transaction.atomic():
+            existing = Category.objects.order_by().in_bulk(list(names))
+
+            new_categories = [
+                Category(id=category_id, name=name)
+                for category_id, name in names.items() if category_id not in existing
+            ]
+            renamed = []
+            for category_id, category in existing.items():
+                if category.name != names[category_id]:
+                    category.name = names[category_id]
+                    renamed.append(category)
+
+            Category.objects.bulk_create(new_categories, batch_size=self.batch_size)
+            Category.objects.bulk_update(renamed, ['name'], batch_size=self.batch_size)
+            if renamed:
+                CatalogReadModel.update_categories(renamed)
+
+            through = Category.shops.through
+            linked_ids = set(through.objects.filter(
+                shop_id=self.shop.id, category_id__in=list(names)
+            ).values_list('category_id', flat=True))
+            links = [
+                through(category_id=category_id, shop_id=self.shop.id)
+                for category_id in names if category_id not in linked_ids
+            ]
+            through.objects.bulk_create(links, batch_size=self.batch_size, ignore_conflicts=True)
+
+        self.stats.categories_created += len(new_categories)
+        self.stats.categories_renamed += len(renamed)
+        self.stats.categories_linked += len(links)
+        return len(names)
+
+
+class BulkProductImporter:
+    """
+    Пакетный импорт товаров магазина.
+
+    Вместо запросов на каждый товар и параметр загружает соответствия
+    "ключ сопоставления -> id" для Product и "название -> id" для Parameter
+    одним запросом на пакет и хранит их в памяти до конца импорта,
+    а ProductInfo и ProductParameter записывает через bulk_create с обработкой
+    конфликтов по ограничениям unique_product_info и unique_product_parameter.
+
+    Поддерживаются два режима:
+    - replace: товары записываются в новую версию каталога магазина, которая
+      публикуется после записи всех пакетов (см. publish); до этого покупатели
+      видят текущую версию целиком;
+    - incremental: товары текущей версии каталога сопоставляются с прайс-листом
+      по external_id, и записываются только добавленные, измененные
+      и удаленные строки.
+
+    Изменения цен и остатков записываются в историю (PriceHistory): в режиме
+    incremental - вместе с каждым пакетом, в режиме replace - при публикации версии.
+    Поисковый индекс (ProductSearchIndex) обновляется в режиме incremental для товаров
+    каждого пакета и удаленных строк, а в режиме replace - при публикации версии.
+    Витрина каталога (CatalogReadModel) так же обновляется в режиме incremental
+    для измененных товаров пакета, а в режиме replace пересобирается при публикации.
+    """
+
+    product_info_update_fields = ['model', 'price', 'price_rrc', 'quantity']
+    product_info_compare_fields = ['product_id', 'model', 'price', 'price_rrc', 'quantity']
+
+    def __init__(self, shop, batch_size=None, stats=None, incremental=False, checkpoint=None, progress=None,
+                 version=None):
+        self.shop = shop
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.stats = stats if stats is not None else ImportStats()
+        self.incremental = incremental
+        self.checkpoint = checkpoint
+        self.progress = progress
+        self.position = 0
+        if version is None:
+            version = self.shop.catalog_version if incremental else self.staging_version(shop)
+        self.version = version
+        self._product_ids = {}
+        self._parameter_ids = {}
+        self._seen_external_ids = set()
+
+    @staticmethod
+    def staging_version(shop):
+        """
+        Номер версии каталога, в которую записывается импорт в режиме replace.
+
+        Номер больше текущей и предыдущей версий и не меняется до публикации,
+        поэтому прерванный импорт продолжается в той же версии.
+        """
+        return max(shop.catalog_version, shop.previous_catalog_version or 0) + 1
+
+    def begin(self):
+        """
+        Подготовка к импорту: в режиме replace удаляет строки незавершенного
+        импорта из версии, в которую будут записаны товары.
+
+        При продолжении прерванного импорта товары не удаляются.
+        """
+        resuming = self.checkpoint is not None and self.checkpoint.offset > 0
+        if not self.incremental and not resuming:
+            ProductInfo.objects.filter(shop_id=self.shop.id, catalog_version=self.version).delete()
+
+    def finish(self):
+        """
+        Завершение импорта: в режиме replace публикует новую версию каталога,
+        в режиме incremental удаляет товары, отсутствующие в прайс-листе.
+        Затем пересчитываются фасеты каталога магазина (в режиме incremental -
+        если каталог изменился).
+        """
+        if not self.incremental:
+            self.publish()
+            FacetService.refresh(self.shop)
+            return
+
+        stale_ids = [
+            pk for pk, external_id in ProductInfo.objects.filter(
+                shop_id=self.shop.id, catalog_version=self.version
+            ).values_list('id', 'external_id')
+            if external_id not in self._seen_external_ids
+        ]
+        stale_product_ids = set()
+        for batch in self._batches(stale_ids):
+            stale_product_ids.update(ProductInfo.objects.filter(id__in=batch).values_list('product_id', flat=True))
+            ProductInfo.objects.filter(id__in=batch).delete()
+        if stale_ids:
+            ProductSearchIndex.sync(stale_product_ids, batch_size=self.batch_size)
+            CatalogResponseCache.invalidate([self.shop.id])
+        self.stats.deleted += len(stale_ids)
+        stats = self.stats
+        # Продолженный после сбоя импорт мог изменить каталог до контрольной точки
+        if stats.products or stats.parameters or stats.deleted or stats.parameters_deleted or stats.resumed:
+            FacetService.refresh(self.shop)
+
+    def publish(self):
+        """
+        Публикация записанной версии каталога.
+
+        Указатель Shop.catalog_version переключается одним UPDATE в транзакции
+        вместе со сбросом контрольной точки; прежняя текущая версия сохраняется
+        в previous_catalog_version для отката. Более старые версии удаляются,
+        кроме строк, на которые ссылаются позиции заказов.
+        """
+        live_version = self.shop.catalog_version
+        with transaction.atomic():
+            self.stats.history += PriceHistoryRecorder.record_version_change(
+                self.shop, live_version, self.version, batch_size=self.batch_size
+            )
+            Shop.objects.filter(id=self.shop.id).update(
+                catalog_version=self.version, previous_catalog_version=live_version
+            )
+            CatalogReadModel.refresh_shop(self.shop, batch_size=self.batch_size)
+            ProductSearchIndex.sync_shop(self.shop, (self.version, live_version), batch_size=self.batch_size)
+            if self.checkpoint is not None:
+                self.checkpoint.clear()
+        self.shop.previous_catalog_version = live_version
+        self.shop.catalog_version = self.version
+
+        self.stats.deleted += self.prune(self.shop, keep=(self.version, live_version), batch_size=self.batch_size)
+
+    @staticmethod
+    def prune(shop, keep, batch_size=None):
+        """
+        Удаление строк каталога магазина, не входящих в версии keep.
+
+        Returns:
+            int: Количество удаленных строк ProductInfo.
+        """
+        batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        stale_ids = list(ProductInfo.objects.filter(
+            shop_id=shop.id, ordered_items__isnull=True
+        ).exclude(catalog_version__in=keep).values_list('id', flat=True))
+        for start in range(0, len(stale_ids), batch_size):
+            ProductInfo.objects.filter(id__in=stale_ids[start:start + batch_size]).delete()
+        return len(stale_ids)
+
+    def import_goods(self, goods):
+        """
+        Импорт списка товаров в одной транзакции.
+
+        Вместе с товарами в той же транзакции сохраняется контрольная точка,
+        поэтому после сбоя импорт продолжается со следующего пакета.
+        Товары до контрольной точки пропускаются.
+
+        Args:
+            goods (list): Товары в формате прайс-листа.
+        """
+        start = self.position
+        self.position += len(goods)
+
+        resume_offset = self.checkpoint.offset if self.checkpoint is not None else 0
+        if start < resume_offset:
+            skipped = goods[:resume_offset - start]
+            self._skip_goods(skipped)
+            goods = goods[len(skipped):]
+
+        goods = self._deduplicate(goods)
+        if goods:
+            with transaction.atomic():
+                if self.incremental:
+                    self._merge_goods(goods)
+                else:
+                    self._replace_goods(goods)
+                if self.checkpoint is not None:
+                    self.checkpoint.save(self.position)
+            self.stats.goods += len(goods)
+
+        if self.progress is not None:
+            self.progress.update(self.stats)
+
+    def resolve_identities(self, goods):
+        """
+        Создание недостающих Product и Parameter для товаров пакета без записи ProductInfo.
+        """
+        self._resolve_products(goods)
+        self._resolve_parameters(goods)
+
+    def mark_seen(self, external_ids):
+        """
+        Внешние ИД товаров прайс-листа, записанных другими импортерами (разделами).
+
+        В режиме incremental товары с этими ИД не удаляются как отсутствующие.
+        """
+        self._seen_external_ids.update(external_ids)
+
+    def _skip_goods(self, goods):
+        """
+        Пропуск товаров, записанных до контрольной точки.
+
+        Их внешние ИД запоминаются, чтобы эти товары не были удалены как отсутствующие.
+        """
+        self._seen_external_ids.update(int(item['id']) for item in goods)
+        self.stats.resumed += len(goods)
+
+    def _replace_goods(self, goods):
+        """
+        Запись товаров без сравнения с текущими данными магазина.
+        """
+        product_ids = self._resolve_products(goods)
+        parameter_ids = self._resolve_parameters(goods)
+
+        product_infos = [
+            ProductInfo(
+                product_id=product_id,
+                shop_id=self.shop.id,
+                external_id=item['id'],
+                model=item['model'],
+                price=item['price'],
+                price_rrc=item['price_rrc'],
+                quantity=item['quantity'],
+                catalog_version=self.version,
+            )
+            for item, product_id in zip(goods, product_ids)
+        ]
+        self._upsert_product_infos(product_infos)
+
+        product_parameters = [
+            ProductParameter(
+                product_info_id=product_info.id,
+                parameter_id=parameter_ids[param_name],
+                value=str(param_value),
+                value_numeric=numeric_value(param_value),
+            )
+            for item, product_info in zip(goods, product_infos)
+            for param_name, param_value in item['parameters'].items()
+        ]
+        self._upsert_product_parameters(product_parameters)
+
+        self.stats.products += len(product_infos)
+        self.stats.created += len(product_infos)
+        self.stats.parameters += len(product_parameters)
+
+    def _merge_goods(self, goods):
+        """
+        Сравнение товаров с текущими строками магазина и запись только изменений.
+        """
+        product_ids = self._resolve_products(goods)
+        parameter_ids = self._resolve_parameters(goods)
+        existing, duplicate_ids = self._load_existing_product_infos(goods)
+        existing_parameters = self._load_existing_parameters(
+            [row['id'] for row in existing.values()]
+        )
+
+        created, updated, unchanged = [], [], 0
+        product_infos = []
+        history = PriceHistoryRecorder(self.shop, batch_size=self.batch_size) if PriceHistoryRecorder.enabled() else None
+        for item, product_id in zip(goods, product_ids):
+            product_info = ProductInfo(
+                shop_id=self.shop.id,
+                external_id=int(item['id']),
+                product_id=product_id,
+                model=str(item['model']),
+                price=int(item['price']),
+                price_rrc=int(item['price_rrc']),
+                quantity=int(item['quantity']),
+                catalog_version=self.version,
+            )
+            row = existing.get(product_info.external_id)
+            if history is not None and PriceHistoryRecorder.changed(row, vars(product_info)):
+                history.add(product_info.external_id, product_info.price, product_info.price_rrc,
+                            product_info.quantity)
+            if row is None:
+                created.append(product_info)
+            else:
+                product_info.id = row['id']
+                if any(getattr(product_info, field) != row[field]
+                       for field in self.product_info_compare_fields):
+                    updated.append(product_info)
+                else:
+                    unchanged += 1
+            product_infos.append(product_info)
+
+        search_product_ids = set()
+        if duplicate_ids:
+            search_product_ids.update(
+                ProductInfo.objects.filter(id__in=duplicate_ids).values_list('product_id', flat=True)
+            )
+            ProductInfo.objects.filter(id__in=duplicate_ids).delete()
+            CatalogResponseCache.invalidate([self.shop.id])
+        if created:
+            self._upsert_product_infos(created)
+        if updated:
+            ProductInfo.objects.bulk_update(
+                updated,
+                fields=['product'] + self.product_info_update_fields,
+                batch_size=self.batch_size,
+            )
+
+        changed_parameters, removed_parameter_ids = [], []
+        changed_ids = {product_info.id for product_info in created + updated}
+        for item, product_info in zip(goods, product_infos):
+            incoming = {
+                parameter_ids[param_name]: str(param_value)
+                for param_name, param_value in item['parameters'].items()
+            }
+            current = existing_parameters.get(product_info.id, {})
+            changed_parameters += [
+                ProductParameter(product_info_id=product_info.id, parameter_id=parameter_id, value=value,
+                                 value_numeric=numeric_value(value))
+                for parameter_id, value in incoming.items()
+                if parameter_id not in current or current[parameter_id][1] != value
+            ]
+            removed = [
+                product_parameter_id
+                for parameter_id, (product_parameter_id, _) in current.items()
+                if parameter_id not in incoming
+            ]
+            if removed or any(current.get(parameter_id, (None, None))[1] != value
+                              for parameter_id, value in incoming.items()):
+                changed_ids.add(product_info.id)
+            removed_parameter_ids += removed
+
+        if changed_parameters:
+            self._upsert_product_parameters(changed_parameters)
+        for batch in self._batches(removed_parameter_ids):
+            ProductParameter.objects.filter(id__in=batch).delete()
+        self.stats.parameters_deleted += len(removed_parameter_ids)
+        if history is not None:
+            self.stats.history += history.flush()
+        search_product_ids.update(product_info.product_id for product_info in created + updated)
+        if search_product_ids:
+            ProductSearchIndex.sync(search_product_ids, batch_size=self.batch_size)
+        if changed_ids:
+            CatalogReadModel.sync(changed_ids, batch_size=self.batch_size)
+
+        self._seen_external_ids.update(product_info.external_id for product_info in product_infos)
+        self.stats.products += len(created) + len(updated)
+        self.stats.created += len(created)
+        self.stats.updated += len(updated)
+        self.stats.unchanged += unchanged
+        self.stats.parameters += len(changed_parameters)
+
+    def _load_existing_product_infos(self, goods):
+        """
+        Загружает текущие строки магазина для товаров пакета по external_id.
+
+        Returns:
+            tuple: ("external_id -> строка", id лишних строк с повторяющимся external_id).
+        """
+        existing, duplicate_ids = {}, []
+        for external_ids in self._batches(int(item['id']) for item in goods):
+            rows = ProductInfo.objects.filter(
+                shop_id=self.shop.id, catalog_version=self.version, external_id__in=external_ids
+            ).order_by('id').values('id', 'external_id', *self.product_info_compare_fields)
+            for row in rows:
+                if row['external_id'] in existing:
+                    duplicate_ids.append(row['id'])
+                else:
+                    existing[row['external_id']] = row
+        return existing, duplicate_ids
+
+    def _load_existing_parameters(self, product_info_ids):
+        """
+        Загружает текущие значения параметров: "product_info_id -> {parameter_id: (id, значение)}".
+        """
+        parameters = {}
+        for batch in self._batches(product_info_ids):
+            rows = ProductParameter.objects.filter(
+                product_info_id__in=batch
+            ).values_list('product_info_id', 'parameter_id', 'id', 'value')
+            for product_info_id, parameter_id, pk, value in rows:
+                parameters.setdefault(product_info_id, {})[parameter_id] = (pk, value)
+        return parameters
+
+    def _deduplicate(self, goods):
+        """
+        Удаляет повторы товара внутри пакета, оставляя последний.
+
+        Одна команда INSERT ... ON CONFLICT не может обновить одну и ту же строку дважды.
+        В режиме incremental товар определяется внешним ИД, в режиме replace -
+        парой "ключ сопоставления Product + внешний ИД", как в ограничении
+        unique_product_info (все строки пакета относятся к одной версии каталога).
+        """
+        unique_goods = {}
+        for item in goods:
+            if self.incremental:
+                key = int(item['id'])
+            else:
+                key = (product_match_key(item['name'], item['model']), item['id'])
+            unique_goods[key] = item
+        return list(unique_goods.values())
+
+    def _batches(self, items):
+        items = list(items)
+        for start in range(0, len(items), self.batch_size):
+            yield items[start:start + self.batch_size]
+
+    def _resolve_products(self, goods):
+        """
+        Возвращает id Product для каждого товара пакета, создавая недостающие.
+
+        Товары сопоставляются по ключу product_match_key. Таблица "ключ -> id"
+        хранится в памяти до конца импорта, поэтому каждый ключ ищется в БД
+        (по индексу match_key) не более одного раза.
+
+        Недостающие товары вставляются с пропуском конфликтов по уникальному match_key,
+        а их id дочитываются по ключам: если тот же товар одновременно создал другой
+        импорт, используется его строка.
+        """
+        keys = [product_match_key(item['name'], item['model']) for item in goods]
+        unknown = {}
+        for key, item in zip(keys, goods):
+            if key not in self._product_ids:
+                unknown.setdefault(key, item)
+
+        for batch in self._batches(unknown):
+            existing = Product.objects.filter(match_key__in=batch).order_by('id').values_list('match_key', 'id')
+            for key, product_id in existing:
+                self._product_ids.setdefault(key, product_id)
+
+        missing = [
+            Product(name=item['name'], category_id=item['category'], match_key=key)
+            for key, item in unknown.items()
+            if key not in self._product_ids
+        ]
+        if missing:
+            Product.objects.bulk_create(missing, batch_size=self.batch_size, ignore_conflicts=True)
+            self._product_ids.update(self._collect_ids(Product, missing, field='match_key'))
+
+        return [self._product_ids[key] for key in keys]
+
+    def _resolve_parameters(self, goods):
+        """
+        Возвращает соответствие "название параметра -> id", создавая недостающие параметры.
+
+        Набор параметров у магазина обычно небольшой, поэтому он кэшируется между пакетами.
+        """
+        names = {
+            param_name
+            for item in goods
+            for param_name in item['parameters']
+            if param_name not in self._parameter_ids
+        }
+
+        for batch in self._batches(names):
+            existing = Parameter.objects.filter(name__in=batch).order_by('id').values_list('name', 'id')
+            for name, parameter_id in existing:
+                self._parameter_ids.setdefault(name, parameter_id)
+
+        missing = [Parameter(name=name) for name in names if name not in self._parameter_ids]
+        if missing:
+            Parameter.objects.bulk_create(missing, batch_size=self.batch_size)
+            self._parameter_ids.update(self._collect_ids(Parameter, missing))
+
+        return self._parameter_ids
+
+    @staticmethod
+    def _collect_ids(model, objects, field='name'):
+        """
+        Возвращает "значение поля field -> id" для только что созданных объектов.
+
+        Если БД не вернула первичные ключи после bulk_create, они дочитываются одним запросом.
+        """
+        ids = {getattr(obj, field): obj.pk for obj in objects if obj.pk is not None}
+        unresolved = [getattr(obj, field) for obj in objects if obj.pk is None]
+        if unresolved:
+            existing = model.objects.filter(**{f'{field}__in': unresolved}).order_by('id').values_list(field, 'id')
+            for value, pk in existing:
+                ids.setdefault(value, pk)
+        return ids
+
+    def _upsert_product_infos(self, product_infos):
+        """
+        Вставка или обновление ProductInfo по ограничению unique_product_info.
+        """
+        ProductInfo.objects.bulk_create(
+            product_infos,
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=['product', 'shop', 'external_id', 'catalog_version'],
+            update_fields=self.product_info_update_fields,
+        )
+
+        unresolved = [product_info for product_info in product_infos if product_info.pk is None]
+        if unresolved:
+            ids = {
+                (product_id, external_id): pk
+                for product_id, external_id, pk in ProductInfo.objects.filter(
+                    shop_id=self.shop.id,
+                    catalog_version=self.version,
+                    external_id__in=[product_info.external_id for product_info in unresolved],
+                ).values_list('product_id', 'external_id', 'id')
+            }
+            for product_info in unresolved:
+                product_info.pk = ids[(product_info.product_id, product_info.external_id)]
+
+    def _upsert_product_parameters(self, product_parameters):
+        """
+        Вставка или обновление ProductParameter по ограничению unique_product_parameter.
+        """
+        ProductParameter.objects.bulk_create(
+            product_parameters,
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=['product_info', 'parameter'],
+            update_fields=['value', 'value_numeric'],
+        )
@@ -0,0 +1,192 @@
+import logging
+from django.conf import settings
+from .response_cache import CatalogResponseCache
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogReadModel:
+    """
+    Витрина каталога (CatalogItem) для чтения списка и карточки товара.
+
+    Строки витрины соответствуют товарам текущей версии каталога магазина:
+    - в режиме импорта replace витрина магазина пересобирается при публикации
+      версии в той же транзакции, что и переключение Shop.catalog_version,
+      поэтому покупатели видят прежний или новый каталог целиком;
+    - в режиме incremental пересчитываются строки записанных и измененных товаров
+      каждого пакета, а удаленные товары удаляются из витрины каскадно;
+    - сохранение Shop, Category, Product, ProductInfo и ProductParameter через ORM
+      обновляет соответствующие строки, а их удаление (строки витрины удаляются
+      каскадно) сбрасывает кэш ответов.
+    Каждое изменение витрины сбрасывает кэш ответов каталога затронутых магазинов
+    (CatalogResponseCache).
+    """
+
+    # Поля строки ProductInfo со связанными товаром, категорией и магазином
+    product_info_fields = (
+        'id', 'model', 'external_id', 'quantity', 'price', 'price_rrc',
+        'product_id', 'product__name', 'product__image', 'product__category_id', 'product__category__name',
+        'shop_id', 'shop__name', 'shop__url', 'shop__state',
+    )
+
+    @staticmethod
+    def parameters(product_info_ids):
+        """
+        Параметры товаров в формате ответа API: "product_info_id -> [{"parameter": {...}, "value"}]".
+        """
+        from ..models import ProductParameter
+
+        parameters = {}
+        for product_info_id, parameter_id, name, value in ProductParameter.objects.filter(
+            product_info_id__in=product_info_ids
+        ).order_by('id').values_list('product_info_id', 'parameter_id', 'parameter__name', 'value'):
+            parameters.setdefault(product_info_id, []).append(
+                {'parameter': {'id': parameter_id, 'name': name}, 'value': value}
+            )
+        return parameters
+
+    @classmethod
+    def build(cls, product_info_ids):
+        """
+        Строки витрины для товаров текущей версии каталога из списка product_info_ids.
+
+        Returns:
+            list: Несохраненные объекты CatalogItem.
+        """
+        from ..models import CatalogItem, ProductInfo
+
+        parameters = cls.parameters(product_info_ids)
+        rows = ProductInfo.objects.filter(id__in=product_info_ids).live().values(*cls.product_info_fields)
+        return [
+            CatalogItem(
+                product_info_id=row['id'],
+                product_id=row['product_id'],
+                product_name=row['product__name'],
+                product_image=row['product__image'] or '',
+                category_id=row['product__category_id'],
+                category_name=row['product__category__name'] or '',
+                shop_id=row['shop_id'],
+                shop_name=row['shop__name'],
+                shop_url=row['shop__url'],
+                shop_state=row['shop__state'],
+                model=row['model'],
+                external_id=row['external_id'],
+                quantity=row['quantity'],
+                price=row['price'],
+                price_rrc=row['price_rrc'],
+                parameters=parameters.get(row['id'], []),
+            )
+            for row in rows
+        ]
+
+    @classmethod
+    def sync(cls, product_info_ids, batch_size=None):
+        """
+        Пересчет строк витрины товаров; строки товаров не из текущей версии каталога удаляются.
+
+        Returns:
+            int: Количество записанных строк.
+        """
+        from ..models import CatalogItem
+
+        product_info_ids = sorted(set(product_info_ids))
+        batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        written, shop_ids = 0, set()
+        for start in range(0, len(product_info_ids), batch_size):
+            batch = product_info_ids[start:start + batch_size]
+            items = cls.build(batch)
+            CatalogItem.objects.filter(product_info_id__in=batch).delete()
+            CatalogItem.objects.bulk_create(items, batch_size=batch_size)
+            written += len(items)
+            shop_ids.update(item.shop_id for item in items)
+        if product_info_ids:
+            # Магазин удаленных из витрины строк неизвестен - сбрасываются ответы всех магазинов
+            CatalogResponseCache.invalidate(shop_ids if written == len(product_info_ids) else None)
+        return written
+
+    @classmethod
+    def refresh_shop(cls, shop, batch_size=None):
+        """
+        Пересборка витрины магазина по текущей версии каталога.
+
+        Вызывается в транзакции публикации или отката версии каталога.
+
+        Returns:
+            int: Количество строк витрины магазина.
+        """
+        from ..models import CatalogItem, ProductInfo
+
+        batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        CatalogItem.objects.filter(shop_id=shop.id).delete()
+        product_info_ids = list(ProductInfo.objects.filter(
+            shop_id=shop.id
+        ).live().order_by('id').values_list('id', flat=True))
+        written = 0
+        for start in range(0, len(product_info_ids), batch_size):
+            items = cls.build(product_info_ids[start:start + batch_size])
+            CatalogItem.objects.bulk_create(items, batch_size=batch_size)
+            written += len(items)
+        CatalogResponseCache.invalidate([shop.id])
+        return written
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Полная пересборка витрины для всех магазинов.
+
+        Returns:
+            int: Количество строк витрины.
+        """
+        from ..models import Shop
+
+        written = sum(cls.refresh_shop(shop) for shop in Shop.objects.order_by('id'))
+        logger.info(f"Витрина каталога пересобрана, товаров: {written}")
+        return written
+
+    @staticmethod
+    def update_shop(shop):
+        """
+        Обновление названия, ссылки и статуса магазина в строках витрины.
+        """
+        from ..models import CatalogItem
+
+        CatalogItem.objects.filter(shop_id=shop.id).update(
+            shop_name=shop.name, shop_url=shop.url, shop_state=shop.state
+        )
+        CatalogResponseCache.invalidate([shop.id])
+
+    @staticmethod
+    def update_quantity(product_info):
+        """
+        Обновление остатка товара в строке витрины (списание и возврат товара заказами).
+        """
+        from ..models import CatalogItem
+
+        CatalogItem.objects.filter(product_info_id=product_info.id).update(quantity=product_info.quantity)
+        CatalogResponseCache.invalidate([product_info.shop_id])
+
+    @staticmethod
+    def update_product(product):
+        """
+        Обновление названия, изображения и категории товара в строках витрины.
+        """
+        from ..models import CatalogItem
+
+        CatalogItem.objects.filter(product_id=product.id).update(
+            product_name=product.name,
+            product_image=product.image.name or '',
+            category_id=product.category_id,
+            category_name=product.category.name if product.category_id else '',
+        )
+        CatalogResponseCache.invalidate()
+
+    @staticmethod
+    def update_categories(categories):
+        """
+        Обновление названий категорий в строках витрины.
+        """
+        from ..models import CatalogItem
+
+        for category in categories:
+            CatalogItem.objects.filter(category_id=category.id).update(category_name=category.name)
+        CatalogResponseCache.invalidate()
@@ -0,0 +1,170 @@
+import re
+import math
+import logging
+from django.conf import settings
+from django.db.models import Count, Exists, OuterRef, Sum
+from .response_cache import CatalogResponseCache
+
+logger = logging.getLogger(__name__)
+
+PARAMETER_FILTER_PATTERN = re.compile(r'^(param|param_min|param_max)\[(.+)\]$')
+
+
+def numeric_value(value):
+    """
+    Числовое значение параметра для фильтрации по диапазону; None, если значение не число.
+
+    Десятичным разделителем может быть точка или запятая: "6.1" и "6,1" -> 6.1.
+    """
+    try:
+        number = float(str(value).strip().replace(',', '.'))
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+class ParameterFilters:
+    """
+    Фильтры списка товаров по параметрам.
+
+    Параметры запроса:
+    - param[Цвет]=черный - значение параметра; повтор параметра объединяет значения через ИЛИ;
+    - param_min[Встроенная память (Гб)]=64, param_max[...]=256 - диапазон числового значения.
+    Фильтры разных параметров объединяются через И.
+    """
+
+    def __init__(self, filters):
+        self.filters = filters
+
+    def __bool__(self):
+        return bool(self.filters)
+
+    @classmethod
+    def parse(cls, query_params):
+        """
+        Разбор фильтров из параметров запроса.
+
+        Returns:
+            tuple: (ParameterFilters, текст ошибки или None).
+        """
+        filters = {}
+        for key in query_params:
+            match = PARAMETER_FILTER_PATTERN.match(key)
+            if match is None:
+                continue
+            kind, name = match.groups()
+            parameter_filter = filters.setdefault(name, {'values': [], 'min': None, 'max': None})
+            if kind == 'param':
+                parameter_filter['values'] += [value for value in query_params.getlist(key) if value]
+                continue
+            bound = numeric_value(query_params.get(key))
+            if bound is None:
+                return cls({}), f"Значение {key} должно быть числом"
+            parameter_filter[kind[len('param_'):]] = bound
+        return cls(filters), None
+
+    def apply(self, queryset):
+        """
+        Фильтрация ProductInfo: для каждого параметра - подзапрос EXISTS по индексам
+        (parameter, value) и (parameter, value_numeric).
+        """
+        from ..models import ProductParameter
+
+        for name, parameter_filter in self.filters.items():
+            condition = ProductParameter.objects.filter(product_info=OuterRef('pk'), parameter__name=name)
+            if parameter_filter['values']:
+                condition = condition.filter(value__in=parameter_filter['values'])
+            if parameter_filter['min'] is not None:
+                condition = condition.filter(value_numeric__gte=parameter_filter['min'])
+            if parameter_filter['max'] is not None:
+                condition = condition.filter(value_numeric__lte=parameter_filter['max'])
+            queryset = queryset.filter(Exists(condition))
+        return queryset
+
+
+class FacetService:
+    """
+    Значения параметров с количеством товаров (фасеты) для фильтров каталога.
+
+    Для каталога без поиска и фильтров по параметрам (все товары, магазин
+    или категория) количество берется из предрасчитанной таблицы ParameterFacet,
+    которую пересчитывает импорт прайс-листа магазина. Для остальных выборок
+    количество считается одним GROUP BY по параметрам найденных товаров.
+    """
+
+    @staticmethod
+    def refresh(shop):
+        """
+        Пересчет предрасчитанных фасетов текущей версии каталога магазина.
+
+        Количество считается одним GROUP BY; строк в результате столько, сколько
+        различных значений параметров в категориях магазина, а не товаров.
+
+        Returns:
+            int: Количество строк ParameterFacet.
+        """
+        from ..models import ParameterFacet, ProductParameter
+
+        rows = ProductParameter.objects.filter(
+            product_info__shop_id=shop.id, product_info__catalog_version=shop.catalog_version
+        ).values('product_info__product__category_id', 'parameter_id', 'value').annotate(count=Count('id'))
+        facets = [
+            ParameterFacet(shop_id=shop.id, category_id=row['product_info__product__category_id'],
+                           parameter_id=row['parameter_id'], value=row['value'], count=row['count'])
+            for row in rows
+        ]
+        ParameterFacet.objects.filter(shop_id=shop.id).delete()
+        ParameterFacet.objects.bulk_create(facets, batch_size=settings.IMPORT_BATCH_SIZE)
+        CatalogResponseCache.invalidate([shop.id])
+        return len(facets)
+
+    @classmethod
+    def precomputed(cls, shop_id=None, category_id=None):
+        """
+        Фасеты из таблицы ParameterFacet для активных магазинов.
+        """
+        from ..models import ParameterFacet
+
+        rows = ParameterFacet.objects.filter(shop__state=True)
+        if shop_id:
+            rows = rows.filter(shop_id=shop_id)
+        if category_id:
+            rows = rows.filter(category_id=category_id)
+        return cls.build(rows.values_list('parameter__name', 'value').annotate(total=Sum('count')))
+
+    @classmethod
+    def for_queryset(cls, queryset):
+        """
+        Фасеты для произвольной выборки ProductInfo.
+        """
+        from ..models import ProductParameter
+
+        rows = ProductParameter.objects.filter(
+            product_info__in=queryset.order_by().values('pk')
+        ).values_list('parameter__name', 'value').annotate(total=Count('id'))
+        return cls.build(rows)
+
+    @staticmethod
+    def build(rows):
+        """
+        Группировка строк (параметр, значение, количество) в список фасетов.
+
+        Значения упорядочены по убыванию количества, их число ограничено
+        FACET_MAX_VALUES; для числовых параметров добавляется диапазон min/max.
+        """
+        grouped = {}
+        for name, value, count in rows:
+            grouped.setdefault(name, []).append((value, count))
+
+        facets = []
+        for name in sorted(grouped):
+            values = sorted(grouped[name], key=lambda item: (-item[1], item[0]))
+            facet = {
+                'parameter': name,
+                'values': [{'value': value, 'count': count} for value, count in values[:settings.FACET_MAX_VALUES]],
+            }
+            numbers = [numeric_value(value) for value, _ in values]
+            if numbers and None not in numbers:
+                facet['min'], facet['max'] = min(numbers), max(numbers)
+            facets.append(facet)
+        return facets
@@ -0,0 +1,281 @@
+import os
+import zlib
+import hashlib
+import itertools
+import logging
+import tempfile
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b'\x1f\x8b'
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class FetchError(Exception):
+    """
+    Ошибка загрузки прайс-листа.
+    """
+
+
+class PriceListDownload:
+    """
+    Загруженный прайс-лист: временный файл на диске и сведения для повторного запроса.
+
+    При ответе 304 Not Modified файла нет, а not_modified равен True.
+    """
+
+    def __init__(self, path=None, size=0, content_hash='', etag='', last_modified='',
+                 source_url='', not_modified=False, content_type='', filename=''):
+        self.path = path
+        self.size = size
+        self.content_hash = content_hash
+        self.etag = etag
+        self.last_modified = last_modified
+        self.source_url = source_url
+        self.not_modified = not_modified
+        self.content_type = content_type
+        self.filename = filename
+
+    @classmethod
+    def from_bytes(cls, content, source_url=''):
+        """
+        Сохраняет уже полученное содержимое во временный файл.
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        file = tempfile.NamedTemporaryFile(prefix='price_list_', delete=False)
+        try:
+            with file:
+                file.write(content)
+        except BaseException:
+            os.unlink(file.name)
+            raise
+        return cls(
+            path=file.name,
+            size=len(content),
+            content_hash=hashlib.sha256(content).hexdigest(),
+            source_url=source_url,
+        )
+
+    @classmethod
+    def from_chunks(cls, chunks, directory=None):
+        """
+        Потоковая запись во временный файл с подсчетом размера и SHA-256.
+
+        Данные в формате gzip распаковываются на лету (см. gunzip). Ограничение
+        размера IMPORT_MAX_SIZE проверяется по распакованным данным.
+
+        Args:
+            chunks: Итератор байтовых фрагментов.
+            directory (str): Каталог для файла; по умолчанию - системный временный.
+
+        Raises:
+            FetchError: Превышение размера или поврежденный gzip. При любой
+            ошибке временный файл удаляется.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        chunks = (chunk for chunk in chunks if chunk)
+        file = tempfile.NamedTemporaryFile(prefix='price_list_', dir=directory, delete=False)
+        try:
+            with file:
+                first = next(chunks, b'')
+                pieces = itertools.chain([first], chunks)
+                if first.startswith(GZIP_MAGIC):
+                    pieces = cls.gunzip(pieces)
+                for piece in pieces:
+                    size += len(piece)
+                    if size > settings.IMPORT_MAX_SIZE:
+                        raise FetchError(PriceListFetcher.size_error())
+                    digest.update(piece)
+                    file.write(piece)
+        except zlib.error as e:
+            os.unlink(file.name)
+            raise FetchError(f"Ошибка распаковки gzip: {str(e)}")
+        except BaseException:
+            # Любая ошибка, в том числе нехватка места, сбой чтения загрузки
+            # или прерывание задачи по лимиту времени, не оставляет файл
+            os.unlink(file.name)
+            raise
+
+        return cls(path=file.name, size=size, content_hash=digest.hexdigest())
+
+    @staticmethod
+    def gunzip(chunks):
+        """
+        Генератор распакованных фрагментов gzip размером не более DOWNLOAD_CHUNK_SIZE.
+
+        Выход распаковщика ограничивается max_length, а непрочитанный вход
+        (unconsumed_tail) подается повторно, поэтому сильно сжатый фрагмент
+        не распаковывается в память целиком и ограничение размера срабатывает
+        до записи лишних данных. Архив из нескольких членов (склеенные файлы .gz)
+        распаковывается целиком, как это делает модуль gzip.
+
+        Raises:
+            zlib.error: Поврежденный или неполный архив, данные после архива.
+        """
+        decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        for data in chunks:
+            pending = False
+            while data or pending:
+                if decompressor.eof:
+                    # Следующий член архива
+                    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+                piece = decompressor.decompress(data, DOWNLOAD_CHUNK_SIZE)
+                if piece:
+                    yield piece
+                data = decompressor.unused_data if decompressor.eof else decompressor.unconsumed_tail
+                # Выход уперся в max_length: часть данных может оставаться в распаковщике
+                pending = len(piece) == DOWNLOAD_CHUNK_SIZE and not decompressor.eof
+        if not decompressor.eof:
+            raise zlib.error("архив поврежден или неполон")
+
+    @classmethod
+    def from_upload(cls, uploaded_file):
+        """
+        Сохраняет загруженный через API прайс-лист в каталог IMPORT_UPLOAD_DIR.
+
+        Файл копируется по фрагментам (сжатый gzip - с распаковкой), поэтому
+        в памяти не находится целиком. Каталог должен быть доступен воркерам Celery.
+        """
+        os.makedirs(settings.IMPORT_UPLOAD_DIR, exist_ok=True)
+        download = cls.from_chunks(uploaded_file.chunks(), directory=settings.IMPORT_UPLOAD_DIR)
+        download.filename = uploaded_file.name
+        download.content_type = uploaded_file.content_type or ''
+        return download
+
+    def as_dict(self):
+        """
+        Сведения о файле для передачи в задачу Celery.
+        """
+        return {
+            'path': self.path,
+            'size': self.size,
+            'content_hash': self.content_hash,
+            'content_type': self.content_type,
+            'filename': self.filename,
+        }
+
+    def open(self):
+        return open(self.path, 'rb')
+
+    def read(self):
+        with self.open() as file:
+            return file.read()
+
+    def head(self, size):
+        """
+        Первые size байт файла для определения формата.
+        """
+        with self.open() as file:
+            return file.read(size)
+
+    def cleanup(self):
+        """
+        Удаляет временный файл.
+        """
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+        self.path = None
+
+
+class PriceListFetcher:
+    """
+    Загрузка прайс-листов партнеров по HTTP.
+
+    - соединения переиспользуются через общую сессию с пулом;
+    - запросы ограничены тайм-аутами, а размер ответа - IMPORT_MAX_SIZE;
+    - при наличии ETag/Last-Modified прошлой загрузки запрос выполняется условно,
+      и ответ 304 не содержит тела;
+    - тело ответа (в том числе сжатое gzip) потоково записывается во временный файл
+      с одновременным подсчетом SHA-256.
+    """
+
+    _session = None
+    _session_lock = threading.Lock()
+
+    @classmethod
+    def get_session(cls):
+        """
+        Общая сессия requests с пулом соединений и повторами при сетевых ошибках.
+        """
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    retry = Retry(
+                        total=settings.IMPORT_FETCH_RETRIES,
+                        backoff_factor=0.5,
+                        status_forcelist=(502, 503, 504),
+                        allowed_methods=('GET',),
+                    )
+                    adapter = HTTPAdapter(
+                        pool_connections=settings.IMPORT_FETCH_POOL_SIZE,
+                        pool_maxsize=settings.IMPORT_FETCH_POOL_SIZE,
+                        max_retries=retry,
+                    )
+                    session = requests.Session()
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    session.headers['Accept-Encoding'] = 'gzip, deflate'
+                    cls._session = session
+        return cls._session
+
+    @classmethod
+    def fetch(cls, url, etag='', last_modified=''):
+        """
+        Загрузка прайс-листа во временный файл.
+
+        Args:
+            url (str): Адрес прайс-листа.
+            etag (str): ETag прошлой загрузки.
+            last_modified (str): Last-Modified прошлой загрузки.
+
+        Returns:
+            PriceListDownload: Загруженный файл или признак not_modified.
+
+        Raises:
+            FetchError: Ошибка сети, HTTP-статус ошибки или превышение размера.
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        timeout = (settings.IMPORT_FETCH_CONNECT_TIMEOUT, settings.IMPORT_FETCH_READ_TIMEOUT)
+        try:
+            response = cls.get_session().get(url, headers=headers, stream=True, timeout=timeout)
+        except requests.RequestException as e:
+            raise FetchError(f"Ошибка при получении данных: {str(e)}")
+
+        try:
+            if response.status_code == 304:
+                logger.info(f"Прайс-лист {url} не изменился (304 Not Modified)")
+                return PriceListDownload(
+                    etag=etag, last_modified=last_modified, source_url=url, not_modified=True
+                )
+            response.raise_for_status()
+
+            content_length = response.headers.get('Content-Length')
+            if content_length and content_length.isdigit() and int(content_length) > settings.IMPORT_MAX_SIZE:
+                raise FetchError(cls.size_error())
+
+            download = PriceListDownload.from_chunks(response.iter_content(DOWNLOAD_CHUNK_SIZE))
+            download.etag = response.headers.get('ETag', '')
+            download.last_modified = response.headers.get('Last-Modified', '')
+            download.content_type = response.headers.get('Content-Type', '')
+            download.source_url = url
+            return download
+        except requests.RequestException as e:
+            raise FetchError(f"Ошибка при получении данных: {str(e)}")
+        finally:
+            response.close()
+
+    @staticmethod
+    def size_error():
+        return f"Размер прайс-листа превышает допустимый ({settings.IMPORT_MAX_SIZE} байт)"
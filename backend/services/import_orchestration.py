@@ -0,0 +1,433 @@
+import uuid
+import random
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from .import_service import ImportService
+
+logger = logging.getLogger(__name__)
+
+
+class ImportLock:
+    """
+    Распределенная блокировка импорта прайс-листа магазина.
+
+    Блокировка хранится в кэше (Redis в продакшене): cache.add атомарно
+    создает ключ, только если его еще нет. Значением ключа является
+    идентификатор задачи, которая выполняет импорт, поэтому повторный запрос
+    может вернуть клиенту ID уже запущенной задачи.
+    """
+
+    key_prefix = 'import-lock'
+
+    def __init__(self, user_id, owner=None, timeout=None):
+        self.user_id = user_id
+        self.owner = owner or str(uuid.uuid4())
+        self.timeout = timeout or settings.IMPORT_LOCK_TIMEOUT
+        self.acquired = False
+
+    @property
+    def key(self):
+        return f"{self.key_prefix}:{self.user_id}"
+
+    @classmethod
+    def holder(cls, user_id):
+        """
+        ID задачи, удерживающей блокировку магазина, или None.
+        """
+        return cache.get(f"{cls.key_prefix}:{user_id}")
+
+    def acquire(self):
+        """
+        Захват блокировки.
+
+        Задача, повторно доставленная после сбоя воркера или перезапущенная через retry,
+        сохраняет свой ID и поэтому снова получает собственную блокировку.
+        """
+        self.acquired = cache.add(self.key, self.owner, self.timeout) or cache.get(self.key) == self.owner
+        return self.acquired
+
+    def release(self):
+        """
+        Снимает блокировку, если она принадлежит текущему владельцу.
+        """
+        if self.acquired and cache.get(self.key) == self.owner:
+            cache.delete(self.key)
+        self.acquired = False
+
+    @classmethod
+    def release_owner(cls, user_id, owner):
+        """
+        Снимает блокировку, захваченную задачей owner, из другой задачи
+        (например, после завершения импорта по разделам).
+        """
+        lock = cls(user_id, owner=owner)
+        lock.acquired = True
+        lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class ImportOrchestrator:
+    """
+    Импорт прайс-листов нескольких магазинов и крупных прайс-листов по разделам.
+
+    Магазины распределяются по дорожкам (lanes), число которых ограничено
+    IMPORT_BATCH_CONCURRENCY. Дорожки выполняются параллельно группой задач Celery,
+    магазины внутри дорожки - последовательно. Результаты объединяет
+    завершающая задача chord.
+    """
+
+    @classmethod
+    def run_locked(cls, url, user_id, owner=None, progress=None, refresh=False):
+        """
+        Импорт прайс-листа магазина под блокировкой.
+
+        Если импорт этого магазина уже выполняется, повторный не запускается:
+        возвращается ID выполняющейся задачи. При плановом обновлении (refresh)
+        результат импорта по разделам учитывает в расписании завершающая задача.
+        """
+        return cls._run_locked(
+            user_id, owner, lambda: ImportService.import_shop_data(
+                url, user_id, progress=progress, schedule_partitions=True
+            ), refresh=refresh
+        )
+
+    @classmethod
+    def run_upload_locked(cls, download, user_id, owner=None, progress=None):
+        """
+        Импорт загруженного файла прайс-листа под блокировкой магазина.
+        """
+        return cls._run_locked(
+            user_id, owner, lambda: ImportService.import_uploaded_file(
+                download, user_id, progress=progress, schedule_partitions=True
+            )
+        )
+
+    @classmethod
+    def _run_locked(cls, user_id, owner, run_import, refresh=False):
+        lock = ImportLock(user_id, owner=owner)
+        if not lock.acquire():
+            running_task_id = ImportLock.holder(user_id)
+            logger.info(f"Импорт магазина пользователя {user_id} уже выполняется: {running_task_id}")
+            return {
+                "status": True,
+                "coalesced": True,
+                "task_id": running_task_id,
+                "message": "Импорт данного магазина уже выполняется"
+            }
+
+        # При импорте по разделам блокировку снимает завершающая задача
+        partitioned = False
+        try:
+            result = run_import()
+            if result.get('partitioned'):
+                result = cls.start_partitions(result, lock.owner, refresh=refresh)
+                partitioned = True
+            return result
+        finally:
+            if not partitioned:
+                lock.release()
+
+    @staticmethod
+    def start_partitions(result, owner, refresh=False):
+        """
+        Запуск импорта по разделам: задачи разделов выполняются параллельно группой
+        chord, завершающая задача публикует результат и снимает блокировку магазина,
+        а при плановом обновлении (refresh) - и отметку запуска в расписании.
+
+        Returns:
+            dict: Результат с ID завершающей задачи (finish_task_id).
+        """
+        from celery import chord
+        from .partitioned_import import PartitionedImport
+        from ..tasks import import_partition_task, finish_partitioned_import_task, partitioned_import_failed_task
+
+        plan = dict(result['plan'], owner=owner, refresh=refresh)
+        callback = finish_partitioned_import_task.s(plan)
+        callback.on_error(partitioned_import_failed_task.s(plan))
+        try:
+            async_result = chord(
+                import_partition_task.s(plan, index) for index in range(len(plan['paths']))
+            )(callback)
+        except Exception:
+            PartitionedImport.cleanup(plan)
+            raise
+
+        return {
+            "status": True,
+            "partitioned": True,
+            "partitions": len(plan['paths']),
+            "goods": plan['goods'],
+            "finish_task_id": async_result.id,
+            "message": f"{result['message']}. Результат импорта будет доступен в задаче {async_result.id}"
+        }
+
+    @staticmethod
+    def release_partitions(plan, result):
+        """
+        Удаление файлов разделов и снятие блокировки магазина после импорта по разделам.
+
+        Для планового обновления результат (result) учитывается в расписании магазина.
+        """
+        from .partitioned_import import PartitionedImport
+
+        PartitionedImport.cleanup(plan)
+        ImportLock.release_owner(plan['user_id'], plan['owner'])
+        if plan.get('refresh'):
+            RefreshScheduler.record_result(plan['shop_id'], result)
+
+    @staticmethod
+    def prepare_items(shops):
+        """
+        Проверка списка магазинов для пакетного импорта.
+
+        Args:
+            shops (list): Элементы вида {"shop_id": 1, "url": "https://..."};
+                если url не указан, используется сохраненный адрес магазина.
+
+        Returns:
+            tuple: (элементы {"shop_id", "user_id", "url"}, список ошибок).
+        """
+        from ..models import Shop
+
+        shop_ids = [item.get('shop_id') for item in shops if isinstance(item, dict)]
+        shops_by_id = Shop.objects.in_bulk([shop_id for shop_id in shop_ids if isinstance(shop_id, int)])
+
+        items, errors, seen_users = [], [], set()
+        for item in shops:
+            shop_id = item.get('shop_id') if isinstance(item, dict) else None
+            shop = shops_by_id.get(shop_id)
+            if shop is None:
+                errors.append({"shop_id": shop_id, "error": "Магазин не найден"})
+                continue
+            if shop.user_id is None:
+                errors.append({"shop_id": shop_id, "error": "У магазина нет владельца"})
+                continue
+
+            url = item.get('url') or shop.url
+            url_valid, url_error = ImportService.validate_url(url)
+            if not url_valid:
+                errors.append({"shop_id": shop_id, "error": url_error})
+                continue
+
+            # Повторы одного магазина в запросе объединяются в один импорт
+            if shop.user_id in seen_users:
+                continue
+            seen_users.add(shop.user_id)
+            items.append({"shop_id": shop.id, "user_id": shop.user_id, "url": url})
+
+        return items, errors
+
+    @staticmethod
+    def split_lanes(items, concurrency):
+        """
+        Распределяет магазины по дорожкам по кругу.
+        """
+        lanes_count = max(1, min(concurrency, len(items)))
+        return [items[index::lanes_count] for index in range(lanes_count)]
+
+    @classmethod
+    def start_batch(cls, items, concurrency=None):
+        """
+        Запуск пакетного импорта.
+
+        Returns:
+            AsyncResult: Результат завершающей задачи с объединенным отчетом.
+        """
+        from celery import chord
+        from ..tasks import import_shops_lane_task, aggregate_import_results_task
+
+        concurrency = concurrency or settings.IMPORT_BATCH_CONCURRENCY
+        lanes = cls.split_lanes(items, concurrency)
+        return chord(import_shops_lane_task.s(lane) for lane in lanes)(aggregate_import_results_task.s())
+
+    @staticmethod
+    def aggregate(lane_results):
+        """
+        Объединение результатов дорожек в общий отчет.
+        """
+        results = [result for lane in lane_results for result in lane]
+        failed = [result for result in results if not result.get('status')]
+        skipped = [result for result in results if result.get('skipped')]
+        coalesced = [result for result in results if result.get('coalesced')]
+
+        return {
+            "status": not failed,
+            "total": len(results),
+            "succeeded": len(results) - len(failed),
+            "failed": len(failed),
+            "skipped": len(skipped),
+            "coalesced": len(coalesced),
+            "results": results,
+        }
+
+
+class RefreshScheduler:
+    """
+    Плановое обновление прайс-листов магазинов по сохраненному адресу (Shop.url).
+
+    Задача Celery beat раз в IMPORT_REFRESH_TICK секунд вызывает dispatch():
+    магазины, у которых наступило время next_refresh_at, запускаются отдельными
+    задачами, но одновременно выполняется не больше IMPORT_REFRESH_CONCURRENCY
+    плановых импортов; остальные ждут следующей проверки.
+
+    Первые запуски распределяются по периоду обновления по ID магазина,
+    а к каждому следующему добавляется случайный разброс IMPORT_REFRESH_JITTER,
+    поэтому магазины не обновляются одновременно. Период магазина задается
+    полем Shop.refresh_interval (0 - автообновление отключено). Если прайс-лист
+    не загружается или не изменился несколько раз подряд, период удваивается,
+    но не более чем в IMPORT_REFRESH_MAX_BACKOFF раз.
+    """
+
+    # Множитель для распределения магазинов по периоду (мультипликативное хэширование)
+    spread_factor = 2654435761
+
+    @staticmethod
+    def interval(shop):
+        """
+        Период обновления магазина в секундах; 0 - автообновление отключено.
+        """
+        if shop.refresh_interval is None:
+            return settings.IMPORT_REFRESH_INTERVAL
+        return shop.refresh_interval
+
+    @classmethod
+    def initial_offset(cls, shop, interval):
+        """
+        Смещение первого запуска от текущего времени, одинаковое для магазина.
+        """
+        return shop.id * cls.spread_factor % max(interval, 1)
+
+    @classmethod
+    def next_refresh_at(cls, shop, now, streak=0):
+        """
+        Время следующего обновления с учетом серии ошибок или неизменившихся прайс-листов.
+        """
+        interval = cls.interval(shop) * min(2 ** streak, settings.IMPORT_REFRESH_MAX_BACKOFF)
+        jitter = interval * settings.IMPORT_REFRESH_JITTER
+        return now + timedelta(seconds=interval + random.uniform(-jitter, jitter))
+
+    @staticmethod
+    def refreshable_shops():
+        """
+        Магазины, прайс-листы которых обновляются автоматически.
+        """
+        from ..models import Shop
+
+        return (Shop.objects.filter(state=True, user__isnull=False)
+                .exclude(url__isnull=True).exclude(url='').exclude(refresh_interval=0))
+
+    @classmethod
+    def dispatch(cls, now=None):
+        """
+        Запуск обновления магазинов, для которых наступило время.
+
+        Запуск отмечается в refresh_started_at условным UPDATE, поэтому при
+        наложении проверок один магазин не запускается дважды. Отметки старше
+        IMPORT_LOCK_TIMEOUT считаются оставшимися от упавшего воркера.
+
+        Returns:
+            dict: ID запущенных магазинов (dispatched) и число уже выполняющихся обновлений.
+        """
+        from ..models import ShopImportState
+        from ..tasks import refresh_shop_price_list_task
+
+        now = now or timezone.now()
+        shops = cls.refreshable_shops()
+
+        # Расписание новых магазинов
+        for shop in shops.filter(Q(import_state__isnull=True) | Q(import_state__next_refresh_at__isnull=True)):
+            interval = cls.interval(shop)
+            first_run = now + timedelta(seconds=cls.initial_offset(shop, interval))
+            state, created = ShopImportState.objects.get_or_create(shop=shop, defaults={'next_refresh_at': first_run})
+            if not created:
+                ShopImportState.objects.filter(pk=state.pk, next_refresh_at__isnull=True).update(
+                    next_refresh_at=first_run
+                )
+
+        stale_before = now - timedelta(seconds=settings.IMPORT_LOCK_TIMEOUT)
+        running = ShopImportState.objects.filter(refresh_started_at__gte=stale_before).count()
+        slots = max(settings.IMPORT_REFRESH_CONCURRENCY - running, 0)
+
+        idle = Q(refresh_started_at__isnull=True) | Q(refresh_started_at__lt=stale_before)
+        due = (ShopImportState.objects
+               .filter(idle, shop__in=shops, next_refresh_at__lte=now)
+               .order_by('next_refresh_at')
+               .values_list('pk', 'shop_id', 'refresh_started_at'))
+
+        dispatched = []
+        for state_id, shop_id, started_at in due:
+            if len(dispatched) >= slots:
+                break
+            claimed = ShopImportState.objects.filter(pk=state_id, refresh_started_at=started_at).update(
+                refresh_started_at=now
+            )
+            if not claimed:
+                continue
+            try:
+                refresh_shop_price_list_task.delay(shop_id)
+            except Exception:
+                ShopImportState.objects.filter(pk=state_id).update(refresh_started_at=started_at)
+                raise
+            dispatched.append(shop_id)
+
+        if dispatched:
+            logger.info(f"Запущено автообновление прайс-листов магазинов: {dispatched}")
+        return {"dispatched": dispatched, "running": running}
+
+    @classmethod
+    def record_result(cls, shop_id, result, now=None):
+        """
+        Учет результата обновления и планирование следующего запуска.
+
+        Ошибки и неизменившиеся прайс-листы считаются отдельными сериями;
+        успешный импорт сбрасывает обе. Если импорт магазина уже выполнялся
+        (coalesced), серии не меняются. Импорт по разделам (partitioned) еще
+        выполняется: отметка запуска остается, а результат учитывает завершающая
+        задача (ImportOrchestrator.release_partitions). Для удаленного магазина только
+        снимается отметка запуска.
+
+        Returns:
+            ShopImportState: Состояние магазина; None, если магазин удален
+            или импорт по разделам еще выполняется.
+        """
+        from ..models import Shop, ShopImportState
+
+        if result.get('partitioned'):
+            return None
+        now = now or timezone.now()
+        shop = Shop.objects.filter(id=shop_id).first()
+        if shop is None:
+            ShopImportState.objects.filter(shop_id=shop_id).update(refresh_started_at=None)
+            return None
+        state, _ = ShopImportState.objects.get_or_create(shop=shop)
+
+        if not result.get('status'):
+            state.refresh_failures += 1
+            state.refresh_unchanged = 0
+            state.last_refresh_error = str(result.get('error', ''))
+            logger.warning(f"Ошибка автообновления магазина {shop_id} ({state.refresh_failures} подряд): "
+                           f"{state.last_refresh_error}")
+        elif result.get('skipped'):
+            state.refresh_unchanged += 1
+            state.refresh_failures = 0
+        elif not result.get('coalesced'):
+            state.refresh_failures = 0
+            state.refresh_unchanged = 0
+            state.last_refresh_error = ''
+
+        streak = max(state.refresh_failures, state.refresh_unchanged)
+        state.next_refresh_at = cls.next_refresh_at(shop, now, streak)
+        state.refresh_started_at = None
+        state.save(update_fields=['refresh_failures', 'refresh_unchanged', 'last_refresh_error',
+                                  'next_refresh_at', 'refresh_started_at'])
+        return state
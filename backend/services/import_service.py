@@ -1,17 +1,28 @@
 import yaml
-from yaml import Loader
 import logging
-import requests
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
-from ..models import Shop, Category, Product, ProductInfo, Parameter, ProductParameter
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from ..models import ShopImportState, Shop, Category, Product, ProductInfo, Parameter, ProductParameter
+from .bulk_import import BulkCategoryImporter, BulkProductImporter, ImportCheckpoint, ImportStats, QueryCounter
+from .fetch import PriceListDownload, PriceListFetcher, FetchError
+from .partitioned_import import PartitionedImport
+from .price_history import PriceHistoryRecorder
+from .facets import FacetService
+from .catalog import CatalogReadModel
+from .search import ProductSearchIndex
+from .parsers import YamlLoader, PriceListError, SNIFF_SIZE, detect_format, get_reader
+from .validation import PriceListValidator
 
 logger = logging.getLogger(__name__)
 
 
 class ImportService:
     """
-    Сервис для импорта данных о товарах магазина из YAML-файлов.
+    Сервис для импорта данных о товарах магазина из прайс-листов
+    в форматах YAML, JSON, JSON Lines и CSV.
     """
 
     @staticmethod
@@ -35,19 +46,41 @@ class ImportService:
         Получение данных по URL.
         """
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            return True, response.content
-        except requests.RequestException as e:
-            return False, f"Ошибка при получении данных: {str(e)}"
+            download = PriceListFetcher.fetch(url)
+        except FetchError as e:
+            return False, str(e)
+
+        try:
+            return True, download.read()
+        finally:
+            download.cleanup()
+
+    @staticmethod
+    def fetch_price_list(url, import_state=None):
+        """
+        Загрузка прайс-листа во временный файл.
+
+        Если прайс-лист по этому адресу уже загружался, запрос выполняется
+        условно по сохраненным ETag/Last-Modified.
+        """
+        etag, last_modified = '', ''
+        if import_state is not None and import_state.source_url == url:
+            etag, last_modified = import_state.etag, import_state.last_modified
+
+        try:
+            return True, PriceListFetcher.fetch(url, etag=etag, last_modified=last_modified)
+        except FetchError as e:
+            return False, str(e)
 
     @staticmethod
     def parse_yaml(content):
         """
         Парсинг YAML-данных.
+
+        Используется безопасный загрузчик на базе libyaml, если он доступен.
         """
         try:
-            data = yaml.load(content, Loader=Loader)
+            data = yaml.load(content, Loader=YamlLoader)
 
             # Проверка обязательных полей
             required_fields = ['shop', 'categories', 'goods']
@@ -60,103 +93,134 @@ class ImportService:
             return False, f"Ошибка при парсинге YAML: {str(e)}"
 
     @staticmethod
-    def validate_structure(data):
+    def validate_structure(data, validator=None):
         """
         Проверка структуры YAML-данных.
-        """
-        # Проверка структуры категорий
-        for category in data.get('categories', []):
-            if 'id' not in category or 'name' not in category:
-                return False, "Категория должна содержать поля 'id' и 'name'"
 
-        # Проверка структуры товаров
-        for item in data.get('goods', []):
-            required_item_fields = ['id', 'category', 'model', 'name', 'price', 'price_rrc', 'quantity', 'parameters']
-            for field in required_item_fields:
-                if field not in item:
-                    return False, f"Товар должен содержать поле '{field}'"
+        Категории и товары проверяются за один проход PriceListValidator: наличие
+        обязательных полей, типы значений и ссылки товаров на категории прайс-листа.
+        Числовые поля, переданные строками, приводятся к int прямо в data.
+        В сообщение об ошибке попадают ошибки всех строк (не более IMPORT_VALIDATION_MAX_ERRORS).
 
+        Args:
+            data (dict): Разобранный прайс-лист или его часть.
+            validator (PriceListValidator): Валидатор, общий для последовательных пакетов товаров.
+        """
+        validator = validator or PriceListValidator()
+        if not validator.validate(data):
+            return False, validator.format_errors()
         return True, None
 
     @classmethod
-    def import_categories(cls, data, shop):
+    def import_categories(cls, data, shop, stats=None):
         """
         Импорт категорий из данных.
+
+        Категории и их привязка к магазину записываются пакетно через
+        BulkCategoryImporter. Если передан объект ImportStats, в него добавляется
+        количество созданных, переименованных и привязанных к магазину категорий.
         """
+        stats = stats if stats is not None else ImportStats()
         try:
-            categories_count = 0
-            for category in data['categories']:
-                category_object, created = Category.objects.get_or_create(
-                    id=category['id'],
-                    defaults={'name': category['name']}
-                )
-
-                # Если категория существует, проверим, нужно ли обновить название
-                if not created and category_object.name != category['name']:
-                    category_object.name = category['name']
-                    category_object.save()
+            categories_count = BulkCategoryImporter(shop, stats=stats).import_categories(data['categories'])
 
-                # Связываем категорию с магазином
-                category_object.shops.add(shop.id)
-                categories_count += 1
-
-            return True, f"Импортировано категорий: {categories_count}"
+            return True, (f"Импортировано категорий: {categories_count} "
+                          f"(создано: {stats.categories_created}, переименовано: {stats.categories_renamed}, "
+                          f"привязано к магазину: {stats.categories_linked})")
         except Exception as e:
             logger.error(f"Ошибка при импорте категорий: {e}")
             return False, f"Ошибка при импорте категорий: {str(e)}"
 
     @classmethod
-    def import_products(cls, data, shop):
+    def import_products(cls, data, shop, stats=None, checkpoint=None, progress=None):
         """
         Импорт товаров из данных.
-        """
-        try:
-            # Очищаем старую информацию о товарах для данного магазина
-            # перед импортом новых данных
-            ProductInfo.objects.filter(shop_id=shop.id).delete()
-
-            products_count = 0
-            parameters_count = 0
-
-            for item in data['goods']:
-                # Создаем или получаем товар
-                product, _ = Product.objects.get_or_create(
-                    name=item['name'],
-                    defaults={'category_id': item['category']}
-                )
 
-                # Создаем информацию о товаре
-                product_info = ProductInfo.objects.create(
-                    product_id=product.id,
-                    external_id=item['id'],
-                    model=item['model'],
-                    price=item['price'],
-                    price_rrc=item['price_rrc'],
-                    quantity=item['quantity'],
-                    shop_id=shop.id
-                )
-                products_count += 1
-
-                # Импортируем параметры товара
-                for param_name, param_value in item['parameters'].items():
-                    parameter, _ = Parameter.objects.get_or_create(name=param_name)
-
-                    ProductParameter.objects.create(
-                        product_info_id=product_info.id,
-                        parameter_id=parameter.id,
-                        value=str(param_value)
-                    )
-                    parameters_count += 1
+        Товары записываются пакетно через BulkProductImporter. Если передан объект
+        ImportStats, в него добавляется статистика импорта.
+        """
+        return cls.import_product_chunks(
+            cls.iter_chunks(data['goods']), shop, stats=stats, checkpoint=checkpoint, progress=progress
+        )
 
-            return True, f"Импортировано товаров: {products_count}, параметров: {parameters_count}"
+    @classmethod
+    def import_product_chunks(cls, chunks, shop, stats=None, checkpoint=None, progress=None):
+        """
+        Импорт товаров, поступающих пакетами.
+
+        Каждый пакет записывается в отдельной транзакции, поэтому одновременно
+        в памяти находится только текущий пакет товаров. Если передана контрольная
+        точка ImportCheckpoint, позиция сохраняется вместе с каждым пакетом,
+        а уже записанные пакеты пропускаются. Если передан объект ImportProgress,
+        ход импорта публикуется после каждого пакета.
+
+        Ошибки БД не перехватываются: задача импорта повторяется и продолжает
+        работу с контрольной точки.
+
+        Режим задается настройкой IMPORT_MODE:
+        - replace (по умолчанию): товары записываются в новую версию каталога магазина,
+          которая публикуется после записи всех пакетов;
+        - incremental: в текущую версию записываются только добавленные, измененные
+          и удаленные товары, покупатели видят уже записанные пакеты.
+        """
+        try:
+            importer = BulkProductImporter(
+                shop, stats=stats, incremental=settings.IMPORT_MODE == 'incremental',
+                checkpoint=checkpoint, progress=progress
+            )
+            importer.begin()
+            for chunk in chunks:
+                importer.import_goods(chunk)
+            if progress is not None:
+                progress.set_phase('finishing')
+            importer.finish()
+
+            return True, (f"Импортировано товаров: {importer.stats.goods}, "
+                          f"параметров: {importer.stats.parameters}")
+        except PriceListError as e:
+            logger.error(f"Ошибка в данных прайс-листа: {e}")
+            return False, str(e)
+        except DatabaseError:
+            raise
         except Exception as e:
             logger.error(f"Ошибка при импорте товаров: {e}")
             return False, f"Ошибка при импорте товаров: {str(e)}"
 
+    @staticmethod
+    def iter_chunks(goods, chunk_size=None):
+        """
+        Разбивает список товаров на пакеты по IMPORT_CHUNK_SIZE.
+        """
+        chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+        for start in range(0, len(goods), chunk_size):
+            yield goods[start:start + chunk_size]
+
+    @classmethod
+    def iter_stream_chunks(cls, reader, validator=None):
+        """
+        Пакеты товаров из потокового чтения с проверкой структуры каждого пакета.
+        """
+        validator = validator or PriceListValidator()
+        try:
+            for chunk in reader.iter_chunks():
+                valid_struct, struct_error = cls.validate_structure({'goods': chunk}, validator)
+                if not valid_struct:
+                    raise PriceListError(struct_error)
+                yield chunk
+        except yaml.YAMLError as e:
+            raise PriceListError(f"Ошибка при парсинге YAML: {str(e)}")
+
     @classmethod
-    def import_shop_data(cls, url, user_id):
+    def import_shop_data(cls, url, user_id, progress=None, schedule_partitions=False):
         """
         Основная функция импорта данных магазина.
+
+        Если передан объект ImportProgress, в него публикуются фазы и ход импорта.
+
+        Крупный прайс-лист, разбитый на разделы (см. should_partition), по умолчанию
+        импортируется по разделам последовательно в текущем процессе (run_partitions).
+        С schedule_partitions=True возвращается только описание импорта plan, а задачи
+        разделов запускает вызывающий код (ImportOrchestrator.start_partitions).
         """
         # Проверка URL
         url_valid, url_error = cls.validate_url(url)
@@ -164,12 +228,94 @@ class ImportService:
             return {"status": False, "error": url_error}
 
         # Получение данных
-        fetch_success, content = cls.fetch_data(url)
+        if progress is not None:
+            progress.set_phase('fetching')
+        import_state = cls.get_import_state(user_id)
+        fetch_success, download = cls.fetch_price_list(url, import_state)
         if not fetch_success:
-            return {"status": False, "error": content}
+            return {"status": False, "error": download}
+
+        try:
+            # Источник ответил 304 Not Modified
+            if download.not_modified:
+                return cls.skipped_result()
+
+            # Прайс-лист не изменился с последнего успешного импорта
+            if import_state is not None and import_state.content_hash == download.content_hash:
+                cls.save_fetch_validators(import_state, download)
+                return cls.skipped_result()
+
+            result = cls.import_shop_file(download, user_id, progress=progress)
+        finally:
+            download.cleanup()
+        return cls.complete_partitions(result, schedule_partitions, progress)
+
+    @classmethod
+    def import_uploaded_file(cls, download, user_id, progress=None, schedule_partitions=False):
+        """
+        Импорт прайс-листа, загруженного файлом через API.
+
+        Файл уже находится на диске, поэтому сетевой запрос не выполняется.
+        Если содержимое совпадает с последним импортированным, импорт пропускается.
+        Разделы крупного прайс-листа обрабатываются, как в import_shop_data.
+        """
+        import_state = cls.get_import_state(user_id)
+        if import_state is not None and import_state.content_hash == download.content_hash:
+            return cls.skipped_result()
+
+        result = cls.import_shop_file(download, user_id, progress=progress)
+        return cls.complete_partitions(result, schedule_partitions, progress)
+
+    @classmethod
+    def complete_partitions(cls, result, schedule_partitions=False, progress=None):
+        """
+        Результат импорта с учетом разбиения на разделы: без schedule_partitions
+        разделы импортируются сразу, и возвращается итоговый результат.
+        """
+        if not result.get('partitioned') or schedule_partitions:
+            return result
+        return cls.run_partitions(result['plan'], progress)
+
+    @classmethod
+    def run_partitions(cls, plan, progress=None):
+        """
+        Импорт по разделам в текущем процессе: разделы записываются последовательно,
+        затем выполняется завершающий шаг; файлы разделов удаляются в любом случае.
+
+        Используется, когда задачи разделов не запускаются через Celery
+        (например, при замерах ImportBenchmark).
+        """
+        if progress is not None:
+            progress.set_phase('products', goods_total=plan['goods'])
+        try:
+            partition_stats = [
+                PartitionedImport.import_partition(plan, index) for index in range(len(plan['paths']))
+            ]
+            return cls.finish_partitioned_import(plan, partition_stats)
+        finally:
+            PartitionedImport.cleanup(plan)
+
+    @classmethod
+    def import_shop_file(cls, download, user_id, progress=None):
+        """
+        Импорт прайс-листа из загруженного файла.
+
+        Формат определяется по типу содержимого, расширению или началу файла.
+        Крупные YAML-прайс-листы и прайс-листы остальных форматов разбираются
+        потоково прямо из файла, небольшие YAML-прайс-листы - целиком.
+        """
+        if progress is not None:
+            progress.set_phase('parsing')
+
+        price_format = cls.detect_format(download)
+        if price_format != 'yaml' or download.size >= settings.IMPORT_STREAM_THRESHOLD:
+            with download.open() as stream:
+                return cls.import_shop_stream(
+                    stream, user_id, download=download, progress=progress, price_format=price_format
+                )
 
         # Парсинг YAML
-        parse_success, data = cls.parse_yaml(content)
+        parse_success, data = cls.parse_yaml(download.read())
         if not parse_success:
             return {"status": False, "error": data}
 
@@ -178,30 +324,282 @@ class ImportService:
         if not valid_struct:
             return {"status": False, "error": struct_error}
 
-        # Создание или получение магазина
+        return cls.import_price_list(data, user_id, download=download, progress=progress)
+
+    @staticmethod
+    def detect_format(download):
+        """
+        Формат загруженного прайс-листа: yaml, json, jsonl или csv.
+        """
+        filename = download.source_url or download.filename
+        return detect_format(download.content_type, filename, download.head(SNIFF_SIZE))
+
+    @staticmethod
+    def get_import_state(user_id):
+        """
+        Состояние импорта магазина пользователя, если импорт уже выполнялся.
+        """
+        return ShopImportState.objects.filter(shop__user_id=user_id).first()
+
+    @staticmethod
+    def save_import_state(shop, download):
+        """
+        Сохранение хэша содержимого и HTTP-валидаторов после успешного импорта.
+
+        Адрес прайс-листа запоминается в магазине для последующих пакетных обновлений.
+        """
+        if download.source_url and shop.url != download.source_url:
+            Shop.objects.filter(id=shop.id).update(url=download.source_url)
+        ShopImportState.objects.update_or_create(
+            shop=shop,
+            defaults={
+                'content_hash': download.content_hash,
+                'source_url': download.source_url,
+                'etag': download.etag,
+                'last_modified': download.last_modified,
+                'last_import_at': timezone.now(),
+                'checkpoint_hash': '',
+                'checkpoint_offset': 0,
+                'checkpoint_at': None,
+            }
+        )
+
+    @staticmethod
+    def load_checkpoint(shop, download):
+        """
+        Контрольная точка импорта загруженного файла.
+        """
+        return ImportCheckpoint(shop, download.content_hash)
+
+    @staticmethod
+    def save_fetch_validators(import_state, download):
+        """
+        Обновление ETag/Last-Modified, если содержимое не изменилось, а валидаторы источника - да.
+        """
+        fields = {
+            'source_url': download.source_url,
+            'etag': download.etag,
+            'last_modified': download.last_modified,
+        }
+        if any(getattr(import_state, name) != value for name, value in fields.items()):
+            ShopImportState.objects.filter(id=import_state.id).update(**fields)
+
+    @staticmethod
+    def should_partition(goods_total):
+        """
+        Импортировать ли товары по разделам (см. PartitionedImport).
+
+        Разбиение включается настройкой IMPORT_PARTITIONS > 1 для прайс-листов,
+        число товаров которых известно заранее и не меньше IMPORT_PARTITION_THRESHOLD.
+        """
+        return (settings.IMPORT_PARTITIONS > 1 and goods_total is not None
+                and goods_total >= settings.IMPORT_PARTITION_THRESHOLD)
+
+    @classmethod
+    def split_price_list(cls, data, shop, chunks=None, download=None):
+        """
+        Разбиение товаров прайс-листа на разделы для параллельного импорта.
+
+        Товары в БД не записываются: результат содержит описание импорта plan,
+        по которому ImportOrchestrator запускает задачи разделов.
+        """
+        if chunks is None:
+            chunks = cls.iter_chunks(data['goods'])
         try:
-            shop, created = Shop.objects.get_or_create(
-                name=data['shop'],
-                defaults={"user_id": user_id}
-            )
+            plan = PartitionedImport(shop).split(chunks, download=download)
+        except PriceListError as e:
+            logger.error(f"Ошибка в данных прайс-листа: {e}")
+            return {"status": False, "error": str(e)}
 
-            if not created and shop.user_id != user_id:
-                return {"status": False, "error": "У вас нет прав на обновление данного магазина"}
-        except Exception as e:
-            logger.error(f"Ошибка при получении магазина: {e}")
-            return {"status": False, "error": f"Ошибка при получении магазина: {str(e)}"}
+        return {
+            "status": True,
+            "partitioned": True,
+            "plan": plan,
+            "message": f"Товары прайс-листа ({plan['goods']}) разбиты на разделы: {len(plan['paths'])}",
+        }
+
+    @classmethod
+    def finish_partitioned_import(cls, plan, partition_stats):
+        """
+        Завершение импорта по разделам: публикация версии каталога или удаление
+        отсутствующих товаров и сохранение состояния импорта.
+        """
+        shop, stats = PartitionedImport.finish(plan, partition_stats)
+        if plan['download'] is not None:
+            cls.save_import_state(shop, PriceListDownload(**plan['download']))
+
+        logger.info(f"Импорт магазина '{shop.name}' по разделам завершен: {stats.as_dict()}")
+        return {
+            "status": True,
+            "message": (f"Импорт успешно завершен. Импортировано товаров: {stats.goods}, "
+                        f"параметров: {stats.parameters} (разделов: {len(plan['paths'])})"),
+            "stats": stats.as_dict()
+        }
+
+    @staticmethod
+    def rollback_catalog(shop):
+        """
+        Откат каталога магазина к предыдущей опубликованной версии.
+
+        Текущая и предыдущая версии меняются местами, поэтому повторный откат
+        возвращает отмененную версию. Хэш и HTTP-валидаторы последнего импорта
+        сбрасываются, чтобы повторный импорт того же прайс-листа не был пропущен.
+        """
+        with transaction.atomic():
+            shop = Shop.objects.select_for_update().get(id=shop.id)
+            if shop.previous_catalog_version is None:
+                return {"status": False, "error": "Нет предыдущей версии каталога для отката"}
+
+            restored, replaced = shop.previous_catalog_version, shop.catalog_version
+            Shop.objects.filter(id=shop.id).update(catalog_version=restored, previous_catalog_version=replaced)
+            PriceHistoryRecorder.record_version_change(shop, replaced, restored)
+            shop.catalog_version = restored
+            CatalogReadModel.refresh_shop(shop)
+            ProductSearchIndex.sync_shop(shop, (restored, replaced))
+            FacetService.refresh(shop)
+            ShopImportState.objects.filter(shop=shop).update(content_hash='', etag='', last_modified='')
+
+        logger.info(f"Каталог магазина '{shop.name}' возвращен к версии {restored} (отменена версия {replaced})")
+        return {
+            "status": True,
+            "message": f"Каталог магазина возвращен к версии {restored}",
+            "catalog_version": restored,
+            "previous_catalog_version": replaced,
+        }
+
+    @staticmethod
+    def skipped_result():
+        return {
+            "status": True,
+            "skipped": True,
+            "message": "Прайс-лист не изменился с момента последнего импорта, импорт пропущен"
+        }
+
+    @classmethod
+    def import_shop_stream(cls, stream, user_id, download=None, progress=None, price_format='yaml'):
+        """
+        Потоковый импорт прайс-листа из файлового объекта.
+
+        Заголовок (магазин и категории) читается сразу, товары - пакетами
+        по IMPORT_CHUNK_SIZE по мере записи в БД. Читатель выбирается
+        по формату price_format.
+
+        Если включена настройка IMPORT_STREAM_PREVALIDATE, товары сначала проверяются
+        отдельным проходом по файлу, и ошибки структуры обнаруживаются до записи в БД.
+        """
+        try:
+            reader = get_reader(price_format, stream, chunk_size=settings.IMPORT_CHUNK_SIZE)
+            header = reader.read_header()
+        except yaml.YAMLError as e:
+            return {"status": False, "error": f"Ошибка при парсинге YAML: {str(e)}"}
+        except PriceListError as e:
+            return {"status": False, "error": str(e)}
+
+        # Валидация структуры категорий
+        validator = PriceListValidator()
+        valid_struct, struct_error = cls.validate_structure(header, validator)
+        if not valid_struct:
+            return {"status": False, "error": struct_error}
+
+        goods_total = None
+        if settings.IMPORT_STREAM_PREVALIDATE and stream.seekable():
+            valid_struct, struct_error = cls.prevalidate_stream(reader, validator)
+            if not valid_struct:
+                return {"status": False, "error": struct_error}
+            goods_total = validator.goods_count
+            validator.rewind()
+
+        return cls.import_price_list(
+            header, user_id, chunks=cls.iter_stream_chunks(reader, validator), download=download,
+            progress=progress, goods_total=goods_total
+        )
+
+    @classmethod
+    def prevalidate_stream(cls, reader, validator):
+        """
+        Проверка всех товаров потокового прайс-листа без записи в БД.
+        """
+        try:
+            for chunk in reader.iter_chunks():
+                validator.validate_goods(chunk)
+                if validator.is_full:
+                    break
+        except yaml.YAMLError as e:
+            return False, f"Ошибка при парсинге YAML: {str(e)}"
+        except PriceListError as e:
+            return False, str(e)
+
+        if validator.errors:
+            return False, validator.format_errors()
+        return True, None
+
+    @classmethod
+    def import_price_list(cls, data, user_id, chunks=None, download=None, progress=None, goods_total=None):
+        """
+        Запись разобранного прайс-листа в БД: магазин, категории и товары.
+
+        Если chunks не передан, товары берутся из data['goods'], иначе их общее
+        количество можно передать в goods_total для оценки хода импорта. Если передан
+        загруженный файл download, после успешного импорта его хэш и HTTP-валидаторы
+        сохраняются в ShopImportState.
+
+        Крупные прайс-листы (см. should_partition) только разбиваются на разделы,
+        а товары записывают задачи разделов.
+        """
+        stats = ImportStats()
+        with QueryCounter() as query_counter:
+            # Создание или получение магазина
+            try:
+                shop, created = Shop.objects.get_or_create(
+                    name=data['shop'],
+                    defaults={"user_id": user_id}
+                )
+
+                if not created and shop.user_id != user_id:
+                    return {"status": False, "error": "У вас нет прав на обновление данного магазина"}
+            except Exception as e:
+                logger.error(f"Ошибка при получении магазина: {e}")
+                return {"status": False, "error": f"Ошибка при получении магазина: {str(e)}"}
+
+            # Импорт категорий
+            if progress is not None:
+                progress.set_phase('categories')
+            cat_success, cat_message = cls.import_categories(data, shop, stats=stats)
+            if not cat_success:
+                return {"status": False, "error": cat_message}
+
+            # Импорт товаров; при потоковом чтении без предварительной проверки
+            # общее количество товаров заранее неизвестно
+            if chunks is None:
+                goods_total = len(data['goods'])
+            if cls.should_partition(goods_total):
+                if progress is not None:
+                    progress.set_phase('partitioning', goods_total=goods_total)
+                return cls.split_price_list(data, shop, chunks, download)
+
+            if progress is not None:
+                progress.set_phase('products', goods_total=goods_total)
+            checkpoint = cls.load_checkpoint(shop, download) if download is not None else None
+            if chunks is None:
+                prod_success, prod_message = cls.import_products(
+                    data, shop, stats=stats, checkpoint=checkpoint, progress=progress
+                )
+            else:
+                prod_success, prod_message = cls.import_product_chunks(
+                    chunks, shop, stats=stats, checkpoint=checkpoint, progress=progress
+                )
+            if not prod_success:
+                return {"status": False, "error": prod_message}
 
-        # Импорт категорий
-        cat_success, cat_message = cls.import_categories(data, shop)
-        if not cat_success:
-            return {"status": False, "error": cat_message}
+            if download is not None:
+                cls.save_import_state(shop, download)
 
-        # Импорт товаров
-        prod_success, prod_message = cls.import_products(data, shop)
-        if not prod_success:
-            return {"status": False, "error": prod_message}
+        stats.queries = query_counter.count
+        stats.finish()
+        logger.info(f"Импорт магазина '{data['shop']}' завершен: {stats.as_dict()}")
 
         return {
             "status": True,
-            "message": f"Импорт успешно завершен. {cat_message}. {prod_message}"
-        }
\ No newline at end of file
+            "message": f"Импорт успешно завершен. {cat_message}. {prod_message}",
+            "stats": stats.as_dict()
+        }
@@ -0,0 +1,46 @@
+import unicodedata
+from functools import lru_cache
+from django.conf import settings
+
+MATCH_KEY_LENGTH = 100
+
+# Знаки препинания базовой плоскости Unicode заменяются пробелами; символы (например, "+") сохраняются
+PUNCTUATION_TABLE = {
+    code: ' ' for code in range(0x10000)
+    if unicodedata.category(chr(code)).startswith('P')
+}
+
+
+def normalize_text(value):
+    """
+    Текст без учета регистра, повторных пробелов и знаков препинания, "ё" приравнивается к "е".
+
+    Используется для ключей сопоставления товаров и поискового индекса.
+    """
+    value = unicodedata.normalize('NFKC', str(value)).casefold().replace('ё', 'е')
+    return ' '.join(value.translate(PUNCTUATION_TABLE).split())
+
+
+@lru_cache(maxsize=65536)
+def normalize_match_key(value):
+    """
+    Нормализованный ключ сопоставления товаров (см. normalize_text).
+
+    Пример: "Смартфон Apple iPhone XS (512GB, золотистый)" -> "смартфон apple iphone xs 512gb золотистый".
+    Результаты кэшируются: в прайс-листах одно название повторяется у разных товаров.
+    """
+    return normalize_text(value)[:MATCH_KEY_LENGTH]
+
+
+def product_match_key(name, model=None):
+    """
+    Ключ сопоставления товара прайс-листа с Product.
+
+    По умолчанию товары сопоставляются по названию. При IMPORT_PRODUCT_MATCH = 'model'
+    товары с заполненной моделью сопоставляются по ней, остальные - по названию.
+    """
+    if model and settings.IMPORT_PRODUCT_MATCH == 'model':
+        key = normalize_match_key(model)
+        if key:
+            return f"model:{key}"[:MATCH_KEY_LENGTH]
+    return normalize_match_key(name)
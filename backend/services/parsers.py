@@ -0,0 +1,666 @@
+import io
+import csv
+import codecs
+import json
+import os
+from urllib.parse import urlparse
+import yaml
+from yaml.events import (
+    AliasEvent, ScalarEvent, SequenceStartEvent, SequenceEndEvent,
+    MappingStartEvent, MappingEndEvent, CollectionStartEvent, CollectionEndEvent,
+    StreamStartEvent, DocumentStartEvent
+)
+from yaml.nodes import ScalarNode, SequenceNode, MappingNode
+
+# Загрузчик на базе libyaml, если PyYAML собран с ее поддержкой
+YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+HEADER_FIELDS = ('shop', 'categories')
+GOODS_FIELD = 'goods'
+
+# Столбцы CSV-прайс-листа; остальные столбцы считаются параметрами товара
+CSV_COLUMNS = ('shop', 'category', 'category_name', 'id', 'model', 'name', 'price', 'price_rrc', 'quantity')
+CSV_DELIMITERS = ',;\t'
+
+FORMAT_CONTENT_TYPES = {
+    'application/x-yaml': 'yaml',
+    'application/yaml': 'yaml',
+    'text/yaml': 'yaml',
+    'text/x-yaml': 'yaml',
+    'application/json': 'json',
+    'text/json': 'json',
+    'application/x-ndjson': 'jsonl',
+    'application/ndjson': 'jsonl',
+    'application/jsonl': 'jsonl',
+    'application/x-jsonlines': 'jsonl',
+    'application/json-lines': 'jsonl',
+    'text/csv': 'csv',
+    'application/csv': 'csv',
+}
+FORMAT_EXTENSIONS = {
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.json': 'json',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.csv': 'csv',
+}
+SNIFF_SIZE = 64 * 1024
+
+
+class PriceListError(Exception):
+    """
+    Ошибка структуры прайс-листа, обнаруженная при потоковом чтении.
+    """
+
+
+class YamlPriceListReader:
+    """
+    Потоковое чтение YAML-прайс-листа.
+
+    Документ разбирается по событиям парсера: заголовок (магазин и категории)
+    собирается целиком, а последовательность goods отдается пакетами по chunk_size
+    товаров. В памяти одновременно находится только текущий пакет, поэтому
+    потребление памяти не зависит от размера файла.
+
+    Если заголовок расположен в файле после goods, поток перематывается
+    и читается повторно, поэтому он должен поддерживать seek().
+    """
+
+    def __init__(self, stream, chunk_size=1000):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.has_goods = False
+        self._header = None
+        self._loader = None
+        self._anchors = {}
+        self._at_goods = False
+
+    def read_header(self):
+        """
+        Возвращает поля верхнего уровня прайс-листа, кроме goods.
+        """
+        if self._header is not None:
+            return self._header
+
+        self._start()
+        header = {}
+        while True:
+            key = self._read_key()
+            if key is None:
+                break
+            if key == GOODS_FIELD:
+                self.has_goods = True
+                if all(field in header for field in HEADER_FIELDS):
+                    # Обычный порядок полей: товары идут последними, читаем их без перемотки
+                    self._at_goods = True
+                    break
+                self._skip_value()
+            else:
+                header[key] = self._read_value()
+
+        missing = [field for field in HEADER_FIELDS if field not in header]
+        if not self.has_goods:
+            missing.append(GOODS_FIELD)
+        if missing:
+            raise PriceListError(f"В данных отсутствует обязательное поле '{missing[0]}'")
+
+        self._header = header
+        return header
+
+    def iter_chunks(self):
+        """
+        Генератор пакетов товаров из последовательности goods.
+        """
+        self.read_header()
+        if not self._at_goods:
+            self._start()
+            while True:
+                key = self._read_key()
+                if key is None:
+                    return
+                if key == GOODS_FIELD:
+                    break
+                self._skip_value()
+        self._at_goods = False
+
+        event = self._loader.get_event()
+        if isinstance(event, ScalarEvent):
+            # goods: (пустое значение) - товаров нет
+            return
+        if not isinstance(event, SequenceStartEvent):
+            raise PriceListError("Поле 'goods' должно содержать список товаров")
+
+        chunk = []
+        while not self._loader.check_event(SequenceEndEvent):
+            node = self._compose(self._loader.get_event())
+            chunk.append(self._loader.construct_document(node))
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        self._loader.get_event()
+
+        if chunk:
+            yield chunk
+        self._close()
+
+    def _start(self):
+        """
+        Открывает поток с начала и позиционируется внутри корневого отображения.
+        """
+        self._close()
+        if self.stream.seekable():
+            self.stream.seek(0)
+        self._loader = YamlLoader(self.stream)
+        self._anchors = {}
+
+        for expected in (StreamStartEvent, DocumentStartEvent):
+            if not isinstance(self._loader.get_event(), expected):
+                raise PriceListError("Прайс-лист не содержит YAML-документа")
+        if not isinstance(self._loader.get_event(), MappingStartEvent):
+            raise PriceListError("Корневой элемент прайс-листа должен быть отображением")
+
+    def _close(self):
+        if self._loader is not None:
+            self._loader.dispose()
+            self._loader = None
+
+    def _read_key(self):
+        """
+        Читает очередной ключ корневого отображения; None - отображение закончилось.
+        """
+        event = self._loader.get_event()
+        if isinstance(event, MappingEndEvent):
+            return None
+        return self._loader.construct_document(self._compose(event))
+
+    def _read_value(self):
+        return self._loader.construct_document(self._compose(self._loader.get_event()))
+
+    def _skip_value(self):
+        """
+        Пропускает значение без построения объектов.
+        """
+        depth = 0
+        while True:
+            event = self._loader.get_event()
+            if isinstance(event, CollectionStartEvent):
+                depth += 1
+            elif isinstance(event, CollectionEndEvent):
+                depth -= 1
+            if depth == 0:
+                return
+
+    def _compose(self, event):
+        """
+        Строит узел YAML из события и последующих событий вложенных элементов.
+        """
+        loader = self._loader
+
+        if isinstance(event, AliasEvent):
+            if event.anchor not in self._anchors:
+                raise yaml.composer.ComposerError(
+                    None, None, f"found undefined alias {event.anchor!r}", event.start_mark
+                )
+            return self._anchors[event.anchor]
+
+        if isinstance(event, ScalarEvent):
+            tag = event.tag
+            if tag is None or tag == '!':
+                tag = loader.resolve(ScalarNode, event.value, event.implicit)
+            node = ScalarNode(tag, event.value, event.start_mark, event.end_mark, style=event.style)
+        elif isinstance(event, SequenceStartEvent):
+            tag = event.tag
+            if tag is None or tag == '!':
+                tag = loader.resolve(SequenceNode, None, event.implicit)
+            node = SequenceNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+            if event.anchor is not None:
+                self._anchors[event.anchor] = node
+            while not loader.check_event(SequenceEndEvent):
+                node.value.append(self._compose(loader.get_event()))
+            node.end_mark = loader.get_event().end_mark
+        elif isinstance(event, MappingStartEvent):
+            tag = event.tag
+            if tag is None or tag == '!':
+                tag = loader.resolve(MappingNode, None, event.implicit)
+            node = MappingNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+            if event.anchor is not None:
+                self._anchors[event.anchor] = node
+            while not loader.check_event(MappingEndEvent):
+                key_node = self._compose(loader.get_event())
+                value_node = self._compose(loader.get_event())
+                node.value.append((key_node, value_node))
+            node.end_mark = loader.get_event().end_mark
+        else:
+            raise PriceListError(f"Неожиданный элемент YAML: {event}")
+
+        if event.anchor is not None:
+            self._anchors[event.anchor] = node
+        return node
+
+
+class JsonLinesPriceListReader:
+    """
+    Потоковое чтение прайс-листа в формате JSON Lines.
+
+    Первая строка - заголовок {"shop": ..., "categories": [...]}, каждая следующая
+    строка - один товар в том же виде, что и в YAML. Пустые строки пропускаются.
+    """
+
+    def __init__(self, stream, chunk_size=1000):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self._header = None
+
+    def read_header(self):
+        if self._header is not None:
+            return self._header
+
+        self._rewind()
+        for number, line in enumerate(self.stream, start=1):
+            if line.strip():
+                header = self._loads(line, number)
+                break
+        else:
+            raise PriceListError("Прайс-лист не содержит заголовка")
+
+        if not isinstance(header, dict):
+            raise PriceListError("Первая строка JSON Lines должна содержать объект с полями 'shop' и 'categories'")
+        for field in HEADER_FIELDS:
+            if field not in header:
+                raise PriceListError(f"В данных отсутствует обязательное поле '{field}'")
+
+        self._header = {field: header[field] for field in HEADER_FIELDS}
+        return self._header
+
+    def iter_chunks(self):
+        self.read_header()
+        self._rewind()
+
+        chunk = []
+        lines = enumerate(self.stream, start=1)
+        for number, line in lines:
+            if line.strip():
+                break
+        for number, line in lines:
+            if not line.strip():
+                continue
+            chunk.append(self._loads(line, number))
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _rewind(self):
+        if self.stream.seekable():
+            self.stream.seek(0)
+
+    @staticmethod
+    def _loads(line, number):
+        try:
+            return json.loads(line)
+        except ValueError as e:
+            raise PriceListError(f"Ошибка при парсинге JSON в строке {number}: {str(e)}")
+
+
+class CsvPriceListReader:
+    """
+    Потоковое чтение прайс-листа в формате CSV.
+
+    Каждая строка - один товар со столбцами CSV_COLUMNS; значения остальных
+    столбцов становятся параметрами товара (пустые значения пропускаются).
+    Название магазина берется из столбца shop, а категории собираются
+    по столбцам category и category_name отдельным проходом по файлу,
+    поэтому поток должен поддерживать seek(). Разделитель (",", ";" или табуляция)
+    определяется по заголовку.
+    """
+
+    def __init__(self, stream, chunk_size=1000):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self._header = None
+        self._dialect = None
+
+    def read_header(self):
+        if self._header is not None:
+            return self._header
+
+        shop, categories = None, {}
+        for row in self._rows():
+            if shop is None:
+                shop = row['shop']
+            categories.setdefault(row['category'], row['category_name'])
+
+        if not shop:
+            raise PriceListError("В данных отсутствует обязательное поле 'shop'")
+        self._header = {
+            'shop': shop,
+            'categories': [{'id': category_id, 'name': name} for category_id, name in categories.items()],
+        }
+        return self._header
+
+    def iter_chunks(self):
+        self.read_header()
+
+        chunk = []
+        parameter_columns = None
+        for row in self._rows():
+            if parameter_columns is None:
+                parameter_columns = [column for column in row if column not in CSV_COLUMNS]
+            chunk.append({
+                'id': row['id'],
+                'category': row['category'],
+                'model': row['model'],
+                'name': row['name'],
+                'price': row['price'],
+                'price_rrc': row['price_rrc'],
+                'quantity': row['quantity'],
+                'parameters': {column: row[column] for column in parameter_columns if row[column]},
+            })
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _rows(self):
+        """
+        Строки CSV в виде словарей; поток каждый раз читается с начала.
+        """
+        if self.stream.seekable():
+            self.stream.seek(0)
+        text = io.TextIOWrapper(self.stream, encoding='utf-8-sig', newline='')
+        try:
+            if self._dialect is None:
+                self._dialect = self._sniff(text.readline())
+                text.seek(0)
+            reader = csv.DictReader(text, dialect=self._dialect)
+            missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or ())]
+            if missing:
+                raise PriceListError(f"В CSV отсутствует обязательный столбец '{missing[0]}'")
+            for row in reader:
+                if None in row:
+                    raise PriceListError(f"Лишние значения в строке {reader.line_num} CSV")
+                yield row
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise PriceListError(f"Ошибка при парсинге CSV: {str(e)}")
+        finally:
+            # Закрытие обертки закрыло бы и исходный поток
+            text.detach()
+
+    @staticmethod
+    def _sniff(first_line):
+        try:
+            return csv.Sniffer().sniff(first_line, delimiters=CSV_DELIMITERS)
+        except csv.Error:
+            return csv.excel
+
+
+class JsonPriceListReader:
+    """
+    Потоковое чтение прайс-листа в формате JSON с той же структурой, что и YAML.
+
+    Корневой объект читается по ключам: заголовок (магазин и категории) разбирается
+    целиком, а элементы массива goods - по одному через JSONDecoder.raw_decode и
+    отдаются пакетами по chunk_size товаров. В памяти находятся текущий пакет
+    и буфер чтения, поэтому потребление памяти не зависит от размера файла.
+
+    Если заголовок расположен в файле после goods, поток перематывается
+    и читается повторно, поэтому он должен поддерживать seek().
+    """
+
+    # Размер блока чтения из потока, символов
+    block_size = 64 * 1024
+    whitespace = ' \t\n\r'
+
+    def __init__(self, stream, chunk_size=1000):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.has_goods = False
+        self._header = None
+        self._at_goods = False
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._fields = 0
+        self._text_decoder = None
+
+    def read_header(self):
+        """
+        Возвращает поля заголовка прайс-листа.
+        """
+        if self._header is not None:
+            return self._header
+
+        try:
+            self._start()
+            header = {}
+            while True:
+                key = self._read_key()
+                if key is None:
+                    break
+                if key == GOODS_FIELD:
+                    self.has_goods = True
+                    if all(field in header for field in HEADER_FIELDS):
+                        # Обычный порядок полей: товары идут последними, читаем их без перемотки
+                        self._at_goods = True
+                        break
+                    for _ in self._iter_goods():
+                        pass
+                else:
+                    header[key] = self._decode()
+        except ValueError as e:
+            raise PriceListError(f"Ошибка при парсинге JSON: {str(e)}")
+
+        missing = [field for field in HEADER_FIELDS if field not in header]
+        if not self.has_goods:
+            missing.append(GOODS_FIELD)
+        if missing:
+            raise PriceListError(f"В данных отсутствует обязательное поле '{missing[0]}'")
+
+        self._header = {field: header[field] for field in HEADER_FIELDS}
+        return self._header
+
+    def iter_chunks(self):
+        """
+        Генератор пакетов товаров из массива goods.
+        """
+        self.read_header()
+        try:
+            if not self._at_goods:
+                self._start()
+                while True:
+                    key = self._read_key()
+                    if key is None:
+                        return
+                    if key == GOODS_FIELD:
+                        break
+                    self._decode()
+            self._at_goods = False
+
+            chunk = []
+            for item in self._iter_goods():
+                chunk.append(item)
+                if len(chunk) >= self.chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+        except ValueError as e:
+            raise PriceListError(f"Ошибка при парсинге JSON: {str(e)}")
+
+    def _start(self):
+        """
+        Открывает поток с начала и позиционируется внутри корневого объекта.
+        """
+        if self.stream.seekable():
+            self.stream.seek(0)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._fields = 0
+        if self._peek() != '{':
+            raise PriceListError("Корневой элемент прайс-листа должен быть объектом")
+        self._pos += 1
+
+    def _read_key(self):
+        """
+        Читает очередной ключ корневого объекта вместе с двоеточием; None - объект закончился.
+        """
+        char = self._peek()
+        if char == '}':
+            self._pos += 1
+            return None
+        if self._fields:
+            if char != ',':
+                raise ValueError(f"ожидалась запятая или '}}', найдено {char!r}")
+            self._pos += 1
+        self._fields += 1
+        key = self._decode()
+        if not isinstance(key, str):
+            raise ValueError("ключ объекта должен быть строкой")
+        self._expect(':')
+        return key
+
+    def _iter_goods(self):
+        """
+        Элементы массива goods по одному; null - товаров нет.
+        """
+        char = self._peek()
+        if char == 'n' and self._decode() is None:
+            return
+        if char != '[':
+            raise PriceListError("Поле 'goods' должно содержать список товаров")
+        self._pos += 1
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._decode()
+            char = self._peek()
+            self._pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"ожидалась запятая или ']', найдено {char!r}")
+
+    def _expect(self, expected):
+        char = self._peek()
+        if char != expected:
+            raise ValueError(f"ожидалось {expected!r}, найдено {char!r}")
+        self._pos += 1
+
+    def _peek(self):
+        """
+        Первый непробельный символ с текущей позиции; пустая строка - конец потока.
+        """
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in self.whitespace:
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._fill():
+                return self._buffer[self._pos:self._pos + 1]
+
+    def _decode(self):
+        """
+        Разбирает значение с текущей позиции, дочитывая поток, пока значение не поместится в буфер.
+
+        Значение в конце буфера принимается только в конце потока: иначе
+        число могло быть прочитано не полностью.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                if not self._fill():
+                    raise
+                continue
+            if end < len(self._buffer) or not self._fill():
+                self._pos = end
+                return value
+
+    def _fill(self):
+        """
+        Дочитывает поток в буфер, отбрасывая разобранную часть; False - поток закончился.
+
+        Размер блока растет вместе с буфером, поэтому крупное значение
+        разбирается за логарифмическое число попыток.
+        """
+        data = ''
+        while not data and not self._eof:
+            data = self.stream.read(max(self.block_size, len(self._buffer) - self._pos))
+            self._eof = not data
+            if isinstance(data, bytes):
+                # Блок может закончиться посреди многобайтового символа
+                data = self._text_decoder.decode(data, final=self._eof)
+        if not data:
+            return False
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+        return True
+
+
+PRICE_LIST_READERS = {
+    'yaml': YamlPriceListReader,
+    'json': JsonPriceListReader,
+    'jsonl': JsonLinesPriceListReader,
+    'csv': CsvPriceListReader,
+}
+
+
+def get_reader(price_format, stream, chunk_size=1000):
+    """
+    Читатель прайс-листа заданного формата.
+    """
+    if price_format not in PRICE_LIST_READERS:
+        raise PriceListError(f"Неподдерживаемый формат прайс-листа: {price_format}")
+    return PRICE_LIST_READERS[price_format](stream, chunk_size=chunk_size)
+
+
+def detect_format(content_type='', filename='', head=b''):
+    """
+    Определение формата прайс-листа.
+
+    Порядок: тип содержимого HTTP-ответа, расширение файла или URL,
+    затем начало содержимого. По умолчанию - YAML.
+    """
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type in FORMAT_CONTENT_TYPES:
+        return FORMAT_CONTENT_TYPES[content_type]
+
+    path = urlparse(filename).path if '://' in (filename or '') else (filename or '')
+    name = os.path.basename(path).lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    extension = os.path.splitext(name)[1]
+    if extension in FORMAT_EXTENSIONS:
+        return FORMAT_EXTENSIONS[extension]
+
+    return sniff_format(head)
+
+
+def sniff_format(head):
+    """
+    Определение формата по первым байтам содержимого.
+    """
+    text = head.decode('utf-8-sig', errors='ignore').lstrip()
+    first_line = text.split('\n', 1)[0].strip()
+
+    if text.startswith('{') or text.startswith('['):
+        try:
+            first = json.loads(first_line)
+        except ValueError:
+            # Многострочный JSON-документ
+            return 'json'
+        if isinstance(first, dict) and GOODS_FIELD not in first and '\n' in text.strip():
+            return 'jsonl'
+        return 'json'
+
+    columns = {column.strip().strip('"').lower() for column in first_line.replace(';', ',').replace('\t', ',').split(',')}
+    if {'id', 'price', 'shop'}.issubset(columns):
+        return 'csv'
+
+    return 'yaml'
@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import uuid
+import logging
+from contextlib import ExitStack
+from django.conf import settings
+from ..models import Shop
+from .bulk_import import BulkProductImporter, ImportStats, QueryCounter
+
+logger = logging.getLogger(__name__)
+
+
+class PartitionedImport:
+    """
+    Импорт товаров крупного прайс-листа по разделам, которые записываются параллельно.
+
+    Товары распределяются по разделам по остатку от деления внешнего ИД, поэтому
+    повторы одного товара попадают в один раздел и записываются в исходном порядке.
+    Каждый раздел сохраняется файлом JSON Lines в каталоге IMPORT_UPLOAD_DIR,
+    доступном воркерам Celery, и импортируется отдельной задачей.
+
+    Недостающие Product и Parameter создаются при разбиении, до запуска разделов:
+    задачи разделов только находят их id и не создают дубликаты одинаковых
+    названий параллельно. Завершающий шаг выполняется после всех разделов:
+    в режиме replace публикует версию каталога, в режиме incremental удаляет
+    товары, отсутствующие в прайс-листе.
+
+    Описание импорта (plan) - словарь, который передается в задачи Celery.
+    """
+
+    def __init__(self, shop, partitions=None, incremental=None, directory=None):
+        self.shop = shop
+        self.partitions = partitions or settings.IMPORT_PARTITIONS
+        self.incremental = settings.IMPORT_MODE == 'incremental' if incremental is None else incremental
+        self.directory = directory or settings.IMPORT_UPLOAD_DIR
+
+    def split(self, chunks, download=None):
+        """
+        Разбиение проверенных пакетов товаров на разделы.
+
+        Args:
+            chunks: Итератор пакетов товаров.
+            download (PriceListDownload): Загруженный файл; его хэш и HTTP-валидаторы
+                сохраняются после завершения импорта.
+
+        Returns:
+            dict: Описание импорта для задач разделов и завершающей задачи.
+        """
+        started_at = time.time()
+        importer = BulkProductImporter(self.shop, incremental=self.incremental)
+        importer.begin()
+
+        os.makedirs(self.directory, exist_ok=True)
+        prefix = os.path.join(self.directory, f"partition-{self.shop.id}-{uuid.uuid4().hex}")
+        plan = {
+            'shop_id': self.shop.id,
+            'user_id': self.shop.user_id,
+            'version': importer.version,
+            'incremental': self.incremental,
+            'paths': [f"{prefix}-{index}.jsonl" for index in range(self.partitions)],
+            'ids_path': f"{prefix}.ids",
+            'goods': 0,
+            'started_at': started_at,
+            'download': None,
+        }
+        if download is not None:
+            plan['download'] = {
+                'content_hash': download.content_hash,
+                'source_url': download.source_url,
+                'etag': download.etag,
+                'last_modified': download.last_modified,
+            }
+
+        try:
+            with ExitStack() as stack:
+                partition_files = [stack.enter_context(open(path, 'w', encoding='utf-8')) for path in plan['paths']]
+                ids_file = stack.enter_context(open(plan['ids_path'], 'w', encoding='utf-8'))
+                for chunk in chunks:
+                    importer.resolve_identities(chunk)
+                    for item in chunk:
+                        external_id = int(item['id'])
+                        partition_files[external_id % self.partitions].write(
+                            json.dumps(item, ensure_ascii=False) + '\n'
+                        )
+                        ids_file.write(f"{external_id}\n")
+                    plan['goods'] += len(chunk)
+        except BaseException:
+            self.cleanup(plan)
+            raise
+
+        logger.info(f"Прайс-лист магазина {self.shop.id} разбит на разделы: {self.partitions}, товаров: {plan['goods']}")
+        return plan
+
+    @staticmethod
+    def read_chunks(file, chunk_size=None):
+        chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+        chunk = []
+        for line in file:
+            chunk.append(json.loads(line))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @classmethod
+    def import_partition(cls, plan, index):
+        """
+        Запись товаров одного раздела.
+
+        Повторный запуск раздела после ошибки БД безопасен: строки записываются
+        через INSERT ... ON CONFLICT в ту же версию каталога.
+
+        Returns:
+            dict: Статистика раздела (ImportStats.as_dict()).
+        """
+        shop = Shop.objects.get(id=plan['shop_id'])
+        stats = ImportStats()
+        importer = BulkProductImporter(shop, stats=stats, incremental=plan['incremental'], version=plan['version'])
+        with QueryCounter() as query_counter:
+            with open(plan['paths'][index], encoding='utf-8') as file:
+                for chunk in cls.read_chunks(file):
+                    importer.import_goods(chunk)
+
+        stats.queries = query_counter.count
+        stats.finish()
+        return stats.as_dict()
+
+    @staticmethod
+    def finish(plan, partition_stats):
+        """
+        Завершающий шаг после записи всех разделов.
+
+        Returns:
+            tuple: (магазин, суммарная статистика ImportStats).
+        """
+        shop = Shop.objects.get(id=plan['shop_id'])
+        stats = ImportStats.combine(partition_stats)
+        importer = BulkProductImporter(shop, stats=stats, incremental=plan['incremental'], version=plan['version'])
+        if plan['incremental']:
+            with open(plan['ids_path'], encoding='utf-8') as file:
+                importer.mark_seen(int(line) for line in file)
+        with QueryCounter() as query_counter:
+            importer.finish()
+
+        stats.queries += query_counter.count
+        stats.elapsed = time.time() - plan['started_at']
+        return shop, stats
+
+    @staticmethod
+    def cleanup(plan):
+        """
+        Удаление файлов разделов.
+        """
+        for path in plan['paths'] + [plan['ids_path']]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,234 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Count, DateTimeField, FloatField, Func, IntegerField, Max, Min, Value
+from django.db.models.functions import Floor, Least, Round
+from django.utils import timezone
+from ..models import ProductInfo, PriceHistory
+
+logger = logging.getLogger(__name__)
+
+
+class PriceHistoryRecorder:
+    """
+    Запись истории цен и остатков при импорте.
+
+    Изменения накапливаются в памяти и записываются одним bulk_create на пакет
+    товаров в транзакции импорта. Записываются только товары, у которых
+    изменились цена, рекомендуемая цена или количество; новые товары
+    записываются как первое значение ряда.
+    """
+
+    tracked_fields = ('price', 'price_rrc', 'quantity')
+
+    def __init__(self, shop, batch_size=None):
+        self.shop = shop
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.pending = []
+
+    @staticmethod
+    def enabled():
+        return settings.IMPORT_PRICE_HISTORY
+
+    @classmethod
+    def changed(cls, previous, current):
+        """
+        Изменились ли отслеживаемые поля; previous - словарь с текущими значениями или None.
+        """
+        return previous is None or any(previous[field] != current[field] for field in cls.tracked_fields)
+
+    def add(self, external_id, price, price_rrc, quantity):
+        self.pending.append((external_id, price, price_rrc, quantity))
+
+    def flush(self, recorded_at=None):
+        """
+        Запись накопленных изменений.
+
+        Returns:
+            int: Количество записанных строк истории.
+        """
+        if not self.pending:
+            return 0
+        recorded_at = recorded_at or timezone.now()
+        PriceHistory.objects.bulk_create([
+            PriceHistory(shop_id=self.shop.id, external_id=external_id, price=price,
+                         price_rrc=price_rrc, quantity=quantity, recorded_at=recorded_at)
+            for external_id, price, price_rrc, quantity in self.pending
+        ], batch_size=self.batch_size)
+        count = len(self.pending)
+        self.pending = []
+        return count
+
+    @classmethod
+    def record_version_change(cls, shop, old_version, new_version, batch_size=None):
+        """
+        Запись изменений при смене текущей версии каталога (публикация импорта в режиме replace или откат).
+
+        Строки новой версии читаются пакетами по id и сравниваются со строками
+        прежней версии с тем же внешним ИД.
+
+        Returns:
+            int: Количество записанных строк истории.
+        """
+        if not cls.enabled():
+            return 0
+
+        recorder = cls(shop, batch_size=batch_size)
+        recorded_at = timezone.now()
+        fields = ('external_id',) + cls.tracked_fields
+        rows = ProductInfo.objects.filter(shop_id=shop.id, catalog_version=new_version).order_by('id')
+        written, last_id, seen = 0, 0, set()
+        while True:
+            batch = list(rows.filter(id__gt=last_id).values('id', *fields)[:recorder.batch_size])
+            if not batch:
+                break
+            last_id = batch[-1]['id']
+
+            previous = {}
+            if old_version is not None:
+                for row in ProductInfo.objects.filter(
+                    shop_id=shop.id, catalog_version=old_version,
+                    external_id__in=[row['external_id'] for row in batch]
+                ).order_by('-id').values(*fields):
+                    previous[row['external_id']] = row
+
+            for row in batch:
+                # Строки с одинаковым внешним ИД (разные Product) дают одну запись
+                if row['external_id'] in seen:
+                    continue
+                seen.add(row['external_id'])
+                if cls.changed(previous.get(row['external_id']), row):
+                    recorder.add(*(row[field] for field in fields))
+            written += recorder.flush(recorded_at)
+
+        logger.info(f"История цен магазина {shop.id}: записано изменений {written} "
+                    f"(версия {old_version} -> {new_version})")
+        return written
+
+
+class Epoch(Func):
+    """
+    Время в секундах для вычисления интервалов в SQL.
+
+    В SQLite отсчитывается от начала юлианского календаря, в остальных БД -
+    от начала эпохи Unix, поэтому имеет смысл только разность двух значений.
+    """
+    output_field = FloatField()
+    template = 'EXTRACT(EPOCH FROM %(expressions)s)'
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='(julianday(%(expressions)s) * 86400.0)', **extra_context)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='UNIX_TIMESTAMP(%(expressions)s)', **extra_context)
+
+
+class PriceHistoryService:
+    """
+    Чтение истории цен товара.
+    """
+
+    fields = ('recorded_at', 'price', 'price_rrc', 'quantity')
+
+    @classmethod
+    def series(cls, product_info, date_from=None, date_to=None, points=None):
+        """
+        Ряд цен и остатков товара за период.
+
+        Первой точкой ряда идет значение, действовавшее на начало периода.
+        Если изменений больше, чем points, период делится на points равных
+        интервалов, и для каждого интервала с изменениями возвращаются
+        последние значения, а также минимальная и максимальная цена.
+        Интервалы группируются в SQL, поэтому из БД читается не больше
+        points строк независимо от длины истории.
+
+        Args:
+            product_info (ProductInfo): Товар магазина.
+            date_from (datetime): Начало периода; по умолчанию - первая запись истории.
+            date_to (datetime): Конец периода; по умолчанию - текущее время.
+            points (int): Максимальное число точек ряда.
+
+        Returns:
+            dict: {"downsampled": bool, "points": [...]}.
+        """
+        points = points or settings.PRICE_HISTORY_POINTS
+        date_to = date_to or timezone.now()
+        history = PriceHistory.objects.filter(shop_id=product_info.shop_id, external_id=product_info.external_id)
+
+        initial = None
+        if date_from is not None:
+            initial = history.filter(recorded_at__lt=date_from).order_by('-recorded_at', '-id').values_list(
+                *cls.fields).first()
+            if initial is not None:
+                initial = (date_from,) + initial[1:]
+            history = history.filter(recorded_at__gte=date_from)
+        history = history.filter(recorded_at__lte=date_to)
+
+        summary = history.aggregate(count=Count('id'), first=Min('recorded_at'))
+        if summary['count'] + (initial is not None) <= points:
+            rows = [initial] if initial is not None else []
+            rows += list(history.order_by('recorded_at', 'id').values_list(*cls.fields))
+            return {
+                "downsampled": False,
+                "points": [cls.point(row[0], row) for row in rows],
+            }
+
+        start = initial[0] if initial is not None else summary['first']
+        step = max((date_to - start) / points, timedelta(microseconds=1))
+        buckets = cls.buckets(history, start, step, points)
+        if initial is not None:
+            # Значение на начало периода относится к первому интервалу
+            last, price_min, price_max = buckets.get(0, (initial, initial[1], initial[1]))
+            buckets[0] = (last, min(price_min, initial[1]), max(price_max, initial[1]))
+
+        return {
+            "downsampled": True,
+            "points": [cls.point(start + step * index, *bucket) for index, bucket in sorted(buckets.items())],
+        }
+
+    @classmethod
+    def buckets(cls, history, start, step, points):
+        """
+        Интервалы ряда, сгруппированные в SQL.
+
+        Номер интервала вычисляется по миллисекундам от начала периода;
+        для каждого интервала читаются диапазон цены и последняя запись
+        (записи истории добавляются в хронологическом порядке, поэтому
+        последняя - с наибольшим id).
+
+        Returns:
+            dict: "номер интервала -> (последняя запись, минимальная цена, максимальная цена)".
+        """
+        step_ms = step / timedelta(milliseconds=1)
+        offset_ms = Round((Epoch('recorded_at') - Epoch(Value(start, output_field=DateTimeField()))) * 1000)
+        bucket = Least(Floor(offset_ms / step_ms), Value(points - 1), output_field=IntegerField())
+        groups = list(
+            history.annotate(bucket=bucket).values('bucket')
+            .annotate(price_min=Min('price'), price_max=Max('price'), last_id=Max('id'))
+            .order_by('bucket')
+        )
+        last_rows = {
+            row[0]: row[1:]
+            for row in PriceHistory.objects.filter(id__in=[group['last_id'] for group in groups]).values_list(
+                'id', *cls.fields
+            )
+        }
+        return {
+            int(group['bucket']): (last_rows[group['last_id']], group['price_min'], group['price_max'])
+            for group in groups
+        }
+
+    @staticmethod
+    def point(recorded_at, last, price_min=None, price_max=None):
+        """
+        Точка ряда: последние значения интервала и диапазон цены (для одной записи - ее цена).
+        """
+        _, price, price_rrc, quantity = last
+        return {
+            "recorded_at": recorded_at,
+            "price": price,
+            "price_min": price if price_min is None else price_min,
+            "price_max": price if price_max is None else price_max,
+            "price_rrc": price_rrc,
+            "quantity": quantity,
+        }
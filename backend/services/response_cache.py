@@ -0,0 +1,151 @@
+import time
+import hashlib
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogResponseCache:
+    """
+    Кэш ответов каталога (ProductView, ProductDetailView).
+
+    Ключ ответа - адрес запроса с упорядоченными параметрами. Вместе с ответом
+    хранятся версии каталога, от которых он зависит: список всех магазинов -
+    от общей версии all, список магазина и карточка товара - от версии магазина
+    и версии global (изменения товаров и категорий, общих для магазинов).
+    Импорт, откат каталога и изменения магазина увеличивают версию магазина
+    (а вместе с ней all), поэтому устаревший ответ не совпадает по версиям
+    и пересчитывается, а остальные ответы остаются в кэше.
+
+    Версия - время изменения в микросекундах, она же задает Last-Modified.
+    Ответ из кэша отдается без запросов к БД и сериализации, а при совпадении
+    If-None-Match или If-Modified-Since - с кодом 304 без тела.
+    """
+
+    prefix = 'catalog-response'
+
+    def __init__(self, request):
+        self.request = request
+        self.enabled = settings.CATALOG_CACHE_ENABLED
+        if self.enabled:
+            self.key = f"{self.prefix}:{self.request_key(request)}"
+            # Если каталог изменится, пока готовится ответ, ответ не сохраняется
+            self.generation = self.versions(['all'])['all']
+
+    @staticmethod
+    def request_key(request):
+        """
+        Хэш адреса и параметров запроса: порядок параметров и их повторов не важен.
+        """
+        query = sorted((name, sorted(request.query_params.getlist(name))) for name in request.query_params)
+        return hashlib.sha256(f"{request.build_absolute_uri(request.path)}?{query}".encode()).hexdigest()
+
+    @staticmethod
+    def dependencies(shop_id=None):
+        if shop_id is None:
+            return ['all']
+        return [f'shop:{shop_id}', 'global']
+
+    @classmethod
+    def version_key(cls, name):
+        return f"{cls.prefix}:version:{name}"
+
+    @staticmethod
+    def now():
+        return time.time_ns() // 1000
+
+    @classmethod
+    def versions(cls, names):
+        """
+        Текущие версии; отсутствующая в кэше версия создается заново,
+        поэтому после вытеснения версии сохраненные ответы не совпадают с ней.
+        """
+        keys = {cls.version_key(name): name for name in names}
+        found = cache.get_many(list(keys))
+        for key in keys:
+            if key not in found:
+                cache.add(key, cls.now(), None)
+                found[key] = cache.get(key)
+        return {name: found[key] for key, name in keys.items()}
+
+    @classmethod
+    def invalidate(cls, shop_ids=None):
+        """
+        Увеличение версий каталога магазинов shop_ids; без shop_ids - версии global.
+
+        Версии увеличиваются сразу и еще раз после фиксации транзакции, чтобы
+        ответ, прочитанный до фиксации, не был сохранен с новой версией.
+        """
+        if not settings.CATALOG_CACHE_ENABLED:
+            return
+        names = ['global'] if shop_ids is None else [f'shop:{shop_id}' for shop_id in set(shop_ids)]
+        names.append('all')
+        cls._bump(names)
+        if connection.in_atomic_block:
+            transaction.on_commit(lambda: cls._bump(names))
+
+    @classmethod
+    def _bump(cls, names):
+        keys = [cls.version_key(name) for name in names]
+        current = cache.get_many(keys)
+        now = cls.now()
+        cache.set_many({key: max(now, current.get(key, 0) + 1) for key in keys}, None)
+
+    @staticmethod
+    def etag(key, versions):
+        return quote_etag(hashlib.sha1(f"{key}:{sorted(versions.items())}".encode()).hexdigest())
+
+    @staticmethod
+    def last_modified(versions):
+        return max(versions.values()) // 1_000_000
+
+    def get(self):
+        """
+        Ответ из кэша (или 304), если версии каталога не изменились; иначе None.
+        """
+        if not self.enabled:
+            return None
+        entry = cache.get(self.key)
+        if entry is None or self.versions(entry['versions']) != entry['versions']:
+            return None
+        return self.respond(entry['data'], entry['versions'])
+
+    def store(self, response, shop_id=None):
+        """
+        Сохранение успешного ответа в кэш и добавление заголовков ETag и Last-Modified.
+        """
+        if not self.enabled or response.status_code != status.HTTP_200_OK:
+            return response
+        dependencies = self.dependencies(shop_id)
+        current = self.versions(set(dependencies) | {'all'})
+        versions = {name: current[name] for name in dependencies}
+        if current['all'] == self.generation:
+            cache.set(self.key, {'versions': versions, 'data': response.data}, settings.CATALOG_CACHE_TIMEOUT)
+        self.add_headers(response, versions)
+        return response
+
+    def respond(self, data, versions):
+        etag = self.etag(self.key, versions)
+        last_modified = self.last_modified(versions)
+        if_none_match = self.request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            not_modified = if_none_match.strip() == '*' or etag in [
+                tag.strip().removeprefix('W/') for tag in if_none_match.split(',')
+            ]
+        else:
+            if_modified_since = parse_http_date_safe(self.request.headers.get('If-Modified-Since', ''))
+            not_modified = if_modified_since is not None and last_modified <= if_modified_since
+        response = Response(status=status.HTTP_304_NOT_MODIFIED) if not_modified else Response(data)
+        self.add_headers(response, versions)
+        return response
+
+    def add_headers(self, response, versions):
+        response['ETag'] = self.etag(self.key, versions)
+        response['Last-Modified'] = http_date(self.last_modified(versions))
+        return response
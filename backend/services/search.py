@@ -0,0 +1,397 @@
+import logging
+from abc import ABC, abstractmethod
+from django.conf import settings
+from django.db import connections, DEFAULT_DB_ALIAS
+from .matching import normalize_text
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = 'backend_product_search'
+
+
+def trigrams(text):
+    """
+    Триграммы слов текста, как в pg_trgm: слово дополняется двумя пробелами в начале и одним в конце.
+    """
+    result = set()
+    for word in text.split():
+        padded = f"  {word} "
+        result.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    return result
+
+
+def word_similarity(query, document):
+    """
+    Доля триграмм запроса, найденных в документе (от 0 до 1).
+    """
+    query_trigrams = trigrams(query)
+    if not query_trigrams:
+        return 0.0
+    return len(query_trigrams & trigrams(document)) / len(query_trigrams)
+
+
+class SearchBackend(ABC):
+    """
+    Поисковый индекс товаров: одна строка на Product с нормализованным
+    документом из названия товара и моделей его предложений в магазинах.
+
+    Поиск выполняется ступенями, возвращается первая непустая:
+    1. подстрока - весь запрос целиком (как прежний icontains);
+    2. слова - все слова запроса в любом порядке;
+    3. нечеткий - по триграммам, с опечатками.
+
+    Область поиска (scope) - SQL подзапроса с id товаров, прошедших фильтры
+    каталога: она применяется в запросе к индексу до ограничения limit,
+    поэтому ступень, не нашедшая товаров в области, уступает следующей.
+    """
+
+    min_length = 3
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def search(self, text, limit, scope=None):
+        """
+        ID товаров по убыванию релевантности; None, если запрос слишком короткий для триграмм.
+
+        Слова короче трех символов учитываются только ступенью "подстрока".
+
+        Args:
+            scope: (sql, params) подзапроса с id товаров области поиска; None - весь индекс.
+        """
+        if len(text) < self.min_length:
+            return None
+        words = [word for word in text.split() if len(word) >= self.min_length]
+        for tier in (self.search_phrase, self.search_words, self.search_fuzzy):
+            product_ids = tier(text, words, limit, scope)
+            if product_ids:
+                return product_ids
+        return []
+
+    @staticmethod
+    def scope_condition(column, scope):
+        """
+        Условие "column IN (подзапрос области)" для WHERE и его параметры.
+        """
+        if scope is None:
+            return '', []
+        sql, params = scope
+        return f" AND {column} IN ({sql})", list(params)
+
+    @abstractmethod
+    def search_phrase(self, text, words, limit, scope=None):
+        """
+        Ступень "подстрока": документы, содержащие запрос целиком.
+        """
+
+    @abstractmethod
+    def search_words(self, text, words, limit, scope=None):
+        """
+        Ступень "слова": документы, содержащие все слова запроса в любом порядке.
+        """
+
+    @abstractmethod
+    def search_fuzzy(self, text, words, limit, scope=None):
+        """
+        Ступень "нечеткий": документы, похожие на запрос по триграммам.
+        """
+
+    @abstractmethod
+    def load(self, product_ids):
+        """
+        Текущие документы индекса: "product_id -> документ".
+        """
+
+    @abstractmethod
+    def write(self, documents):
+        """
+        Запись документов "product_id -> документ" с заменой существующих.
+        """
+
+    @abstractmethod
+    def delete(self, product_ids):
+        """
+        Удаление документов товаров.
+        """
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+
+class SqliteSearchBackend(SearchBackend):
+    """
+    Индекс SQLite: виртуальная таблица FTS5 с токенизатором trigram.
+
+    Токенизатор trigram ищет подстроки, поэтому ступени "подстрока" и "слова"
+    используют индекс напрямую. Для нечеткого поиска индекс отбирает
+    SEARCH_FUZZY_CANDIDATES документов с общими триграммами (по bm25),
+    а сходство с запросом считается как в pg_trgm.
+    """
+
+    @staticmethod
+    def quote(value):
+        return '"' + value.replace('"', '""') + '"'
+
+    def match(self, expression, limit, scope=None, columns='rowid'):
+        condition, params = self.scope_condition('rowid', scope)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {columns} FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s{condition} "
+                f"ORDER BY rank LIMIT %s",
+                [expression, *params, limit]
+            )
+            return cursor.fetchall()
+
+    def search_phrase(self, text, words, limit, scope=None):
+        return [row[0] for row in self.match(self.quote(text), limit, scope)]
+
+    def search_words(self, text, words, limit, scope=None):
+        if len(words) < 2:
+            return []
+        return [row[0] for row in self.match(' AND '.join(self.quote(word) for word in words), limit, scope)]
+
+    def search_fuzzy(self, text, words, limit, scope=None):
+        parts = {word[index:index + 3] for word in words for index in range(len(word) - 2)}
+        if not parts:
+            return []
+        candidates = self.match(' OR '.join(self.quote(part) for part in sorted(parts)),
+                                settings.SEARCH_FUZZY_CANDIDATES, scope, columns='rowid, document')
+        scored = [(word_similarity(text, document), product_id) for product_id, document in candidates]
+        scored = [item for item in scored if item[0] >= settings.SEARCH_TRIGRAM_THRESHOLD]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [product_id for _, product_id in scored[:limit]]
+
+    def load(self, product_ids):
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"SELECT rowid, document FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})",
+                           list(product_ids))
+            return dict(cursor.fetchall())
+
+    def write(self, documents):
+        placeholders = ', '.join(['%s'] * len(documents))
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", list(documents))
+            cursor.executemany(f"INSERT INTO {SEARCH_TABLE} (rowid, document) VALUES (%s, %s)",
+                               list(documents.items()))
+
+    def delete(self, product_ids):
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", list(product_ids))
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Индекс PostgreSQL: таблица с tsvector (GIN) и триграммным GIN-индексом pg_trgm.
+
+    Подстрока ищется через LIKE по триграммному индексу, слова - по tsvector
+    с префиксным совпадением и ранжированием ts_rank, нечеткий поиск -
+    оператором word_similarity (<%) с порогом SEARCH_TRIGRAM_THRESHOLD.
+    """
+
+    def query(self, sql, params):
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def search_phrase(self, text, words, limit, scope=None):
+        condition, params = self.scope_condition('product_id', scope)
+        return self.query(
+            f"SELECT product_id FROM {SEARCH_TABLE} WHERE document LIKE %s{condition} "
+            f"ORDER BY length(document), product_id LIMIT %s",
+            [f"%{text}%", *params, limit]
+        )
+
+    def search_words(self, text, words, limit, scope=None):
+        if len(words) < 2:
+            return []
+        tsquery = ' & '.join(f"'{word}':*" for word in words)
+        condition, params = self.scope_condition('product_id', scope)
+        return self.query(
+            f"SELECT product_id FROM {SEARCH_TABLE}, to_tsquery('simple', %s) query "
+            f"WHERE search_vector @@ query{condition} "
+            f"ORDER BY ts_rank(search_vector, query) DESC, product_id LIMIT %s",
+            [tsquery, *params, limit]
+        )
+
+    def search_fuzzy(self, text, words, limit, scope=None):
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)",
+                           [str(settings.SEARCH_TRIGRAM_THRESHOLD)])
+        condition, params = self.scope_condition('product_id', scope)
+        return self.query(
+            f"SELECT product_id FROM {SEARCH_TABLE} WHERE %s <%% document{condition} "
+            f"ORDER BY word_similarity(%s, document) DESC, product_id LIMIT %s",
+            [text, *params, text, limit]
+        )
+
+    def load(self, product_ids):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"SELECT product_id, document FROM {SEARCH_TABLE} WHERE product_id = ANY(%s)",
+                           [list(product_ids)])
+            return dict(cursor.fetchall())
+
+    def write(self, documents):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (product_id, document, search_vector) "
+                f"VALUES (%s, %s, to_tsvector('simple', %s)) "
+                f"ON CONFLICT (product_id) DO UPDATE "
+                f"SET document = EXCLUDED.document, search_vector = EXCLUDED.search_vector",
+                [(product_id, document, document) for product_id, document in documents.items()]
+            )
+
+    def delete(self, product_ids):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE product_id = ANY(%s)", [list(product_ids)])
+
+
+class ProductSearchIndex:
+    """
+    Поисковый индекс товаров для ProductView (параметр search).
+
+    Реализация выбирается по СУБД: FTS5 для SQLite, tsvector и pg_trgm для
+    PostgreSQL; для остальных СУБД индекс не ведется, и поиск выполняется
+    через icontains.
+
+    В индексе только товары с предложениями текущих версий каталогов магазинов
+    (ProductInfo.objects.live()), документ строится из моделей этих предложений.
+    Индекс обновляется импортом прайс-листов для товаров записанных пакетов
+    и удаленных строк, публикацией и откатом версии каталога (sync_shop),
+    а также при сохранении и удалении Product, ProductInfo и Shop через ORM.
+    """
+
+    backends = {
+        'sqlite': SqliteSearchBackend,
+        'postgresql': PostgresSearchBackend,
+    }
+
+    @classmethod
+    def backend(cls, using=DEFAULT_DB_ALIAS):
+        if not settings.SEARCH_INDEX_ENABLED:
+            return None
+        backend_class = cls.backends.get(connections[using].vendor)
+        return backend_class(using) if backend_class else None
+
+    @staticmethod
+    def documents(product_ids):
+        """
+        Документы индекса: "product_id -> нормализованные название и модели товара".
+
+        Товары без предложений текущих версий каталогов в результат не входят.
+        """
+        from ..models import Product, ProductInfo
+
+        live_ids, models = set(), {}
+        for product_id, model in ProductInfo.objects.filter(
+            product_id__in=product_ids
+        ).live().values_list('product_id', 'model').distinct():
+            live_ids.add(product_id)
+            if model:
+                models.setdefault(product_id, set()).add(model)
+
+        return {
+            product_id: normalize_text(' '.join([name] + sorted(models.get(product_id, ()))))
+            for product_id, name in Product.objects.filter(id__in=live_ids).values_list('id', 'name')
+        }
+
+    @classmethod
+    def sync(cls, product_ids, batch_size=None):
+        """
+        Обновление документов товаров; записываются только изменившиеся,
+        документы товаров без предложений текущих версий каталогов удаляются.
+
+        Returns:
+            int: Количество записанных документов.
+        """
+        backend = cls.backend()
+        if backend is None:
+            return 0
+
+        product_ids = sorted(set(product_ids))
+        batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        written = 0
+        for start in range(0, len(product_ids), batch_size):
+            batch = product_ids[start:start + batch_size]
+            current = backend.load(batch)
+            documents = cls.documents(batch)
+            changed = {
+                product_id: document for product_id, document in documents.items()
+                if current.get(product_id) != document
+            }
+            if changed:
+                backend.write(changed)
+                written += len(changed)
+            removed = [product_id for product_id in current if product_id not in documents]
+            if removed:
+                backend.delete(removed)
+        return written
+
+    @classmethod
+    def sync_shop(cls, shop, versions, batch_size=None):
+        """
+        Обновление документов товаров версий каталога магазина versions
+        (при публикации и откате версии: прежней и новой текущей).
+        """
+        from ..models import ProductInfo
+
+        return cls.sync(ProductInfo.objects.filter(
+            shop_id=shop.id, catalog_version__in=versions
+        ).values_list('product_id', flat=True).distinct(), batch_size=batch_size)
+
+    @classmethod
+    def remove(cls, product_ids):
+        """
+        Удаление документов товаров (при удалении Product).
+        """
+        backend = cls.backend()
+        if backend is not None and product_ids:
+            backend.delete(list(product_ids))
+
+    @classmethod
+    def rebuild(cls, batch_size=None):
+        """
+        Полное перестроение индекса.
+
+        Returns:
+            int: Количество проиндексированных товаров.
+        """
+        from ..models import ProductInfo
+
+        backend = cls.backend()
+        if backend is None:
+            return 0
+
+        batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        backend.clear()
+        product_ids = sorted(set(ProductInfo.objects.live().values_list('product_id', flat=True)))
+        for start in range(0, len(product_ids), batch_size):
+            backend.write(cls.documents(product_ids[start:start + batch_size]))
+        logger.info(f"Поисковый индекс перестроен, товаров: {len(product_ids)}")
+        return len(product_ids)
+
+    @classmethod
+    def search(cls, query, limit=None, scope=None):
+        """
+        Поиск товаров.
+
+        Args:
+            scope: QuerySet модели с полем product_id (например, отфильтрованная витрина
+                каталога), внутри которого выполняется поиск; None - весь индекс.
+
+        Returns:
+            list | None: ID товаров (Product) по убыванию релевантности, не больше
+                SEARCH_MAX_RESULTS; None, если индекс недоступен или запрос короче трех символов.
+        """
+        backend = cls.backend()
+        if backend is None:
+            return None
+        if scope is not None:
+            scope = scope.order_by().values('product_id').query.sql_with_params()
+        return backend.search(normalize_text(query), limit or settings.SEARCH_MAX_RESULTS, scope)
@@ -0,0 +1,259 @@
+from functools import lru_cache, partial
+from django.conf import settings
+
+CATEGORY_FIELDS = ('id', 'name')
+GOODS_FIELDS = ('id', 'category', 'model', 'name', 'price', 'price_rrc', 'quantity', 'parameters')
+
+
+class FieldTypeError(ValueError):
+    """
+    Значение поля не приводится к нужному типу.
+    """
+
+
+def to_positive_int(value, max_value=None):
+    """
+    Приведение к целому неотрицательному числу: 10, "10", 10.0; не больше max_value.
+    """
+    if type(value) is int:
+        if value < 0:
+            raise FieldTypeError(positive_int_message(max_value))
+    elif isinstance(value, str) and value.strip().isdigit():
+        value = int(value.strip())
+    elif isinstance(value, float) and value.is_integer() and value >= 0:
+        value = int(value)
+    else:
+        raise FieldTypeError(positive_int_message(max_value))
+    if max_value is not None and value > max_value:
+        raise FieldTypeError(positive_int_message(max_value))
+    return value
+
+
+def positive_int_message(max_value):
+    if max_value is None:
+        return "целым неотрицательным числом"
+    return f"целым неотрицательным числом не больше {max_value}"
+
+
+def to_string(value, max_length=None):
+    """
+    Приведение скалярного значения к строке (YAML разбирает "1984" как число)
+    длиной не больше max_length.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(value)
+    elif not isinstance(value, str):
+        raise FieldTypeError(string_message(max_length))
+    if max_length is not None and len(value) > max_length:
+        raise FieldTypeError(string_message(max_length))
+    return value
+
+
+def string_message(max_length):
+    if max_length is None:
+        return "строкой"
+    return f"строкой не длиннее {max_length} символов"
+
+
+def to_mapping(value):
+    if isinstance(value, dict):
+        return value
+    if value is None:
+        return {}
+    raise FieldTypeError("словарем")
+
+
+def to_parameters(value, name_length=None, value_length=None):
+    """
+    Приведение параметров товара к словарю "название -> значение".
+
+    Названия приводятся к строкам; значения должны быть скалярами (строка,
+    число или логическое значение), строковое представление которых
+    сохраняется в ProductParameter.value.
+    """
+    parameters = {}
+    for name, parameter_value in to_mapping(value).items():
+        try:
+            name = to_string(name, name_length)
+        except FieldTypeError:
+            raise FieldTypeError(parameters_message(name_length, value_length))
+        if not isinstance(parameter_value, (str, int, float)) \
+                or (value_length is not None and len(str(parameter_value)) > value_length):
+            raise FieldTypeError(parameters_message(name_length, value_length))
+        parameters[name] = parameter_value
+    return parameters
+
+
+def parameters_message(name_length, value_length):
+    return (f"словарем, где названия - строки не длиннее {name_length} символов, "
+            f"а значения - строки или числа не длиннее {value_length} символов")
+
+
+def field_limit(model_name, field_name):
+    """
+    Ограничение поля модели: max_length строкового поля или наибольшее значение
+    целого числа. Диапазоны целых чисел берутся из BaseDatabaseOperations
+    (как в PostgreSQL), чтобы проверка не зависела от СУБД.
+    """
+    from django.apps import apps
+    from django.db.backends.base.operations import BaseDatabaseOperations
+
+    field = apps.get_model('backend', model_name)._meta.get_field(field_name)
+    if field.max_length is not None:
+        return field.max_length
+    return BaseDatabaseOperations.integer_field_ranges[field.get_internal_type()][1]
+
+
+@lru_cache(maxsize=None)
+def price_list_schemas():
+    """
+    Схемы категорий и товаров прайс-листа с ограничениями полей моделей.
+
+    Returns:
+        tuple: (схема категорий, схема товаров) - пары "поле, функция приведения".
+    """
+    category_id = partial(to_positive_int, max_value=field_limit('Category', 'id'))
+    category_schema = (
+        ('id', category_id),
+        ('name', partial(to_string, max_length=field_limit('Category', 'name'))),
+    )
+    goods_schema = (
+        ('id', partial(to_positive_int, max_value=field_limit('ProductInfo', 'external_id'))),
+        ('category', category_id),
+        ('model', partial(to_string, max_length=field_limit('ProductInfo', 'model'))),
+        ('name', partial(to_string, max_length=field_limit('Product', 'name'))),
+        ('price', partial(to_positive_int, max_value=field_limit('ProductInfo', 'price'))),
+        ('price_rrc', partial(to_positive_int, max_value=field_limit('ProductInfo', 'price_rrc'))),
+        ('quantity', partial(to_positive_int, max_value=field_limit('ProductInfo', 'quantity'))),
+        ('parameters', partial(to_parameters, name_length=field_limit('Parameter', 'name'),
+                               value_length=field_limit('ProductParameter', 'value'))),
+    )
+    return category_schema, goods_schema
+
+
+class PriceListValidator:
+    """
+    Проверка структуры прайс-листа за один проход.
+
+    Для каждой записи проверяется наличие всех обязательных полей и приводятся
+    типы (id, category, price, price_rrc и quantity - целые числа, model и name -
+    строки, parameters - словарь скалярных значений); приведенные значения
+    записываются в данные. Длина строк и диапазон чисел ограничены полями моделей
+    (см. price_list_schemas), поэтому такие ошибки находятся до записи в БД.
+    Ошибки собираются по всем строкам, но не более max_errors.
+
+    Валидатор можно вызывать последовательно для пакетов товаров: нумерация строк
+    и список категорий прайс-листа сохраняются между вызовами.
+    """
+
+    def __init__(self, max_errors=None):
+        self.category_schema, self.goods_schema = price_list_schemas()
+        self.max_errors = max_errors or settings.IMPORT_VALIDATION_MAX_ERRORS
+        self.errors = []
+        self.truncated = False
+        self.category_ids = None
+        self.goods_count = 0
+
+    def rewind(self):
+        """
+        Сброс ошибок и нумерации строк для повторного прохода по товарам.
+
+        Список категорий прайс-листа сохраняется.
+        """
+        self.errors = []
+        self.truncated = False
+        self.goods_count = 0
+
+    @property
+    def is_full(self):
+        return len(self.errors) >= self.max_errors
+
+    def validate(self, data):
+        """
+        Проверка категорий и товаров прайс-листа.
+
+        Returns:
+            bool: True, если ошибок не найдено.
+        """
+        if 'categories' in data:
+            self.validate_categories(data['categories'])
+        if 'goods' in data:
+            self.validate_goods(data['goods'])
+        return not self.errors
+
+    def validate_categories(self, categories):
+        if not isinstance(categories, list):
+            self._add_error("Поле 'categories' должно содержать список категорий")
+            return
+
+        required = frozenset(CATEGORY_FIELDS)
+        category_ids = set()
+        for number, category in enumerate(categories, start=1):
+            if self.is_full:
+                self.truncated = True
+                break
+            if not isinstance(category, dict) or not required.issubset(category):
+                self._add_error(f"Категория должна содержать поля 'id' и 'name' (категория №{number})")
+                continue
+            self._coerce(category, self.category_schema, f"категории (категория №{number})")
+            category_ids.add(category['id'])
+        self.category_ids = category_ids
+
+    def validate_goods(self, goods):
+        if not isinstance(goods, list):
+            self._add_error("Поле 'goods' должно содержать список товаров")
+            return
+
+        required = GOODS_FIELDS
+        schema = self.goods_schema
+        category_ids = self.category_ids
+        for item in goods:
+            self.goods_count += 1
+            if self.is_full:
+                self.truncated = True
+                continue
+            location = f"товар №{self.goods_count}"
+            if not isinstance(item, dict):
+                self._add_error(f"Товар должен быть словарем ({location})")
+                continue
+            if 'id' in item:
+                location += f", id={item['id']}"
+
+            missing = [field for field in required if field not in item]
+            if missing:
+                for field in missing:
+                    self._add_error(f"Товар должен содержать поле '{field}' ({location})")
+                continue
+
+            if self._coerce(item, schema, f"товара ({location})") and category_ids is not None \
+                    and item['category'] not in category_ids:
+                self._add_error(f"Категория товара {item['category']} отсутствует в прайс-листе ({location})")
+
+    def format_errors(self, limit=10):
+        """
+        Сообщение об ошибках для ответа API.
+        """
+        message = "; ".join(self.errors[:limit])
+        rest = len(self.errors) - limit
+        if rest > 0:
+            message += f"; и еще ошибок: {rest}"
+        if self.truncated:
+            message += f" (проверка остановлена после {self.max_errors} ошибок)"
+        return message
+
+    def _coerce(self, row, schema, location):
+        valid = True
+        for field, coerce in schema:
+            value = row[field]
+            try:
+                row[field] = coerce(value)
+            except FieldTypeError as e:
+                self._add_error(f"Поле '{field}' {location} должно быть {e}, получено: {value!r}")
+                valid = False
+        return valid
+
+    def _add_error(self, message):
+        if self.is_full:
+            self.truncated = True
+            return
+        self.errors.append(message)
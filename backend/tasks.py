@@ -1,7 +1,12 @@
 from celery import shared_task
 from django.core.mail import send_mail
 from django.conf import settings
+from django.db import DatabaseError
 from .services.import_service import ImportService
+from .services.import_orchestration import ImportOrchestrator, RefreshScheduler
+from .services.bulk_import import ImportProgress
+from .services.fetch import PriceListDownload
+from .services.partitioned_import import PartitionedImport
 
 
 @shared_task
@@ -112,11 +117,24 @@ def send_order_confirmation_email(order_id):
         pass
 
 
-@shared_task
-def import_shop_data_task(url, user_id):
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True,
+             autoretry_for=(DatabaseError,), retry_backoff=settings.IMPORT_TASK_RETRY_DELAY,
+             max_retries=settings.IMPORT_TASK_MAX_RETRIES)
+def import_shop_data_task(self, url, user_id):
     """
     Асинхронная задача для импорта данных магазина из внешнего источника.
 
+    Импорт выполняется под блокировкой магазина: если такой же импорт уже
+    выполняется, задача завершается и возвращает ID выполняющейся задачи.
+
+    Товары записываются пакетами с контрольной точкой. Задача подтверждается
+    брокеру только после завершения, поэтому при падении воркера она будет
+    доставлена повторно, а при ошибке БД - перезапущена; в обоих случаях
+    импорт продолжится с контрольной точки.
+
+    Во время выполнения задача находится в состоянии PROGRESS, а ее метаданные
+    содержат фазу и ход импорта (см. ImportProgress).
+
     Args:
         url (str): URL источника данных.
         user_id (int): ID пользователя-магазина.
@@ -124,10 +142,188 @@ def import_shop_data_task(url, user_id):
     Returns:
         dict: Результат импорта данных.
     """
-    result = ImportService.import_shop_data(url, user_id)
+    progress = None
+    if self.request.id:
+        progress = ImportProgress(lambda meta: self.update_state(state='PROGRESS', meta=meta))
+
+    result = ImportOrchestrator.run_locked(url, user_id, owner=self.request.id, progress=progress)
+    return result
+
+
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True,
+             autoretry_for=(DatabaseError,), retry_backoff=settings.IMPORT_TASK_RETRY_DELAY,
+             max_retries=settings.IMPORT_TASK_MAX_RETRIES)
+def import_shop_file_task(self, download, user_id):
+    """
+    Асинхронная задача для импорта прайс-листа, загруженного файлом через API.
+
+    Работает так же, как import_shop_data_task, но читает файл из IMPORT_UPLOAD_DIR
+    без сетевого запроса. Файл удаляется после завершения импорта; при повторе
+    задачи после ошибки БД или падения воркера он сохраняется.
+
+    Args:
+        download (dict): Сведения о файле (PriceListDownload.as_dict()).
+        user_id (int): ID пользователя-магазина.
+
+    Returns:
+        dict: Результат импорта данных.
+    """
+    download = PriceListDownload(**download)
+    progress = None
+    if self.request.id:
+        progress = ImportProgress(lambda meta: self.update_state(state='PROGRESS', meta=meta))
+
+    try:
+        result = ImportOrchestrator.run_upload_locked(download, user_id, owner=self.request.id, progress=progress)
+    except DatabaseError:
+        if self.request.retries >= self.max_retries:
+            download.cleanup()
+        raise
+    except Exception:
+        download.cleanup()
+        raise
+
+    download.cleanup()
     return result
 
 
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True,
+             autoretry_for=(DatabaseError,), retry_backoff=settings.IMPORT_TASK_RETRY_DELAY,
+             max_retries=settings.IMPORT_TASK_MAX_RETRIES)
+def import_partition_task(self, plan, index):
+    """
+    Запись товаров одного раздела крупного прайс-листа.
+
+    Args:
+        plan (dict): Описание импорта по разделам (PartitionedImport.split()).
+        index (int): Номер раздела.
+
+    Returns:
+        dict: Статистика раздела.
+    """
+    return PartitionedImport.import_partition(plan, index)
+
+
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True,
+             autoretry_for=(DatabaseError,), retry_backoff=settings.IMPORT_TASK_RETRY_DELAY,
+             max_retries=settings.IMPORT_TASK_MAX_RETRIES)
+def finish_partitioned_import_task(self, partition_stats, plan):
+    """
+    Завершение импорта по разделам после записи всех разделов.
+
+    Файлы разделов удаляются, а блокировка магазина снимается после завершения;
+    при повторе задачи после ошибки БД они сохраняются.
+
+    Args:
+        partition_stats (list): Результаты задач import_partition_task.
+        plan (dict): Описание импорта по разделам.
+
+    Returns:
+        dict: Результат импорта данных.
+    """
+    try:
+        result = ImportService.finish_partitioned_import(plan, partition_stats)
+    except DatabaseError as e:
+        if self.request.retries >= self.max_retries:
+            ImportOrchestrator.release_partitions(plan, {"status": False, "error": f"Ошибка при импорте: {str(e)}"})
+        raise
+    except Exception as e:
+        ImportOrchestrator.release_partitions(plan, {"status": False, "error": f"Ошибка при импорте: {str(e)}"})
+        raise
+
+    ImportOrchestrator.release_partitions(plan, result)
+    return result
+
+
+@shared_task
+def partitioned_import_failed_task(request, exc, traceback, plan):
+    """
+    Обработка ошибки задачи раздела: удаление файлов разделов и снятие блокировки магазина.
+
+    Версия каталога при этом не публикуется, а плановое обновление считается ошибкой.
+    """
+    ImportOrchestrator.release_partitions(plan, {"status": False, "error": f"Ошибка при импорте раздела: {exc}"})
+
+
+@shared_task(bind=True)
+def import_shops_lane_task(self, items):
+    """
+    Последовательный импорт прайс-листов группы магазинов (одна дорожка пакетного импорта).
+
+    Args:
+        items (list): Элементы {"shop_id", "user_id", "url"}.
+
+    Returns:
+        list: Результаты импорта по каждому магазину.
+    """
+    results = []
+    for item in items:
+        try:
+            result = ImportOrchestrator.run_locked(item['url'], item['user_id'], owner=self.request.id)
+        except Exception as e:
+            result = {"status": False, "error": f"Ошибка при импорте: {str(e)}"}
+        results.append({"shop_id": item['shop_id'], "url": item['url'], **result})
+    return results
+
+
+@shared_task
+def aggregate_import_results_task(lane_results):
+    """
+    Объединение результатов пакетного импорта.
+
+    Args:
+        lane_results (list): Результаты задач import_shops_lane_task.
+
+    Returns:
+        dict: Общий отчет пакетного импорта.
+    """
+    return ImportOrchestrator.aggregate(lane_results)
+
+
+@shared_task(bind=True)
+def refresh_shop_price_list_task(self, shop_id):
+    """
+    Плановое обновление прайс-листа магазина по сохраненному адресу.
+
+    Задачу запускает schedule_price_list_refresh_task. Результат импорта
+    учитывается в расписании магазина (RefreshScheduler.record_result),
+    а отметка запуска снимается при любом исходе, в том числе если магазин
+    удален после постановки задачи в очередь. Крупный прайс-лист импортируется
+    по разделам: отметка запуска остается до завершения chord, и результат
+    учитывает его завершающая задача.
+
+    Args:
+        shop_id (int): ID магазина.
+
+    Returns:
+        dict: Результат импорта данных.
+    """
+    from .models import Shop
+
+    result = {"status": False, "error": "Обновление прервано"}
+    try:
+        shop = Shop.objects.get(id=shop_id)
+        result = ImportOrchestrator.run_locked(shop.url, shop.user_id, owner=self.request.id, refresh=True)
+    except Shop.DoesNotExist:
+        result = {"status": True, "skipped": True, "message": "Магазин удален, обновление пропущено"}
+    except Exception as e:
+        result = {"status": False, "error": f"Ошибка при импорте: {str(e)}"}
+    finally:
+        RefreshScheduler.record_result(shop_id, result)
+    return result
+
+
+@shared_task
+def schedule_price_list_refresh_task():
+    """
+    Периодическая задача Celery beat: запуск обновления магазинов по расписанию.
+
+    Returns:
+        dict: ID запущенных магазинов и число уже выполняющихся обновлений.
+    """
+    return RefreshScheduler.dispatch()
+
+
 @shared_task
 def process_user_avatar(user_id):
     """
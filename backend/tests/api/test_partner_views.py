@@ -1,10 +1,17 @@
-from django.test import TestCase
+import gzip
+import os
+import tempfile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
 from unittest.mock import patch
 from rest_framework import status
+from backend.services.import_orchestration import ImportLock
 from backend.models import Shop, Category, Product, ProductInfo, Order, OrderItem, Contact
+from backend.tasks import import_shop_file_task
+from backend.tests.test_price_list_parsers import build_price_list
 
 
 User = get_user_model()
@@ -111,6 +118,285 @@ class PartnerUpdateViewTest(TestCase):
         self.assertFalse(response.data['status'])
         self.assertIn('Только пользователи с типом \'магазин\'', response.data['error'])
 
+    @patch('backend.tasks.import_shop_data_task.delay')
+    def test_update_price_list_already_running(self, mock_import_shop_data_task):
+        """
+        Тестирование повторного запроса во время выполняющегося импорта магазина.
+        """
+        lock = ImportLock(self.shop_user.id, owner='running-task-id')
+        lock.acquire()
+        self.client.force_authenticate(user=self.shop_user)
+
+        try:
+            response = self.client.post(
+                '/api/v1/partner/update',
+                {'url': 'https://example.com/shop1.yaml'},
+                format='json'
+            )
+        finally:
+            lock.release()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['coalesced'])
+        self.assertEqual(response.data['task_id'], 'running-task-id')
+        mock_import_shop_data_task.assert_not_called()
+
+
+class PartnerBatchUpdateViewTest(TestCase):
+    """
+    Тестирование представления для пакетного обновления прайс-листов.
+    """
+
+    def setUp(self):
+        """
+        Подготовка тестовых данных.
+        """
+        self.client = APIClient()
+        self.admin_user = User.objects.create_user(
+            email='admin@example.com',
+            password='password123',
+            is_active=True,
+            is_staff=True
+        )
+        self.shop_user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+        self.shop = Shop.objects.create(
+            name='Test Shop',
+            user=self.shop_user,
+            url='https://example.com/shop1.yaml'
+        )
+
+    @patch('backend.services.import_orchestration.ImportOrchestrator.start_batch')
+    def test_batch_update_success(self, mock_start_batch):
+        """
+        Тестирование запуска пакетного импорта администратором.
+        """
+        mock_start_batch.return_value.id = 'batch-task-id'
+        self.client.force_authenticate(user=self.admin_user)
+
+        response = self.client.post(
+            '/api/v1/partner/update/batch',
+            {'shops': [{'shop_id': self.shop.id}, {'shop_id': 999999}], 'concurrency': 2},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['status'])
+        self.assertEqual(response.data['task_id'], 'batch-task-id')
+        self.assertEqual(len(response.data['errors']), 1)
+        mock_start_batch.assert_called_once_with(
+            [{'shop_id': self.shop.id, 'user_id': self.shop_user.id, 'url': 'https://example.com/shop1.yaml'}],
+            concurrency=2
+        )
+
+    def test_batch_update_not_staff(self):
+        """
+        Тестирование попытки пакетного импорта пользователем без прав администратора.
+        """
+        self.client.force_authenticate(user=self.shop_user)
+
+        response = self.client.post(
+            '/api/v1/partner/update/batch',
+            {'shops': [{'shop_id': self.shop.id}]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(response.data['status'])
+
+    def test_batch_update_without_shops(self):
+        """
+        Тестирование пакетного импорта без списка магазинов.
+        """
+        self.client.force_authenticate(user=self.admin_user)
+
+        response = self.client.post('/api/v1/partner/update/batch', {'shops': []}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Необходимо указать список магазинов', response.data['error'])
+
+
+class PartnerUploadViewTest(TestCase):
+    """
+    Тестирование представления для загрузки файла прайс-листа.
+    """
+
+    def setUp(self):
+        """
+        Подготовка тестовых данных.
+        """
+        self.client = APIClient()
+        self.shop_user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+        self.upload_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.upload_dir.cleanup)
+        settings_override = override_settings(IMPORT_UPLOAD_DIR=self.upload_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def upload(self, content, name='price.yaml.gz'):
+        self.client.force_authenticate(user=self.shop_user)
+        return self.client.post(
+            '/api/v1/partner/update/upload',
+            {'file': SimpleUploadedFile(name, content, content_type='application/gzip')},
+            format='multipart'
+        )
+
+    @patch('backend.tasks.import_shop_file_task.delay')
+    def test_upload_gzip_and_import(self, mock_import_shop_file_task):
+        """
+        Тестирование загрузки сжатого прайс-листа и его импорта из локального файла.
+        """
+        mock_import_shop_file_task.return_value.id = 'upload-task-id'
+        content = build_price_list(10)
+
+        with patch('backend.services.fetch.PriceListFetcher.get_session') as mock_get_session:
+            response = self.upload(gzip.compress(content))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['task_id'], 'upload-task-id')
+
+            # Файл распакован в каталог загрузок
+            download, user_id = mock_import_shop_file_task.call_args.args
+            self.assertEqual(user_id, self.shop_user.id)
+            self.assertEqual(os.path.dirname(download['path']), self.upload_dir.name)
+            with open(download['path'], 'rb') as file:
+                self.assertEqual(file.read(), content)
+
+            # Задача импортирует файл без HTTP-запросов и удаляет его
+            result = import_shop_file_task.run(download, user_id)
+            mock_get_session.assert_not_called()
+
+        self.assertTrue(result['status'], result.get('error'))
+        self.assertEqual(ProductInfo.objects.filter(shop__user=self.shop_user).count(), 10)
+        self.assertFalse(os.path.exists(download['path']))
+        shop = Shop.objects.get(user=self.shop_user)
+        self.assertIsNone(shop.url)
+
+    def test_upload_without_file(self):
+        """
+        Тестирование запроса без файла.
+        """
+        self.client.force_authenticate(user=self.shop_user)
+
+        response = self.client.post('/api/v1/partner/update/upload', {}, format='multipart')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.data['status'])
+
+    def test_upload_buyer(self):
+        """
+        Тестирование загрузки прайс-листа покупателем.
+        """
+        self.shop_user.type = 'buyer'
+        self.shop_user.save()
+
+        response = self.upload(gzip.compress(build_price_list(1)))
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_upload_corrupted_gzip(self):
+        """
+        Тестирование загрузки поврежденного gzip-архива: файл не сохраняется.
+        """
+        response = self.upload(gzip.compress(build_price_list(50))[:200])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('gzip', response.data['error'])
+        self.assertEqual(os.listdir(self.upload_dir.name), [])
+
+    @override_settings(IMPORT_MAX_SIZE=1000)
+    def test_upload_max_size(self):
+        """
+        Тестирование ограничения размера распакованного прайс-листа.
+        """
+        response = self.upload(gzip.compress(build_price_list(50)))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('превышает допустимый', response.data['error'])
+        self.assertEqual(os.listdir(self.upload_dir.name), [])
+
+    @patch('backend.tasks.import_shop_file_task.delay')
+    def test_upload_import_already_running(self, mock_import_shop_file_task):
+        """
+        Тестирование загрузки во время выполняющегося импорта магазина.
+        """
+        lock = ImportLock(self.shop_user.id, owner='running-task-id')
+        lock.acquire()
+        self.addCleanup(lock.release)
+
+        response = self.upload(gzip.compress(build_price_list(1)))
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['task_id'], 'running-task-id')
+        mock_import_shop_file_task.assert_not_called()
+
+
+class PartnerCatalogRollbackViewTest(TestCase):
+    """
+    Тестирование представления для отката каталога магазина.
+    """
+
+    def setUp(self):
+        """
+        Подготовка тестовых данных.
+        """
+        self.client = APIClient()
+        self.shop_user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+        self.shop = Shop.objects.create(
+            name='Test Shop', user=self.shop_user, catalog_version=2, previous_catalog_version=1
+        )
+        self.client.force_authenticate(user=self.shop_user)
+
+    def test_rollback(self):
+        """
+        Тестирование успешного отката каталога.
+        """
+        response = self.client.post('/api/v1/partner/catalog/rollback')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['catalog_version'], 1)
+        self.shop.refresh_from_db()
+        self.assertEqual((self.shop.catalog_version, self.shop.previous_catalog_version), (1, 2))
+
+    def test_rollback_without_previous_version(self):
+        """
+        Тестирование отката, когда предыдущей версии каталога нет.
+        """
+        Shop.objects.filter(id=self.shop.id).update(previous_catalog_version=None)
+
+        response = self.client.post('/api/v1/partner/catalog/rollback')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.data['status'])
+
+    def test_rollback_import_running(self):
+        """
+        Тестирование отката во время выполняющегося импорта магазина.
+        """
+        lock = ImportLock(self.shop_user.id, owner='running-task-id')
+        lock.acquire()
+        self.addCleanup(lock.release)
+
+        response = self.client.post('/api/v1/partner/catalog/rollback')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['task_id'], 'running-task-id')
+        self.shop.refresh_from_db()
+        self.assertEqual(self.shop.catalog_version, 2)
+
 
 class PartnerViewsTestCase(TestCase):
     """
@@ -0,0 +1,173 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from backend.models import Shop, Category, Product, ProductInfo
+from backend.services.import_service import ImportService
+
+User = get_user_model()
+
+
+@override_settings(CATALOG_CACHE_ENABLED=True, IMPORT_MODE='incremental')
+class CatalogResponseCacheTestCase(TestCase):
+    """
+    Тесты кэша ответов каталога.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+        self.shop = Shop.objects.create(name='Shop', user=self.user, state=True)
+        self.other_shop = Shop.objects.create(name='Other Shop', state=True)
+        self.category = Category.objects.create(id=1, name='Смартфоны')
+        product = Product.objects.create(name='Смартфон', category=self.category)
+        self.product_info = ProductInfo.objects.create(product=product, shop=self.shop, model='model',
+                                                       external_id=1, price=100, price_rrc=120, quantity=5)
+        self.other_product_info = ProductInfo.objects.create(product=product, shop=self.other_shop, model='model',
+                                                             external_id=1, price=110, price_rrc=120, quantity=5)
+
+    def import_price(self, price):
+        ImportService.import_products({'goods': [{
+            'id': 1, 'category': 1, 'model': 'model', 'name': 'Смартфон',
+            'price': price, 'price_rrc': 120, 'quantity': 5, 'parameters': {},
+        }]}, self.shop)
+
+    def test_cache_hit_without_queries(self):
+        """
+        Тестирование ответа из кэша без запросов к БД; порядок параметров не влияет на ключ.
+        """
+        first = self.client.get('/api/v1/products', {'shop_id': self.shop.id, 'page_size': 10})
+
+        with self.assertNumQueries(0):
+            second = self.client.get(f'/api/v1/products?page_size=10&shop_id={self.shop.id}')
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertIn('Last-Modified', second)
+
+    def test_not_modified(self):
+        """
+        Тестирование ответа 304 на If-None-Match и If-Modified-Since.
+        """
+        url = f'/api/v1/products/{self.product_info.id}'
+        response = self.client.get(url)
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+        not_modified = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        modified = self.client.get(url, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+
+    def test_import_invalidates_shop(self):
+        """
+        Тестирование сброса ответов магазина импортом; ответы другого магазина остаются в кэше.
+        """
+        shop_url = f'/api/v1/products?shop_id={self.shop.id}'
+        other_url = f'/api/v1/products?shop_id={self.other_shop.id}'
+        etag = self.client.get(shop_url)['ETag']
+        self.client.get(other_url)
+        self.client.get('/api/v1/products')
+
+        self.import_price(90)
+
+        response = self.client.get(shop_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['price'], 90)
+        self.assertNotEqual(response['ETag'], etag)
+        with self.assertNumQueries(0):
+            self.client.get(other_url)
+        self.assertEqual(sorted(item['price'] for item in self.client.get('/api/v1/products').data['results']),
+                         [90, 110])
+
+    def test_unchanged_import_keeps_cache(self):
+        """
+        Тестирование повторного импорта без изменений: кэш не сбрасывается.
+        """
+        self.import_price(100)
+        etag = self.client.get(f'/api/v1/products/{self.product_info.id}')['ETag']
+
+        self.import_price(100)
+
+        response = self.client.get(f'/api/v1/products/{self.product_info.id}', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_shop_state_invalidates(self):
+        """
+        Тестирование сброса кэша при выключении магазина.
+        """
+        self.client.get('/api/v1/products')
+        self.client.get(f'/api/v1/products/{self.product_info.id}')
+
+        self.client.force_authenticate(user=self.user)
+        self.client.post('/api/v1/partner/state', {'state': 'off'})
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(self.client.get('/api/v1/products').data['count'], 1)
+        self.assertEqual(self.client.get(f'/api/v1/products/{self.product_info.id}').status_code,
+                         status.HTTP_404_NOT_FOUND)
+
+    def test_delete_invalidates(self):
+        """
+        Тестирование сброса кэша и ETag при удалении товара магазина, товара, категории и магазина.
+        """
+        detail_url = f'/api/v1/products/{self.product_info.id}'
+        for delete, count in (
+            (lambda: self.other_product_info.delete(), 1),
+            (lambda: self.product_info.product.delete(), 0),
+        ):
+            response = self.client.get('/api/v1/products')
+            detail = self.client.get(detail_url)
+            delete()
+            self.assertEqual(self.client.get('/api/v1/products').data['count'], count)
+            self.assertNotEqual(
+                self.client.get('/api/v1/products', HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+                status.HTTP_304_NOT_MODIFIED
+            )
+        self.assertEqual(detail.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(detail_url).status_code, status.HTTP_404_NOT_FOUND)
+
+        for delete in (lambda: self.category.delete(), lambda: self.shop.delete()):
+            category = Category.objects.get_or_create(id=1, name='Смартфоны')[0]
+            product = Product.objects.create(name='Планшет', category=category)
+            product_info = ProductInfo.objects.create(product=product, shop=self.shop, model='model',
+                                                      external_id=2, price=100, price_rrc=120, quantity=5)
+            url = f'/api/v1/products/{product_info.id}'
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            self.assertEqual(self.client.get('/api/v1/products').data['count'], 1)
+
+            delete()
+
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+            self.assertEqual(self.client.get('/api/v1/products').data['count'], 0)
+
+    def test_errors_not_cached(self):
+        """
+        Тестирование ответов с ошибкой: они не кэшируются и не содержат ETag.
+        """
+        response = self.client.get('/api/v1/products', {'ordering': 'unknown'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn('ETag', response)
+
+    @override_settings(CATALOG_CACHE_ENABLED=False)
+    def test_disabled(self):
+        """
+        Тестирование отключенного кэша.
+        """
+        self.client.get('/api/v1/products')
+        response = self.client.get('/api/v1/products')
+
+        self.assertNotIn('ETag', response)
@@ -0,0 +1,95 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from backend.models import Shop, Category, Product, ProductInfo, Parameter, ProductParameter
+
+
+class ProductFieldsTestCase(TestCase):
+    """
+    Тесты выбора полей ответа (fields) и развертывания вложенных объектов (expand) каталога.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.shop = Shop.objects.create(name='Shop', url='https://shop.example.com/price.yaml', state=True)
+        self.category = Category.objects.create(name='Смартфоны')
+        self.product = Product.objects.create(name='Смартфон Apple iPhone XS', category=self.category)
+        self.product_info = ProductInfo.objects.create(product=self.product, shop=self.shop, model='apple/xs',
+                                                       external_id=1, price=100, price_rrc=120, quantity=5)
+        ProductParameter.objects.create(product_info=self.product_info,
+                                        parameter=Parameter.objects.create(name='Цвет'), value='черный')
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, queries[-1]['sql']
+
+    def test_fields(self):
+        """
+        Тестирование выбранных полей: в запросе только их столбцы, product и shop возвращаются как id.
+        """
+        response, sql = self.get('/api/v1/products', {'fields': 'id,price,product,shop'})
+        full = self.client.get('/api/v1/products')
+
+        self.assertEqual(response.data['results'], [
+            {'id': self.product_info.id, 'product': self.product.id, 'shop': self.shop.id, 'price': 100}
+        ])
+        self.assertNotIn('"parameters"', sql)
+        self.assertNotIn('"product_name"', sql)
+        self.assertLess(len(response.content), len(full.content))
+
+    def test_expand(self):
+        """
+        Тестирование развертывания вложенных объектов.
+        """
+        response, sql = self.get('/api/v1/products', {'fields': 'id,product', 'expand': 'product'})
+        self.assertEqual(response.data['results'][0]['product'], {
+            'id': self.product.id, 'name': self.product.name, 'category': self.category.id, 'image': None,
+        })
+        self.assertNotIn('"category_name"', sql)
+
+        response, _ = self.get('/api/v1/products', {'expand': 'product.category,shop'})
+        item = response.data['results'][0]
+        self.assertNotIn('product_parameters', item)
+        self.assertEqual(item['product']['category'], {'id': self.category.id, 'name': self.category.name})
+        self.assertEqual(item['shop']['name'], self.shop.name)
+
+        response, sql = self.get('/api/v1/products', {'fields': 'id', 'expand': 'product_parameters'})
+        self.assertEqual(response.data['results'][0]['product_parameters'][0]['value'], 'черный')
+        self.assertIn('"parameters"', sql)
+
+    def test_detail(self):
+        """
+        Тестирование выбора полей в карточке товара.
+        """
+        response, _ = self.get(f'/api/v1/products/{self.product_info.id}', {'fields': 'price,quantity'})
+
+        self.assertEqual(response.data, {'quantity': 5, 'price': 100})
+
+    def test_cursor_pagination(self):
+        """
+        Тестирование курсорной пагинации без поля id в ответе.
+        """
+        ProductInfo.objects.create(product=self.product, shop=self.shop, model='apple/xs', external_id=2,
+                                   price=200, price_rrc=220, quantity=5)
+
+        first = self.client.get('/api/v1/products', {'pagination': 'cursor', 'page_size': 1, 'fields': 'price'})
+        second = self.client.get(first.data['next'])
+
+        self.assertEqual(first.data['results'], [{'price': 100}])
+        self.assertEqual(second.data['results'], [{'price': 200}])
+
+    def test_invalid(self):
+        """
+        Тестирование неизвестного поля и недопустимого значения expand.
+        """
+        for params in ({'fields': 'id,secret'}, {'expand': 'user'}):
+            response = self.client.get('/api/v1/products', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertFalse(response.data['status'])
+
+        response = self.client.get(f'/api/v1/products/{self.product_info.id}', {'fields': 'secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
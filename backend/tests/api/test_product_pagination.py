@@ -0,0 +1,133 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from backend.models import Shop, Category, Product, ProductInfo
+from backend.services.catalog import CatalogReadModel
+
+
+class ProductCursorPaginationTestCase(TestCase):
+    """
+    Тесты курсорной пагинации списка товаров.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.shop = Shop.objects.create(name='Shop', state=True)
+        category = Category.objects.create(name='Category')
+        product = Product.objects.create(name='Product', category=category)
+        self.product_infos = [
+            ProductInfo.objects.create(product=product, shop=self.shop, model=f'Model {index}',
+                                       external_id=index, price=100 + index, price_rrc=120, quantity=1)
+            for index in range(25)
+        ]
+
+    def walk(self, params):
+        """
+        Обход всех страниц по ссылкам next.
+
+        Returns:
+            tuple: (id товаров по порядку, ответы страниц).
+        """
+        response = self.client.get('/api/v1/products', params)
+        pages = [response]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            pages.append(response)
+        return [item['id'] for page in pages for item in page.data['results']], pages
+
+    def test_cursor_walk(self):
+        """
+        Тестирование обхода каталога курсором: все товары по одному разу, без count.
+        """
+        ids, pages = self.walk({'pagination': 'cursor', 'page_size': 10})
+
+        self.assertEqual(ids, [product_info.id for product_info in self.product_infos])
+        self.assertEqual(len(pages), 3)
+        self.assertNotIn('count', pages[0].data)
+        self.assertIsNone(pages[0].data['previous'])
+        self.assertIn('cursor=', pages[1].data['previous'])
+
+    def test_descending_order(self):
+        """
+        Тестирование курсора по ключу сортировки -id.
+        """
+        ids, _ = self.walk({'pagination': 'cursor', 'page_size': 10, 'ordering': '-id'})
+
+        self.assertEqual(ids, [product_info.id for product_info in reversed(self.product_infos)])
+
+    def test_ties_beyond_offset_cutoff(self):
+        """
+        Тестирование обхода больше 1000 товаров с одинаковой ценой в обе стороны.
+        """
+        product = self.product_infos[0].product
+        ProductInfo.objects.bulk_create([
+            ProductInfo(product=product, shop=self.shop, model=f'Tie {index}', external_id=1000 + index,
+                        price=100, price_rrc=120, quantity=0)
+            for index in range(1300)
+        ])
+        CatalogReadModel.refresh_shop(self.shop)
+        expected = list(ProductInfo.objects.order_by('price', 'id').values_list('id', flat=True))
+
+        ids, pages = self.walk({'pagination': 'cursor', 'page_size': 100, 'ordering': 'price'})
+        self.assertEqual(ids, expected)
+
+        ids, _ = self.walk({'pagination': 'cursor', 'page_size': 100, 'ordering': '-quantity'})
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(ids), len(expected))
+
+        # Обратный обход по ссылкам previous от последней страницы
+        response, previous = pages[-1], []
+        while response.data['previous']:
+            response = self.client.get(response.data['previous'])
+            previous = [item['id'] for item in response.data['results']] + previous
+        self.assertEqual(previous + [item['id'] for item in pages[-1].data['results']], expected)
+
+    def test_invalid_cursor(self):
+        """
+        Тестирование поврежденного курсора.
+        """
+        response = self.client.get('/api/v1/products', {'pagination': 'cursor', 'cursor': 'cD1bMSwyXQ=='})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_no_count_query(self):
+        """
+        Тестирование отсутствия COUNT и OFFSET в запросах курсорной пагинации.
+        """
+        first = self.client.get('/api/v1/products', {'pagination': 'cursor', 'page_size': 10})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(first.data['next'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sql = ' '.join(query['sql'] for query in queries.captured_queries).upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_count_on_request(self):
+        """
+        Тестирование подсчета количества по явному запросу count=true.
+        """
+        response = self.client.get('/api/v1/products', {'pagination': 'cursor', 'count': 'true'})
+
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_page_number_mode_unchanged(self):
+        """
+        Тестирование постраничной пагинации по умолчанию.
+        """
+        response = self.client.get('/api/v1/products', {'page': 2, 'page_size': 10})
+
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(response.data['results'][0]['id'], self.product_infos[10].id)
+
+    def test_invalid_ordering(self):
+        """
+        Тестирование неподдерживаемого ключа сортировки.
+        """
+        response = self.client.get('/api/v1/products', {'ordering': 'shop__user__password'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['status'])
@@ -0,0 +1,99 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from backend.models import Shop, Category, Product, ProductInfo
+
+
+class ProductSortingTestCase(TestCase):
+    """
+    Тесты фильтров по цене и наличию и сортировок каталога.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.shop = Shop.objects.create(name='Shop', state=True)
+        self.category = Category.objects.create(name='Смартфоны')
+        for external_id, name, price, quantity in (
+            (1, 'Смартфон Samsung Galaxy S10', 300, 0),
+            (2, 'Смартфон Apple iPhone XS', 100, 7),
+            (3, 'Смартфон Xiaomi Redmi Note', 200, 3),
+            (4, 'Смартфон Huawei P30', 200, 12),
+        ):
+            product = Product.objects.create(name=name, category=self.category)
+            ProductInfo.objects.create(product=product, shop=self.shop, model=f'model/{external_id}',
+                                       external_id=external_id, price=price, price_rrc=price, quantity=quantity)
+
+    def external_ids(self, params):
+        response = self.client.get('/api/v1/products', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['external_id'] for item in response.data['results']]
+
+    def test_ordering(self):
+        """
+        Тестирование сортировок; одинаковые значения упорядочены по id.
+        """
+        self.assertEqual(self.external_ids({'ordering': 'price'}), [2, 3, 4, 1])
+        self.assertEqual(self.external_ids({'ordering': '-price'}), [1, 4, 3, 2])
+        self.assertEqual(self.external_ids({'ordering': 'name'}), [2, 4, 1, 3])
+        self.assertEqual(self.external_ids({'ordering': '-quantity'}), [4, 2, 3, 1])
+
+    def test_filters(self):
+        """
+        Тестирование диапазона цены (включительно) и наличия.
+        """
+        self.assertEqual(self.external_ids({'min_price': 200, 'ordering': 'price'}), [3, 4, 1])
+        self.assertEqual(self.external_ids({'min_price': 150, 'max_price': 200, 'ordering': 'price'}), [3, 4])
+        self.assertEqual(self.external_ids({'in_stock': 'true', 'ordering': '-price'}), [4, 3, 2])
+
+        response = self.client.get('/api/v1/products', {'min_price': 'дешево'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['status'])
+
+    def test_cursor_pagination(self):
+        """
+        Тестирование курсорной пагинации по цене с одинаковыми ценами.
+        """
+        params = {'pagination': 'cursor', 'page_size': 2, 'ordering': 'price'}
+        first = self.client.get('/api/v1/products', params)
+        second = self.client.get(first.data['next'])
+
+        pages = [[item['external_id'] for item in page.data['results']] for page in (first, second)]
+        self.assertEqual(pages, [[2, 3], [4, 1]])
+        self.assertIsNone(second.data['next'])
+
+    def query_plan(self, params):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/v1/products', {'pagination': 'cursor', **params})
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {queries[-1]['sql']}")
+            return ' '.join(row[-1] for row in cursor.fetchall())
+
+    def test_query_plans(self):
+        """
+        Тестирование планов запросов: каждая комбинация фильтров и сортировки читается по индексу.
+
+        Без фильтра по другому столбцу сортировка берется из индекса без отдельной сортировки;
+        с диапазоном по цене или наличию планировщик может выбрать индекс фильтра.
+        """
+        if connection.vendor != 'sqlite':
+            self.skipTest('Планы запросов проверяются для SQLite')
+        scopes = {
+            'state': {},
+            'shop': {'shop_id': self.shop.id},
+            'category': {'category_id': self.category.id},
+        }
+        orderings = {'price': 'price', '-price': 'price', 'name': 'name', '-quantity': 'quantity'}
+        filters = {None: {}, 'price': {'min_price': 100, 'max_price': 250}, 'quantity': {'in_stock': 'true'}}
+        for scope, scope_params in scopes.items():
+            for ordering, index in orderings.items():
+                for filter_index, filter_params in filters.items():
+                    params = {**scope_params, **filter_params, 'ordering': ordering}
+                    with self.subTest(**params):
+                        plan = self.query_plan(params)
+                        if filter_index in (None, index):
+                            self.assertIn(f'USING INDEX catalog_item_{scope}_{index}', plan)
+                            self.assertNotIn('TEMP B-TREE', plan)
+                        else:
+                            self.assertRegex(plan, rf'USING INDEX catalog_item_{scope}_({index}|{filter_index})')
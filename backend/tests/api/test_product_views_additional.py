@@ -186,7 +186,7 @@ class ProductDetailViewAdditionalTestCase(TestCase):
             external_id=1, price=100, price_rrc=120, quantity=10
         )
 
-    @patch('backend.api.views.product_views.ProductInfo.objects')
+    @patch('backend.api.views.product_views.CatalogItem.objects')
     def test_product_detail_exception_handling(self, mock_product_info):
         """
         Тестирование обработки исключений в ProductDetailView.
@@ -0,0 +1,202 @@
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from backend.api.serializers import ProductInfoSerializer
+from backend.models import Shop, Category, Product, ProductInfo, Parameter, ProductParameter, CatalogItem
+from backend.services.import_service import ImportService
+
+User = get_user_model()
+
+
+def build_data(goods, categories=None):
+    """
+    Данные прайс-листа из списка (id, название, цена, параметры).
+    """
+    return {
+        'categories': categories or [{'id': 1, 'name': 'Смартфоны'}],
+        'goods': [{
+            'id': external_id, 'category': 1, 'model': f'model/{external_id}', 'name': name,
+            'price': price, 'price_rrc': price + 10, 'quantity': 5, 'parameters': parameters,
+        } for external_id, name, price, parameters in goods],
+    }
+
+
+GOODS = [
+    (1, 'Смартфон Apple iPhone XS', 100, {'Цвет': 'черный', 'Память': 64}),
+    (2, 'Смартфон Samsung Galaxy S10', 200, {'Цвет': 'белый'}),
+]
+
+
+class CatalogReadModelTestCase(TestCase):
+    """
+    Тесты витрины каталога (CatalogItem).
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.shop = Shop.objects.create(name='Shop', url='https://shop.example.com/price.yaml', state=True)
+        self.category = Category.objects.create(name='Смартфоны')
+        self.product = Product.objects.create(name='Смартфон Apple iPhone XS', category=self.category)
+        self.product_info = ProductInfo.objects.create(product=self.product, shop=self.shop, model='apple/xs',
+                                                       external_id=1, price=100, price_rrc=120, quantity=5)
+        for name, value in (('Цвет', 'черный'), ('Память', '64')):
+            ProductParameter.objects.create(product_info=self.product_info,
+                                            parameter=Parameter.objects.create(name=name), value=value)
+
+    def test_same_response_as_product_info(self):
+        """
+        Тестирование ответа из витрины: он совпадает с сериализацией ProductInfo.
+        """
+        expected = ProductInfoSerializer(ProductInfo.objects.get(pk=self.product_info.pk)).data
+
+        list_response = self.client.get('/api/v1/products')
+        detail_response = self.client.get(f'/api/v1/products/{self.product_info.pk}')
+
+        self.assertEqual(list_response.data['results'], [expected])
+        self.assertEqual(detail_response.data, expected)
+
+    def test_single_query(self):
+        """
+        Тестирование чтения списка и карточки товара одним запросом без JOIN.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/v1/products', {'pagination': 'cursor', 'category_id': self.category.id})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('JOIN', queries[0]['sql'])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/api/v1/products/{self.product_info.pk}')
+        self.assertEqual(len(queries), 1)
+
+    def test_orm_changes(self):
+        """
+        Тестирование обновления витрины при сохранении моделей через ORM.
+        """
+        self.product.name = 'Смартфон Apple iPhone XS Max'
+        self.product.save()
+        self.category.name = 'Телефоны'
+        self.category.save()
+        self.product_info.price = 90
+        self.product_info.save()
+        parameter = ProductParameter.objects.get(parameter__name='Цвет')
+        parameter.value = 'золотой'
+        parameter.save()
+
+        data = self.client.get(f'/api/v1/products/{self.product_info.pk}').data
+        self.assertEqual(data['product']['name'], 'Смартфон Apple iPhone XS Max')
+        self.assertEqual(data['product']['category']['name'], 'Телефоны')
+        self.assertEqual(data['price'], 90)
+        self.assertEqual(data['product_parameters'][0]['value'], 'золотой')
+
+    def test_stock_change(self):
+        """
+        Тестирование списания остатка: обновляется только количество в витрине, без поискового индекса.
+        """
+        product_info = ProductInfo.objects.get(pk=self.product_info.pk)
+        product_info.quantity -= 2
+        with CaptureQueriesContext(connection) as queries:
+            product_info.save(update_fields=['quantity'])
+
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('backend_product_search', ' '.join(query['sql'] for query in queries.captured_queries))
+        self.assertEqual(CatalogItem.objects.get().quantity, 3)
+        self.assertEqual(self.client.get(f'/api/v1/products/{self.product_info.pk}').data['quantity'], 3)
+
+        # Без update_fields изменившиеся поля определяются по значениям, загруженным из БД
+        product_info.quantity = 10
+        with CaptureQueriesContext(connection) as queries:
+            product_info.save()
+        self.assertNotIn('backend_product_search', ' '.join(query['sql'] for query in queries.captured_queries))
+        self.assertEqual(CatalogItem.objects.get().quantity, 10)
+
+    def test_shop_state(self):
+        """
+        Тестирование скрытия товаров при выключении магазина.
+        """
+        self.shop.state = False
+        self.shop.save()
+
+        self.assertFalse(CatalogItem.objects.get().shop_state)
+        self.assertEqual(self.client.get('/api/v1/products').data['count'], 0)
+        self.assertEqual(self.client.get(f'/api/v1/products/{self.product_info.pk}').status_code, 404)
+
+    def test_deleted_product_info(self):
+        """
+        Тестирование удаления строки витрины вместе с товаром магазина.
+        """
+        self.product_info.delete()
+
+        self.assertFalse(CatalogItem.objects.exists())
+
+    def test_rebuild(self):
+        """
+        Тестирование пересборки витрины командой rebuild_catalog.
+        """
+        CatalogItem.objects.all().delete()
+        output = StringIO()
+        call_command('rebuild_catalog', stdout=output)
+
+        self.assertIn('1 items', output.getvalue())
+        self.assertEqual(self.client.get('/api/v1/products').data['count'], 1)
+
+
+class CatalogReadModelImportTestCase(TestCase):
+    """
+    Тесты обновления витрины каталога импортом прайс-листа.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+        self.shop = Shop.objects.create(name='Shop', user=user, state=True)
+
+    def import_data(self, data):
+        ImportService.import_categories(data, self.shop)
+        ImportService.import_products(data, self.shop)
+        self.shop.refresh_from_db()
+
+    def catalog(self):
+        return {
+            item.external_id: (item.price, item.category_name, [parameter['value'] for parameter in item.parameters])
+            for item in CatalogItem.objects.all()
+        }
+
+    @override_settings(IMPORT_MODE='incremental')
+    def test_incremental_import(self):
+        """
+        Тестирование витрины при импорте в режиме incremental: изменения, удаление, переименование категории.
+        """
+        self.import_data(build_data(GOODS))
+        self.assertEqual(self.catalog(), {1: (100, 'Смартфоны', ['черный', '64']), 2: (200, 'Смартфоны', ['белый'])})
+
+        self.import_data(build_data(
+            [(1, GOODS[0][1], 100, {'Цвет': 'черный'})],
+            categories=[{'id': 1, 'name': 'Телефоны'}],
+        ))
+        self.assertEqual(self.catalog(), {1: (100, 'Телефоны', ['черный'])})
+
+    @override_settings(IMPORT_MODE='replace')
+    def test_replace_import_and_rollback(self):
+        """
+        Тестирование витрины при публикации версии каталога и откате.
+        """
+        self.import_data(build_data(GOODS))
+        self.import_data(build_data([(1, GOODS[0][1], 150, GOODS[0][3])]))
+
+        self.assertEqual(self.catalog(), {1: (150, 'Смартфоны', ['черный', '64'])})
+        self.assertEqual(
+            CatalogItem.objects.get().pk,
+            ProductInfo.objects.filter(shop=self.shop).live().get().pk
+        )
+
+        ImportService.rollback_catalog(self.shop)
+        self.assertEqual(self.catalog(), {1: (100, 'Смартфоны', ['черный', '64']), 2: (200, 'Смартфоны', ['белый'])})
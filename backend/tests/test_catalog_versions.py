@@ -0,0 +1,158 @@
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from backend.models import Shop, ShopImportState, ProductInfo, Order, OrderItem
+from backend.services.bulk_import import BulkProductImporter
+from backend.services.fetch import PriceListDownload
+from backend.services.import_service import ImportService
+from backend.tests.test_price_list_parsers import build_price_list
+
+User = get_user_model()
+
+
+@override_settings(IMPORT_MODE='replace', IMPORT_STREAM_THRESHOLD=0, IMPORT_CHUNK_SIZE=5)
+class CatalogVersionTestCase(TestCase):
+    """
+    Тесты версионирования каталога магазина при импорте в режиме replace.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+
+    def import_price_list(self, content):
+        download = PriceListDownload.from_bytes(content)
+        with patch('backend.services.import_service.ImportService.fetch_price_list',
+                   return_value=(True, download)):
+            return ImportService.import_shop_data('https://example.com/data.yaml', self.user.id)
+
+    def catalog_prices(self):
+        response = self.client.get('/api/v1/products', {'page_size': 100})
+        return sorted(item['price'] for item in response.data['results'])
+
+    def test_readers_see_live_version_during_import(self):
+        """
+        Тестирование чтения каталога во время импорта: покупатели видят предыдущую версию целиком.
+        """
+        self.import_price_list(build_price_list(12))
+        old_prices = self.catalog_prices()
+        write_goods = BulkProductImporter._replace_goods
+        seen_during_import = []
+
+        def write_and_read(importer, goods):
+            write_goods(importer, goods)
+            seen_during_import.append(self.catalog_prices())
+
+        content = build_price_list(12).replace(b"    price: 100\n", b"    price: 999\n")
+        with patch.object(BulkProductImporter, '_replace_goods', write_and_read):
+            result = self.import_price_list(content)
+
+        self.assertTrue(result['status'])
+        self.assertEqual(seen_during_import, [old_prices] * 3)
+        self.assertIn(999, self.catalog_prices())
+        self.assertEqual(len(self.catalog_prices()), 12)
+
+        shop = Shop.objects.get(name='Test Shop')
+        self.assertEqual((shop.catalog_version, shop.previous_catalog_version), (2, 1))
+
+    def test_old_versions_pruned_except_ordered(self):
+        """
+        Тестирование удаления устаревших версий с сохранением строк, на которые ссылаются заказы.
+        """
+        self.import_price_list(build_price_list(3))
+        ordered = ProductInfo.objects.get(external_id=1)
+        order = Order.objects.create(user=self.user, state='new')
+        OrderItem.objects.create(order=order, product_info=ordered, quantity=1)
+
+        self.import_price_list(build_price_list(3).replace(b"quantity: 5", b"quantity: 6"))
+        result = self.import_price_list(build_price_list(3).replace(b"quantity: 5", b"quantity: 7"))
+
+        self.assertEqual(result['stats']['deleted'], 2)
+        self.assertEqual(
+            sorted(ProductInfo.objects.values_list('catalog_version', flat=True)), [1, 2, 2, 2, 3, 3, 3]
+        )
+        self.assertTrue(OrderItem.objects.filter(product_info=ordered).exists())
+
+    def test_rollback(self):
+        """
+        Тестирование отката к предыдущей версии и повторного отката к отмененной.
+        """
+        self.import_price_list(build_price_list(3))
+        self.import_price_list(build_price_list(5))
+        shop = Shop.objects.get(name='Test Shop')
+
+        result = ImportService.rollback_catalog(shop)
+
+        self.assertTrue(result['status'])
+        self.assertEqual(result['catalog_version'], 1)
+        self.assertEqual(len(self.catalog_prices()), 3)
+        self.assertEqual(ShopImportState.objects.get(shop=shop).content_hash, '')
+
+        ImportService.rollback_catalog(shop)
+        self.assertEqual(len(self.catalog_prices()), 5)
+
+    def test_rollback_without_previous_version(self):
+        """
+        Тестирование отката, когда предыдущей версии нет.
+        """
+        shop = Shop.objects.create(name='Test Shop', user=self.user)
+
+        result = ImportService.rollback_catalog(shop)
+
+        self.assertFalse(result['status'])
+        self.assertEqual(result['error'], "Нет предыдущей версии каталога для отката")
+
+    def test_resume_keeps_staging_version(self):
+        """
+        Тестирование продолжения прерванного импорта в той же версии каталога.
+        """
+        self.import_price_list(build_price_list(3))
+        write_goods = BulkProductImporter._replace_goods
+        calls = []
+
+        def failing_write(importer, goods):
+            calls.append(importer.version)
+            if len(calls) == 2:
+                raise OperationalError("database is locked")
+            return write_goods(importer, goods)
+
+        content = build_price_list(12)
+        with patch.object(BulkProductImporter, '_replace_goods', failing_write):
+            with self.assertRaises(OperationalError):
+                self.import_price_list(content)
+
+        # Прерванный импорт не виден покупателям
+        self.assertEqual(len(self.catalog_prices()), 3)
+        self.assertEqual(ProductInfo.objects.filter(catalog_version=2).count(), 5)
+
+        result = self.import_price_list(content)
+
+        self.assertTrue(result['status'])
+        self.assertEqual(result['stats']['resumed'], 5)
+        self.assertEqual(calls, [2, 2])
+        self.assertEqual(len(self.catalog_prices()), 12)
+        self.assertEqual(ShopImportState.objects.get(shop__name='Test Shop').checkpoint_offset, 0)
+
+    def test_basket_rejects_previous_version(self):
+        """
+        Тестирование добавления в корзину товара из неопубликованной версии каталога.
+        """
+        self.import_price_list(build_price_list(3))
+        old_product_info = ProductInfo.objects.get(external_id=1)
+        self.import_price_list(build_price_list(4))
+
+        buyer = User.objects.create_user(email='buyer@example.com', password='password123', is_active=True)
+        self.client.force_authenticate(user=buyer)
+        response = self.client.post(
+            '/api/v1/basket', {'items': [{'product_info': old_product_info.id, 'quantity': 1}]}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(f"Товар с ID {old_product_info.id} не найден", response.data['error'])
@@ -1,11 +1,13 @@
+import os
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from unittest.mock import patch
 from backend.models import ConfirmEmailToken, Order, Contact, OrderItem, ProductInfo
 from backend.tasks import (
     send_confirmation_email, send_password_reset_email,
-    send_order_confirmation_email, import_shop_data_task
+    send_order_confirmation_email, import_shop_data_task, import_shop_file_task
 )
+from backend.services.fetch import PriceListDownload
 
 User = get_user_model()
 
@@ -107,7 +109,64 @@ class CeleryTasksTestCase(TestCase):
         result = import_shop_data_task('https://example.com/shop1.yaml', self.user.id)
 
         # Проверка вызова сервиса с правильными аргументами
-        mock_import_shop_data.assert_called_once_with('https://example.com/shop1.yaml', self.user.id)
+        mock_import_shop_data.assert_called_once_with(
+            'https://example.com/shop1.yaml', self.user.id, progress=None, schedule_partitions=True
+        )
 
         # Проверка результата
         self.assertEqual(result, expected_result)
+
+    def test_import_shop_data_task_is_resumable(self):
+        """
+        Тестирование настроек задачи импорта: повторная доставка и перезапуск после ошибки БД.
+        """
+        from django.db import DatabaseError
+
+        self.assertTrue(import_shop_data_task.acks_late)
+        self.assertTrue(import_shop_data_task.reject_on_worker_lost)
+        self.assertIn(DatabaseError, import_shop_data_task.autoretry_for)
+
+    @patch('backend.services.import_service.ImportService.import_shop_data')
+    def test_import_shop_data_task_publishes_progress(self, mock_import_shop_data):
+        """
+        Тестирование публикации хода импорта через состояние задачи PROGRESS.
+        """
+        def import_shop_data(url, user_id, progress=None, schedule_partitions=False):
+            progress.set_phase('products', goods_total=10)
+            return {'status': True}
+
+        mock_import_shop_data.side_effect = import_shop_data
+
+        import_shop_data_task.push_request(id='import-task-id')
+        try:
+            with patch.object(import_shop_data_task, 'update_state') as mock_update_state:
+                import_shop_data_task.run('https://example.com/shop1.yaml', self.user.id)
+        finally:
+            import_shop_data_task.pop_request()
+
+        kwargs = mock_update_state.call_args.kwargs
+        self.assertEqual(kwargs['state'], 'PROGRESS')
+        self.assertEqual(kwargs['meta']['phase'], 'products')
+        self.assertEqual(kwargs['meta']['goods_total'], 10)
+
+    @patch('backend.services.import_service.ImportService.import_uploaded_file')
+    def test_import_shop_file_task_keeps_file_for_retry(self, mock_import_uploaded_file):
+        """
+        Тестирование задачи импорта загруженного файла: при ошибке БД файл сохраняется для повтора.
+        """
+        from django.db import OperationalError
+
+        download = PriceListDownload.from_bytes(b'shop: Shop')
+        self.addCleanup(download.cleanup)
+        mock_import_uploaded_file.side_effect = OperationalError('database is locked')
+
+        with self.assertRaises(OperationalError):
+            import_shop_file_task.run(download.as_dict(), self.user.id)
+        self.assertTrue(os.path.exists(download.path))
+
+        mock_import_uploaded_file.side_effect = None
+        mock_import_uploaded_file.return_value = {'status': True}
+        result = import_shop_file_task.run(download.as_dict(), self.user.id)
+
+        self.assertEqual(result, {'status': True})
+        self.assertFalse(os.path.exists(download.path))
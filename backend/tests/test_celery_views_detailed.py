@@ -110,6 +110,29 @@ class TaskStatusViewTestCase(TestCase):
         self.assertIn('завершилась с ошибкой', response.data['message'])
         self.assertEqual(response.data['error'], 'Тестовая ошибка')
 
+    @patch('backend.api.views.celery_views.AsyncResult')
+    def test_get_progress_task_status(self, mock_async_result):
+        """
+        Тестирование получения хода выполнения задачи в состоянии 'PROGRESS'.
+        """
+        # Настройка мока AsyncResult
+        progress = {
+            'phase': 'products', 'goods_processed': 500, 'goods_total': 1000,
+            'parameters': 1500, 'elapsed': 2.0, 'goods_per_sec': 250.0, 'eta': 2.0
+        }
+        mock_task = MagicMock()
+        mock_task.state = 'PROGRESS'
+        mock_task.info = progress
+        mock_async_result.return_value = mock_task
+
+        # Выполнение запроса
+        response = self.client.get(self.task_url)
+
+        # Проверка результата
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'progress')
+        self.assertEqual(response.data['progress'], progress)
+
     @patch('backend.api.views.celery_views.AsyncResult')
     def test_get_unknown_task_status(self, mock_async_result):
         """
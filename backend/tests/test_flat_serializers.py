@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from backend.api.flat_serializers import CatalogItemFlatSerializer, ProductInfoFlatSerializer, OrderFlatSerializer
+from backend.api.serializers import ProductInfoSerializer, OrderSerializer
+from backend.models import (
+    Shop, Category, Product, ProductInfo, Parameter, ProductParameter, CatalogItem, Contact, Order, OrderItem
+)
+from backend.services.catalog import CatalogReadModel
+
+User = get_user_model()
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+class FlatSerializerContractTestCase(TestCase):
+    """
+    Контрактные тесты быстрой сериализации: JSON совпадает с DRF-сериализаторами побайтно.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='buyer@example.com', password='password123', is_active=True)
+        self.client.force_authenticate(user=self.user)
+
+        shop = Shop.objects.create(name='Shop', url='https://shop.example.com/price.yaml', state=True)
+        other_shop = Shop.objects.create(name='Other Shop', state=True)
+        category = Category.objects.create(name='Смартфоны')
+        phone = Product.objects.create(name='Смартфон Apple iPhone XS', category=category)
+        Product.objects.filter(pk=phone.pk).update(image='products/iphone.jpg')
+        case = Product.objects.create(name='Чехол')
+
+        self.product_infos = [
+            ProductInfo.objects.create(product=phone, shop=shop, model='apple/xs', external_id=1,
+                                       price=110990, price_rrc=116990, quantity=14),
+            ProductInfo.objects.create(product=case, shop=other_shop, model='case', external_id=2,
+                                       price=999, price_rrc=1200, quantity=3),
+        ]
+        for name, value in (('Цвет', 'золотистый'), ('Встроенная память (Гб)', '512')):
+            ProductParameter.objects.create(product_info=self.product_infos[0],
+                                            parameter=Parameter.objects.create(name=name), value=value)
+        CatalogReadModel.sync([product_info.id for product_info in self.product_infos])
+
+        contact = Contact.objects.create(user=self.user, city='Москва', street='Ленина', house='1', phone='+79991234567')
+        self.orders = [
+            Order.objects.create(user=self.user, state='new', contact=contact),
+            Order.objects.create(user=self.user, state='basket'),
+        ]
+        OrderItem.objects.create(order=self.orders[0], product_info=self.product_infos[1], quantity=3)
+        OrderItem.objects.create(order=self.orders[0], product_info=self.product_infos[0], quantity=1)
+        OrderItem.objects.create(order=self.orders[1], product_info=self.product_infos[0], quantity=2)
+
+    def test_catalog_item(self):
+        """
+        Тестирование строк витрины: изображение, товар без категории, магазин без ссылки, параметры.
+        """
+        serializer = CatalogItemFlatSerializer()
+        rows = serializer.values(CatalogItem.objects.order_by('pk'))
+        expected = ProductInfoSerializer(ProductInfo.objects.order_by('pk'), many=True).data
+
+        self.assertEqual(render(serializer.many(rows)), render(expected))
+
+    def test_product_info(self):
+        """
+        Тестирование загрузки товаров магазинов по списку id.
+        """
+        loaded = ProductInfoFlatSerializer.load([product_info.id for product_info in self.product_infos])
+
+        for product_info in ProductInfo.objects.all():
+            self.assertEqual(render(loaded[product_info.id]), render(ProductInfoSerializer(product_info).data))
+
+    def test_orders(self):
+        """
+        Тестирование заказов: несколько заказов, заказ без контакта, стоимость заказа.
+        """
+        orders = Order.objects.order_by('-dt', 'id')
+
+        self.assertEqual(render(OrderFlatSerializer.many(orders)), render(OrderSerializer(orders, many=True).data))
+        self.assertEqual(OrderFlatSerializer.one(self.orders[0])['total_cost'], '113987.00')
+        self.assertEqual(OrderFlatSerializer.many(Order.objects.none()), [])
+
+    def test_api_responses(self):
+        """
+        Тестирование ответов API каталога, заказов и корзины.
+        """
+        product_info = ProductInfo.objects.get(pk=self.product_infos[0].pk)
+        response = self.client.get(f'/api/v1/products/{product_info.pk}')
+        self.assertEqual(response.content, render(ProductInfoSerializer(product_info).data))
+
+        orders = Order.objects.filter(user=self.user).exclude(state='basket').order_by('-dt')
+        response = self.client.get('/api/v1/order')
+        self.assertEqual(response.content, render(OrderSerializer(orders, many=True).data))
+
+        response = self.client.get(f'/api/v1/order/{self.orders[0].pk}')
+        self.assertEqual(response.content, render(OrderSerializer(self.orders[0]).data))
+
+        response = self.client.get('/api/v1/basket')
+        self.assertEqual(response.content, render(OrderSerializer(self.orders[1]).data))
+
+    def test_fixed_query_count(self):
+        """
+        Тестирование количества запросов: оно не зависит от количества заказов и позиций.
+        """
+        for _ in range(3):
+            order = Order.objects.create(user=self.user, state='new')
+            for product_info in self.product_infos:
+                OrderItem.objects.create(order=order, product_info=product_info, quantity=1)
+
+        # Заказы, контакты, позиции, товары и параметры (часть запросов может прийти из кэша cachalot)
+        with CaptureQueriesContext(connection) as queries:
+            OrderFlatSerializer.many(Order.objects.all())
+        self.assertLessEqual(len(queries), 5)
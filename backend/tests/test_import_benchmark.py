@@ -0,0 +1,104 @@
+import os
+import json
+import tempfile
+import yaml
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from io import StringIO
+from backend.models import ProductInfo, ShopImportState
+from backend.services.benchmark import PriceListGenerator
+from backend.services.import_service import ImportService
+
+
+class ImportBenchmarkTestCase(TestCase):
+    """
+    Тесты генератора прайс-листов и команды замера импорта.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_generated_price_list_is_valid(self):
+        """
+        Тестирование структуры сгенерированного прайс-листа.
+        """
+        path = os.path.join(self.directory.name, 'price.yaml')
+        call_command('generate_price_list', path, goods=25, categories=3, params=5, stdout=StringIO())
+
+        with open(path, encoding='utf-8') as file:
+            data = yaml.safe_load(file)
+
+        self.assertEqual(len(data['categories']), 3)
+        self.assertEqual(len(data['goods']), 25)
+        self.assertTrue(all(len(item['parameters']) == 5 for item in data['goods']))
+        self.assertEqual(ImportService.validate_structure(data), (True, None))
+
+    def test_generator_is_reproducible(self):
+        """
+        Тестирование воспроизводимости прайс-листа при одинаковом seed.
+        """
+        first = list(PriceListGenerator(goods=10, seed=1).iter_lines())
+        second = list(PriceListGenerator(goods=10, seed=1).iter_lines())
+        other = list(PriceListGenerator(goods=10, seed=2).iter_lines())
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+    def test_benchmark_import(self):
+        """
+        Тестирование замера импорта и сохранения результатов в JSON.
+        """
+        output = os.path.join(self.directory.name, 'results.json')
+        call_command('benchmark_import', goods=[30], runs=2, output=output, stdout=StringIO())
+
+        with open(output, encoding='utf-8') as file:
+            report = json.load(file)
+
+        result = report['results'][0]
+        self.assertTrue(result['status'])
+        self.assertEqual((result['runs'], result['goods']), (2, 30))
+        self.assertEqual(result['rows'], 30 + 30 * 4)
+        self.assertGreater(result['queries'], 0)
+        self.assertGreater(result['peak_rss_kb'], 0)
+        self.assertIn('database', report['environment'])
+        self.assertEqual((report['parse'][0]['format'], report['parse'][0]['goods']), ('yaml', 30))
+        self.assertEqual(ProductInfo.objects.count(), 30)
+        self.assertEqual(ShopImportState.objects.count(), 1)
+
+    def test_benchmark_parse_formats(self):
+        """
+        Тестирование сравнения скорости разбора форматов без записи в БД.
+        """
+        output = os.path.join(self.directory.name, 'results.json')
+        call_command(
+            'benchmark_import', goods=[20], formats=['yaml', 'json', 'jsonl', 'csv'], parse_only=True,
+            output=output, stdout=StringIO()
+        )
+
+        with open(output, encoding='utf-8') as file:
+            report = json.load(file)
+
+        self.assertEqual([item['format'] for item in report['parse']], ['yaml', 'json', 'jsonl', 'csv'])
+        self.assertTrue(all(item['goods'] == 20 for item in report['parse']))
+        self.assertEqual(report['results'], [])
+        self.assertFalse(ProductInfo.objects.exists())
+
+    @override_settings(IMPORT_MODE='incremental')
+    def test_benchmark_compare(self):
+        """
+        Тестирование сравнения с результатами прошлого замера.
+        """
+        baseline = os.path.join(self.directory.name, 'baseline.json')
+        output = os.path.join(self.directory.name, 'results.json')
+        call_command('benchmark_import', goods=[10], runs=1, output=baseline, stdout=StringIO())
+        call_command(
+            'benchmark_import', goods=[10], runs=1, mode='warm', output=output, compare=baseline,
+            stdout=StringIO()
+        )
+
+        with open(output, encoding='utf-8') as file:
+            report = json.load(file)
+
+        self.assertEqual(report['comparison'][0]['file'], 'generated_10.yaml')
+        self.assertEqual(report['results'][0]['details'][0]['stats']['unchanged'], 10)
@@ -0,0 +1,153 @@
+from django.test import TestCase
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from unittest.mock import patch
+from backend.services.import_orchestration import ImportLock, ImportOrchestrator
+from backend.tasks import import_shop_data_task, import_shops_lane_task, aggregate_import_results_task
+from backend.models import Shop
+
+User = get_user_model()
+
+
+class ImportLockTestCase(TestCase):
+    """
+    Тесты блокировки импорта магазина.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_acquire_and_release(self):
+        """
+        Тестирование захвата и освобождения блокировки.
+        """
+        lock = ImportLock(1, owner='task-1')
+        self.assertTrue(lock.acquire())
+        self.assertEqual(ImportLock.holder(1), 'task-1')
+        self.assertFalse(ImportLock(1, owner='task-2').acquire())
+
+        lock.release()
+        self.assertIsNone(ImportLock.holder(1))
+
+    def test_acquire_by_same_owner(self):
+        """
+        Тестирование повторного захвата блокировки той же задачей после перезапуска.
+        """
+        ImportLock(1, owner='task-1').acquire()
+        self.assertTrue(ImportLock(1, owner='task-1').acquire())
+
+    def test_release_foreign_lock(self):
+        """
+        Тестирование: неудачная попытка захвата не снимает чужую блокировку.
+        """
+        ImportLock(1, owner='task-1').acquire()
+        with ImportLock(1, owner='task-2') as lock:
+            self.assertFalse(lock.acquired)
+        self.assertEqual(ImportLock.holder(1), 'task-1')
+
+
+class ImportOrchestratorTestCase(TestCase):
+    """
+    Тесты пакетного импорта прайс-листов нескольких магазинов.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            User.objects.create_user(email=f'shop{index}@example.com', password='password123',
+                                     is_active=True, type='shop')
+            for index in range(3)
+        ]
+        self.shops = [
+            Shop.objects.create(name=f'Shop {index}', user=user, url=f'https://example.com/shop{index}.yaml')
+            for index, user in enumerate(self.users)
+        ]
+
+    @patch('backend.services.import_service.ImportService.import_shop_data')
+    def test_run_locked(self, mock_import_shop_data):
+        """
+        Тестирование импорта под блокировкой: блокировка снимается после импорта.
+        """
+        mock_import_shop_data.return_value = {"status": True, "message": "ok"}
+
+        result = ImportOrchestrator.run_locked('https://example.com/shop.yaml', self.users[0].id, owner='task-1')
+
+        self.assertEqual(result, {"status": True, "message": "ok"})
+        mock_import_shop_data.assert_called_once_with(
+            'https://example.com/shop.yaml', self.users[0].id, progress=None, schedule_partitions=True
+        )
+        self.assertIsNone(ImportLock.holder(self.users[0].id))
+
+    @patch('backend.services.import_service.ImportService.import_shop_data')
+    def test_run_locked_coalesces_duplicate(self, mock_import_shop_data):
+        """
+        Тестирование повторного импорта магазина во время выполняющегося импорта.
+        """
+        ImportLock(self.users[0].id, owner='running-task').acquire()
+
+        result = import_shop_data_task('https://example.com/shop.yaml', self.users[0].id)
+
+        mock_import_shop_data.assert_not_called()
+        self.assertTrue(result['coalesced'])
+        self.assertEqual(result['task_id'], 'running-task')
+        self.assertEqual(ImportLock.holder(self.users[0].id), 'running-task')
+
+    def test_prepare_items(self):
+        """
+        Тестирование проверки списка магазинов: ошибки, повторы и сохраненный URL.
+        """
+        items, errors = ImportOrchestrator.prepare_items([
+            {"shop_id": self.shops[0].id, "url": "https://example.com/new.yaml"},
+            {"shop_id": self.shops[1].id},
+            {"shop_id": self.shops[0].id},
+            {"shop_id": 999999},
+            {"shop_id": self.shops[2].id, "url": "not-a-url"},
+        ])
+
+        self.assertEqual(items, [
+            {"shop_id": self.shops[0].id, "user_id": self.users[0].id, "url": "https://example.com/new.yaml"},
+            {"shop_id": self.shops[1].id, "user_id": self.users[1].id, "url": "https://example.com/shop1.yaml"},
+        ])
+        self.assertEqual([error['shop_id'] for error in errors], [999999, self.shops[2].id])
+
+    def test_split_lanes(self):
+        """
+        Тестирование распределения магазинов по дорожкам с ограничением параллельности.
+        """
+        self.assertEqual(ImportOrchestrator.split_lanes([1, 2, 3, 4, 5], 2), [[1, 3, 5], [2, 4]])
+        self.assertEqual(ImportOrchestrator.split_lanes([1, 2], 8), [[1], [2]])
+
+    @patch('celery.chord')
+    def test_start_batch(self, mock_chord):
+        """
+        Тестирование запуска пакетного импорта группой задач с завершающей задачей.
+        """
+        items = [{"shop_id": shop.id, "user_id": shop.user_id, "url": shop.url} for shop in self.shops]
+
+        ImportOrchestrator.start_batch(items, concurrency=2)
+
+        header = list(mock_chord.call_args[0][0])
+        self.assertEqual(len(header), 2)
+        self.assertEqual(header[0].task, import_shops_lane_task.name)
+        self.assertEqual([len(signature.args[0]) for signature in header], [2, 1])
+        callback = mock_chord.return_value.call_args[0][0]
+        self.assertEqual(callback.task, aggregate_import_results_task.name)
+
+    @patch('backend.services.import_service.ImportService.import_shop_data')
+    def test_lane_and_aggregate(self, mock_import_shop_data):
+        """
+        Тестирование последовательного импорта в дорожке и объединения результатов.
+        """
+        mock_import_shop_data.side_effect = [
+            {"status": True, "message": "ok"},
+            {"status": False, "error": "Ошибка при получении данных"},
+            {"status": True, "skipped": True, "message": "skip"},
+        ]
+        items = [{"shop_id": shop.id, "user_id": shop.user_id, "url": shop.url} for shop in self.shops]
+
+        lane_results = [import_shops_lane_task(items[:2]), import_shops_lane_task(items[2:])]
+        report = aggregate_import_results_task(lane_results)
+
+        self.assertFalse(report['status'])
+        self.assertEqual((report['total'], report['succeeded'], report['failed'], report['skipped']), (3, 2, 1, 1))
+        self.assertEqual([result['shop_id'] for result in report['results']], [shop.id for shop in self.shops])
@@ -1,10 +1,13 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from unittest.mock import patch, MagicMock
 from django.contrib.auth import get_user_model
 import yaml
+import hashlib
 import requests
 from backend.services.import_service import ImportService
-from backend.models import Shop, Category, Product, ProductInfo, Parameter, ProductParameter
+from backend.services.fetch import PriceListDownload
+from backend.services.bulk_import import ImportProgress, ImportStats, QueryCounter
+from backend.models import ShopImportState, Shop, Category, Product, ProductInfo, Parameter, ProductParameter
 
 User = get_user_model()
 
@@ -88,28 +91,30 @@ class ImportServiceTestCase(TestCase):
         self.assertFalse(valid)
         self.assertIn("Некорректный URL", error)
 
-    @patch('requests.get')
-    def test_fetch_data_success(self, mock_get):
+    @patch('backend.services.fetch.PriceListFetcher.get_session')
+    def test_fetch_data_success(self, mock_get_session):
         """
         Тестирование успешного получения данных по URL.
         """
-        # Настройка мока для requests.get
+        # Настройка мока для запроса через сессию
         mock_response = MagicMock()
-        mock_response.content = self.yaml_data.encode('utf-8')
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [self.yaml_data.encode('utf-8')]
         mock_response.raise_for_status = MagicMock()
-        mock_get.return_value = mock_response
+        mock_get_session.return_value.get.return_value = mock_response
 
         success, content = ImportService.fetch_data('https://example.com/data.yaml')
         self.assertTrue(success)
         self.assertEqual(content, self.yaml_data.encode('utf-8'))
 
-    @patch('requests.get')
-    def test_fetch_data_failure(self, mock_get):
+    @patch('backend.services.fetch.PriceListFetcher.get_session')
+    def test_fetch_data_failure(self, mock_get_session):
         """
         Тестирование неудачного получения данных по URL.
         """
-        # Настройка мока для requests.get с выбросом исключения
-        mock_get.side_effect = requests.RequestException("Connection error")
+        # Настройка мока для запроса с выбросом исключения
+        mock_get_session.return_value.get.side_effect = requests.RequestException("Connection error")
 
         success, error = ImportService.fetch_data('https://example.com/data.yaml')
         self.assertFalse(success)
@@ -170,112 +175,242 @@ class ImportServiceTestCase(TestCase):
         self.assertFalse(valid)
         self.assertIn("Товар должен содержать поле", error)
 
-    @patch('backend.services.import_service.Category.objects.get_or_create')
-    def test_import_categories(self, mock_get_or_create):
+    def test_import_categories(self):
         """
         Тестирование импорта категорий.
         """
         # Парсим YAML-данные для получения структуры
         _, data = ImportService.parse_yaml(self.yaml_data.encode('utf-8'))
 
-        # Настройка мока для Category.objects.get_or_create
-        mock_category1 = MagicMock()
-        mock_category1.name = 'Category 1'
-        mock_category2 = MagicMock()
-        mock_category2.name = 'Category 2'
+        # Одна категория уже существует под другим названием и привязана к магазину
+        existing = Category.objects.create(id=1, name='Old name')
+        existing.shops.add(self.shop)
 
-        mock_get_or_create.side_effect = [
-            (mock_category1, True),  # Первый вызов - создание новой категории
-            (mock_category2, False)  # Второй вызов - получение существующей категории
-        ]
-
-        success, message = ImportService.import_categories(data, self.shop)
+        stats = ImportStats()
+        success, message = ImportService.import_categories(data, self.shop, stats=stats)
         self.assertTrue(success)
         self.assertIn("Импортировано категорий: 2", message)
+        self.assertEqual(
+            (stats.categories_created, stats.categories_renamed, stats.categories_linked), (1, 1, 1)
+        )
 
-        # Проверяем, что get_or_create вызван дважды
-        self.assertEqual(mock_get_or_create.call_count, 2)
+        self.assertEqual(
+            dict(Category.objects.values_list('id', 'name')), {1: 'Category 1', 2: 'Category 2'}
+        )
+        self.assertEqual(set(self.shop.categories.values_list('id', flat=True)), {1, 2})
+
+    def test_import_categories_query_count(self):
+        """
+        Тестирование количества запросов: оно не зависит от количества категорий.
+        """
+        _, data = ImportService.parse_yaml(self.yaml_data.encode('utf-8'))
+        data['categories'] = [{'id': index, 'name': f'Category {index}'} for index in range(1, 301)]
 
-        # Проверяем, что метод shops.add вызван для каждой категории
-        self.assertEqual(mock_category1.shops.add.call_count, 1)
-        self.assertEqual(mock_category2.shops.add.call_count, 1)
+        with QueryCounter() as counter:
+            success, _ = ImportService.import_categories(data, self.shop)
+        self.assertTrue(success)
+        self.assertLess(counter.count, 10)
+        self.assertEqual(self.shop.categories.count(), 300)
+
+        # Повторный импорт тех же категорий ничего не записывает:
+        # два запроса на чтение и точка сохранения транзакции
+        stats = ImportStats()
+        with self.assertNumQueries(4):
+            ImportService.import_categories(data, self.shop, stats=stats)
+        self.assertEqual(
+            (stats.categories_created, stats.categories_renamed, stats.categories_linked), (0, 0, 0)
+        )
 
-    @patch('backend.services.import_service.ProductInfo.objects.filter')
-    @patch('backend.services.import_service.Product.objects.get_or_create')
-    @patch('backend.services.import_service.ProductInfo.objects.create')
-    @patch('backend.services.import_service.Parameter.objects.get_or_create')
-    @patch('backend.services.import_service.ProductParameter.objects.create')
-    def test_import_products(self, mock_param_create, mock_param_get_or_create,
-                             mock_product_info_create, mock_product_get_or_create,
-                             mock_product_info_filter):
+    def test_import_products(self):
         """
         Тестирование импорта товаров.
         """
-        # Парсим YAML-данные для получения структуры
+        # Парсим YAML-данные и создаем категории, на которые ссылаются товары
         _, data = ImportService.parse_yaml(self.yaml_data.encode('utf-8'))
+        ImportService.import_categories(data, self.shop)
 
-        # Настройка моков
-        mock_product1 = MagicMock()
-        mock_product1.id = 1
-        mock_product2 = MagicMock()
-        mock_product2.id = 2
-
-        mock_product_get_or_create.side_effect = [
-            (mock_product1, True),  # Первый вызов
-            (mock_product2, False)  # Второй вызов
-        ]
+        success, message = ImportService.import_products(data, self.shop)
+        self.assertTrue(success)
+        self.assertIn("Импортировано товаров: 2", message)
+        self.assertIn("параметров: 4", message)
+
+        # Проверяем созданные записи
+        self.assertEqual(Product.objects.count(), 2)
+        self.assertEqual(Parameter.objects.count(), 3)
+        self.assertEqual(ProductInfo.objects.filter(shop=self.shop).count(), 2)
+        self.assertEqual(ProductParameter.objects.count(), 4)
+
+        product_info = ProductInfo.objects.get(shop=self.shop, external_id=2)
+        self.assertEqual(product_info.product.name, 'Product 2')
+        self.assertEqual(product_info.price, 200)
+        self.assertEqual(
+            dict(product_info.product_parameters.values_list('parameter__name', 'value')),
+            {'param1': 'value3', 'param3': 'value4'}
+        )
+
+    def test_import_products_reuses_existing_products_and_parameters(self):
+        """
+        Тестирование повторного импорта: существующие товары и параметры не дублируются.
+        """
+        _, data = ImportService.parse_yaml(self.yaml_data.encode('utf-8'))
+        ImportService.import_categories(data, self.shop)
 
-        mock_product_info1 = MagicMock()
-        mock_product_info1.id = 1
-        mock_product_info2 = MagicMock()
-        mock_product_info2.id = 2
+        ImportService.import_products(data, self.shop)
+        data['goods'][0]['price'] = 150
+        success, _ = ImportService.import_products(data, self.shop)
 
-        mock_product_info_create.side_effect = [
-            mock_product_info1,  # Первый вызов
-            mock_product_info2  # Второй вызов
-        ]
+        self.assertTrue(success)
+        self.assertEqual(Product.objects.count(), 2)
+        self.assertEqual(Parameter.objects.count(), 3)
+        self.assertEqual(ProductInfo.objects.live().get(shop=self.shop, external_id=1).price, 150)
+
+    @override_settings(IMPORT_MODE='incremental')
+    def test_import_products_query_count_does_not_grow_with_goods(self):
+        """
+        Тестирование количества запросов: оно не зависит от количества товаров в пакете.
+        """
+        _, data = ImportService.parse_yaml(self.yaml_data.encode('utf-8'))
+        ImportService.import_categories(data, self.shop)
 
-        mock_parameter1 = MagicMock()
-        mock_parameter1.id = 1
-        mock_parameter2 = MagicMock()
-        mock_parameter2.id = 2
-        mock_parameter3 = MagicMock()
-        mock_parameter3.id = 3
-
-        mock_param_get_or_create.side_effect = [
-            (mock_parameter1, True),  # param1 для первого товара
-            (mock_parameter2, False),  # param2 для первого товара
-            (mock_parameter1, False),  # param1 для второго товара
-            (mock_parameter3, True)  # param3 для второго товара
+        template = data['goods'][0]
+        data['goods'] = [
+            {**template, 'id': index, 'name': f'Product {index}',
+             'parameters': {'param1': index, 'param2': 'value'}}
+            for index in range(200)
         ]
 
+        stats = ImportStats()
+        with QueryCounter() as counter:
+            success, _ = ImportService.import_products(data, self.shop, stats=stats)
+
+        self.assertTrue(success)
+        self.assertEqual(stats.products, 200)
+        self.assertEqual(stats.parameters, 400)
+        # Запись витрины каталога и пересчет фасетов магазина добавляют запросы;
+        # в SQLite вставка витрины разбивается по лимиту параметров запроса
+        self.assertLess(counter.count, 32)
+
+    def test_import_products_duplicate_goods(self):
+        """
+        Тестирование повторяющихся товаров в одном прайс-листе: остается последняя версия.
+        """
+        _, data = ImportService.parse_yaml(self.yaml_data.encode('utf-8'))
+        ImportService.import_categories(data, self.shop)
+        data['goods'].append({**data['goods'][0], 'price': 999})
+
         success, message = ImportService.import_products(data, self.shop)
+
         self.assertTrue(success)
         self.assertIn("Импортировано товаров: 2", message)
-        self.assertIn("параметров: 4", message)
+        self.assertEqual(ProductInfo.objects.get(shop=self.shop, external_id=1).price, 999)
+
+    @override_settings(IMPORT_MODE='incremental')
+    def test_import_products_incremental_writes_only_changes(self):
+        """
+        Тестирование инкрементального импорта: изменяются только отличающиеся товары и параметры.
+        """
+        _, data = ImportService.parse_yaml(self.yaml_data.encode('utf-8'))
+        ImportService.import_categories(data, self.shop)
+        ImportService.import_products(data, self.shop)
+        product_info_ids = dict(ProductInfo.objects.filter(shop=self.shop).values_list('external_id', 'id'))
+
+        data['goods'][0]['price'] = 150
+        data['goods'][0]['parameters'] = {'param1': 'value1'}
+        stats = ImportStats()
+        success, _ = ImportService.import_products(data, self.shop, stats=stats)
+
+        self.assertTrue(success)
+        self.assertEqual((stats.created, stats.updated, stats.unchanged, stats.deleted), (0, 1, 1, 0))
+        self.assertEqual(stats.parameters, 0)
+        # Строки обновлены на месте, а не пересозданы
+        self.assertEqual(
+            dict(ProductInfo.objects.filter(shop=self.shop).values_list('external_id', 'id')),
+            product_info_ids
+        )
+        product_info = ProductInfo.objects.get(shop=self.shop, external_id=1)
+        self.assertEqual(product_info.price, 150)
+        self.assertEqual(
+            dict(product_info.product_parameters.values_list('parameter__name', 'value')),
+            {'param1': 'value1'}
+        )
+
+    @override_settings(IMPORT_MODE='incremental')
+    def test_import_products_incremental_deletes_missing_goods(self):
+        """
+        Тестирование инкрементального импорта: товары, отсутствующие в прайс-листе, удаляются.
+        """
+        _, data = ImportService.parse_yaml(self.yaml_data.encode('utf-8'))
+        ImportService.import_categories(data, self.shop)
+        ImportService.import_products(data, self.shop)
+
+        data['goods'] = data['goods'][1:] + [{**data['goods'][0], 'id': 3, 'name': 'Product 3'}]
+        stats = ImportStats()
+        success, _ = ImportService.import_products(data, self.shop, stats=stats)
+
+        self.assertTrue(success)
+        self.assertEqual((stats.created, stats.updated, stats.unchanged, stats.deleted), (1, 0, 1, 1))
+        self.assertEqual(
+            sorted(ProductInfo.objects.filter(shop=self.shop).values_list('external_id', flat=True)),
+            [2, 3]
+        )
+
+    @override_settings(IMPORT_MODE='incremental')
+    def test_import_products_incremental_unchanged_query_count(self):
+        """
+        Тестирование повторного импорта тех же данных: в БД ничего не записывается.
+        """
+        _, data = ImportService.parse_yaml(self.yaml_data.encode('utf-8'))
+        ImportService.import_categories(data, self.shop)
+        ImportService.import_products(data, self.shop)
+
+        stats = ImportStats()
+        with self.assertNumQueries(6):
+            success, _ = ImportService.import_products(data, self.shop, stats=stats)
 
-        # Проверяем, что методы вызваны нужное количество раз
-        self.assertEqual(mock_product_get_or_create.call_count, 2)
-        self.assertEqual(mock_product_info_create.call_count, 2)
-        self.assertEqual(mock_param_get_or_create.call_count, 4)
-        self.assertEqual(mock_param_create.call_count, 4)
+        self.assertTrue(success)
+        self.assertEqual(stats.unchanged, 2)
+        self.assertEqual(stats.products, 0)
+
+    @override_settings(IMPORT_MODE='replace')
+    def test_import_products_replace_mode(self):
+        """
+        Тестирование режима replace: товары магазина создаются заново в новой версии каталога,
+        предыдущая версия сохраняется для отката.
+        """
+        _, data = ImportService.parse_yaml(self.yaml_data.encode('utf-8'))
+        ImportService.import_categories(data, self.shop)
+        ImportService.import_products(data, self.shop)
+        old_ids = set(ProductInfo.objects.filter(shop=self.shop).live().values_list('id', flat=True))
+
+        stats = ImportStats()
+        success, _ = ImportService.import_products(data, self.shop, stats=stats)
+
+        self.assertTrue(success)
+        self.assertEqual(stats.created, 2)
+        self.assertFalse(old_ids & set(ProductInfo.objects.filter(shop=self.shop).live().values_list('id', flat=True)))
+        self.assertEqual(
+            set(ProductInfo.objects.filter(shop=self.shop, catalog_version=1).values_list('id', flat=True)), old_ids
+        )
 
     @patch('backend.services.import_service.ImportService.validate_url')
-    @patch('backend.services.import_service.ImportService.fetch_data')
+    @patch('backend.services.import_service.ImportService.fetch_price_list')
     @patch('backend.services.import_service.ImportService.parse_yaml')
     @patch('backend.services.import_service.ImportService.validate_structure')
     @patch('backend.services.import_service.Shop.objects.get_or_create')
     @patch('backend.services.import_service.ImportService.import_categories')
     @patch('backend.services.import_service.ImportService.import_products')
-    def test_import_shop_data_success(self, mock_import_products, mock_import_categories,
+    @patch('backend.services.import_service.ImportService.save_import_state')
+    @patch('backend.services.import_service.ImportService.load_checkpoint')
+    def test_import_shop_data_success(self, mock_load_checkpoint, mock_save_import_state,
+                                      mock_import_products, mock_import_categories,
                                       mock_shop_get_or_create, mock_validate_structure,
-                                      mock_parse_yaml, mock_fetch_data, mock_validate_url):
+                                      mock_parse_yaml, mock_fetch_price_list, mock_validate_url):
         """
         Тестирование полного процесса импорта данных магазина - успешный сценарий.
         """
         # Настройка моков
         mock_validate_url.return_value = (True, None)
-        mock_fetch_data.return_value = (True, self.yaml_data.encode('utf-8'))
+        mock_fetch_price_list.return_value = (True, PriceListDownload.from_bytes(self.yaml_data.encode('utf-8')))
         mock_parse_yaml.return_value = (True, {'shop': 'Test Shop', 'categories': [], 'goods': []})
         mock_validate_structure.return_value = (True, None)
 
@@ -292,15 +427,17 @@ class ImportServiceTestCase(TestCase):
         # Проверка результата
         self.assertTrue(result['status'])
         self.assertIn("Импорт успешно завершен", result['message'])
+        self.assertIn('stats', result)
 
         # Проверка вызова всех методов
         mock_validate_url.assert_called_once_with('https://example.com/data.yaml')
-        mock_fetch_data.assert_called_once_with('https://example.com/data.yaml')
+        mock_fetch_price_list.assert_called_once_with('https://example.com/data.yaml', None)
         mock_parse_yaml.assert_called_once()
         mock_validate_structure.assert_called_once()
         mock_shop_get_or_create.assert_called_once()
         mock_import_categories.assert_called_once()
         mock_import_products.assert_called_once()
+        mock_save_import_state.assert_called_once()
 
     @patch('backend.services.import_service.ImportService.validate_url')
     def test_import_shop_data_invalid_url(self, mock_validate_url):
@@ -318,14 +455,14 @@ class ImportServiceTestCase(TestCase):
         self.assertEqual(result['error'], "Некорректный URL")
 
     @patch('backend.services.import_service.ImportService.validate_url')
-    @patch('backend.services.import_service.ImportService.fetch_data')
-    def test_import_shop_data_fetch_failure(self, mock_fetch_data, mock_validate_url):
+    @patch('backend.services.import_service.ImportService.fetch_price_list')
+    def test_import_shop_data_fetch_failure(self, mock_fetch_price_list, mock_validate_url):
         """
         Тестирование импорта данных магазина с ошибкой получения данных.
         """
         # Настройка моков
         mock_validate_url.return_value = (True, None)
-        mock_fetch_data.return_value = (False, "Ошибка при получении данных")
+        mock_fetch_price_list.return_value = (False, "Ошибка при получении данных")
 
         # Вызов тестируемого метода
         result = ImportService.import_shop_data('https://example.com/data.yaml', self.user.id)
@@ -335,15 +472,15 @@ class ImportServiceTestCase(TestCase):
         self.assertEqual(result['error'], "Ошибка при получении данных")
 
     @patch('backend.services.import_service.ImportService.validate_url')
-    @patch('backend.services.import_service.ImportService.fetch_data')
+    @patch('backend.services.import_service.ImportService.fetch_price_list')
     @patch('backend.services.import_service.ImportService.parse_yaml')
-    def test_import_shop_data_parse_failure(self, mock_parse_yaml, mock_fetch_data, mock_validate_url):
+    def test_import_shop_data_parse_failure(self, mock_parse_yaml, mock_fetch_price_list, mock_validate_url):
         """
         Тестирование импорта данных магазина с ошибкой парсинга YAML.
         """
         # Настройка моков
         mock_validate_url.return_value = (True, None)
-        mock_fetch_data.return_value = (True, "invalid yaml")
+        mock_fetch_price_list.return_value = (True, PriceListDownload.from_bytes("invalid yaml"))
         mock_parse_yaml.return_value = (False, "Ошибка при парсинге YAML")
 
         # Вызов тестируемого метода
@@ -354,17 +491,17 @@ class ImportServiceTestCase(TestCase):
         self.assertEqual(result['error'], "Ошибка при парсинге YAML")
 
     @patch('backend.services.import_service.ImportService.validate_url')
-    @patch('backend.services.import_service.ImportService.fetch_data')
+    @patch('backend.services.import_service.ImportService.fetch_price_list')
     @patch('backend.services.import_service.ImportService.parse_yaml')
     @patch('backend.services.import_service.ImportService.validate_structure')
     def test_import_shop_data_invalid_structure(self, mock_validate_structure, mock_parse_yaml,
-                                                mock_fetch_data, mock_validate_url):
+                                                mock_fetch_price_list, mock_validate_url):
         """
         Тестирование импорта данных магазина с некорректной структурой данных.
         """
         # Настройка моков
         mock_validate_url.return_value = (True, None)
-        mock_fetch_data.return_value = (True, self.yaml_data.encode('utf-8'))
+        mock_fetch_price_list.return_value = (True, PriceListDownload.from_bytes(self.yaml_data.encode('utf-8')))
         mock_parse_yaml.return_value = (True, {'shop': 'Test Shop'})  # Отсутствуют обязательные поля
         mock_validate_structure.return_value = (False, "Отсутствуют обязательные поля")
 
@@ -376,18 +513,18 @@ class ImportServiceTestCase(TestCase):
         self.assertEqual(result['error'], "Отсутствуют обязательные поля")
 
     @patch('backend.services.import_service.ImportService.validate_url')
-    @patch('backend.services.import_service.ImportService.fetch_data')
+    @patch('backend.services.import_service.ImportService.fetch_price_list')
     @patch('backend.services.import_service.ImportService.parse_yaml')
     @patch('backend.services.import_service.ImportService.validate_structure')
     @patch('backend.services.import_service.Shop.objects.get_or_create')
     def test_import_shop_data_unauthorized(self, mock_shop_get_or_create, mock_validate_structure,
-                                           mock_parse_yaml, mock_fetch_data, mock_validate_url):
+                                           mock_parse_yaml, mock_fetch_price_list, mock_validate_url):
         """
         Тестирование импорта данных магазина без прав доступа.
         """
         # Настройка моков
         mock_validate_url.return_value = (True, None)
-        mock_fetch_data.return_value = (True, self.yaml_data.encode('utf-8'))
+        mock_fetch_price_list.return_value = (True, PriceListDownload.from_bytes(self.yaml_data.encode('utf-8')))
         mock_parse_yaml.return_value = (True, {'shop': 'Test Shop', 'categories': [], 'goods': []})
         mock_validate_structure.return_value = (True, None)
 
@@ -402,3 +539,84 @@ class ImportServiceTestCase(TestCase):
         # Проверка результата
         self.assertFalse(result['status'])
         self.assertIn("У вас нет прав на обновление данного магазина", result['error'])
+
+    @patch('backend.services.import_service.ImportService.fetch_price_list')
+    def test_import_shop_data_reports_stats(self, mock_fetch_price_list):
+        """
+        Тестирование статистики импорта в результате: строки, запросы и скорость.
+        """
+        mock_fetch_price_list.return_value = (True, PriceListDownload.from_bytes(self.yaml_data.encode('utf-8')))
+
+        result = ImportService.import_shop_data('https://example.com/data.yaml', self.user.id)
+
+        self.assertTrue(result['status'])
+        self.assertEqual(result['stats']['goods'], 2)
+        self.assertEqual(result['stats']['products'], 2)
+        self.assertEqual(result['stats']['parameters'], 4)
+        self.assertGreater(result['stats']['queries'], 0)
+        self.assertIn('rows_per_sec', result['stats'])
+
+    @patch('backend.services.import_service.ImportService.fetch_price_list')
+    def test_import_shop_data_progress(self, mock_fetch_price_list):
+        """
+        Тестирование публикации фаз и хода импорта.
+        """
+        mock_fetch_price_list.return_value = (True, PriceListDownload.from_bytes(self.yaml_data.encode('utf-8')))
+        published = []
+
+        result = ImportService.import_shop_data(
+            'https://example.com/data.yaml', self.user.id, progress=ImportProgress(published.append, interval=0)
+        )
+
+        self.assertTrue(result['status'])
+        self.assertEqual(
+            [meta['phase'] for meta in published],
+            ['fetching', 'parsing', 'categories', 'products', 'products', 'finishing']
+        )
+        self.assertEqual(published[-1]['goods_processed'], 2)
+        self.assertEqual(published[-1]['goods_total'], 2)
+        self.assertEqual(published[-1]['parameters'], 4)
+        self.assertEqual(published[-1]['eta'], 0)
+
+    def test_import_progress_throttling(self):
+        """
+        Тестирование ограничения частоты публикации хода импорта.
+        """
+        published = []
+        progress = ImportProgress(published.append, interval=60)
+        stats = ImportStats()
+
+        progress.set_phase('products', goods_total=100)
+        stats.goods = 10
+        progress.update(stats)
+        progress.set_phase('finishing')
+
+        self.assertEqual([meta['phase'] for meta in published], ['products', 'finishing'])
+        self.assertEqual(published[-1]['goods_processed'], 10)
+
+    @override_settings(IMPORT_MODE='incremental')
+    @patch('backend.services.import_service.ImportService.fetch_price_list')
+    def test_import_shop_data_skips_unchanged_content(self, mock_fetch_price_list):
+        """
+        Тестирование пропуска импорта, если содержимое прайс-листа не изменилось.
+        """
+        mock_fetch_price_list.return_value = (True, PriceListDownload.from_bytes(self.yaml_data.encode('utf-8')))
+
+        first = ImportService.import_shop_data('https://example.com/data.yaml', self.user.id)
+        self.assertTrue(first['status'])
+        self.assertEqual(ShopImportState.objects.get(shop=self.shop).content_hash,
+                         hashlib.sha256(self.yaml_data.encode('utf-8')).hexdigest())
+
+        with patch('backend.services.import_service.ImportService.parse_yaml') as mock_parse_yaml:
+            second = ImportService.import_shop_data('https://example.com/data.yaml', self.user.id)
+            mock_parse_yaml.assert_not_called()
+
+        self.assertTrue(second['status'])
+        self.assertTrue(second['skipped'])
+
+        # Измененный файл импортируется снова
+        changed_data = self.yaml_data.replace('price: 100', 'price: 110').encode('utf-8')
+        mock_fetch_price_list.return_value = (True, PriceListDownload.from_bytes(changed_data))
+        third = ImportService.import_shop_data('https://example.com/data.yaml', self.user.id)
+        self.assertNotIn('skipped', third)
+        self.assertEqual(third['stats']['updated'], 1)
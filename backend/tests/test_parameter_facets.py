@@ -0,0 +1,169 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from backend.models import Shop, Category, ParameterFacet, ProductParameter
+from backend.services.facets import numeric_value
+from backend.services.import_service import ImportService
+
+User = get_user_model()
+
+
+def build_goods(items):
+    """
+    Данные прайс-листа из списка (id, название, цвет, память).
+    """
+    return {'goods': [{
+        'id': external_id, 'category': 1, 'model': f'model/{external_id}', 'name': name,
+        'price': 100, 'price_rrc': 120, 'quantity': 5,
+        'parameters': {'Цвет': color, 'Встроенная память (Гб)': memory},
+    } for external_id, name, color, memory in items]}
+
+
+GOODS = [
+    (1, 'Смартфон Apple iPhone XS', 'черный', 64),
+    (2, 'Смартфон Apple iPhone 11', 'белый', 128),
+    (3, 'Смартфон Samsung Galaxy S10', 'черный', 256),
+    (4, 'Смартфон Xiaomi Redmi Note', 'синий', 512),
+]
+
+
+class ParameterFacetTestCase(TestCase):
+    """
+    Тесты фильтров по параметрам товаров и фасетов.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+        self.shop = Shop.objects.create(name='Shop', user=user, state=True)
+        Category.objects.create(id=1, name='Смартфоны')
+        ImportService.import_products(build_goods(GOODS), self.shop)
+
+    def list_ids(self, params):
+        response = self.client.get('/api/v1/products', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(item['external_id'] for item in response.data['results'])
+
+    def facets(self, params=None):
+        response = self.client.get('/api/v1/products', {'facets': 'true', **(params or {})})
+        return {facet['parameter']: facet for facet in response.data['facets']}
+
+    def test_numeric_value(self):
+        """
+        Тестирование разбора числового значения параметра.
+        """
+        self.assertEqual(numeric_value('6,1'), 6.1)
+        self.assertEqual(numeric_value(' 128 '), 128)
+        self.assertIsNone(numeric_value('черный'))
+        self.assertIsNone(numeric_value('nan'))
+        self.assertEqual(ProductParameter.objects.filter(value_numeric__isnull=False).count(), 4)
+
+    def test_value_filter(self):
+        """
+        Тестирование фильтра по значению и объединения повторенных значений через ИЛИ.
+        """
+        self.assertEqual(self.list_ids({'param[Цвет]': 'черный'}), [1, 3])
+        self.assertEqual(self.list_ids({'param[Цвет]': ['белый', 'синий']}), [2, 4])
+        self.assertEqual(self.list_ids({'param[Цвет]': 'черный', 'param[Встроенная память (Гб)]': '64'}), [1])
+
+    def test_numeric_range(self):
+        """
+        Тестирование фильтра по диапазону числового параметра.
+        """
+        self.assertEqual(self.list_ids({'param_min[Встроенная память (Гб)]': '128',
+                                        'param_max[Встроенная память (Гб)]': '256'}), [2, 3])
+        self.assertEqual(self.list_ids({'param_min[Встроенная память (Гб)]': '1000'}), [])
+
+    def test_invalid_bound(self):
+        """
+        Тестирование нечисловой границы диапазона.
+        """
+        response = self.client.get('/api/v1/products', {'param_min[Встроенная память (Гб)]': 'много'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['status'])
+
+    def test_precomputed_facets(self):
+        """
+        Тестирование фасетов каталога из предрасчитанной таблицы.
+        """
+        facets = self.facets()
+
+        self.assertEqual(facets['Цвет']['values'][0], {'value': 'черный', 'count': 2})
+        self.assertNotIn('min', facets['Цвет'])
+        self.assertEqual((facets['Встроенная память (Гб)']['min'], facets['Встроенная память (Гб)']['max']),
+                         (64, 512))
+        self.assertEqual(self.facets({'category_id': 2}), {})
+
+        self.shop.state = False
+        self.shop.save()
+        self.assertEqual(self.facets(), {})
+
+    def test_facets_for_filtered_list(self):
+        """
+        Тестирование фасетов для выборки с поиском и фильтрами по параметрам.
+        """
+        facets = self.facets({'param[Цвет]': 'черный'})
+        self.assertEqual(facets['Цвет']['values'], [{'value': 'черный', 'count': 2}])
+        self.assertEqual(len(facets['Встроенная память (Гб)']['values']), 2)
+
+        facets = self.facets({'search': 'apple'})
+        self.assertEqual(sorted(value['value'] for value in facets['Цвет']['values']), ['белый', 'черный'])
+
+    @override_settings(FACET_MAX_VALUES=2)
+    def test_max_values(self):
+        """
+        Тестирование ограничения количества значений параметра.
+        """
+        self.assertEqual(len(self.facets()['Цвет']['values']), 2)
+
+    @override_settings(IMPORT_MODE='incremental')
+    def test_incremental_reimport_refreshes(self):
+        """
+        Тестирование пересчета фасетов повторным импортом в режиме incremental.
+        """
+        ImportService.import_products(build_goods(GOODS[:2] + [(3, GOODS[2][1], 'белый', 256)]), self.shop)
+
+        colors = {value['value']: value['count'] for value in self.facets()['Цвет']['values']}
+        self.assertEqual(colors, {'черный': 1, 'белый': 2})
+        self.assertEqual(self.list_ids({'param[Цвет]': 'белый'}), [2, 3])
+
+
+@override_settings(IMPORT_MODE='replace')
+class ParameterFacetVersionTestCase(TestCase):
+    """
+    Тесты предрасчитанных фасетов при версионировании каталога.
+    """
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+        self.shop = Shop.objects.create(name='Shop', user=user, state=True)
+        Category.objects.create(id=1, name='Смартфоны')
+
+    def counts(self):
+        return dict(ParameterFacet.objects.filter(parameter__name='Цвет').values_list('value', 'count'))
+
+    def test_replace_and_rollback(self):
+        """
+        Тестирование фасетов опубликованной версии и их восстановления при откате.
+        """
+        ImportService.import_products(build_goods(GOODS), self.shop)
+        self.assertEqual(self.counts(), {'черный': 2, 'белый': 1, 'синий': 1})
+
+        ImportService.import_products(build_goods(GOODS[:1]), self.shop)
+        self.assertEqual(self.counts(), {'черный': 1})
+
+        self.shop.refresh_from_db()
+        ImportService.rollback_catalog(self.shop)
+        self.assertEqual(self.counts(), {'черный': 2, 'белый': 1, 'синий': 1})
@@ -0,0 +1,188 @@
+import os
+import tempfile
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from unittest.mock import patch
+from backend.models import Shop, ShopImportState, Product, Parameter, ProductInfo, ProductParameter
+from backend.services.fetch import PriceListDownload
+from backend.services.import_orchestration import ImportLock, ImportOrchestrator, RefreshScheduler
+from backend.services.import_service import ImportService
+from backend.tasks import import_partition_task, finish_partitioned_import_task, partitioned_import_failed_task
+from backend.tests.test_price_list_parsers import build_price_list
+
+User = get_user_model()
+
+
+@override_settings(IMPORT_PARTITIONS=3, IMPORT_PARTITION_THRESHOLD=10, IMPORT_CHUNK_SIZE=4,
+                   IMPORT_STREAM_THRESHOLD=0)
+class PartitionedImportTestCase(TestCase):
+    """
+    Тесты импорта крупного прайс-листа по разделам.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+        self.upload_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.upload_dir.cleanup)
+        settings_override = override_settings(IMPORT_UPLOAD_DIR=self.upload_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def run_import(self, content, owner='coordinator-task-id', refresh=False):
+        """
+        Импорт с выполнением задач разделов и завершающей задачи в текущем процессе.
+
+        Returns:
+            tuple: (результат задачи импорта, описание импорта plan или None, результат завершающей задачи).
+        """
+        download = PriceListDownload.from_bytes(content)
+        with patch('backend.services.import_service.ImportService.fetch_price_list',
+                   return_value=(True, download)), patch('celery.chord') as mock_chord:
+            mock_chord.return_value.return_value.id = 'finish-task-id'
+            result = ImportOrchestrator.run_locked('https://example.com/data.yaml', self.user.id, owner=owner,
+                                                   refresh=refresh)
+
+        if not mock_chord.called:
+            return result, None, None
+
+        header = list(mock_chord.call_args[0][0])
+        plan = header[0].args[0]
+        partition_stats = [import_partition_task.run(*signature.args) for signature in header]
+        return result, plan, finish_partitioned_import_task.run(partition_stats, plan)
+
+    @override_settings(IMPORT_MODE='replace')
+    def test_replace_import(self):
+        """
+        Тестирование импорта по разделам в режиме replace: версия публикуется завершающей задачей.
+        """
+        self.run_import(build_price_list(12))
+        result, plan, finish_result = self.run_import(build_price_list(30))
+
+        self.assertTrue(result['partitioned'])
+        self.assertEqual(result['partitions'], 3)
+        self.assertEqual(result['finish_task_id'], 'finish-task-id')
+        self.assertTrue(finish_result['status'], finish_result.get('error'))
+        self.assertEqual(finish_result['stats']['goods'], 30)
+        self.assertEqual(finish_result['stats']['parameters'], 60)
+
+        shop = Shop.objects.get(user=self.user)
+        self.assertEqual((shop.catalog_version, shop.previous_catalog_version), (2, 1))
+        self.assertEqual(ProductInfo.objects.filter(shop=shop).live().count(), 30)
+        self.assertEqual(
+            sorted(ProductInfo.objects.live().values_list('external_id', flat=True)), list(range(1, 31))
+        )
+        self.assertEqual(ProductParameter.objects.filter(product_info__catalog_version=2).count(), 60)
+        self.assertEqual(ShopImportState.objects.get(shop=shop).content_hash, plan['download']['content_hash'])
+
+        # Файлы разделов удалены, блокировка снята
+        self.assertEqual(os.listdir(self.upload_dir.name), [])
+        self.assertIsNone(ImportLock.holder(self.user.id))
+
+    @override_settings(IMPORT_MODE='incremental')
+    def test_incremental_import(self):
+        """
+        Тестирование импорта по разделам в режиме incremental: отсутствующие товары удаляются,
+        товары и параметры не дублируются.
+        """
+        self.run_import(build_price_list(30))
+        content = build_price_list(20).replace(b"    price: 105\n", b"    price: 999\n")
+
+        _, _, finish_result = self.run_import(content)
+
+        self.assertEqual(finish_result['stats']['updated'], 1)
+        self.assertEqual(finish_result['stats']['unchanged'], 19)
+        self.assertEqual(finish_result['stats']['deleted'], 10)
+        self.assertEqual(ProductInfo.objects.count(), 20)
+        self.assertEqual(ProductInfo.objects.get(external_id=6).price, 999)
+        self.assertEqual(Product.objects.count(), 30)
+        self.assertEqual(Parameter.objects.count(), 2)
+
+    @override_settings(IMPORT_MODE='replace')
+    def test_direct_import_runs_partitions(self):
+        """
+        Тестирование импорта без оркестратора: разделы записываются в текущем процессе,
+        возвращается итоговый результат, а не описание импорта.
+        """
+        download = PriceListDownload.from_bytes(build_price_list(30))
+        with patch('backend.services.import_service.ImportService.fetch_price_list',
+                   return_value=(True, download)), patch('celery.chord') as mock_chord:
+            result = ImportService.import_shop_data('https://example.com/data.yaml', self.user.id)
+
+        mock_chord.assert_not_called()
+        self.assertTrue(result['status'], result.get('error'))
+        self.assertNotIn('plan', result)
+        self.assertEqual(result['stats']['goods'], 30)
+        self.assertEqual(ProductInfo.objects.live().count(), 30)
+        self.assertEqual(os.listdir(self.upload_dir.name), [])
+
+    def test_small_price_list_not_partitioned(self):
+        """
+        Тестирование импорта прайс-листа меньше порога без разбиения.
+        """
+        result, plan, _ = self.run_import(build_price_list(9))
+
+        self.assertTrue(result['status'])
+        self.assertIsNone(plan)
+        self.assertNotIn('partitioned', result)
+        self.assertEqual(ProductInfo.objects.count(), 9)
+        self.assertIsNone(ImportLock.holder(self.user.id))
+
+    @override_settings(IMPORT_MODE='replace')
+    def test_lock_held_until_finish(self):
+        """
+        Тестирование блокировки магазина: она удерживается до завершающей задачи.
+        """
+        download = PriceListDownload.from_bytes(build_price_list(12))
+        with patch('backend.services.import_service.ImportService.fetch_price_list',
+                   return_value=(True, download)), patch('celery.chord') as mock_chord:
+            ImportOrchestrator.run_locked('https://example.com/data.yaml', self.user.id, owner='coordinator')
+
+        self.assertEqual(ImportLock.holder(self.user.id), 'coordinator')
+        plan = list(mock_chord.call_args[0][0])[0].args[0]
+
+        # Ошибка задачи раздела: версия не публикуется, файлы удаляются, блокировка снимается
+        partitioned_import_failed_task.run(None, OperationalError("database is locked"), None, plan)
+
+        self.assertIsNone(ImportLock.holder(self.user.id))
+        self.assertEqual(os.listdir(self.upload_dir.name), [])
+        self.assertEqual(Shop.objects.get(user=self.user).catalog_version, 0)
+
+    @override_settings(IMPORT_MODE='replace')
+    def test_refresh_recorded_by_finish(self):
+        """
+        Тестирование планового обновления по разделам: отметка запуска остается до завершения chord,
+        а результат (успех или ошибку раздела) учитывает завершающая задача.
+        """
+        self.run_import(build_price_list(12))
+        shop = Shop.objects.get(user=self.user)
+        ShopImportState.objects.update_or_create(shop=shop, defaults={
+            'refresh_started_at': timezone.now(), 'refresh_failures': 2,
+        })
+
+        result, plan, finish_result = self.run_import(build_price_list(30), refresh=True)
+
+        self.assertTrue(plan['refresh'])
+        self.assertIsNone(RefreshScheduler.record_result(shop.id, result))
+        self.assertTrue(finish_result['status'], finish_result.get('error'))
+        state = ShopImportState.objects.get(shop=shop)
+        self.assertEqual(state.refresh_failures, 0)
+        self.assertIsNone(state.refresh_started_at)
+
+        with patch('backend.services.import_service.ImportService.fetch_price_list',
+                   return_value=(True, PriceListDownload.from_bytes(build_price_list(12)))), \
+                patch('celery.chord') as mock_chord:
+            ImportOrchestrator.run_locked('https://example.com/data.yaml', self.user.id, owner='coordinator',
+                                          refresh=True)
+        plan = list(mock_chord.call_args[0][0])[0].args[0]
+        partitioned_import_failed_task.run(None, OperationalError("database is locked"), None, plan)
+
+        state = ShopImportState.objects.get(shop=shop)
+        self.assertEqual(state.refresh_failures, 1)
+        self.assertIn('database is locked', state.last_refresh_error)
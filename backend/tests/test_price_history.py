@@ -0,0 +1,208 @@
+from datetime import timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from backend.models import Shop, Category, Product, ProductInfo, PriceHistory
+from backend.services.fetch import PriceListDownload
+from backend.services.import_service import ImportService
+from backend.services.price_history import PriceHistoryService
+from backend.tests.test_price_list_parsers import build_price_list
+
+User = get_user_model()
+
+
+@override_settings(IMPORT_STREAM_THRESHOLD=0, IMPORT_CHUNK_SIZE=5)
+class PriceHistoryImportTestCase(TestCase):
+    """
+    Тесты записи истории цен и остатков при импорте.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+
+    def import_price_list(self, content):
+        download = PriceListDownload.from_bytes(content)
+        with patch('backend.services.import_service.ImportService.fetch_price_list',
+                   return_value=(True, download)):
+            return ImportService.import_shop_data('https://example.com/data.yaml', self.user.id)
+
+    def history(self):
+        return list(PriceHistory.objects.order_by('id').values_list('external_id', 'price', 'quantity'))
+
+    @override_settings(IMPORT_MODE='incremental')
+    def test_incremental_records_changes_only(self):
+        """
+        Тестирование режима incremental: записываются новые товары и изменения цены или количества.
+        """
+        result = self.import_price_list(build_price_list(12))
+        self.assertEqual(result['stats']['history'], 12)
+
+        content = (build_price_list(12)
+                   .replace(b"    price: 100\n", b"    price: 90\n")
+                   .replace(b"    model: model-5\n", b"    model: model-5b\n"))
+        content = content.replace(b"  - id: 8\n    category: 1\n    model: model-7\n    name: Product 7\n"
+                                  b"    price: 107\n    price_rrc: 127\n    quantity: 5\n",
+                                  b"  - id: 8\n    category: 1\n    model: model-7\n    name: Product 7\n"
+                                  b"    price: 107\n    price_rrc: 127\n    quantity: 0\n")
+        result = self.import_price_list(content)
+
+        # Изменение модели не попадает в историю
+        self.assertEqual(result['stats']['updated'], 3)
+        self.assertEqual(result['stats']['history'], 2)
+        self.assertEqual(self.history()[12:], [(1, 90, 5), (8, 107, 0)])
+
+        # Повторный импорт без изменений не добавляет записей
+        state = Shop.objects.get(user=self.user).import_state
+        state.content_hash = ''
+        state.save()
+        self.import_price_list(content)
+        self.assertEqual(PriceHistory.objects.count(), 14)
+
+    @override_settings(IMPORT_MODE='replace')
+    def test_replace_records_on_publish(self):
+        """
+        Тестирование режима replace: изменения записываются при публикации и при откате версии.
+        """
+        self.import_price_list(build_price_list(6))
+        result = self.import_price_list(build_price_list(6).replace(b"    price: 102\n", b"    price: 150\n"))
+
+        self.assertEqual(result['stats']['history'], 1)
+        self.assertEqual(self.history()[6:], [(3, 150, 5)])
+
+        ImportService.rollback_catalog(Shop.objects.get(user=self.user))
+        self.assertEqual(self.history()[7:], [(3, 102, 5)])
+
+    @override_settings(IMPORT_MODE='incremental', IMPORT_PRICE_HISTORY=False)
+    def test_history_disabled(self):
+        """
+        Тестирование отключения истории настройкой IMPORT_PRICE_HISTORY.
+        """
+        self.import_price_list(build_price_list(6))
+
+        self.assertEqual(PriceHistory.objects.count(), 0)
+
+
+class PriceHistorySeriesTestCase(TestCase):
+    """
+    Тесты чтения ряда истории цен и API истории цен.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+        self.shop = Shop.objects.create(name='Shop', user=user)
+        product = Product.objects.create(name='Product', category=Category.objects.create(name='Category'))
+        self.product_info = ProductInfo.objects.create(
+            product=product, shop=self.shop, external_id=1, price=100, price_rrc=120, quantity=5
+        )
+        self.start = timezone.now() - timedelta(days=100)
+        PriceHistory.objects.bulk_create([
+            PriceHistory(shop=self.shop, external_id=1, price=100 + day % 10, price_rrc=120, quantity=day,
+                         recorded_at=self.start + timedelta(days=day))
+            for day in range(100)
+        ] + [
+            PriceHistory(shop=self.shop, external_id=2, price=1, price_rrc=1, quantity=1, recorded_at=self.start)
+        ])
+
+    def test_full_series(self):
+        """
+        Тестирование ряда без прореживания.
+        """
+        series = PriceHistoryService.series(self.product_info, points=100)
+
+        self.assertFalse(series['downsampled'])
+        self.assertEqual(len(series['points']), 100)
+        self.assertEqual(series['points'][-1]['quantity'], 99)
+
+    def test_downsampled_series(self):
+        """
+        Тестирование прореживания ряда: последние значения и диапазон цены в каждом интервале.
+        """
+        series = PriceHistoryService.series(self.product_info, points=10, date_to=self.start + timedelta(days=100))
+
+        self.assertTrue(series['downsampled'])
+        self.assertEqual(len(series['points']), 10)
+        first = series['points'][0]
+        self.assertEqual(first['recorded_at'], self.start)
+        self.assertEqual((first['price_min'], first['price_max'], first['price'], first['quantity']),
+                         (100, 109, 109, 9))
+
+    def test_downsampled_in_sql(self):
+        """
+        Тестирование группировки интервалов в SQL: строки отдельных записей не читаются,
+        интервалы совпадают с разбиением периода на равные части.
+        """
+        date_from = self.start + timedelta(days=3, hours=12)
+        date_to = self.start + timedelta(days=63, hours=12)
+        with CaptureQueriesContext(connection) as queries:
+            series = PriceHistoryService.series(self.product_info, date_from=date_from, date_to=date_to, points=6)
+
+        self.assertLessEqual(len(queries), 4)
+        self.assertEqual(len(series['points']), 6)
+        # Первый интервал: значение на начало периода (день 3) и дни 4-13
+        first = series['points'][0]
+        self.assertEqual((first['recorded_at'], first['price_min'], first['price_max'], first['quantity']),
+                         (date_from, 100, 109, 13))
+        last = series['points'][-1]
+        self.assertEqual((last['recorded_at'], last['price'], last['quantity']),
+                         (date_from + timedelta(days=50), 103, 63))
+
+    def test_initial_value(self):
+        """
+        Тестирование начала периода: первой точкой идет значение, действовавшее на его начало.
+        """
+        date_from = self.start + timedelta(days=50, hours=12)
+        series = PriceHistoryService.series(self.product_info, date_from=date_from,
+                                            date_to=self.start + timedelta(days=52, hours=12))
+
+        self.assertEqual([(point['recorded_at'], point['quantity']) for point in series['points']], [
+            (date_from, 50),
+            (self.start + timedelta(days=51), 51),
+            (self.start + timedelta(days=52), 52),
+        ])
+
+    def test_api(self):
+        """
+        Тестирование API истории цен товара.
+        """
+        response = self.client.get(f'/api/v1/products/{self.product_info.id}/price-history', {'points': 20})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['external_id'], 1)
+        self.assertTrue(response.data['downsampled'])
+        self.assertLessEqual(len(response.data['points']), 20)
+
+        response = self.client.get(f'/api/v1/products/{self.product_info.id}/price-history',
+                                   {'date_from': (self.start + timedelta(days=98)).date().isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['downsampled'])
+        self.assertEqual(len(response.data['points']), 3)
+
+    def test_api_errors(self):
+        """
+        Тестирование ошибок API истории цен: неизвестный товар и некорректные параметры.
+        """
+        url = f'/api/v1/products/{self.product_info.id}/price-history'
+
+        self.assertEqual(self.client.get('/api/v1/products/999999/price-history').status_code, 404)
+        # Строка неопубликованной версии каталога
+        staged = ProductInfo.objects.create(product=self.product_info.product, shop=self.shop, external_id=1,
+                                            price=100, price_rrc=120, quantity=5, catalog_version=1)
+        self.assertEqual(self.client.get(f'/api/v1/products/{staged.id}/price-history').status_code, 404)
+        self.assertEqual(self.client.get(url, {'date_from': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'points': 0}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'date_from': '2030-01-02', 'date_to': '2030-01-01'}).status_code, 400)
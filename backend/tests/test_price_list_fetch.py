@@ -0,0 +1,232 @@
+import gzip
+import os
+import threading
+import time
+import tempfile
+import tracemalloc
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from unittest.mock import patch
+from backend.services.fetch import PriceListFetcher, PriceListDownload, FetchError
+from backend.services.import_service import ImportService
+from backend.models import ShopImportState, Shop, ProductInfo
+from backend.tests.test_price_list_parsers import build_price_list
+
+User = get_user_model()
+
+
+class PriceListStubHandler(BaseHTTPRequestHandler):
+    """
+    HTTP-заглушка источника прайс-листов с поддержкой ETag и gzip.
+    """
+    content = b''
+    etag = '"v1"'
+    gzip_file = False
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append(dict(self.headers))
+
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.send_header('ETag', self.etag)
+            self.end_headers()
+            return
+
+        body = self.content
+        self.send_response(200)
+        self.send_header('ETag', self.etag)
+        self.send_header('Last-Modified', 'Wed, 01 Jan 2025 00:00:00 GMT')
+        if self.gzip_file:
+            body = gzip.compress(body)
+        elif 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PriceListFetchTestCase(TestCase):
+    """
+    Тесты загрузки прайс-листов по HTTP.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(('127.0.0.1', 0), PriceListStubHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/price.yaml"
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        PriceListStubHandler.content = build_price_list(5)
+        PriceListStubHandler.etag = '"v1"'
+        PriceListStubHandler.gzip_file = False
+        PriceListStubHandler.requests = []
+        self.user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+
+    def test_fetch_to_temp_file(self):
+        """
+        Тестирование загрузки во временный файл со сжатием gzip при передаче.
+        """
+        download = PriceListFetcher.fetch(self.url)
+        try:
+            self.assertEqual(download.read(), PriceListStubHandler.content)
+            self.assertEqual(download.size, len(PriceListStubHandler.content))
+            self.assertEqual(download.etag, '"v1"')
+            self.assertIn('gzip', PriceListStubHandler.requests[0]['Accept-Encoding'])
+        finally:
+            download.cleanup()
+        self.assertIsNone(download.path)
+
+    def test_fetch_gzip_file(self):
+        """
+        Тестирование прайс-листа, отданного файлом .gz без Content-Encoding.
+        """
+        PriceListStubHandler.gzip_file = True
+        download = PriceListFetcher.fetch(self.url)
+        try:
+            self.assertEqual(download.read(), PriceListStubHandler.content)
+        finally:
+            download.cleanup()
+
+    @override_settings(IMPORT_MAX_SIZE=1024 * 1024)
+    def test_gzip_bomb(self):
+        """
+        Тестирование сильно сжатого архива: распаковка останавливается на ограничении размера,
+        не распаковывая фрагмент в память целиком.
+        """
+        bomb = gzip.compress(b'0' * 64 * 1024 * 1024)
+
+        tracemalloc.start()
+        try:
+            with self.assertRaisesMessage(FetchError, "превышает допустимый"):
+                PriceListDownload.from_chunks([bomb])
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(peak, 4 * 1024 * 1024)
+
+    def test_file_removed_on_any_error(self):
+        """
+        Тестирование удаления временного файла при любой ошибке чтения фрагментов,
+        в том числе при прерывании задачи.
+        """
+        def chunks(error):
+            yield b'shop: Test Shop\n'
+            raise error
+
+        with tempfile.TemporaryDirectory() as directory:
+            for error in (OSError("No space left on device"), KeyboardInterrupt(), SystemExit()):
+                with self.subTest(error=type(error).__name__):
+                    with self.assertRaises(type(error)):
+                        PriceListDownload.from_chunks(chunks(error), directory=directory)
+                    self.assertEqual(os.listdir(directory), [])
+
+    def test_gzip_members(self):
+        """
+        Тестирование архива из нескольких членов и данных после архива.
+        """
+        content = PriceListStubHandler.content
+        archive = gzip.compress(content[:100]) + gzip.compress(content[100:])
+        download = PriceListDownload.from_chunks([archive[:50], archive[50:]])
+        try:
+            self.assertEqual(download.read(), content)
+        finally:
+            download.cleanup()
+
+        for archive in (gzip.compress(content) + b'garbage', gzip.compress(content)[:-4]):
+            with self.assertRaisesMessage(FetchError, "Ошибка распаковки gzip"):
+                PriceListDownload.from_chunks([archive])
+
+    def test_fetch_not_modified(self):
+        """
+        Тестирование условного запроса: при совпадении ETag тело не передается.
+        """
+        download = PriceListFetcher.fetch(self.url, etag='"v1"')
+
+        self.assertTrue(download.not_modified)
+        self.assertIsNone(download.path)
+        self.assertEqual(PriceListStubHandler.requests[0]['If-None-Match'], '"v1"')
+
+    @override_settings(IMPORT_MAX_SIZE=100)
+    def test_fetch_max_size(self):
+        """
+        Тестирование ограничения размера прайс-листа.
+        """
+        with self.assertRaisesMessage(FetchError, "превышает допустимый"):
+            PriceListFetcher.fetch(self.url)
+
+    def test_fetch_http_error(self):
+        """
+        Тестирование ошибки соединения.
+        """
+        with self.assertRaisesMessage(FetchError, "Ошибка при получении данных"):
+            PriceListFetcher.fetch('http://127.0.0.1:1/price.yaml')
+
+    def test_import_shop_data_conditional_request(self):
+        """
+        Тестирование повторного импорта: ответ 304 завершает импорт без разбора файла.
+        """
+        result = ImportService.import_shop_data(self.url, self.user.id)
+        self.assertTrue(result['status'])
+        state = ShopImportState.objects.get(shop__user=self.user)
+        self.assertEqual((state.source_url, state.etag), (self.url, '"v1"'))
+
+        started = time.perf_counter()
+        with patch('backend.services.import_service.ImportService.import_shop_file') as mock_import_file:
+            result = ImportService.import_shop_data(self.url, self.user.id)
+            mock_import_file.assert_not_called()
+
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertTrue(result['skipped'])
+        self.assertEqual(PriceListStubHandler.requests[-1]['If-None-Match'], '"v1"')
+
+    def test_import_shop_data_new_version(self):
+        """
+        Тестирование импорта новой версии прайс-листа с другим ETag.
+        """
+        ImportService.import_shop_data(self.url, self.user.id)
+
+        PriceListStubHandler.content = build_price_list(8)
+        PriceListStubHandler.etag = '"v2"'
+        result = ImportService.import_shop_data(self.url, self.user.id)
+
+        self.assertTrue(result['status'])
+        self.assertNotIn('skipped', result)
+        shop = Shop.objects.get(user=self.user)
+        self.assertEqual(ProductInfo.objects.live().filter(shop=shop).count(), 8)
+        self.assertEqual(shop.import_state.etag, '"v2"')
+
+    @override_settings(IMPORT_STREAM_THRESHOLD=0)
+    def test_import_shop_data_streams_from_temp_file(self):
+        """
+        Тестирование потокового импорта из временного файла и его удаления.
+        """
+        def temp_files():
+            return {name for name in os.listdir(tempfile.gettempdir()) if name.startswith('price_list_')}
+
+        before = temp_files()
+        result = ImportService.import_shop_data(self.url, self.user.id)
+
+        self.assertTrue(result['status'])
+        self.assertEqual(result['stats']['goods'], 5)
+        self.assertEqual(temp_files() - before, set())
@@ -0,0 +1,395 @@
+import io
+import json
+import tempfile
+import tracemalloc
+import yaml
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from unittest.mock import patch
+from django.db import OperationalError
+from backend.services.bulk_import import BulkProductImporter
+from backend.services.import_service import ImportService
+from backend.services.fetch import PriceListDownload
+from backend.services.benchmark import PriceListGenerator
+from backend.services.parsers import (
+    YamlPriceListReader, JsonLinesPriceListReader, CsvPriceListReader, JsonPriceListReader,
+    PriceListError, detect_format, get_reader
+)
+from backend.models import ShopImportState, Shop, ProductInfo, ProductParameter
+
+User = get_user_model()
+
+
+def build_price_list(goods_count, shop='Test Shop'):
+    """
+    Формирует YAML-прайс-лист с заданным количеством товаров.
+    """
+    lines = [
+        f"shop: {shop}",
+        "categories:",
+        "  - id: 1",
+        "    name: Category 1",
+        "goods:",
+    ]
+    for index in range(goods_count):
+        lines += [
+            f"  - id: {index + 1}",
+            "    category: 1",
+            f"    model: model-{index}",
+            f"    name: Product {index}",
+            f"    price: {100 + index}",
+            f"    price_rrc: {120 + index}",
+            "    quantity: 5",
+            "    parameters:",
+            f"      \"Цвет\": color-{index % 7}",
+            f"      \"Память (Гб)\": {index % 4 * 64}",
+        ]
+    return ("\n".join(lines) + "\n").encode('utf-8')
+
+
+class YamlPriceListReaderTestCase(TestCase):
+    """
+    Тесты потокового чтения YAML-прайс-листа.
+    """
+
+    def test_chunks_match_full_document(self):
+        """
+        Тестирование совпадения потокового чтения с разбором документа целиком.
+        """
+        content = build_price_list(25)
+        reader = YamlPriceListReader(io.BytesIO(content), chunk_size=10)
+
+        header = reader.read_header()
+        chunks = list(reader.iter_chunks())
+        expected = yaml.safe_load(content)
+
+        self.assertEqual(header, {'shop': expected['shop'], 'categories': expected['categories']})
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        self.assertEqual([item for chunk in chunks for item in chunk], expected['goods'])
+
+    def test_header_after_goods(self):
+        """
+        Тестирование прайс-листа, в котором заголовок расположен после товаров.
+        """
+        content = b"goods:\n  - {id: 1, name: a}\n  - {id: 2, name: b}\nshop: Shop\ncategories: []\n"
+        reader = YamlPriceListReader(io.BytesIO(content))
+
+        self.assertEqual(reader.read_header(), {'shop': 'Shop', 'categories': []})
+        self.assertEqual(list(reader.iter_chunks()), [[{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}]])
+
+    def test_aliases(self):
+        """
+        Тестирование якорей и ссылок YAML внутри товаров.
+        """
+        content = (b"shop: Shop\ncategories: []\ngoods:\n"
+                   b"  - {id: 1, parameters: &params {color: red}}\n"
+                   b"  - {id: 2, parameters: *params}\n")
+        chunks = list(YamlPriceListReader(io.BytesIO(content)).iter_chunks())
+
+        self.assertEqual(chunks[0][1]['parameters'], {'color': 'red'})
+
+    def test_missing_required_field(self):
+        """
+        Тестирование прайс-листа без обязательного поля.
+        """
+        reader = YamlPriceListReader(io.BytesIO(b"shop: Shop\ngoods: []\n"))
+
+        with self.assertRaisesMessage(PriceListError, "отсутствует обязательное поле 'categories'"):
+            reader.read_header()
+
+    def test_peak_memory_does_not_depend_on_file_size(self):
+        """
+        Тестирование потребления памяти: пик определяется размером пакета, а не файла.
+        """
+        content = build_price_list(500)
+
+        tracemalloc.start()
+        try:
+            for _ in YamlPriceListReader(io.BytesIO(content), chunk_size=20).iter_chunks():
+                pass
+            _, streaming_peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+
+            yaml.safe_load(content)
+            _, full_peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(streaming_peak * 5, full_peak)
+
+
+class PriceListFormatsTestCase(TestCase):
+    """
+    Тесты чтения прайс-листов в форматах JSON, JSON Lines и CSV.
+    """
+
+    def write_price_list(self, price_format, goods=12):
+        file = tempfile.NamedTemporaryFile(suffix=f'.{price_format}')
+        self.addCleanup(file.close)
+        PriceListGenerator(goods=goods, categories=3, parameters=3).write(file.name, price_format)
+        return open(file.name, 'rb')
+
+    def read_all(self, price_format, chunk_size=5):
+        with self.write_price_list(price_format) as stream:
+            reader = get_reader(price_format, stream, chunk_size=chunk_size)
+            header = reader.read_header()
+            chunks = list(reader.iter_chunks())
+        return header, chunks
+
+    def test_formats_match_yaml(self):
+        """
+        Тестирование совпадения содержимого прайс-листа во всех форматах после проверки структуры.
+        """
+        expected_header, expected_chunks = self.read_all('yaml')
+        expected = {'goods': [item for chunk in expected_chunks for item in chunk], **expected_header}
+        ImportService.validate_structure(expected)
+
+        for price_format in ('json', 'jsonl', 'csv'):
+            with self.subTest(price_format=price_format):
+                header, chunks = self.read_all(price_format)
+                self.assertEqual([len(chunk) for chunk in chunks], [5, 5, 2])
+
+                data = {'goods': [item for chunk in chunks for item in chunk], **header}
+                self.assertEqual(ImportService.validate_structure(data), (True, None))
+                self.assertEqual(data['shop'], expected['shop'])
+                self.assertEqual(
+                    sorted(category['id'] for category in data['categories']),
+                    sorted({item['category'] for item in expected['goods']})
+                )
+                # В CSV все значения параметров - строки
+                for item, expected_item in zip(data['goods'], expected['goods']):
+                    self.assertEqual(
+                        {**item, 'parameters': None}, {**expected_item, 'parameters': None}
+                    )
+                    self.assertEqual(
+                        {name: str(value) for name, value in item['parameters'].items()},
+                        {name: str(value) for name, value in expected_item['parameters'].items()}
+                    )
+
+    def test_json_lines_invalid_line(self):
+        """
+        Тестирование ошибки разбора строки JSON Lines с указанием ее номера.
+        """
+        content = b'{"shop": "Shop", "categories": []}\n{"id": 1}\n{"id": \n'
+        reader = JsonLinesPriceListReader(io.BytesIO(content))
+
+        with self.assertRaisesMessage(PriceListError, "в строке 3"):
+            list(reader.iter_chunks())
+
+    def test_csv_semicolon_and_missing_column(self):
+        """
+        Тестирование CSV с разделителем ";" и CSV без обязательного столбца.
+        """
+        content = (
+            "shop;category;category_name;id;model;name;price;price_rrc;quantity;Цвет\n"
+            "Shop;1;Phones;10;m;Phone;100;120;5;red\n"
+            "Shop;1;Phones;11;m;Phone 2;100;120;5;\n"
+        ).encode('utf-8')
+        reader = CsvPriceListReader(io.BytesIO(content))
+
+        self.assertEqual(reader.read_header(), {'shop': 'Shop', 'categories': [{'id': '1', 'name': 'Phones'}]})
+        goods = next(reader.iter_chunks())
+        self.assertEqual(goods[0]['parameters'], {'Цвет': 'red'})
+        self.assertEqual(goods[1]['parameters'], {})
+
+        reader = CsvPriceListReader(io.BytesIO(b"shop,id,name\nShop,1,a\n"))
+        with self.assertRaisesMessage(PriceListError, "отсутствует обязательный столбец 'category'"):
+            reader.read_header()
+
+    def test_json_missing_goods(self):
+        """
+        Тестирование JSON-прайс-листа без обязательного поля.
+        """
+        reader = JsonPriceListReader(io.BytesIO(b'{"shop": "Shop", "categories": []}'))
+
+        with self.assertRaisesMessage(PriceListError, "отсутствует обязательное поле 'goods'"):
+            reader.read_header()
+
+    def test_json_header_after_goods(self):
+        """
+        Тестирование JSON-прайс-листа с заголовком после товаров и чтения малыми блоками.
+        """
+        content = json.dumps({
+            'goods': [{'id': index, 'name': f'Товар {index}', 'price': 10 ** index} for index in range(5)],
+            'shop': 'Shop',
+            'categories': [{'id': 1, 'name': 'Категория'}],
+        }, ensure_ascii=False).encode('utf-8')
+        reader = JsonPriceListReader(io.BytesIO(content), chunk_size=2)
+        reader.block_size = 3
+
+        self.assertEqual(reader.read_header(), {'shop': 'Shop', 'categories': [{'id': 1, 'name': 'Категория'}]})
+        chunks = list(reader.iter_chunks())
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual([item for chunk in chunks for item in chunk], json.loads(content)['goods'])
+
+        reader = JsonPriceListReader(io.BytesIO(b'{"shop": "Shop", "categories": [], "goods": [{"id": 1}'))
+        with self.assertRaisesMessage(PriceListError, "Ошибка при парсинге JSON"):
+            list(reader.iter_chunks())
+
+    def test_json_peak_memory_does_not_depend_on_file_size(self):
+        """
+        Тестирование потребления памяти JSON-прайс-листа: пик определяется размером пакета, а не файла.
+        """
+        with self.write_price_list('json', goods=2000) as stream:
+            content = stream.read()
+
+        tracemalloc.start()
+        try:
+            for _ in JsonPriceListReader(io.BytesIO(content), chunk_size=20).iter_chunks():
+                pass
+            _, streaming_peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+
+            json.load(io.BytesIO(content))
+            _, full_peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(streaming_peak * 5, full_peak)
+
+    def test_detect_format(self):
+        """
+        Тестирование определения формата по типу содержимого, расширению и содержимому.
+        """
+        self.assertEqual(detect_format(content_type='application/x-ndjson; charset=utf-8'), 'jsonl')
+        self.assertEqual(detect_format(content_type='text/csv'), 'csv')
+        self.assertEqual(detect_format(filename='https://example.com/price.json?v=2'), 'json')
+        self.assertEqual(detect_format(filename='price.yml.gz'), 'yaml')
+        self.assertEqual(
+            detect_format(content_type='application/octet-stream', filename='https://example.com/price'), 'yaml'
+        )
+        self.assertEqual(detect_format(head=b'{"shop": "Shop", "categories": []}\n{"id": 1}\n'), 'jsonl')
+        self.assertEqual(detect_format(head=b'{\n  "shop": "Shop",\n  "goods": []\n}'), 'json')
+        self.assertEqual(detect_format(head=json.dumps({'shop': 'Shop', 'goods': []}).encode()), 'json')
+        self.assertEqual(detect_format(head=b'shop,category,id,price\nShop,1,1,100\n'), 'csv')
+        self.assertEqual(detect_format(head=build_price_list(1)), 'yaml')
+
+
+class StreamingImportTestCase(TestCase):
+    """
+    Тесты потокового импорта прайс-листа через ImportService.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+
+    @override_settings(IMPORT_STREAM_THRESHOLD=0, IMPORT_CHUNK_SIZE=7)
+    @patch('backend.services.import_service.ImportService.fetch_price_list')
+    def test_import_shop_data_streaming(self, mock_fetch_price_list):
+        """
+        Тестирование импорта крупного прайс-листа в потоковом режиме.
+        """
+        mock_fetch_price_list.return_value = (True, PriceListDownload.from_bytes(build_price_list(30)))
+
+        with patch('backend.services.import_service.ImportService.parse_yaml') as mock_parse_yaml:
+            result = ImportService.import_shop_data('https://example.com/data.yaml', self.user.id)
+            mock_parse_yaml.assert_not_called()
+
+        self.assertTrue(result['status'])
+        shop = Shop.objects.get(name='Test Shop')
+        self.assertEqual(ProductInfo.objects.filter(shop=shop).count(), 30)
+        self.assertEqual(ProductParameter.objects.filter(product_info__shop=shop).count(), 60)
+        self.assertEqual(result['stats']['goods'], 30)
+
+    @patch('backend.services.import_service.ImportService.fetch_price_list')
+    def test_import_shop_data_formats(self, mock_fetch_price_list):
+        """
+        Тестирование импорта прайс-листов в форматах CSV, JSON Lines и JSON через общий конвейер.
+        """
+        for price_format in ('csv', 'jsonl', 'json'):
+            with self.subTest(price_format=price_format):
+                with tempfile.NamedTemporaryFile(suffix=f'.{price_format}') as file:
+                    PriceListGenerator(goods=15, parameters=2, shop='Test Shop', seed=len(price_format)).write(
+                        file.name, price_format
+                    )
+                    download = PriceListDownload.from_bytes(file.read())
+                download.content_type = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}.get(price_format, '')
+                mock_fetch_price_list.return_value = (True, download)
+
+                with patch('backend.services.import_service.ImportService.parse_yaml') as mock_parse_yaml:
+                    result = ImportService.import_shop_data('https://example.com/data', self.user.id)
+                    mock_parse_yaml.assert_not_called()
+
+                self.assertTrue(result['status'], result.get('error'))
+                self.assertEqual(result['stats']['goods'], 15)
+                shop = Shop.objects.get(name='Test Shop')
+                live = ProductInfo.objects.live().filter(shop=shop)
+                self.assertEqual(live.count(), 15)
+                self.assertEqual(ProductParameter.objects.filter(product_info__in=live).count(), 30)
+
+    @patch('backend.services.import_service.ImportService.fetch_price_list')
+    def test_import_shop_data_csv_invalid_row(self, mock_fetch_price_list):
+        """
+        Тестирование проверки структуры CSV-прайс-листа до записи в БД.
+        """
+        content = (
+            "shop,category,category_name,id,model,name,price,price_rrc,quantity\n"
+            "Test Shop,1,Phones,10,m,Phone,100,120,5\n"
+            "Test Shop,1,Phones,11,m,Phone 2,сто,120,5\n"
+        )
+        download = PriceListDownload.from_bytes(content, source_url='https://example.com/price.csv')
+        mock_fetch_price_list.return_value = (True, download)
+
+        result = ImportService.import_shop_data('https://example.com/price.csv', self.user.id)
+
+        self.assertFalse(result['status'])
+        self.assertIn("Поле 'price' товара (товар №2, id=11)", result['error'])
+        self.assertFalse(ProductInfo.objects.exists())
+
+    @override_settings(IMPORT_STREAM_THRESHOLD=0)
+    @patch('backend.services.import_service.ImportService.fetch_price_list')
+    def test_import_shop_data_streaming_invalid_goods(self, mock_fetch_price_list):
+        """
+        Тестирование потокового импорта с товаром без обязательного поля.
+        """
+        content = build_price_list(3).replace(b"    price: 101\n", b"")
+        mock_fetch_price_list.return_value = (True, PriceListDownload.from_bytes(content))
+
+        result = ImportService.import_shop_data('https://example.com/data.yaml', self.user.id)
+
+        self.assertFalse(result['status'])
+        self.assertIn("Товар должен содержать поле 'price'", result['error'])
+
+    @override_settings(IMPORT_STREAM_THRESHOLD=0, IMPORT_CHUNK_SIZE=7, IMPORT_MODE='replace')
+    @patch('backend.services.import_service.ImportService.fetch_price_list')
+    def test_import_shop_data_resumes_from_checkpoint(self, mock_fetch_price_list):
+        """
+        Тестирование продолжения прерванного импорта с контрольной точки.
+        """
+        content = build_price_list(30)
+        mock_fetch_price_list.side_effect = lambda *args: (True, PriceListDownload.from_bytes(content))
+        write_goods = BulkProductImporter._replace_goods
+        calls = []
+        fail_on_call = [3]
+
+        def failing_write(importer, goods):
+            calls.append(len(goods))
+            if len(calls) in fail_on_call:
+                raise OperationalError("database is locked")
+            return write_goods(importer, goods)
+
+        # Сбой БД на третьем пакете: два пакета уже записаны вместе с контрольной точкой
+        with patch.object(BulkProductImporter, '_replace_goods', failing_write):
+            with self.assertRaises(OperationalError):
+                ImportService.import_shop_data('https://example.com/data.yaml', self.user.id)
+
+        shop = Shop.objects.get(name='Test Shop')
+        self.assertEqual(ProductInfo.objects.filter(shop=shop).count(), 14)
+        self.assertEqual(ShopImportState.objects.get(shop=shop).checkpoint_offset, 14)
+
+        # Повторный запуск продолжает с 15-го товара и не удаляет записанные
+        calls.clear()
+        fail_on_call.clear()
+        with patch.object(BulkProductImporter, '_replace_goods', failing_write):
+            result = ImportService.import_shop_data('https://example.com/data.yaml', self.user.id)
+
+        self.assertTrue(result['status'])
+        self.assertEqual(result['stats']['resumed'], 14)
+        self.assertEqual(calls, [7, 7, 2])
+        self.assertEqual(ProductInfo.objects.filter(shop=shop).count(), 30)
+        self.assertEqual(ShopImportState.objects.get(shop=shop).checkpoint_offset, 0)
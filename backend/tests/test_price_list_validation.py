@@ -0,0 +1,193 @@
+import time
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from unittest.mock import patch
+from backend.models import Shop, ProductInfo
+from backend.services.fetch import PriceListDownload
+from backend.services.import_service import ImportService
+from backend.services.validation import PriceListValidator
+from backend.tests.test_price_list_parsers import build_price_list
+
+User = get_user_model()
+
+
+def build_goods(goods_count):
+    """
+    Формирует список товаров прайс-листа в виде словарей.
+    """
+    return [
+        {
+            'id': index + 1,
+            'category': 1,
+            'model': f'model-{index}',
+            'name': f'Product {index}',
+            'price': 100 + index,
+            'price_rrc': 120 + index,
+            'quantity': 5,
+            'parameters': {'Цвет': f'color-{index % 7}'},
+        }
+        for index in range(goods_count)
+    ]
+
+
+class PriceListValidatorTestCase(TestCase):
+    """
+    Тесты однопроходной проверки структуры прайс-листа.
+    """
+
+    def setUp(self):
+        self.data = {
+            'shop': 'Test Shop',
+            'categories': [{'id': 1, 'name': 'Category 1'}],
+            'goods': build_goods(5),
+        }
+
+    def test_coerces_numeric_strings(self):
+        """
+        Тестирование приведения числовых полей, переданных строкой, и числовых названий.
+        """
+        self.data['goods'][0].update({'id': '1', 'price': ' 250 ', 'quantity': 3.0, 'model': 1984})
+
+        valid, error = ImportService.validate_structure(self.data)
+
+        self.assertTrue(valid)
+        self.assertIsNone(error)
+        self.assertEqual(
+            [self.data['goods'][0][field] for field in ('id', 'price', 'quantity', 'model')],
+            [1, 250, 3, '1984']
+        )
+
+    def test_collects_all_row_errors(self):
+        """
+        Тестирование сбора ошибок всех строк за один проход.
+        """
+        del self.data['goods'][1]['price']
+        self.data['goods'][2]['quantity'] = -1
+        self.data['goods'][3]['price_rrc'] = 'дорого'
+        self.data['goods'][4]['category'] = 2
+
+        validator = PriceListValidator()
+        self.assertFalse(validator.validate(self.data))
+
+        self.assertEqual(len(validator.errors), 4)
+        self.assertIn("Товар должен содержать поле 'price' (товар №2, id=2)", validator.errors[0])
+        self.assertIn("Поле 'quantity'", validator.errors[1])
+        self.assertIn("'дорого'", validator.errors[2])
+        self.assertIn("Категория товара 2 отсутствует", validator.errors[3])
+
+    def test_invalid_parameters_type(self):
+        """
+        Тестирование проверки типа поля parameters.
+        """
+        self.data['goods'][0]['parameters'] = ['Цвет']
+
+        valid, error = ImportService.validate_structure(self.data)
+
+        self.assertFalse(valid)
+        self.assertIn("Поле 'parameters' товара (товар №1, id=1) должно быть словарем", error)
+
+    def test_field_limits(self):
+        """
+        Тестирование ограничений полей моделей: диапазон целых чисел, длина строк и параметры.
+        """
+        self.data['categories'][0]['name'] = 'К' * 41
+        self.data['goods'][0]['price'] = 2147483648
+        self.data['goods'][1]['name'] = 'Н' * 81
+        self.data['goods'][2]['model'] = 'M' * 81
+        self.data['goods'][3]['parameters'] = {'П' * 41: 'черный'}
+        self.data['goods'][4]['parameters'] = {'Цвет': {'основной': 'черный'}}
+
+        validator = PriceListValidator()
+        self.assertFalse(validator.validate(self.data))
+
+        self.assertEqual(len(validator.errors), 6)
+        self.assertIn("Поле 'name' категории (категория №1) должно быть строкой не длиннее 40 символов",
+                      validator.errors[0])
+        self.assertIn("Поле 'price' товара (товар №1, id=1) должно быть целым неотрицательным числом "
+                      "не больше 2147483647", validator.errors[1])
+        self.assertIn("строкой не длиннее 80 символов", validator.errors[2])
+        self.assertIn("Поле 'model'", validator.errors[3])
+        self.assertIn("названия - строки не длиннее 40 символов", validator.errors[4])
+        self.assertIn("Поле 'parameters' товара (товар №5, id=5)", validator.errors[5])
+
+    def test_parameter_names_coerced(self):
+        """
+        Тестирование приведения числовых названий параметров к строкам.
+        """
+        self.data['goods'][0]['parameters'] = {2019: 'год', 'Вес': 1.5, 'В наличии': True}
+
+        valid, error = ImportService.validate_structure(self.data)
+
+        self.assertTrue(valid, error)
+        self.assertEqual(self.data['goods'][0]['parameters'], {'2019': 'год', 'Вес': 1.5, 'В наличии': True})
+
+    @override_settings(IMPORT_VALIDATION_MAX_ERRORS=3)
+    def test_errors_cap(self):
+        """
+        Тестирование ограничения числа собираемых ошибок.
+        """
+        for item in self.data['goods']:
+            item['price'] = 'n/a'
+
+        validator = PriceListValidator()
+        validator.validate(self.data)
+
+        self.assertEqual(len(validator.errors), 3)
+        self.assertTrue(validator.truncated)
+        self.assertIn("проверка остановлена после 3 ошибок", validator.format_errors())
+
+    def test_large_price_list(self):
+        """
+        Тестирование скорости проверки прайс-листа на 100 000 товаров.
+        """
+        self.data['goods'] = build_goods(100000)
+
+        started = time.perf_counter()
+        valid, error = ImportService.validate_structure(self.data)
+
+        self.assertTrue(valid, error)
+        self.assertLess(time.perf_counter() - started, 3)
+
+
+class StreamingValidationTestCase(TestCase):
+    """
+    Тесты проверки потокового прайс-листа до записи в БД.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+
+    @override_settings(IMPORT_STREAM_THRESHOLD=0, IMPORT_CHUNK_SIZE=5)
+    @patch('backend.services.import_service.ImportService.fetch_price_list')
+    def test_invalid_goods_rejected_before_writes(self, mock_fetch_price_list):
+        """
+        Тестирование потокового импорта с ошибкой в последнем пакете: в БД ничего не записано.
+        """
+        content = build_price_list(20).replace(b"    price: 119\n", b"    price: abc\n")
+        mock_fetch_price_list.return_value = (True, PriceListDownload.from_bytes(content))
+
+        result = ImportService.import_shop_data('https://example.com/data.yaml', self.user.id)
+
+        self.assertFalse(result['status'])
+        self.assertIn("товар №20, id=20", result['error'])
+        self.assertFalse(Shop.objects.filter(name='Test Shop').exists())
+        self.assertFalse(ProductInfo.objects.exists())
+
+    @override_settings(IMPORT_STREAM_THRESHOLD=0, IMPORT_CHUNK_SIZE=5)
+    @patch('backend.services.import_service.ImportService.fetch_price_list')
+    def test_prevalidation_reports_goods_total(self, mock_fetch_price_list):
+        """
+        Тестирование передачи общего числа товаров в ход потокового импорта.
+        """
+        mock_fetch_price_list.return_value = (True, PriceListDownload.from_bytes(build_price_list(12)))
+
+        with patch('backend.services.import_service.ImportService.import_price_list',
+                   return_value={"status": True}) as mock_import_price_list:
+            ImportService.import_shop_data('https://example.com/data.yaml', self.user.id)
+
+        self.assertEqual(mock_import_price_list.call_args.kwargs['goods_total'], 12)
@@ -0,0 +1,176 @@
+import importlib
+from types import SimpleNamespace
+from unittest.mock import patch
+from django.apps import apps
+from django.db import connection, IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from backend.models import Shop, Category, Product, ProductInfo, CatalogItem, Order, OrderItem
+from backend.services.bulk_import import BulkProductImporter
+from backend.services.import_service import ImportService
+from backend.services.matching import normalize_match_key, product_match_key
+
+User = get_user_model()
+
+
+def build_item(external_id, name, model='', category=1):
+    return {
+        'id': external_id,
+        'category': category,
+        'model': model,
+        'name': name,
+        'price': 100,
+        'price_rrc': 120,
+        'quantity': 5,
+        'parameters': {},
+    }
+
+
+class ProductMatchingTestCase(TestCase):
+    """
+    Тесты сопоставления товаров прайс-листов с Product по ключу match_key.
+    """
+
+    def setUp(self):
+        self.category = Category.objects.create(id=1, name='Смартфоны')
+        self.shops = []
+        for index in range(2):
+            user = User.objects.create_user(
+                email=f'shop{index}@example.com',
+                password='password123',
+                is_active=True,
+                type='shop'
+            )
+            self.shops.append(Shop.objects.create(name=f'Shop {index}', user=user))
+
+    def test_normalize_match_key(self):
+        """
+        Тестирование нормализации: регистр, пробелы, знаки препинания и "ё".
+        """
+        self.assertEqual(
+            normalize_match_key('  Смартфон Apple iPhone XS (512GB,  золотистый) '),
+            'смартфон apple iphone xs 512gb золотистый'
+        )
+        self.assertEqual(normalize_match_key('Ёлка «Galaxy S10+»'), 'елка galaxy s10+')
+        self.assertEqual(len(normalize_match_key('x' * 200)), 100)
+
+    def test_product_save_sets_match_key(self):
+        """
+        Тестирование заполнения ключа при создании товара через ORM.
+        """
+        product = Product.objects.create(name='iPhone XS, черный', category=self.category)
+
+        self.assertEqual(product.match_key, 'iphone xs черный')
+
+    def test_cross_shop_deduplication(self):
+        """
+        Тестирование сопоставления почти одинаковых названий из разных магазинов с одним товаром.
+        """
+        ImportService.import_products({'goods': [build_item(1, 'Смартфон Apple iPhone XS (черный)')]}, self.shops[0])
+        ImportService.import_products({'goods': [build_item(7, 'смартфон  APPLE iPhone XS черный')]}, self.shops[1])
+
+        self.assertEqual(Product.objects.count(), 1)
+        self.assertEqual(
+            set(ProductInfo.objects.values_list('product__name', flat=True)), {'Смартфон Apple iPhone XS (черный)'}
+        )
+
+    @override_settings(IMPORT_PRODUCT_MATCH='model')
+    def test_model_based_matching(self):
+        """
+        Тестирование сопоставления по модели; товары без модели сопоставляются по названию.
+        """
+        ImportService.import_products({'goods': [
+            build_item(1, 'Смартфон Apple iPhone XS 512 ГБ', model='apple/iphone/xs-max-512'),
+            build_item(2, 'Чехол', model=''),
+        ]}, self.shops[0])
+        ImportService.import_products({'goods': [
+            build_item(1, 'iPhone XS Max 512GB gold', model='Apple/iPhone/XS-Max-512'),
+            build_item(2, 'ЧЕХОЛ'),
+        ]}, self.shops[1])
+
+        self.assertEqual(Product.objects.count(), 2)
+        self.assertEqual(product_match_key('x', 'Apple/iPhone/XS-Max-512'), 'model:apple iphone xs max 512')
+
+    @override_settings(IMPORT_CHUNK_SIZE=2)
+    def test_match_table_reused_between_chunks(self):
+        """
+        Тестирование таблицы сопоставления: ключ читается из БД только в первом пакете.
+        """
+        goods = [build_item(index, f'Product {index % 2}') for index in range(1, 7)]
+        importer = BulkProductImporter(self.shops[0], incremental=True)
+
+        with CaptureQueriesContext(connection) as queries:
+            for start in range(0, len(goods), 2):
+                importer.import_goods(goods[start:start + 2])
+
+        lookups = [query['sql'] for query in queries.captured_queries
+                   if 'match_key' in query['sql'] and query['sql'].startswith('SELECT')]
+        # Поиск по ключам и чтение id созданных товаров - только в первом пакете
+        self.assertEqual(len(lookups), 2)
+        self.assertEqual(Product.objects.count(), 2)
+        self.assertEqual(ProductInfo.objects.count(), 6)
+
+    def test_match_key_is_unique(self):
+        """
+        Тестирование уникальности ключа: пустой ключ может повторяться.
+        """
+        Product.objects.create(name='iPhone XS, черный')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Product.objects.create(name='IPHONE XS черный')
+
+        Product.objects.create(name='...')
+        Product.objects.create(name='!!!')
+        self.assertEqual(Product.objects.filter(match_key='').count(), 2)
+
+    def test_concurrent_import_reuses_product(self):
+        """
+        Тестирование гонки импортов: товар, созданный другим импортом после поиска по ключу,
+        не дублируется, а его id дочитывается по ключу.
+        """
+        create_products = Product.objects.bulk_create
+        other = []
+
+        def racing_create(objs, **kwargs):
+            other.append(Product.objects.create(name='Смартфон Apple iPhone XS (черный)'))
+            return create_products(objs, **kwargs)
+
+        with patch.object(Product.objects, 'bulk_create', racing_create):
+            success, _ = ImportService.import_products(
+                {'goods': [build_item(1, 'смартфон apple iphone xs черный')]}, self.shops[0]
+            )
+
+        self.assertTrue(success)
+        self.assertEqual(Product.objects.count(), 1)
+        self.assertEqual(ProductInfo.objects.get().product_id, other[0].id)
+
+    def test_migration_merges_duplicates(self):
+        """
+        Тестирование миграции: товары с одинаковым ключом объединяются до создания ограничения.
+        """
+        migration = importlib.import_module('backend.migrations.0015_unique_product_match_key')
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX "unique_product_match_key"')
+
+        keeper = Product.objects.create(name='Смартфон Honor 20', category=self.category)
+        duplicate = Product.objects.create(name='смартфон HONOR 20')
+        keeper_info = ProductInfo.objects.create(product=keeper, shop=self.shops[0], external_id=1,
+                                                 price=100, price_rrc=120, quantity=5)
+        # Повтор того же предложения магазина и предложение другого магазина
+        repeated_info = ProductInfo.objects.create(product=duplicate, shop=self.shops[0], external_id=1,
+                                                   price=100, price_rrc=120, quantity=5)
+        moved_info = ProductInfo.objects.create(product=duplicate, shop=self.shops[1], external_id=7,
+                                                price=90, price_rrc=120, quantity=5)
+        buyer = User.objects.create_user(email='buyer@example.com', password='password123', is_active=True)
+        order = Order.objects.create(user=buyer, state='new')
+        OrderItem.objects.create(order=order, product_info=keeper_info, quantity=1)
+        OrderItem.objects.create(order=order, product_info=repeated_info, quantity=2)
+
+        # Функции миграции нужно только соединение редактора схемы
+        migration.merge_duplicate_products(apps, SimpleNamespace(connection=connection))
+
+        self.assertEqual(list(Product.objects.values_list('id', flat=True)), [keeper.id])
+        self.assertEqual(set(ProductInfo.objects.values_list('id', flat=True)), {keeper_info.id, moved_info.id})
+        self.assertEqual(list(order.ordered_items.values_list('product_info_id', 'quantity')), [(keeper_info.id, 3)])
+        self.assertEqual(CatalogItem.objects.get(pk=moved_info.pk).product_id, keeper.id)
+        self.assertEqual(CatalogItem.objects.get(pk=moved_info.pk).category_name, 'Смартфоны')
@@ -0,0 +1,349 @@
+import importlib
+from types import SimpleNamespace
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from backend.models import Shop, Category, Product, ProductInfo
+from backend.services.import_service import ImportService
+from backend.services.search import ProductSearchIndex, word_similarity
+
+User = get_user_model()
+
+
+class ProductSearchTestCase(TestCase):
+    """
+    Тесты поискового индекса товаров.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.shop = Shop.objects.create(name='Shop', state=True)
+        self.category = Category.objects.create(name='Смартфоны')
+        self.products = {}
+        for external_id, (name, model) in enumerate([
+            ('Смартфон Apple iPhone XS Max 512GB (золотистый)', 'apple/iphone/xs-max'),
+            ('Смартфон Apple iPhone 11 Pro', 'apple/iphone/11-pro'),
+            ('Смартфон Samsung Galaxy S10+', 'samsung/galaxy/s10-plus'),
+            ('Чехол для iPhone XS', 'case/xs'),
+        ], start=1):
+            product = Product.objects.create(name=name, category=self.category)
+            ProductInfo.objects.create(product=product, shop=self.shop, model=model, external_id=external_id,
+                                       price=100, price_rrc=120, quantity=5)
+            self.products[name] = product
+
+    def search(self, query):
+        response = self.client.get('/api/v1/products', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [item['product']['name'] for item in response.data['results']]
+
+    def test_substring(self):
+        """
+        Тестирование поиска подстроки без учета регистра.
+        """
+        self.assertEqual(self.search('GALAXY s10'), ['Смартфон Samsung Galaxy S10+'])
+        self.assertEqual(len(self.search('iphone')), 3)
+
+    def test_word_order(self):
+        """
+        Тестирование поиска слов в любом порядке.
+        """
+        self.assertEqual(self.search('512gb iphone max'), ['Смартфон Apple iPhone XS Max 512GB (золотистый)'])
+
+    def test_typo(self):
+        """
+        Тестирование нечеткого поиска с опечатками.
+        """
+        self.assertEqual(self.search('Samsnug Galxy'), ['Смартфон Samsung Galaxy S10+'])
+        self.assertEqual(self.search('совершенно другое'), [])
+
+    def test_phrase_before_words(self):
+        """
+        Тестирование ступеней поиска: при совпадении всей фразы товары с отдельными словами не возвращаются.
+        """
+        results = self.search('iphone xs')
+
+        self.assertEqual(sorted(results), ['Смартфон Apple iPhone XS Max 512GB (золотистый)', 'Чехол для iPhone XS'])
+        self.assertEqual(len(self.search('xs 11')), 0)
+        self.assertEqual(self.search('pro iphone'), ['Смартфон Apple iPhone 11 Pro'])
+
+    def test_cursor_requires_ordering(self):
+        """
+        Тестирование курсорной пагинации поиска: без ordering порядок по релевантности недоступен.
+        """
+        response = self.client.get('/api/v1/products', {'search': 'iphone', 'pagination': 'cursor'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.data['status'])
+
+        response = self.client.get('/api/v1/products', {'search': 'iphone', 'pagination': 'cursor',
+                                                         'ordering': 'id'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_model_search(self):
+        """
+        Тестирование поиска по модели предложения магазина.
+        """
+        self.assertEqual(self.search('11-pro'), ['Смартфон Apple iPhone 11 Pro'])
+
+    def test_index_used(self):
+        """
+        Тестирование поиска по индексу: сканирование LIKE по таблице товаров не выполняется.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            self.search('galaxy')
+
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        self.assertIn('MATCH', sql)
+        self.assertNotIn('LIKE', sql)
+
+    def test_short_query_fallback(self):
+        """
+        Тестирование запроса короче трех символов: поиск без индекса.
+        """
+        self.assertEqual(self.search('11'), ['Смартфон Apple iPhone 11 Pro'])
+
+    @override_settings(SEARCH_INDEX_ENABLED=False)
+    def test_index_disabled(self):
+        """
+        Тестирование поиска при отключенном индексе.
+        """
+        self.assertIsNone(ProductSearchIndex.search('galaxy'))
+        self.assertEqual(self.search('Galaxy'), ['Смартфон Samsung Galaxy S10+'])
+
+    def test_orm_updates_index(self):
+        """
+        Тестирование обновления индекса при сохранении товара через ORM.
+        """
+        product = self.products['Смартфон Samsung Galaxy S10+']
+        product.name = 'Смартфон Samsung Galaxy Note'
+        product.save()
+
+        self.assertEqual(self.search('galaxy note'), ['Смартфон Samsung Galaxy Note'])
+
+        # Модель предложения входит в документ товара
+        product_info = ProductInfo.objects.get(product=product)
+        product_info.model = 'samsung/galaxy/note-10'
+        product_info.save()
+        self.assertEqual(self.search('note-10'), ['Смартфон Samsung Galaxy Note'])
+
+        # Перенос предложения к другому товару обновляет документы обоих
+        product_info.product = self.products['Чехол для iPhone XS']
+        product_info.save()
+        self.assertEqual(set(self.search('note-10')), {'Чехол для iPhone XS'})
+
+    def test_rebuild(self):
+        """
+        Тестирование перестроения индекса командой rebuild_search_index.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM backend_product_search")
+        self.assertEqual(self.search('galaxy'), [])
+
+        output = StringIO()
+        call_command('rebuild_search_index', stdout=output)
+
+        self.assertIn('4 products', output.getvalue())
+        self.assertEqual(self.search('galaxy'), ['Смартфон Samsung Galaxy S10+'])
+
+    def test_word_similarity(self):
+        """
+        Тестирование сходства по триграммам.
+        """
+        self.assertEqual(word_similarity('iphone', 'смартфон apple iphone xs'), 1.0)
+        self.assertGreater(word_similarity('iphnoe', 'смартфон apple iphone xs'), 0.4)
+        self.assertLess(word_similarity('nonexistentproduct', 'product 1 model 1 1'), 0.4)
+
+
+class ProductSearchImportTestCase(TestCase):
+    """
+    Тесты обновления поискового индекса импортом прайс-листа.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+        self.shop = Shop.objects.create(name='Shop', user=user)
+        self.category = Category.objects.create(id=1, name='Смартфоны')
+
+    def build_data(self, model):
+        return {'goods': [{
+            'id': 1, 'category': 1, 'model': model, 'name': 'Смартфон Xiaomi Redmi Note 8',
+            'price': 100, 'price_rrc': 120, 'quantity': 5, 'parameters': {},
+        }]}
+
+    def search(self, query):
+        response = self.client.get('/api/v1/products', {'search': query})
+        return [item['external_id'] for item in response.data['results']]
+
+    @override_settings(IMPORT_MODE='incremental')
+    def test_incremental_import(self):
+        """
+        Тестирование индексации товаров и изменений модели при импорте в режиме incremental.
+        """
+        ImportService.import_products(self.build_data('xiaomi/redmi-note-8'), self.shop)
+        self.assertEqual(self.search('redmi note'), [1])
+
+        ImportService.import_products(self.build_data('xiaomi/m1908c3jg'), self.shop)
+        self.assertEqual(self.search('m1908c3jg'), [1])
+
+    @override_settings(IMPORT_MODE='replace')
+    def test_replace_import(self):
+        """
+        Тестирование индексации товаров при импорте в режиме replace.
+        """
+        ImportService.import_products(self.build_data('xiaomi/redmi-note-8'), self.shop)
+        ImportService.import_products(self.build_data('xiaomi/redmi-note-8'), self.shop)
+
+        self.assertEqual(self.search('xiaomi redmi'), [1])
+
+
+class ProductSearchScopeTestCase(TestCase):
+    """
+    Тесты поиска внутри выборки с фильтрами каталога.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.shop = Shop.objects.create(name='Shop', state=True)
+        self.other_shop = Shop.objects.create(name='Other Shop', state=True)
+        for external_id, name in enumerate(['Apple iPhone XS', 'Apple iPhone 11', 'Apple iPhone SE'], start=1):
+            ProductInfo.objects.create(product=Product.objects.create(name=name), shop=self.shop,
+                                       model='', external_id=external_id, price=100, price_rrc=120, quantity=5)
+
+    def add_other_shop_product(self, name):
+        ProductInfo.objects.create(product=Product.objects.create(name=name), shop=self.other_shop,
+                                   model='', external_id=1, price=100, price_rrc=120, quantity=5)
+
+    def search(self, params):
+        response = self.client.get('/api/v1/products', params)
+        self.assertEqual(response.status_code, 200)
+        return [item['product']['name'] for item in response.data['results']]
+
+    @override_settings(SEARCH_MAX_RESULTS=2)
+    def test_match_past_limit(self):
+        """
+        Тестирование совпадения в магазине из фильтра, которое во всем каталоге ниже ограничения выдачи.
+        """
+        name = 'Смартфон Apple iPhone 12 Pro Max 256 ГБ тихоокеанский синий'
+        self.add_other_shop_product(name)
+
+        self.assertNotIn(name, self.search({'search': 'apple iphone'}))
+        self.assertEqual(self.search({'search': 'apple iphone', 'shop_id': self.other_shop.id}), [name])
+
+    def test_next_tier_in_scope(self):
+        """
+        Тестирование перехода к следующей ступени, если совпадения ступени не проходят фильтры.
+        """
+        self.add_other_shop_product('iPhone 12 от Apple')
+
+        self.assertEqual(self.search({'search': 'apple iphone', 'shop_id': self.other_shop.id}),
+                         ['iPhone 12 от Apple'])
+        self.assertEqual(self.search({'search': 'apple iphone', 'min_price': 1000}), [])
+
+
+class ProductSearchIndexSyncTestCase(TestCase):
+    """
+    Тесты состава поискового индекса: только товары текущих версий каталогов.
+    """
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email='shop@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+        self.shop = Shop.objects.create(name='Shop', user=user, state=True)
+        Category.objects.create(id=1, name='Смартфоны')
+
+    def indexed(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT rowid, document FROM backend_product_search ORDER BY rowid")
+            return dict(cursor.fetchall())
+
+    def import_goods(self, names):
+        ImportService.import_products({'goods': [{
+            'id': external_id, 'category': 1, 'model': f'model-{external_id}', 'name': name,
+            'price': 100, 'price_rrc': 120, 'quantity': 5, 'parameters': {},
+        } for external_id, name in enumerate(names, start=1)]}, self.shop)
+        self.shop.refresh_from_db()
+
+    def product_id(self, name):
+        return Product.objects.get(name=name).id
+
+    @override_settings(IMPORT_MODE='replace')
+    def test_versions(self):
+        """
+        Тестирование индекса при публикации и откате версии каталога.
+        """
+        self.import_goods(['Смартфон Xiaomi Redmi Note 8', 'Смартфон Honor 20'])
+        self.import_goods(['Смартфон Xiaomi Redmi Note 8'])
+
+        honor = self.product_id('Смартфон Honor 20')
+        self.assertNotIn(honor, self.indexed())
+
+        ImportService.rollback_catalog(self.shop)
+        self.assertIn(honor, self.indexed())
+
+    @override_settings(IMPORT_MODE='incremental')
+    def test_incremental_delete(self):
+        """
+        Тестирование удаления товара, отсутствующего в прайс-листе, из индекса.
+        """
+        self.import_goods(['Смартфон Xiaomi Redmi Note 8', 'Смартфон Honor 20'])
+        honor = self.product_id('Смартфон Honor 20')
+        self.assertIn(honor, self.indexed())
+
+        self.import_goods(['Смартфон Xiaomi Redmi Note 8'])
+        self.assertNotIn(honor, self.indexed())
+
+    def test_orm_delete(self):
+        """
+        Тестирование удаления документов при удалении ProductInfo, Product и Shop через ORM.
+        """
+        products = [Product.objects.create(name=name) for name in ('Смартфон Honor 20', 'Смартфон Honor 30')]
+        product_infos = [
+            ProductInfo.objects.create(product=product, shop=self.shop, model='', external_id=index,
+                                       price=100, price_rrc=120, quantity=5)
+            for index, product in enumerate(products)
+        ]
+        self.assertEqual(sorted(self.indexed()), [product.id for product in products])
+
+        product_infos[0].delete()
+        self.assertEqual(list(self.indexed()), [products[1].id])
+
+        ProductInfo.objects.create(product=products[0], shop=self.shop, model='', external_id=3,
+                                   price=100, price_rrc=120, quantity=5)
+        products[0].delete()
+        self.assertEqual(list(self.indexed()), [products[1].id])
+
+        self.shop.delete()
+        self.assertEqual(self.indexed(), {})
+
+    def test_migration_fill(self):
+        """
+        Тестирование заполнения индекса миграцией по историческим моделям.
+        """
+        from django.apps import apps
+        migration = importlib.import_module('backend.migrations.0011_product_search')
+        product = Product.objects.create(name='Смартфон Honor 20')
+        ProductInfo.objects.create(product=product, shop=self.shop, model='honor/20', external_id=1,
+                                   price=100, price_rrc=120, quantity=5)
+        ProductInfo.objects.create(product=Product.objects.create(name='Черновик'), shop=self.shop, model='',
+                                   external_id=2, price=100, price_rrc=120, quantity=5, catalog_version=5)
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM backend_product_search")
+
+        # Функции заполнения нужно только соединение редактора схемы
+        migration.fill_search_index(apps, SimpleNamespace(connection=connection))
+
+        self.assertEqual(self.indexed(), {product.id: 'смартфон honor 20 honor 20'})
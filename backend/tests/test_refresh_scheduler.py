@@ -0,0 +1,252 @@
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from unittest.mock import patch
+from backend.models import Shop, ShopImportState
+from backend.services.import_orchestration import RefreshScheduler
+from backend.tasks import refresh_shop_price_list_task, schedule_price_list_refresh_task
+
+User = get_user_model()
+
+
+@override_settings(IMPORT_REFRESH_INTERVAL=3600, IMPORT_REFRESH_CONCURRENCY=2,
+                   IMPORT_REFRESH_MAX_BACKOFF=8, IMPORT_REFRESH_JITTER=0)
+class RefreshSchedulerTestCase(TestCase):
+    """
+    Тесты планового обновления прайс-листов магазинов.
+    """
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.shops = [self.create_shop(index) for index in range(4)]
+
+    def create_shop(self, index, **kwargs):
+        user = User.objects.create_user(
+            email=f'shop{index}@example.com',
+            password='password123',
+            is_active=True,
+            type='shop'
+        )
+        kwargs.setdefault('url', f'https://example.com/shop{index}.yaml')
+        return Shop.objects.create(name=f'Shop {index}', user=user, **kwargs)
+
+    def make_due(self, shops):
+        ShopImportState.objects.filter(shop__in=shops).update(next_refresh_at=self.now - timedelta(seconds=1))
+
+    def test_first_runs_spread(self):
+        """
+        Тестирование распределения первых запусков магазинов по периоду обновления.
+        """
+        with patch('backend.tasks.refresh_shop_price_list_task.delay') as mock_delay:
+            RefreshScheduler.dispatch(now=self.now)
+
+        scheduled = [ShopImportState.objects.get(shop=shop).next_refresh_at for shop in self.shops]
+        self.assertEqual(len(set(scheduled)), len(self.shops))
+        for shop, next_refresh_at in zip(self.shops, scheduled):
+            self.assertGreaterEqual(next_refresh_at, self.now)
+            self.assertLess(next_refresh_at, self.now + timedelta(seconds=3600))
+            self.assertEqual((next_refresh_at - self.now).total_seconds(), RefreshScheduler.initial_offset(shop, 3600))
+
+        # Повторная проверка не сдвигает расписание
+        with patch('backend.tasks.refresh_shop_price_list_task.delay'):
+            RefreshScheduler.dispatch(now=self.now + timedelta(seconds=1))
+        self.assertEqual([ShopImportState.objects.get(shop=shop).next_refresh_at for shop in self.shops], scheduled)
+        mock_delay.assert_not_called()
+
+    def test_concurrency_limit(self):
+        """
+        Тестирование ограничения числа одновременных обновлений.
+        """
+        with patch('backend.tasks.refresh_shop_price_list_task.delay'):
+            RefreshScheduler.dispatch(now=self.now)
+        self.make_due(self.shops)
+
+        with patch('backend.tasks.refresh_shop_price_list_task.delay') as mock_delay:
+            result = RefreshScheduler.dispatch(now=self.now)
+            self.assertEqual(len(result['dispatched']), 2)
+            self.assertEqual(mock_delay.call_count, 2)
+
+            # Пока запущенные обновления не завершены, новые не запускаются
+            result = RefreshScheduler.dispatch(now=self.now + timedelta(seconds=300))
+            self.assertEqual(result, {"dispatched": [], "running": 2})
+
+            # Завершение одного обновления освобождает место
+            RefreshScheduler.record_result(mock_delay.call_args_list[0][0][0], {"status": True}, now=self.now)
+            result = RefreshScheduler.dispatch(now=self.now + timedelta(seconds=600))
+            self.assertEqual(len(result['dispatched']), 1)
+
+    @override_settings(IMPORT_LOCK_TIMEOUT=600)
+    def test_stale_refresh_reclaimed(self):
+        """
+        Тестирование повторного запуска обновления, отметка которого осталась от упавшего воркера.
+        """
+        ShopImportState.objects.create(
+            shop=self.shops[0], next_refresh_at=self.now - timedelta(hours=1),
+            refresh_started_at=self.now - timedelta(hours=1)
+        )
+        Shop.objects.filter(id__in=[shop.id for shop in self.shops[1:]]).update(refresh_interval=0)
+
+        with patch('backend.tasks.refresh_shop_price_list_task.delay') as mock_delay:
+            result = RefreshScheduler.dispatch(now=self.now)
+
+        self.assertEqual(result, {"dispatched": [self.shops[0].id], "running": 0})
+        mock_delay.assert_called_once_with(self.shops[0].id)
+
+    def test_disabled_shops_skipped(self):
+        """
+        Тестирование пропуска магазинов без адреса, без приема заказов и с отключенным автообновлением.
+        """
+        Shop.objects.filter(id=self.shops[0].id).update(refresh_interval=0)
+        Shop.objects.filter(id=self.shops[1].id).update(url='')
+        Shop.objects.filter(id=self.shops[2].id).update(state=False)
+
+        with patch('backend.tasks.refresh_shop_price_list_task.delay'):
+            RefreshScheduler.dispatch(now=self.now)
+        self.make_due(self.shops)
+        with patch('backend.tasks.refresh_shop_price_list_task.delay') as mock_delay:
+            result = RefreshScheduler.dispatch(now=self.now)
+
+        self.assertEqual(result['dispatched'], [self.shops[3].id])
+        self.assertEqual(ShopImportState.objects.count(), 1)
+        mock_delay.assert_called_once_with(self.shops[3].id)
+
+    def test_shop_refresh_interval(self):
+        """
+        Тестирование периода обновления, заданного для магазина.
+        """
+        shop = self.shops[0]
+        shop.refresh_interval = 600
+
+        RefreshScheduler.record_result(shop.id, {"status": True}, now=self.now)
+        self.assertEqual(ShopImportState.objects.get(shop=shop).next_refresh_at, self.now + timedelta(seconds=3600))
+
+        shop.save()
+        state = RefreshScheduler.record_result(shop.id, {"status": True}, now=self.now)
+        self.assertEqual(state.next_refresh_at, self.now + timedelta(seconds=600))
+
+    def test_backoff_on_failures(self):
+        """
+        Тестирование увеличения периода после ошибок подряд и его сброса после успешного импорта.
+        """
+        shop = self.shops[0]
+        delays = []
+        for _ in range(5):
+            state = RefreshScheduler.record_result(shop.id, {"status": False, "error": "timeout"}, now=self.now)
+            delays.append((state.next_refresh_at - self.now).total_seconds())
+
+        self.assertEqual(delays, [7200, 14400, 28800, 28800, 28800])
+        self.assertEqual(state.refresh_failures, 5)
+        self.assertEqual(state.last_refresh_error, 'timeout')
+
+        state = RefreshScheduler.record_result(shop.id, {"status": True}, now=self.now)
+        self.assertEqual((state.refresh_failures, state.last_refresh_error), (0, ''))
+        self.assertEqual(state.next_refresh_at, self.now + timedelta(seconds=3600))
+
+    def test_backoff_on_unchanged(self):
+        """
+        Тестирование увеличения периода для неизменившихся прайс-листов.
+        """
+        shop = self.shops[0]
+        RefreshScheduler.record_result(shop.id, {"status": False, "error": "timeout"}, now=self.now)
+        RefreshScheduler.record_result(shop.id, {"status": True, "skipped": True}, now=self.now)
+        state = RefreshScheduler.record_result(shop.id, {"status": True, "skipped": True}, now=self.now)
+
+        self.assertEqual((state.refresh_failures, state.refresh_unchanged), (0, 2))
+        self.assertEqual(state.next_refresh_at, self.now + timedelta(seconds=14400))
+
+        # Импорт, уже выполняющийся по другому запросу, не меняет серии
+        state = RefreshScheduler.record_result(shop.id, {"status": True, "coalesced": True}, now=self.now)
+        self.assertEqual(state.refresh_unchanged, 2)
+        self.assertIsNone(state.refresh_started_at)
+
+    @override_settings(IMPORT_REFRESH_JITTER=0.1)
+    def test_jitter(self):
+        """
+        Тестирование случайного разброса времени следующего запуска.
+        """
+        next_runs = {RefreshScheduler.next_refresh_at(self.shops[0], self.now) for _ in range(10)}
+
+        self.assertGreater(len(next_runs), 1)
+        for next_refresh_at in next_runs:
+            self.assertGreaterEqual(next_refresh_at, self.now + timedelta(seconds=3240))
+            self.assertLessEqual(next_refresh_at, self.now + timedelta(seconds=3960))
+
+    def test_refresh_task(self):
+        """
+        Тестирование задачи обновления магазина: импорт по сохраненному адресу и учет результата.
+        """
+        shop = self.shops[0]
+        ShopImportState.objects.create(shop=shop, refresh_started_at=self.now)
+
+        with patch('backend.tasks.ImportOrchestrator.run_locked',
+                   side_effect=ConnectionError('connection refused')) as mock_run:
+            result = refresh_shop_price_list_task.run(shop.id)
+
+        mock_run.assert_called_once()
+        self.assertEqual(mock_run.call_args[0][:2], (shop.url, shop.user_id))
+        self.assertFalse(result['status'])
+        state = ShopImportState.objects.get(shop=shop)
+        self.assertEqual(state.refresh_failures, 1)
+        self.assertIn('connection refused', state.last_refresh_error)
+        self.assertIsNone(state.refresh_started_at)
+
+    def test_partitioned_refresh_in_flight(self):
+        """
+        Тестирование обновления по разделам: пока chord выполняется, магазин занимает место
+        в ограничении IMPORT_REFRESH_CONCURRENCY, а серии не сбрасываются.
+        """
+        shop = self.shops[0]
+        ShopImportState.objects.create(shop=shop, refresh_started_at=self.now, refresh_failures=3)
+
+        with patch('backend.tasks.ImportOrchestrator.run_locked',
+                   return_value={"status": True, "partitioned": True}) as mock_run:
+            refresh_shop_price_list_task.run(shop.id)
+
+        self.assertTrue(mock_run.call_args[1]['refresh'])
+        state = ShopImportState.objects.get(shop=shop)
+        self.assertEqual(state.refresh_started_at, self.now)
+        self.assertEqual(state.refresh_failures, 3)
+        self.assertEqual(RefreshScheduler.dispatch(now=self.now)['running'], 1)
+
+    def test_refresh_task_deleted_shop(self):
+        """
+        Тестирование задачи обновления удаленного магазина: результат пропуска без ошибки.
+        """
+        shop_id = self.shops[0].id
+        self.shops[0].delete()
+
+        with patch('backend.tasks.ImportOrchestrator.run_locked') as mock_run:
+            result = refresh_shop_price_list_task.run(shop_id)
+
+        mock_run.assert_not_called()
+        self.assertTrue(result['status'])
+        self.assertTrue(result['skipped'])
+
+    def test_refresh_task_shop_deleted_during_import(self):
+        """
+        Тестирование учета результата, если магазин удален во время импорта: задача не падает.
+        """
+        shop = self.shops[0]
+        ShopImportState.objects.create(shop=shop, refresh_started_at=self.now)
+
+        def delete_shop(*args, **kwargs):
+            Shop.objects.filter(pk=shop.pk).delete()
+            return {"status": True}
+
+        with patch('backend.tasks.ImportOrchestrator.run_locked', side_effect=delete_shop):
+            result = refresh_shop_price_list_task.run(shop.id)
+
+        self.assertTrue(result['status'])
+        self.assertFalse(ShopImportState.objects.filter(shop_id=shop.id).exists())
+
+    def test_schedule_task(self):
+        """
+        Тестирование периодической задачи запуска обновлений.
+        """
+        with patch('backend.tasks.RefreshScheduler.dispatch',
+                   return_value={"dispatched": [1], "running": 0}) as mock_dispatch:
+            result = schedule_price_list_refresh_task()
+
+        mock_dispatch.assert_called_once_with()
+        self.assertEqual(result['dispatched'], [1])
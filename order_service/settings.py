@@ -290,6 +290,63 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_STORE_EAGER_RESULT = True
 
+# Настройки импорта прайс-листов
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 1000))  # Размер пакета для bulk_create
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 5000))  # Товаров в одной транзакции
+# Прайс-листы от этого размера (в байтах) разбираются потоково
+IMPORT_STREAM_THRESHOLD = int(os.getenv('IMPORT_STREAM_THRESHOLD', 5 * 1024 * 1024))
+# replace - прайс-лист записывается в новую версию каталога, которая публикуется целиком после записи всех товаров;
+# incremental - текущая версия обновляется на месте (покупатели видят частично записанный прайс-лист)
+IMPORT_MODE = os.getenv('IMPORT_MODE', 'replace')
+# Загрузка прайс-листов по HTTP
+IMPORT_FETCH_CONNECT_TIMEOUT = float(os.getenv('IMPORT_FETCH_CONNECT_TIMEOUT', 5))  # секунды
+IMPORT_FETCH_READ_TIMEOUT = float(os.getenv('IMPORT_FETCH_READ_TIMEOUT', 60))  # секунды
+IMPORT_FETCH_RETRIES = int(os.getenv('IMPORT_FETCH_RETRIES', 2))
+IMPORT_FETCH_POOL_SIZE = int(os.getenv('IMPORT_FETCH_POOL_SIZE', 10))
+IMPORT_MAX_SIZE = int(os.getenv('IMPORT_MAX_SIZE', 200 * 1024 * 1024))  # Максимальный размер прайс-листа, байт
+# Пакетный импорт: число параллельно импортируемых магазинов и время жизни блокировки магазина
+IMPORT_BATCH_CONCURRENCY = int(os.getenv('IMPORT_BATCH_CONCURRENCY', 4))
+IMPORT_LOCK_TIMEOUT = int(os.getenv('IMPORT_LOCK_TIMEOUT', 60 * 60))  # секунды
+# Повтор задачи импорта после ошибки БД, продолжение - с контрольной точки
+IMPORT_TASK_MAX_RETRIES = int(os.getenv('IMPORT_TASK_MAX_RETRIES', 3))
+IMPORT_TASK_RETRY_DELAY = int(os.getenv('IMPORT_TASK_RETRY_DELAY', 30))  # секунды, удваивается с каждой попыткой
+IMPORT_PROGRESS_INTERVAL = float(os.getenv('IMPORT_PROGRESS_INTERVAL', 1))  # Минимальный интервал публикации хода импорта, секунды
+IMPORT_VALIDATION_MAX_ERRORS = int(os.getenv('IMPORT_VALIDATION_MAX_ERRORS', 100))  # Максимум собираемых ошибок структуры прайс-листа
+IMPORT_STREAM_PREVALIDATE = os.getenv('IMPORT_STREAM_PREVALIDATE', 'True') == 'True'  # Проверять товары потокового прайс-листа до записи в БД
+IMPORT_UPLOAD_DIR = os.getenv('IMPORT_UPLOAD_DIR', str(BASE_DIR / 'uploads' / 'price_lists'))  # Каталог загруженных прайс-листов, общий с воркерами Celery
+IMPORT_PARTITIONS = int(os.getenv('IMPORT_PARTITIONS', 1))  # Число разделов параллельного импорта крупного прайс-листа (1 - без разбиения)
+IMPORT_PARTITION_THRESHOLD = int(os.getenv('IMPORT_PARTITION_THRESHOLD', 200000))  # Минимальное число товаров для импорта по разделам
+IMPORT_PRODUCT_MATCH = os.getenv('IMPORT_PRODUCT_MATCH', 'name')  # Сопоставление товаров с Product: name - по названию, model - по модели
+IMPORT_PRICE_HISTORY = os.getenv('IMPORT_PRICE_HISTORY', 'True') == 'True'  # Записывать изменения цен и остатков в историю
+PRICE_HISTORY_POINTS = int(os.getenv('PRICE_HISTORY_POINTS', 200))  # Число точек ряда истории цен по умолчанию
+PRICE_HISTORY_MAX_POINTS = int(os.getenv('PRICE_HISTORY_MAX_POINTS', 1000))  # Максимальное число точек ряда истории цен
+
+# Плановое обновление прайс-листов магазинов по Shop.url (Celery beat)
+IMPORT_REFRESH_INTERVAL = int(os.getenv('IMPORT_REFRESH_INTERVAL', 24 * 60 * 60))  # Период обновления по умолчанию, секунды
+IMPORT_REFRESH_TICK = int(os.getenv('IMPORT_REFRESH_TICK', 5 * 60))  # Период проверки расписания, секунды
+IMPORT_REFRESH_CONCURRENCY = int(os.getenv('IMPORT_REFRESH_CONCURRENCY', 2))  # Максимум одновременных плановых импортов
+IMPORT_REFRESH_MAX_BACKOFF = int(os.getenv('IMPORT_REFRESH_MAX_BACKOFF', 16))  # Максимальное увеличение периода при ошибках и неизменившихся прайс-листах, раз
+IMPORT_REFRESH_JITTER = float(os.getenv('IMPORT_REFRESH_JITTER', 0.1))  # Случайный разброс времени запуска, доля периода
+
+# Поисковый индекс товаров (FTS5 для SQLite, tsvector и pg_trgm для PostgreSQL)
+SEARCH_INDEX_ENABLED = os.getenv('SEARCH_INDEX_ENABLED', 'True') == 'True'
+SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', 500))  # Максимум найденных товаров в выдаче
+SEARCH_TRIGRAM_THRESHOLD = float(os.getenv('SEARCH_TRIGRAM_THRESHOLD', 0.4))  # Порог сходства нечеткого поиска
+SEARCH_FUZZY_CANDIDATES = int(os.getenv('SEARCH_FUZZY_CANDIDATES', 200))  # Кандидатов нечеткого поиска в SQLite
+FACET_MAX_VALUES = int(os.getenv('FACET_MAX_VALUES', 50))  # Максимум значений одного параметра в фасетах
+
+# Кэш ответов каталога (списка и карточки товара) с версиями по магазинам.
+# В тестах по умолчанию выключен: данные тестов откатываются без сброса версий кэша
+CATALOG_CACHE_ENABLED = os.getenv('CATALOG_CACHE_ENABLED', str(not IS_TESTING)) == 'True'
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', 300))  # Время хранения ответа, секунды
+
+CELERY_BEAT_SCHEDULE = {
+    'schedule-price-list-refresh': {
+        'task': 'backend.tasks.schedule_price_list_refresh_task',
+        'schedule': IMPORT_REFRESH_TICK,
+    },
+}
+
 # Spectacular settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Сервис автоматизации закупок API',